@@ -23,6 +23,12 @@ def create_app(config_name='development'):
     
     # Load configuration
     app.config.from_object(config[config_name]) 
+
+    # JSON (dates, TIME columns, Decimals) and response compression
+    from utils.json_provider import FastJSONProvider
+    from utils.compression import init_compression
+    app.json = FastJSONProvider(app)
+    init_compression(app)
     
     # Initialize extensions
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True, allow_headers=["Content-Type", "Authorization"], methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
@@ -45,6 +51,8 @@ def create_app(config_name='development'):
     from routes.hospital_dashboard import hospital_dashboard_bp
     from routes.hospitals import hospitals_bp
     from routes.user_bed_booking import user_bed_booking_bp
+    from routes.jobs import jobs_bp
+    from routes.hospital_bulk import hospital_bulk_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(appointments_bp, url_prefix='/api')
     app.register_blueprint(doctors_bp, url_prefix='/api')
@@ -62,6 +70,8 @@ def create_app(config_name='development'):
     app.register_blueprint(hospital_dashboard_bp, url_prefix='/api')
     app.register_blueprint(hospitals_bp, url_prefix='/api')
     app.register_blueprint(user_bed_booking_bp, url_prefix='/api')
+    app.register_blueprint(jobs_bp, url_prefix='/api')
+    app.register_blueprint(hospital_bulk_bp, url_prefix='/api')
     
     # Root endpoint
     @app.route('/')
@@ -82,6 +92,10 @@ def create_app(config_name='development'):
     def not_found(error):
         return jsonify({'error': 'Resource not found'}), 404
     
+    @app.errorhandler(413)
+    def too_large(error):
+        return jsonify({'error': 'Request too large', 'message': 'The request body exceeds the server limit'}), 413
+
     @app.errorhandler(500)
     def internal_error(error):
         return jsonify({'error': 'Internal server error'}), 500
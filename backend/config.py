@@ -36,12 +36,72 @@ class Config:
     
     # API Keys
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+    # Upper bound for one Gemini call; keep it below the gunicorn worker timeout
+    AI_REQUEST_TIMEOUT_SECONDS = int(os.getenv('AI_REQUEST_TIMEOUT_SECONDS', 60))
     
     # File upload settings
+    # Enforced per upload by utils.uploads.spool_upload. Deliberately not
+    # Flask's app-wide MAX_CONTENT_LENGTH, which would also cut off the
+    # streamed hospital bulk imports.
     MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 10485760))  # 10MB default
     UPLOAD_FOLDER = 'uploads'
+    UPLOAD_SPOOL_DIR = os.getenv('UPLOAD_SPOOL_DIR', '')  # temp files for report uploads; '' = system temp dir
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
 
+    # Background jobs (AI / OCR offloading)
+    JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'memory')  # memory | database
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+    JOB_RESULT_TTL_SECONDS = int(os.getenv('JOB_RESULT_TTL_SECONDS', 3600))
+    JOB_MAX_RETRIES = int(os.getenv('JOB_MAX_RETRIES', 2))
+
+    # Symptom checker: answer locally when the rule-based triage is at least this confident
+    SYMPTOM_TRIAGE_MIN_CONFIDENCE = float(os.getenv('SYMPTOM_TRIAGE_MIN_CONFIDENCE', 0.75))
+
+    # Lab values in saved reports: ask Gemini about lab-looking lines the regex tables don't know (0 disables)
+    LAB_LLM_MAX_LINES = int(os.getenv('LAB_LLM_MAX_LINES', 30))
+
+    # Cache for non-personalized AI answers (symptom routing, Sage chat)
+    RESPONSE_CACHE_TTL_SECONDS = int(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 6 * 3600))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 2000))
+    RESPONSE_CACHE_SIMILARITY = float(os.getenv('RESPONSE_CACHE_SIMILARITY', 0))  # e.g. 0.95; 0 disables
+    RESPONSE_CACHE_MIN_TOKENS = int(os.getenv('RESPONSE_CACHE_MIN_TOKENS', 2))  # shorter prompts are never cached
+
+    # Bed occupancy time-series retention per resolution (days)
+    OCCUPANCY_RETENTION_5M_DAYS = int(os.getenv('OCCUPANCY_RETENTION_5M_DAYS', 3))
+    OCCUPANCY_RETENTION_1H_DAYS = int(os.getenv('OCCUPANCY_RETENTION_1H_DAYS', 90))
+    OCCUPANCY_RETENTION_1D_DAYS = int(os.getenv('OCCUPANCY_RETENTION_1D_DAYS', 1095))
+
+    # Response compression (gzip, or brotli when installed) for bodies above this size
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    COMPRESS_BR_QUALITY = int(os.getenv('COMPRESS_BR_QUALITY', 4))
+
+    # Cross-hospital bed search: full reload interval of the in-process availability index
+    BED_AVAILABILITY_TTL_SECONDS = int(os.getenv('BED_AVAILABILITY_TTL_SECONDS', 30))
+
+    # Rate limiting (sliding window). 'database' shares counters across gunicorn workers.
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # memory | database
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+    RATE_LIMIT_SWEEP_SECONDS = int(os.getenv('RATE_LIMIT_SWEEP_SECONDS', 60))
+
+    # Registration captcha: pre-rendered pool size and token lifetime
+    CAPTCHA_POOL_SIZE = int(os.getenv('CAPTCHA_POOL_SIZE', 50))
+    CAPTCHA_TTL_SECONDS = int(os.getenv('CAPTCHA_TTL_SECONDS', 300))
+
+    # Password hashing: bcrypt cost (see scripts/bcrypt_cost.py) and the bounded hashing pool
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', 0))  # 0 = min(4, CPU count)
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 32))
+    BCRYPT_POOL = os.getenv('BCRYPT_POOL', 'thread')  # thread | process
+
+    # Auth context: how long "this account still exists" answers are reused per worker
+    AUTH_CACHE_TTL_SECONDS = int(os.getenv('AUTH_CACHE_TTL_SECONDS', 60))
+    AUTH_CACHE_MAX_KEYS = int(os.getenv('AUTH_CACHE_MAX_KEYS', 10000))
+
+    # Heavy optional modules imported lazily per request path; gunicorn preload
+    # imports them once in the master so forked workers share the pages.
+    WARMUP_MODULES = os.getenv('WARMUP_MODULES', 'requests,email_validator,numpy,PIL.Image,fitz,pytesseract,google.genai').split(',')
+
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -0,0 +1,97 @@
+"""gunicorn settings for PocketCare.
+
+    cd backend && gunicorn -c gunicorn.conf.py
+    cd backend && GUNICORN_PROFILE=io GUNICORN_BIND=127.0.0.1:5001 gunicorn -c gunicorn.conf.py
+
+``GUNICORN_PROFILE`` picks how requests are served (see README,
+"Production serving"):
+
+- ``web`` (default): threaded workers for the ordinary database-backed API.
+- ``io``: gevent workers for the AI-bound endpoints (Sage chat, symptom
+  analysis, report explanations, weight suggestions). A request waiting
+  on Gemini costs one greenlet, not a whole worker. Falls back to many
+  threads when gevent isn't installed.
+- ``cpu``: one sync worker per core for OCR uploads, which are CPU bound.
+
+Every value can be overridden with the matching ``GUNICORN_*`` environment
+variable. With more than one worker, or any non-``web`` profile,
+``JOB_QUEUE_BACKEND`` and ``RATE_LIMIT_BACKEND`` default to ``database``
+unless they are set explicitly. With ``GUNICORN_PRELOAD=1`` (default) the app is imported once in
+the master and the heavy optional libraries listed in ``WARMUP_MODULES`` are
+imported before forking, so workers start instantly and share those pages.
+"""
+
+import os
+
+profile = os.getenv('GUNICORN_PROFILE', 'web').strip().lower()
+cpus = os.cpu_count() or 1
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+if profile == 'io':
+    try:
+        # Patch before the app (and requests/ssl/PyMySQL) is preloaded, so
+        # sockets and sleeps in every module cooperate with the hub.
+        from gevent import monkey
+
+        monkey.patch_all()
+        worker_class = 'gevent'
+        worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 200)
+    except ImportError:  # optional dependency
+        worker_class = 'gthread'
+        threads = _env_int('GUNICORN_THREADS', 32)
+    workers = _env_int('GUNICORN_WORKERS', cpus)
+    # Longer than AI_REQUEST_TIMEOUT_SECONDS so the upstream timeout fires
+    # first and the client gets a JSON error instead of a killed worker.
+    timeout = _env_int('GUNICORN_TIMEOUT', 90)
+elif profile == 'cpu':
+    worker_class = 'sync'
+    workers = _env_int('GUNICORN_WORKERS', cpus)
+    timeout = _env_int('GUNICORN_TIMEOUT', 120)
+else:
+    profile = 'web'
+    worker_class = 'gthread'
+    threads = _env_int('GUNICORN_THREADS', 4)
+    workers = _env_int('GUNICORN_WORKERS', cpus + 1)
+    timeout = _env_int('GUNICORN_TIMEOUT', 30)
+
+# Job status and rate-limit/captcha state must be visible to every worker,
+# and to the other profiles when nginx splits routes across instances. The
+# in-memory stores are per process, so default to the shared tables here;
+# Config reads these when the app is imported, which happens after this file.
+if workers > 1 or profile != 'web':
+    os.environ.setdefault('JOB_QUEUE_BACKEND', 'database')
+    os.environ.setdefault('RATE_LIMIT_BACKEND', 'database')
+
+wsgi_app = os.getenv('GUNICORN_APP', 'wsgi:app')
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+preload_app = os.getenv('GUNICORN_PRELOAD', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Finish in-flight requests on reload/shutdown before killing workers.
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+# Recycle workers now and then so slow leaks (Pillow/PyMuPDF buffers) stay bounded.
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+if os.path.isdir('/dev/shm'):
+    # Heartbeat files on tmpfs: a slow disk must not make workers look hung.
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-') or None  # empty disables
+proc_name = f'pocketcare-{profile}'
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before workers fork.
+    if not preload_app:
+        return
+    from config import Config
+    from utils.warmup import warm_imports
+
+    timings = warm_imports(Config.WARMUP_MODULES)
+    if timings:
+        detail = ', '.join(f"{name} {ms:.0f} ms" for name, ms in sorted(timings.items(), key=lambda kv: -kv[1]))
+        server.log.info("pre-fork warm-up: %s", detail)
@@ -1,5 +1,6 @@
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
+from utils.auth_context import requires_role
 from utils.database import get_db_connection
 from flask_jwt_extended import get_jwt_identity, jwt_required
 import re
@@ -34,15 +35,6 @@ def get_user_appointments():
         
         appointments = cursor.fetchall()
         
-        # Convert datetime objects to strings
-        for apt in appointments:
-            if apt.get('appointment_date'):
-                apt['appointment_date'] = apt['appointment_date'].isoformat()
-            if apt.get('appointment_time'):
-                apt['appointment_time'] = str(apt['appointment_time'])
-            if apt.get('created_at'):
-                apt['created_at'] = apt['created_at'].isoformat()
-        
         cursor.close()
         conn.close()
         
@@ -153,7 +145,7 @@ def appointments_preflight():
     return ('', 204)
 
 @appointments_bp.route('/appointments', methods=['POST'])
-@jwt_required()
+@requires_role('user')
 def create_appointment():
     data = request.get_json(silent=True) or {}
 
@@ -161,11 +153,7 @@ def create_appointment():
     if missing:
         return jsonify({'error': 'Missing required fields', 'missing': missing}), 400
 
-    raw_identity = get_jwt_identity()
-    try:
-        user_id = int(raw_identity)
-    except (TypeError, ValueError):
-        return jsonify({'error': 'Invalid authentication identity'}), 401
+    user_id = g.auth.id
     doctor_id = data.get('doctor_id')
 
     appointment_date = data.get('appointment_date')
@@ -208,11 +196,6 @@ def create_appointment():
         conn = get_db_connection()
         cursor = conn.cursor()
 
-        # Ensure the caller is a real user (not a doctor/admin token)
-        cursor.execute('SELECT id FROM users WHERE id = %s', (user_id,))
-        if not cursor.fetchone():
-            return jsonify({'error': 'Only users can book appointments with this endpoint'}), 403
-
         # Ensure doctor exists
         cursor.execute('SELECT id FROM doctors WHERE id = %s', (int(doctor_id),))
         if not cursor.fetchone():
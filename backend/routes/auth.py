@@ -1,28 +1,36 @@
 from flask import Blueprint, request, jsonify, send_from_directory
 from flask_jwt_extended import create_access_token, get_jwt_identity
 from utils.database import execute_query
-from utils.auth_utils import hash_password, verify_password, jwt_required_custom
+from utils.auth_utils import (
+    PasswordHashingBusy,
+    hash_password,
+    jwt_required_custom,
+    password_needs_rehash,
+    verify_password,
+)
 from utils.validators import validate_email_format, validate_password_strength, validate_required_fields
+from utils.response_cache import cache_metrics
+from utils import auth_context
+from utils import avatar_images
+from utils.captcha import get_captcha_service
+from utils.rate_limit import rate_limited
+from utils import symptom_terms
+from utils import specialties as specialties_lookup
 from datetime import datetime
 import json
 from datetime import date, timedelta
-import secrets
-import threading
-import time
-import base64
 import os
+import sys
 from pathlib import Path
-from werkzeug.utils import secure_filename
 
 auth_bp = Blueprint('auth', __name__)
 
 _REPO_ROOT = Path(__file__).resolve().parents[2]
 _DEFAULT_USER_PHOTOS_DIR = _REPO_ROOT / 'database' / 'users'
-_DEFAULT_USER_PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Uploaded user images should NOT be committed. This folder is gitignored via `uploads/`.
+# Created on first upload rather than at import time.
 _UPLOADED_USER_PHOTOS_DIR = _REPO_ROOT / 'uploads' / 'users'
-_UPLOADED_USER_PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def _allowed_image_filename(filename: str) -> bool:
@@ -35,27 +43,62 @@ def user_photos(filename):
     """Serve user profile photos.
 
     - Default avatar lives in `database/users` (tracked in git)
-    - Uploaded photos live in `uploads/users` (gitignored)
+    - Uploaded photos live in `uploads/users` (gitignored) as resized,
+      content-hashed variants: `/user-photos/<hash>?size=64` returns the
+      closest stored size, as WebP when the browser accepts it, else JPEG.
     """
     # Basic hardening: disallow path traversal.
     if not filename or '/' in filename or '\\' in filename or '..' in filename:
         return jsonify({'error': 'Invalid filename'}), 400
 
+    # send_from_directory already answers If-None-Match / If-Modified-Since.
+    if avatar_images.is_photo_hash(filename):
+        webp = avatar_images.accepts_webp(request.headers.get('Accept'))
+        size = avatar_images.pick_size(request.args.get('size'))
+        variant = avatar_images.variant_filename(filename, size, webp)
+        # Content-addressed, so a URL never changes content.
+        response = send_from_directory(str(_UPLOADED_USER_PHOTOS_DIR), variant, max_age=31536000)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add('Accept')
+        return response
+
     uploaded_path = _UPLOADED_USER_PHOTOS_DIR / filename
     if uploaded_path.exists():
-        return send_from_directory(str(_UPLOADED_USER_PHOTOS_DIR), filename)
-    return send_from_directory(str(_DEFAULT_USER_PHOTOS_DIR), filename)
+        # Photos uploaded before variants existed; each has a unique name too.
+        response = send_from_directory(str(_UPLOADED_USER_PHOTOS_DIR), filename, max_age=31536000)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+    response = send_from_directory(str(_DEFAULT_USER_PHOTOS_DIR), filename, max_age=86400)
+    response.cache_control.public = True
+    return response
+
+
+def _hashing_busy(e):
+    response = jsonify({'error': str(e)})
+    response.headers['Retry-After'] = '2'
+    return response, 429
+
+
+def _upgrade_password_hash(table: str, row_id, password: str, stored_hash: str) -> None:
+    """Re-hash with the current BCRYPT_ROUNDS while we have the plaintext (best effort)."""
+    if not password_needs_rehash(stored_hash):
+        return
+    try:
+        execute_query(
+            f"UPDATE {table} SET password_hash = %s WHERE id = %s",
+            (hash_password(password), row_id),
+            commit=True,
+        )
+    except Exception as e:
+        print(f"password rehash for {table}.{row_id} skipped: {e}", file=sys.stderr)
 
 
 # --- Lightweight captcha + rate limiting ---
-# Note: This is an intentionally simple, dependency-free captcha to deter naive scripting.
-# It is stored in-memory, so it resets on backend restart (OK for this use-case).
-
-_captcha_lock = threading.Lock()
-_captcha_store = {}  # captcha_id -> {answer:int, expires_at:float, ip:str, used:bool}
-
-_rate_lock = threading.Lock()
-_rate_store = {}  # key -> [timestamps]
+# Captchas come from a pre-rendered pool and are verified statelessly (signed
+# token); counters live in the store selected by RATE_LIMIT_BACKEND.
+# See utils/captcha.py and utils/rate_limit.py.
 
 
 def _get_client_ip() -> str:
@@ -68,133 +111,15 @@ def _get_client_ip() -> str:
 
 
 def _rate_limited(key: str, limit: int, window_seconds: int) -> bool:
-    now = time.time()
-    cutoff = now - float(window_seconds)
-    with _rate_lock:
-        lst = _rate_store.get(key) or []
-        lst = [t for t in lst if t >= cutoff]
-        if len(lst) >= int(limit):
-            _rate_store[key] = lst
-            return True
-        lst.append(now)
-        _rate_store[key] = lst
-    return False
+    return rate_limited(key, limit, window_seconds)
 
 
 def _new_captcha(ip: str) -> dict:
-    # Image captcha: random text rendered into a PNG with light noise.
-    # This is meant to deter naive scripts, not to be bot-proof.
-    try:
-        from PIL import Image, ImageDraw, ImageFilter, ImageFont
-    except Exception as exc:
-        raise RuntimeError("Captcha image generation requires Pillow") from exc
-
-    alphabet = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # avoid ambiguous 0/O, 1/I
-    text = "".join(alphabet[secrets.randbelow(len(alphabet))] for _ in range(5))
-
-    width, height = 180, 64
-    img = Image.new("RGB", (width, height), (255, 255, 255))
-    draw = ImageDraw.Draw(img)
-
-    # Font: try a common bundled font; fall back to PIL default.
-    try:
-        font = ImageFont.truetype("DejaVuSans.ttf", 34)
-    except Exception:
-        font = ImageFont.load_default()
-
-    # Background noise (lines)
-    for _ in range(6):
-        x1 = secrets.randbelow(width)
-        y1 = secrets.randbelow(height)
-        x2 = secrets.randbelow(width)
-        y2 = secrets.randbelow(height)
-        color = (secrets.randbelow(120), secrets.randbelow(120), secrets.randbelow(120))
-        draw.line((x1, y1, x2, y2), fill=color, width=2)
-
-    # Dots
-    for _ in range(120):
-        x = secrets.randbelow(width)
-        y = secrets.randbelow(height)
-        color = (secrets.randbelow(180), secrets.randbelow(180), secrets.randbelow(180))
-        draw.point((x, y), fill=color)
-
-    # Text (slightly jittered)
-    x = 18
-    for ch in text:
-        y = 10 + secrets.randbelow(12)
-        color = (secrets.randbelow(60), secrets.randbelow(60), secrets.randbelow(60))
-        draw.text((x, y), ch, font=font, fill=color)
-        x += 28 + secrets.randbelow(6)
-
-    # Gentle blur to make OCR a bit harder
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.8))
-
-    from io import BytesIO
-
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    png_b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-
-    captcha_id = secrets.token_urlsafe(16)
-    expires_at = time.time() + 5 * 60  # 5 minutes
-
-    with _captcha_lock:
-        # Best-effort pruning of expired/used captchas to avoid unbounded growth.
-        now = time.time()
-        if _captcha_store:
-            for cid, rec in list(_captcha_store.items()):
-                try:
-                    if rec.get('used') or float(rec.get('expires_at') or 0) < now:
-                        _captcha_store.pop(cid, None)
-                except Exception:
-                    _captcha_store.pop(cid, None)
-
-        _captcha_store[captcha_id] = {
-            'answer': text.upper(),
-            'expires_at': float(expires_at),
-            'ip': ip,
-            'used': False,
-        }
-
-    return {
-        'captcha_id': captcha_id,
-        'image_base64': png_b64,
-        'mime_type': 'image/png',
-        'expires_in_seconds': 300,
-    }
+    return get_captcha_service().issue(ip)
 
 
 def _verify_captcha(captcha_id: str, captcha_answer, ip: str) -> (bool, str):
-    cid = (captcha_id or '').strip()
-    if not cid:
-        return False, 'Missing captcha_id'
-
-    provided = ("" if captcha_answer is None else str(captcha_answer)).strip().upper()
-    if not provided:
-        return False, 'Invalid captcha answer'
-
-    now = time.time()
-    with _captcha_lock:
-        rec = _captcha_store.get(cid)
-        if not rec:
-            return False, 'Captcha expired or invalid'
-        if rec.get('used'):
-            return False, 'Captcha already used'
-        if float(rec.get('expires_at') or 0) < now:
-            _captcha_store.pop(cid, None)
-            return False, 'Captcha expired or invalid'
-        # Bind captcha to IP to reduce token reuse.
-        if (rec.get('ip') or '') != (ip or ''):
-            return False, 'Captcha invalid'
-
-        expected = (rec.get('answer') or '').strip().upper()
-        if expected != provided:
-            return False, 'Incorrect captcha'
-
-        # One-time use: invalidate.
-        rec['used'] = True
-        _captcha_store.pop(cid, None)
-    return True, ''
+    return get_captcha_service().verify(captcha_id, captcha_answer, ip)
 
 
 @auth_bp.route('/captcha', methods=['GET'])
@@ -207,11 +132,10 @@ def captcha():
 
 
 def _require_admin_identity():
-    identity = get_jwt_identity()
-    identity_s = str(identity or "")
-    if not identity_s.startswith("admin_"):
+    ctx = auth_context.current_auth(("admin",))
+    if ctx is None or ctx.role != "admin":
         raise PermissionError("Admin access required")
-    return identity_s
+    return f"admin_{ctx.id}"
 
 
 def _parse_range_days(value: str) -> int:
@@ -303,7 +227,7 @@ def register():
         )
         
         # Create access token
-        access_token = create_access_token(identity=str(user_id))
+        access_token = create_access_token(identity=str(user_id), additional_claims=auth_context.claims_for('user', user_id))
         
         return jsonify({
             'message': 'User registered successfully',
@@ -316,6 +240,8 @@ def register():
             'access_token': access_token
         }), 201
         
+    except PasswordHashingBusy as e:
+        return _hashing_busy(e)
     except Exception as e:
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
 
@@ -390,25 +316,16 @@ def register_doctor():
 
             # Resolve ids to names first
             if ids:
-                placeholders = ','.join(['%s'] * len(ids))
-                rows = execute_query(
-                    f'SELECT id, name FROM specialties WHERE id IN ({placeholders})',
-                    tuple(ids),
-                    fetch_all=True,
-                ) or []
-                by_id = {int(r['id']): r.get('name') for r in rows if r and r.get('id') is not None}
+                by_id = specialties_lookup.find_by_ids(ids)
                 for sid in ids:
-                    spec_name = by_id.get(int(sid))
+                    spec_name = (by_id.get(int(sid)) or {}).get('name')
                     if spec_name and (spec_name or '').lower() != 'other':
                         _add_resolved(spec_name)
 
             # Resolve names (canonicalize if they match DB)
+            matches = specialties_lookup.find_by_names(cleaned)
             for spec in cleaned:
-                match = execute_query(
-                    'SELECT id, name FROM specialties WHERE LOWER(name) = LOWER(%s) LIMIT 1',
-                    (spec,),
-                    fetch_one=True,
-                )
+                match = matches.get(spec.lower())
                 if match and (match.get('name') or '').lower() != 'other':
                     _add_resolved(match.get('name'))
                 else:
@@ -418,18 +335,11 @@ def register_doctor():
             # Choose primary specialty
             resolved_specialty = resolved_specialties[0] if resolved_specialties else None
             if resolved_specialty:
-                primary_match = execute_query(
-                    'SELECT id, name FROM specialties WHERE LOWER(name) = LOWER(%s) LIMIT 1',
-                    (resolved_specialty,),
-                    fetch_one=True,
-                )
+                primary_match = specialties_lookup.find_by_name(resolved_specialty)
                 if primary_match and (primary_match.get('name') or '').lower() != 'other':
                     resolved_specialty_id = primary_match.get('id')
                 else:
-                    other_row = execute_query(
-                        'SELECT id FROM specialties WHERE LOWER(name) = "other" LIMIT 1',
-                        fetch_one=True,
-                    )
+                    other_row = specialties_lookup.find_by_name('other')
                     resolved_specialty_id = other_row.get('id') if other_row else None
 
         elif specialty_id is not None and str(specialty_id).strip() != '':
@@ -438,11 +348,7 @@ def register_doctor():
             except (TypeError, ValueError):
                 return jsonify({'error': 'specialty_id must be an integer'}), 400
 
-            row = execute_query(
-                'SELECT id, name FROM specialties WHERE id = %s',
-                (resolved_specialty_id,),
-                fetch_one=True,
-            )
+            row = specialties_lookup.find_by_ids([resolved_specialty_id]).get(resolved_specialty_id)
             if not row:
                 return jsonify({'error': 'Invalid specialty_id'}), 400
 
@@ -459,11 +365,7 @@ def register_doctor():
                 return jsonify({'error': 'Missing required fields: specialty or specialty_id'}), 400
 
             # If it matches a predefined specialty, canonicalize it and store specialty_id.
-            match = execute_query(
-                'SELECT id, name FROM specialties WHERE LOWER(name) = LOWER(%s) LIMIT 1',
-                (specialty,),
-                fetch_one=True,
-            )
+            match = specialties_lookup.find_by_name(specialty)
             if match:
                 resolved_specialty_id = match.get('id')
                 if (match.get('name') or '').lower() == 'other':
@@ -472,10 +374,7 @@ def register_doctor():
                     resolved_specialty = match.get('name')
             else:
                 # Treat unknown as Other
-                other_row = execute_query(
-                    'SELECT id, name FROM specialties WHERE LOWER(name) = "other" LIMIT 1',
-                    fetch_one=True,
-                )
+                other_row = specialties_lookup.find_by_name('other')
                 resolved_specialty_id = other_row.get('id') if other_row else None
                 resolved_specialty = specialty_other or specialty
 
@@ -527,7 +426,7 @@ def register_doctor():
                 raise
 
         # JWT token
-        access_token = create_access_token(identity=str(doctor_id))
+        access_token = create_access_token(identity=str(doctor_id), additional_claims=auth_context.claims_for('doctor', doctor_id))
 
         return jsonify({
             'message': 'Doctor registered successfully',
@@ -542,6 +441,8 @@ def register_doctor():
             'access_token': access_token
         }), 201
 
+    except PasswordHashingBusy as e:
+        return _hashing_busy(e)
     except Exception as e:
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
 
@@ -572,8 +473,10 @@ def login():
 
         if not verify_password(password, user['password_hash']):
             return jsonify({'error': 'Invalid email or password'}), 401
+        _upgrade_password_hash('doctors' if role == 'doctor' else 'users', user['id'], password, user['password_hash'])
 
-        access_token = create_access_token(identity=str(user['id']))
+        claims = auth_context.claims_for('doctor' if role == 'doctor' else 'user', user['id'])
+        access_token = create_access_token(identity=str(user['id']), additional_claims=claims)
 
         user_data = {
             'id': user['id'],
@@ -595,6 +498,8 @@ def login():
             'access_token': access_token
         }), 200
 
+    except PasswordHashingBusy as e:
+        return _hashing_busy(e)
     except Exception as e:
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
 
@@ -703,17 +608,13 @@ def update_profile_photo():
         except Exception:
             pass
 
-        original = secure_filename(file.filename)
-        ext = os.path.splitext(original)[1].lower() or '.png'
-        if ext not in {'.png', '.jpg', '.jpeg', '.webp'}:
-            ext = '.png'
-
-        unique = secrets.token_hex(6)
-        filename = f"user_{user_id}_{int(time.time())}_{unique}{ext}"
-        save_path = _UPLOADED_USER_PHOTOS_DIR / filename
-        file.save(str(save_path))
+        try:
+            _UPLOADED_USER_PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
+            photo_hash = avatar_images.save_variants(file.read(), _UPLOADED_USER_PHOTOS_DIR)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        photo_url = f"/api/auth/user-photos/{filename}"
+        photo_url = f"/api/auth/user-photos/{photo_hash}"
         execute_query(
             "UPDATE users SET photo_url = %s WHERE id = %s",
             (photo_url, user_id),
@@ -752,13 +653,16 @@ def admin_login():
         # Verify password
         if not verify_password(password, admin['password_hash']):
             return jsonify({'error': 'Invalid email or password'}), 401
+        _upgrade_password_hash('admins', admin['id'], password, admin['password_hash'])
         
         # Update last login
         update_query = "UPDATE admins SET last_login = %s WHERE id = %s"
         execute_query(update_query, (datetime.now(), admin['id']), commit=True)
         
         # Create access token
-        access_token = create_access_token(identity=f"admin_{admin['id']}")
+        access_token = create_access_token(
+            identity=f"admin_{admin['id']}", additional_claims=auth_context.claims_for('admin', admin['id'])
+        )
         
         return jsonify({
             'message': 'Admin login successful',
@@ -771,6 +675,8 @@ def admin_login():
             'access_token': access_token
         }), 200
         
+    except PasswordHashingBusy as e:
+        return _hashing_busy(e)
     except Exception as e:
         return jsonify({'error': f'Admin login failed: {str(e)}'}), 500
 
@@ -797,7 +703,7 @@ def hospital_login():
             """
             SELECT id, name, email, password_hash, phone, address, city, state, latitude, longitude
             FROM hospitals
-            WHERE LOWER(email) = LOWER(%s)
+            WHERE email = %s
             LIMIT 1
             """,
             (email,),
@@ -809,8 +715,11 @@ def hospital_login():
 
         if not verify_password(password, hospital.get('password_hash') or ''):
             return jsonify({'error': 'Invalid email or password'}), 401
+        _upgrade_password_hash('hospitals', hospital['id'], password, hospital['password_hash'])
 
-        access_token = create_access_token(identity=f"hospital_{hospital['id']}")
+        access_token = create_access_token(
+            identity=f"hospital_{hospital['id']}", additional_claims=auth_context.claims_for('hospital', hospital['id'])
+        )
 
         hospital_data = {
             'id': hospital['id'],
@@ -831,6 +740,8 @@ def hospital_login():
             'access_token': access_token,
         }), 200
 
+    except PasswordHashingBusy as e:
+        return _hashing_busy(e)
     except Exception as e:
         return jsonify({'error': f'Hospital login failed: {str(e)}'}), 500
 
@@ -924,7 +835,7 @@ def admin_create_hospital():
 
         # Prevent duplicates (best-effort; DB may not have unique constraint)
         existing = execute_query(
-            'SELECT id FROM hospitals WHERE LOWER(email) = LOWER(%s) LIMIT 1',
+            'SELECT id FROM hospitals WHERE email = %s LIMIT 1',
             (email,),
             fetch_one=True,
         )
@@ -987,6 +898,8 @@ def admin_create_hospital():
 
     except PermissionError as e:
         return jsonify({'error': str(e)}), 403
+    except PasswordHashingBusy as e:
+        return _hashing_busy(e)
     except Exception as e:
         return jsonify({'error': f'Failed to create hospital: {str(e)}'}), 500
 
@@ -1022,7 +935,7 @@ def admin_create_admin_account():
             return jsonify({'error': error}), 400
 
         existing = execute_query(
-            'SELECT id FROM admins WHERE LOWER(email) = LOWER(%s) LIMIT 1',
+            'SELECT id FROM admins WHERE email = %s LIMIT 1',
             (email,),
             fetch_one=True,
         )
@@ -1058,6 +971,8 @@ def admin_create_admin_account():
 
     except PermissionError as e:
         return jsonify({'error': str(e)}), 403
+    except PasswordHashingBusy as e:
+        return _hashing_busy(e)
     except Exception as e:
         return jsonify({'error': f'Failed to create admin: {str(e)}'}), 500
 
@@ -1453,33 +1368,8 @@ def admin_symptoms_analytics():
 
         series = _fill_daily_series(start, days, by_day, {'total': 0, 'low': 0, 'medium': 0, 'high': 0})
 
-        rows = execute_query(
-            """
-            SELECT symptoms
-            FROM symptom_logs
-            WHERE created_at >= %s
-            LIMIT 5000
-            """,
-            (start,),
-            fetch_all=True,
-        )
-
-        counts = {}
-        for r in rows or []:
-            raw = (r.get('symptoms') or '').strip().lower()
-            if not raw:
-                continue
-            parts = [p.strip() for p in raw.replace('\n', ',').replace(';', ',').split(',')]
-            parts = [p for p in parts if p]
-            if not parts:
-                continue
-            for p in parts[:10]:
-                counts[p] = counts.get(p, 0) + 1
-
-        top = [
-            {'symptom': k, 'count': v}
-            for k, v in sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:12]
-        ]
+        # Maintained at write time by routes/symptoms.py (see utils/symptom_terms.py).
+        top = symptom_terms.top_terms(start, limit=12)
 
         return jsonify({'range_days': days, 'series': series, 'top_symptoms': top}), 200
 
@@ -1564,6 +1454,24 @@ def admin_weight_analytics():
     except Exception as e:
         return jsonify({'error': f'Failed to fetch analytics: {str(e)}'}), 500
 
+
+@auth_bp.route('/admin/analytics/ai-cache', methods=['GET'])
+@jwt_required_custom
+def admin_ai_cache_analytics():
+    """AI response cache hit rate and saved upstream latency (admin only).
+
+    Counters are per backend process and reset on restart.
+    """
+
+    try:
+        _require_admin_identity()
+        return jsonify({'caches': cache_metrics()}), 200
+
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch analytics: {str(e)}'}), 500
+
 # Doctor Profile Endpoints
 @auth_bp.route('/doctor/profile', methods=['GET'])
 @jwt_required_custom
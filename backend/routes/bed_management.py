@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import get_db_connection
+from utils.bed_availability import beds_changed
 from datetime import datetime
 import sys
 
@@ -106,6 +107,7 @@ def create_bed_ward():
             ward_id = cursor.lastrowid
         
         conn.commit()
+        beds_changed(conn, hospital_id)
         cursor.close()
         conn.close()
         
@@ -160,6 +162,10 @@ def update_bed_ward(ward_id):
         cursor.execute(query, tuple(values))
         
         conn.commit()
+        cursor.execute("SELECT hospital_id FROM bed_wards WHERE id = %s", (ward_id,))
+        ward = cursor.fetchone()
+        if ward:
+            beds_changed(conn, ward['hospital_id'])
         cursor.close()
         conn.close()
         
@@ -181,9 +187,13 @@ def delete_bed_ward(ward_id):
         conn = get_db_connection()
         cursor = conn.cursor()
         
+        cursor.execute("SELECT hospital_id FROM bed_wards WHERE id = %s", (ward_id,))
+        ward = cursor.fetchone()
         cursor.execute("DELETE FROM bed_wards WHERE id = %s", (ward_id,))
         
         conn.commit()
+        if ward:
+            beds_changed(conn, ward['hospital_id'])
         cursor.close()
         conn.close()
         
@@ -277,6 +287,7 @@ def create_private_room():
         room_id = cursor.lastrowid
         
         conn.commit()
+        beds_changed(conn, data['hospital_id'])
         cursor.close()
         conn.close()
         
@@ -326,6 +337,10 @@ def update_private_room(room_id):
         cursor.execute(query, tuple(values))
         
         conn.commit()
+        cursor.execute("SELECT hospital_id FROM private_rooms WHERE id = %s", (room_id,))
+        room = cursor.fetchone()
+        if room:
+            beds_changed(conn, room['hospital_id'])
         cursor.close()
         conn.close()
         
@@ -347,9 +362,13 @@ def delete_private_room(room_id):
         conn = get_db_connection()
         cursor = conn.cursor()
         
+        cursor.execute("SELECT hospital_id FROM private_rooms WHERE id = %s", (room_id,))
+        room = cursor.fetchone()
         cursor.execute("DELETE FROM private_rooms WHERE id = %s", (room_id,))
         
         conn.commit()
+        if room:
+            beds_changed(conn, room['hospital_id'])
         cursor.close()
         conn.close()
         
@@ -438,6 +457,7 @@ def create_allocation_log():
         log_id = cursor.lastrowid
         
         conn.commit()
+        beds_changed(conn, data['hospital_id'])
         cursor.close()
         conn.close()
         
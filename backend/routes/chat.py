@@ -1,10 +1,11 @@
 
 import pymysql
-import requests
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from config import Config
+from utils.response_cache import get_response_cache
 import os
+import time
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', Config.GEMINI_API_KEY)
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key=" + GEMINI_API_KEY
@@ -57,10 +58,19 @@ def send_message():
         ]
     }
     try:
-        response = requests.post(GEMINI_API_URL, json=payload)
-        response.raise_for_status()
-        gemini_response = response.json()
-        ai_text = gemini_response['candidates'][0]['content']['parts'][0]['text']
+        # Sage answers are single-turn and not personalized, so repeated
+        # questions can reuse an earlier reply.
+        cache = get_response_cache('chat')
+        ai_text = cache.get(user_message)
+        if ai_text is None:
+            import requests  # deferred: only cache misses call Gemini
+
+            started = time.perf_counter()
+            response = requests.post(GEMINI_API_URL, json=payload, timeout=Config.AI_REQUEST_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            gemini_response = response.json()
+            ai_text = gemini_response['candidates'][0]['content']['parts'][0]['text']
+            cache.set(user_message, value=ai_text, cost_ms=(time.perf_counter() - started) * 1000)
         # Save AI response
         conn = get_db_connection()
         with conn.cursor() as cursor:
@@ -1,6 +1,5 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity
-from utils.auth_utils import jwt_required_custom
+from flask import Blueprint, g, request, jsonify
+from utils.auth_context import requires_role
 from utils.database import execute_query
 import pymysql
 from datetime import datetime, timedelta
@@ -8,38 +7,6 @@ from datetime import datetime, timedelta
 consultation_chat_bp = Blueprint('consultation_chat', __name__)
 
 
-def _coerce_int_identity():
-    raw = get_jwt_identity()
-    try:
-        return int(raw)
-    except (TypeError, ValueError):
-        return None
-
-
-def _require_user_id():
-    user_id = _coerce_int_identity()
-    if not user_id:
-        return None, (jsonify({'error': 'Invalid authentication identity'}), 401)
-
-    user = execute_query('SELECT id FROM users WHERE id=%s', (user_id,), fetch_one=True)
-    if not user:
-        return None, (jsonify({'error': 'User not found'}), 404)
-
-    return user_id, None
-
-
-def _require_doctor_id():
-    doctor_id = _coerce_int_identity()
-    if not doctor_id:
-        return None, (jsonify({'error': 'Invalid authentication identity'}), 401)
-
-    doctor = execute_query('SELECT id FROM doctors WHERE id=%s', (doctor_id,), fetch_one=True)
-    if not doctor:
-        return None, (jsonify({'error': 'Doctor not found'}), 404)
-
-    return doctor_id, None
-
-
 def _ensure_thread_for_appointment(appointment_id: int):
     try:
         appointment = execute_query(
@@ -91,15 +58,6 @@ def _ensure_thread_for_appointment(appointment_id: int):
     return thread, appointment, None
 
 
-def _serialize_datetime(value):
-    if value is None:
-        return None
-    try:
-        return value.isoformat()
-    except Exception:
-        return str(value)
-
-
 def _check_appointment_time_passed(appointment_date, appointment_time):
     """
     Check if the appointment time has passed.
@@ -189,11 +147,9 @@ def _check_appointment_time_passed(appointment_date, appointment_time):
 
 
 @consultation_chat_bp.route('/user/doctor-chats', methods=['GET'])
-@jwt_required_custom
+@requires_role('user')
 def user_list_doctor_chats():
-    user_id, err = _require_user_id()
-    if err:
-        return err
+    user_id = g.auth.id
 
     try:
         threads = execute_query(
@@ -244,20 +200,13 @@ def user_list_doctor_chats():
     except pymysql.MySQLError as e:
         return jsonify({'error': 'Database error', 'message': str(e)}), 500
 
-    for row in threads:
-        row['appointment_date'] = _serialize_datetime(row.get('appointment_date'))
-        row['appointment_time'] = _serialize_datetime(row.get('appointment_time'))
-        row['last_message_at'] = _serialize_datetime(row.get('last_message_at'))
-
     return jsonify({'threads': threads}), 200
 
 
 @consultation_chat_bp.route('/doctor/patient-chats', methods=['GET'])
-@jwt_required_custom
+@requires_role('doctor')
 def doctor_list_patient_chats():
-    doctor_id, err = _require_doctor_id()
-    if err:
-        return err
+    doctor_id = g.auth.id
 
     try:
         threads = execute_query(
@@ -308,20 +257,13 @@ def doctor_list_patient_chats():
     except pymysql.MySQLError as e:
         return jsonify({'error': 'Database error', 'message': str(e)}), 500
 
-    for row in threads:
-        row['appointment_date'] = _serialize_datetime(row.get('appointment_date'))
-        row['appointment_time'] = _serialize_datetime(row.get('appointment_time'))
-        row['last_message_at'] = _serialize_datetime(row.get('last_message_at'))
-
     return jsonify({'threads': threads}), 200
 
 
 @consultation_chat_bp.route('/user/doctor-chats/<int:appointment_id>/messages', methods=['GET'])
-@jwt_required_custom
+@requires_role('user')
 def user_get_messages(appointment_id: int):
-    user_id, err = _require_user_id()
-    if err:
-        return err
+    user_id = g.auth.id
 
     thread, appointment, err = _ensure_thread_for_appointment(appointment_id)
     if err:
@@ -354,24 +296,19 @@ def user_get_messages(appointment_id: int):
         fetch_all=True,
     )
 
-    for msg in messages:
-        msg['created_at'] = _serialize_datetime(msg.get('created_at'))
-
     return jsonify({
         'thread': {'id': thread['id'], 'appointment_id': appointment_id}, 
         'messages': messages,
         'can_chat': can_chat,
-        'appointment_date': _serialize_datetime(appointment_full['appointment_date']),
-        'appointment_time': str(appointment_full['appointment_time'])
+        'appointment_date': appointment_full['appointment_date'],
+        'appointment_time': appointment_full['appointment_time']
     }), 200
 
 
 @consultation_chat_bp.route('/doctor/patient-chats/<int:appointment_id>/messages', methods=['GET'])
-@jwt_required_custom
+@requires_role('doctor')
 def doctor_get_messages(appointment_id: int):
-    doctor_id, err = _require_doctor_id()
-    if err:
-        return err
+    doctor_id = g.auth.id
 
     thread, appointment, err = _ensure_thread_for_appointment(appointment_id)
     if err:
@@ -404,24 +341,19 @@ def doctor_get_messages(appointment_id: int):
         fetch_all=True,
     )
 
-    for msg in messages:
-        msg['created_at'] = _serialize_datetime(msg.get('created_at'))
-
     return jsonify({
         'thread': {'id': thread['id'], 'appointment_id': appointment_id}, 
         'messages': messages,
         'can_chat': can_chat,
-        'appointment_date': _serialize_datetime(appointment_full['appointment_date']),
-        'appointment_time': str(appointment_full['appointment_time'])
+        'appointment_date': appointment_full['appointment_date'],
+        'appointment_time': appointment_full['appointment_time']
     }), 200
 
 
 @consultation_chat_bp.route('/user/doctor-chats/<int:appointment_id>/messages', methods=['POST'])
-@jwt_required_custom
+@requires_role('user')
 def user_send_message(appointment_id: int):
-    user_id, err = _require_user_id()
-    if err:
-        return err
+    user_id = g.auth.id
 
     data = request.get_json(silent=True) or {}
     message = (data.get('message') or '').strip()
@@ -463,11 +395,9 @@ def user_send_message(appointment_id: int):
 
 
 @consultation_chat_bp.route('/doctor/patient-chats/<int:appointment_id>/messages', methods=['POST'])
-@jwt_required_custom
+@requires_role('doctor')
 def doctor_send_message(appointment_id: int):
-    doctor_id, err = _require_doctor_id()
-    if err:
-        return err
+    doctor_id = g.auth.id
 
     data = request.get_json(silent=True) or {}
     message = (data.get('message') or '').strip()
@@ -4,11 +4,20 @@ import json
 from flask import Blueprint, jsonify, request
 from utils.database import get_db_connection, execute_query
 from utils.auth_utils import jwt_required_custom
+from utils.http_cache import conditional_get
+from utils import specialties as specialties_lookup
 from flask_jwt_extended import get_jwt_identity
 
 doctors_bp = Blueprint('doctors', __name__)
 
+
+def _doctor_version(id):
+    row = execute_query("SELECT updated_at FROM doctors WHERE id = %s", (id,), fetch_one=True)
+    return (row['updated_at'],) if row else None
+
+
 @doctors_bp.route('/doctors/<int:id>', methods=['GET'])
+@conditional_get(_doctor_version, public=True)
 def get_doctor(id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -98,25 +107,16 @@ def update_doctor_profile():
 
             # Resolve ids to names first
             if ids:
-                placeholders = ",".join(["%s"] * len(ids))
-                rows = execute_query(
-                    f"SELECT id, name FROM specialties WHERE id IN ({placeholders})",
-                    tuple(ids),
-                    fetch_all=True,
-                ) or []
-                by_id = {int(r["id"]): r.get("name") for r in rows if r and r.get("id") is not None}
+                by_id = specialties_lookup.find_by_ids(ids)
                 for sid in ids:
-                    spec_name = by_id.get(int(sid))
+                    spec_name = (by_id.get(int(sid)) or {}).get("name")
                     if spec_name and (spec_name or "").lower() != "other":
                         _add_resolved(spec_name)
 
             # Resolve names (canonicalize if they match DB)
+            matches = specialties_lookup.find_by_names(cleaned)
             for spec in cleaned:
-                match = execute_query(
-                    "SELECT id, name FROM specialties WHERE LOWER(name) = LOWER(%s) LIMIT 1",
-                    (spec,),
-                    fetch_one=True,
-                )
+                match = matches.get(spec.lower())
                 if match and (match.get("name") or "").lower() != "other":
                     _add_resolved(match.get("name"))
                 else:
@@ -127,18 +127,11 @@ def update_doctor_profile():
 
             primary_name = resolved_specialties[0]
             primary_id = None
-            primary_match = execute_query(
-                "SELECT id, name FROM specialties WHERE LOWER(name) = LOWER(%s) LIMIT 1",
-                (primary_name,),
-                fetch_one=True,
-            )
+            primary_match = specialties_lookup.find_by_name(primary_name)
             if primary_match and (primary_match.get("name") or "").lower() != "other":
                 primary_id = primary_match.get("id")
             else:
-                other_row = execute_query(
-                    'SELECT id FROM specialties WHERE LOWER(name) = "other" LIMIT 1',
-                    fetch_one=True,
-                )
+                other_row = specialties_lookup.find_by_name("other")
                 primary_id = other_row.get("id") if other_row else None
 
             return resolved_specialties, primary_name, primary_id
@@ -305,16 +298,6 @@ def get_doctor_appointments():
             """
             appointments = execute_query(query, (doctor_id,), fetch_all=True)
         
-        # Convert datetime objects to strings
-        for apt in appointments:
-            if apt.get('appointment_date'):
-                apt['appointment_date'] = apt['appointment_date'].isoformat()
-            if apt.get('appointment_time'):
-                # Convert time to string
-                apt['appointment_time'] = str(apt['appointment_time'])
-            if apt.get('created_at'):
-                apt['created_at'] = apt['created_at'].isoformat()
-        
         return jsonify({'appointments': appointments}), 200
         
     except Exception as e:
@@ -16,8 +16,9 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import verify_jwt_in_request
 
+from utils.auth_context import current_id
 from utils.database import get_db_connection
 
 
@@ -58,38 +59,6 @@ def _is_missing_emergency_requests(err: Exception) -> bool:
 
 
 
-# --- JWT identity parsing ---
-# We distinguish user and hospital callers by the JWT identity format:
-# - Users: identity is a numeric string (e.g., "12")
-# - Hospitals: identity is prefixed (e.g., "hospital_5")
-def _parse_user_id(identity: Any) -> Optional[int]:
-    if identity is None:
-        return None
-    s = str(identity)
-    if not s.isdigit():
-        return None
-    try:
-        return int(s)
-    except Exception:
-        return None
-
-
-def _parse_hospital_id(identity: Any) -> Optional[int]:
-    if identity is None:
-        return None
-    s = str(identity)
-    if not s.startswith('hospital_'):
-        return None
-    raw = s.split('_', 1)[1]
-    if not raw.isdigit():
-        return None
-    try:
-        return int(raw)
-    except Exception:
-        return None
-
-
-
 # --- Request value normalization ---
 # Convert request payload/params into safe numeric types.
 def _as_float(v: Any) -> Optional[float]:
@@ -109,7 +78,7 @@ def create_emergency_sos():
         return ('', 200)
 
     verify_jwt_in_request()
-    user_id = _parse_user_id(get_jwt_identity())
+    user_id = current_id('user')
     if user_id is None:
         return jsonify({'error': 'Unauthorized'}), 401
 
@@ -152,7 +121,7 @@ def get_latest_emergency_sos():
         return ('', 200)
 
     verify_jwt_in_request()
-    user_id = _parse_user_id(get_jwt_identity())
+    user_id = current_id('user')
     if user_id is None:
         return jsonify({'error': 'Unauthorized'}), 401
 
@@ -266,7 +235,7 @@ def get_emergency_sos_history():
         return ('', 200)
 
     verify_jwt_in_request()
-    user_id = _parse_user_id(get_jwt_identity())
+    user_id = current_id('user')
     if user_id is None:
         return jsonify({'error': 'Unauthorized'}), 401
 
@@ -407,7 +376,7 @@ def user_resolve_emergency_sos(request_id: int):
         return ('', 200)
 
     verify_jwt_in_request()
-    user_id = _parse_user_id(get_jwt_identity())
+    user_id = current_id('user')
     if user_id is None:
         return jsonify({'error': 'Unauthorized'}), 401
 
@@ -497,7 +466,7 @@ def hospital_list_emergency_requests():
         return ('', 200)
 
     verify_jwt_in_request()
-    hospital_id = _parse_hospital_id(get_jwt_identity())
+    hospital_id = current_id('hospital')
     if hospital_id is None:
         return jsonify({'error': 'Unauthorized'}), 401
 
@@ -858,7 +827,7 @@ def hospital_accept_emergency_request(request_id: int):
         return ('', 200)
 
     verify_jwt_in_request()
-    hospital_id = _parse_hospital_id(get_jwt_identity())
+    hospital_id = current_id('hospital')
     if hospital_id is None:
         return jsonify({'error': 'Unauthorized'}), 401
 
@@ -920,7 +889,7 @@ def hospital_resolve_emergency_request(request_id: int):
         return ('', 200)
 
     verify_jwt_in_request()
-    hospital_id = _parse_hospital_id(get_jwt_identity())
+    hospital_id = current_id('hospital')
     if hospital_id is None:
         return jsonify({'error': 'Unauthorized'}), 401
 
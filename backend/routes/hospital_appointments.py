@@ -1,25 +1,116 @@
 from flask import Blueprint, request, jsonify
 from utils.database import get_db_connection
 import pymysql
+import base64
 from datetime import datetime, date
 
 hospital_appointments_bp = Blueprint('hospital_appointments', __name__)
 
+_VALID_STATUSES = {'pending', 'confirmed', 'completed', 'cancelled'}
+_MAX_PAGE_SIZE = 500
+
+
+def _parse_iso_date(value, field_name):
+    raw = (value or '').strip()
+    if not raw:
+        return None
+    if raw.lower() == 'today':
+        return date.today()
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f'{field_name} must be YYYY-MM-DD')
+
+
+def _encode_cursor(row):
+    raw = f"{row['appointment_date']}|{row['appointment_time']}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(value):
+    try:
+        raw = base64.urlsafe_b64decode(value.encode('ascii')).decode('utf-8')
+        day, time_s, row_id = raw.split('|')
+        return date.fromisoformat(day), time_s, int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
 # Get all appointments for a hospital
 @hospital_appointments_bp.route('/hospital-appointments', methods=['GET'])
 def get_hospital_appointments():
-    """Get all appointments for a specific hospital"""
+    """Get appointments for a specific hospital
+
+    Query params:
+        hospital_id (required)
+        date: single day (YYYY-MM-DD or 'today'); shortcut for date_from=date_to
+        date_from / date_to: inclusive date window
+        status: one status or a comma-separated list
+        limit: page size (max 500); enables keyset pagination via next_cursor
+        cursor: next_cursor from the previous page
+
+    Without limit every matching appointment is returned (original behaviour).
+    Stats always cover the whole hospital.
+    """
     try:
-        hospital_id = request.args.get('hospital_id')
+        hospital_id = request.args.get('hospital_id', type=int)
         
         if not hospital_id:
             return jsonify({'error': 'hospital_id is required'}), 400
-        
+
+        try:
+            single_day = _parse_iso_date(request.args.get('date'), 'date')
+            date_from = single_day or _parse_iso_date(request.args.get('date_from'), 'date_from')
+            date_to = single_day or _parse_iso_date(request.args.get('date_to'), 'date_to')
+
+            statuses = [
+                s.strip().lower()
+                for s in (request.args.get('status') or '').split(',')
+                if s.strip()
+            ]
+            invalid = [s for s in statuses if s not in _VALID_STATUSES]
+            if invalid:
+                raise ValueError(f"Invalid status. Must be one of: {', '.join(sorted(_VALID_STATUSES))}")
+
+            limit = request.args.get('limit', type=int)
+            if limit is not None:
+                limit = max(1, min(limit, _MAX_PAGE_SIZE))
+            cursor_value = (request.args.get('cursor') or '').strip()
+            after = _decode_cursor(cursor_value) if cursor_value else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        where = ['ha.hospital_id = %s']
+        params = [hospital_id]
+        if date_from:
+            where.append('ha.appointment_date >= %s')
+            params.append(date_from)
+        if date_to:
+            where.append('ha.appointment_date <= %s')
+            params.append(date_to)
+        if statuses:
+            where.append(f"ha.status IN ({', '.join(['%s'] * len(statuses))})")
+            params.extend(statuses)
+        if after:
+            # Keyset on the (hospital_id, appointment_date, appointment_time) index,
+            # ordered newest first; id breaks ties within the same slot.
+            after_date, after_time, after_id = after
+            where.append(
+                '(ha.appointment_date < %s OR (ha.appointment_date = %s AND '
+                '(ha.appointment_time < %s OR (ha.appointment_time = %s AND ha.id < %s))))'
+            )
+            params.extend([after_date, after_date, after_time, after_time, after_id])
+
+        limit_sql = ''
+        if limit is not None:
+            limit_sql = 'LIMIT %s'
+            params.append(limit + 1)
+
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Fetch all hospital appointments with doctor details if available
-        cursor.execute("""
+        # Fetch hospital appointments with doctor details if available
+        cursor.execute(f"""
             SELECT 
                 ha.id,
                 ha.hospital_id,
@@ -41,40 +132,42 @@ def get_hospital_appointments():
                 hd.specialty as doctor_specialty
             FROM hospital_appointments ha
             LEFT JOIN hospital_doctors hd ON ha.hospital_doctor_id = hd.id
-            WHERE ha.hospital_id = %s
-            ORDER BY ha.appointment_date DESC, ha.appointment_time DESC
-        """, (hospital_id,))
+            WHERE {' AND '.join(where)}
+            ORDER BY ha.appointment_date DESC, ha.appointment_time DESC, ha.id DESC
+            {limit_sql}
+        """, tuple(params))
         
         appointments = cursor.fetchall()
-        
-        # Convert date and time objects to strings
-        for apt in appointments:
-            if apt.get('appointment_date'):
-                apt['appointment_date'] = apt['appointment_date'].isoformat()
-            if apt.get('appointment_time'):
-                apt['appointment_time'] = str(apt['appointment_time'])
-            if apt.get('created_at'):
-                apt['created_at'] = apt['created_at'].isoformat()
-            if apt.get('updated_at'):
-                apt['updated_at'] = apt['updated_at'].isoformat()
-        
-        # Calculate stats
-        total = len(appointments)
-        today = date.today().isoformat()
-        today_count = sum(1 for apt in appointments if apt.get('appointment_date') == today)
-        pending = sum(1 for apt in appointments if apt.get('status') == 'pending')
-        confirmed = sum(1 for apt in appointments if apt.get('status') == 'confirmed')
+
+        next_cursor = None
+        if limit is not None and len(appointments) > limit:
+            appointments = appointments[:limit]
+            next_cursor = _encode_cursor(appointments[-1])
+
+        # Hospital-wide stats in one aggregate pass over the index
+        today = date.today()
+        cursor.execute("""
+            SELECT
+                COUNT(*) AS total,
+                COALESCE(SUM(CASE WHEN appointment_date = %s THEN 1 ELSE 0 END), 0) AS today,
+                COALESCE(SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END), 0) AS pending,
+                COALESCE(SUM(CASE WHEN status = 'confirmed' THEN 1 ELSE 0 END), 0) AS confirmed
+            FROM hospital_appointments
+            WHERE hospital_id = %s
+        """, (today, hospital_id))
+        stats_row = cursor.fetchone() or {}
         
         cursor.close()
         conn.close()
         
         return jsonify({
             'appointments': appointments,
+            'next_cursor': next_cursor,
             'stats': {
-                'total': total,
-                'today': today_count,
-                'pending': pending,
-                'confirmed': confirmed
+                'total': int(stats_row.get('total') or 0),
+                'today': int(stats_row.get('today') or 0),
+                'pending': int(stats_row.get('pending') or 0),
+                'confirmed': int(stats_row.get('confirmed') or 0)
             }
         }), 200
         
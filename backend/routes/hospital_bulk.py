@@ -0,0 +1,507 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from utils.auth_context import current_id
+from utils.database import get_db_connection
+from utils.bed_availability import beds_changed
+from utils.bulk_io import (
+    DEFAULT_CHUNK_SIZE,
+    BulkReport,
+    chunked,
+    detect_format,
+    iter_records,
+    parse_bool,
+    parse_float,
+    parse_int,
+    text_or_none,
+    write_chunk,
+)
+from datetime import date, datetime
+import re
+import sys
+
+hospital_bulk_bp = Blueprint('hospital_bulk', __name__)
+
+_MAX_CHUNK_SIZE = 5000
+
+_WARD_TYPES = {'general', 'maternity', 'pediatrics', 'icu', 'emergency', 'private_room'}
+_WARD_AC_TYPES = {'ac', 'non_ac', 'not_applicable'}
+_ROOM_AC_TYPES = {'ac', 'non_ac'}
+_ROOM_STATUSES = {'available', 'occupied', 'reserved', 'maintenance'}
+_APPOINTMENT_PRIORITIES = {'low', 'normal', 'high', 'urgent'}
+_APPOINTMENT_STATUSES = {'pending', 'confirmed', 'completed', 'cancelled'}
+
+_EXPERIENCE_RE = re.compile(r'\d+')
+
+
+def _upload_source():
+    """Return ``(stream, format)`` for a multipart ``file`` or a raw request body."""
+    explicit = request.args.get('format')
+    if request.mimetype and request.mimetype.startswith('multipart/'):
+        upload = request.files.get('file')
+        if upload is None:
+            return None, None
+        return upload.stream, detect_format(explicit, upload.mimetype, upload.filename)
+    return request.stream, detect_format(explicit, request.mimetype, None)
+
+
+def _chunk_size():
+    try:
+        size = int(request.args.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except (TypeError, ValueError):
+        size = DEFAULT_CHUNK_SIZE
+    return max(1, min(size, _MAX_CHUNK_SIZE))
+
+
+def _enum(value, field, allowed, default=None):
+    v = (text_or_none(value) or '').lower()
+    if not v:
+        if default is None:
+            raise ValueError(f'{field} is required')
+        return default
+    if v not in allowed:
+        raise ValueError(f'{field} must be one of: {", ".join(sorted(allowed))}')
+    return v
+
+
+def _parse_date(value, field, required=False):
+    raw = text_or_none(value)
+    if not raw:
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f'{field} must be YYYY-MM-DD')
+
+
+def _parse_time(value, field, required=False):
+    raw = text_or_none(value)
+    if not raw:
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            return datetime.strptime(raw, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f'{field} must be HH:MM or HH:MM:SS')
+
+
+def _run_import(hospital_id, validate, write, chunk_size=None, after=None):
+    """Stream, validate and write an upload chunk by chunk.
+
+    ``validate(record)`` returns the cleaned row or raises ValueError.
+    ``write(conn, cursor, hospital_id, rows, report)`` persists one chunk of
+    ``(row_number, cleaned)`` pairs and updates the report counters.
+    ``after(conn, hospital_id)`` runs once when anything was written.
+    """
+    stream, fmt = _upload_source()
+    if stream is None:
+        return jsonify({'error': 'No file uploaded'}), 400
+    if fmt is None:
+        return jsonify({'error': 'Unsupported format. Send CSV or NDJSON (or pass ?format=csv|ndjson)'}), 415
+
+    dry_run = parse_bool(request.args.get('dry_run'))
+    report = BulkReport()
+    conn = None
+    cursor = None
+    try:
+        if not dry_run:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+        for chunk in chunked(iter_records(stream, fmt), chunk_size or _chunk_size()):
+            valid = []
+            for row_number, record, parse_error in chunk:
+                report.received += 1
+                if parse_error:
+                    report.error(row_number, parse_error)
+                    continue
+                try:
+                    valid.append((row_number, validate(record)))
+                except ValueError as e:
+                    report.error(row_number, str(e))
+
+            report.valid += len(valid)
+            if valid and not dry_run:
+                write(conn, cursor, hospital_id, valid, report)
+
+        if after and (report.inserted or report.updated):
+            after(conn, hospital_id)
+
+        status = 200 if report.failed == 0 else 207
+        return jsonify({'success': report.failed == 0, 'dry_run': dry_run, **report.as_dict()}), status
+
+    except Exception as e:
+        print(f"Error during bulk import: {str(e)}", file=sys.stderr)
+        return jsonify({'error': 'Bulk import failed', **report.as_dict()}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Hospital doctors
+# ---------------------------------------------------------------------------
+
+def _validate_doctor(record):
+    name = text_or_none(record.get('name'))
+    specialty = text_or_none(record.get('specialty'))
+    if not name:
+        raise ValueError('name is required')
+    if not specialty:
+        raise ValueError('specialty is required')
+
+    experience = None
+    raw_experience = text_or_none(record.get('experience'))
+    if raw_experience:
+        match = _EXPERIENCE_RE.search(raw_experience)
+        if match:
+            experience = int(match.group())
+
+    email = text_or_none(record.get('email'))
+    return {
+        'name': name,
+        'email': email.lower() if email else None,
+        'phone': text_or_none(record.get('phone')),
+        'specialty': specialty,
+        'qualification': text_or_none(record.get('qualifications')) or text_or_none(record.get('qualification')),
+        'experience': experience,
+        'consultation_fee': parse_float(record.get('consultation_fee'), 'consultation_fee', default=0.0),
+        'is_available': parse_bool(record.get('is_available'), default=True),
+        'bio': text_or_none(record.get('bio')),
+    }
+
+
+_DOCTOR_UPSERT = """
+    INSERT INTO hospital_doctors
+    (name, email, phone, specialty, qualification,
+     experience, rating, hospital_id, consultation_fee, is_available, bio)
+    VALUES (%s, %s, %s, %s, %s, %s, 0.0, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        name = VALUES(name), phone = VALUES(phone), specialty = VALUES(specialty),
+        qualification = VALUES(qualification), experience = VALUES(experience),
+        consultation_fee = VALUES(consultation_fee), is_available = VALUES(is_available),
+        bio = VALUES(bio)
+"""
+
+
+def _write_doctors(conn, cursor, hospital_id, rows, report):
+    # One IN query per chunk tells inserts from updates (email is the natural key).
+    emails = sorted({d['email'] for _, d in rows if d['email']})
+    existing = set()
+    if emails:
+        placeholders = ', '.join(['%s'] * len(emails))
+        cursor.execute(
+            f"SELECT LOWER(email) AS email FROM hospital_doctors WHERE hospital_id = %s AND email IN ({placeholders})",
+            (hospital_id, *emails),
+        )
+        existing = {r['email'] for r in cursor.fetchall()}
+
+    inserts = 0
+    params = []
+    for row_number, d in rows:
+        if not d['email'] or d['email'] not in existing:
+            inserts += 1
+            if d['email']:
+                existing.add(d['email'])
+        params.append((row_number, (
+            d['name'], d['email'], d['phone'], d['specialty'], d['qualification'],
+            d['experience'], hospital_id, d['consultation_fee'], d['is_available'], d['bio'],
+        )))
+
+    written = []
+    write_chunk(conn, _DOCTOR_UPSERT, params, report, on_success=written.append)
+    _split_counts(report, sum(written), inserts)
+
+
+def _split_counts(report, written, expected_inserts):
+    # Exact when the chunk is written in one go; after a row-by-row replay the
+    # rejected rows are assumed to have been inserts.
+    inserts = min(expected_inserts, written)
+    report.inserted += inserts
+    report.updated += written - inserts
+
+
+@hospital_bulk_bp.route('/hospital-bulk/doctors', methods=['POST'])
+@jwt_required()
+def bulk_import_hospital_doctors():
+    """Create or update hospital doctors from a CSV / NDJSON upload (keyed by email)"""
+    hospital_id = current_id('hospital')
+    if hospital_id is None:
+        return jsonify({'error': 'Hospital access required'}), 403
+    return _run_import(hospital_id, _validate_doctor, _write_doctors)
+
+
+# ---------------------------------------------------------------------------
+# Bed wards
+# ---------------------------------------------------------------------------
+
+def _validate_ward(record):
+    ward_type = _enum(record.get('ward_type'), 'ward_type', _WARD_TYPES)
+    ac_type = _enum(record.get('ac_type'), 'ac_type', _WARD_AC_TYPES, default='not_applicable')
+    total_beds = parse_int(record.get('total_beds'), 'total_beds', minimum=0) or 0
+    # reserved_beds is still accepted as an alias for occupied, like the single-row endpoint.
+    occupied = (parse_int(record.get('occupied_beds'), 'occupied_beds', minimum=0) or 0) + \
+        (parse_int(record.get('reserved_beds'), 'reserved_beds', minimum=0) or 0)
+    available = parse_int(record.get('available_beds'), 'available_beds', minimum=0)
+    if available is None:
+        available = max(0, total_beds - occupied)
+    if available + occupied > total_beds:
+        raise ValueError('available_beds + occupied_beds cannot exceed total_beds')
+    return {
+        'ward_type': ward_type,
+        'ac_type': ac_type,
+        'room_config': text_or_none(record.get('room_config')),
+        'total_beds': total_beds,
+        'available_beds': available,
+        'occupied_beds': occupied,
+    }
+
+
+def _write_wards(conn, cursor, hospital_id, rows, report):
+    # room_config is NULL for most wards, so the unique key can't be relied on
+    # for an upsert; resolve ids from the hospital's (small) ward list instead.
+    cursor.execute(
+        "SELECT id, ward_type, ac_type, room_config FROM bed_wards WHERE hospital_id = %s",
+        (hospital_id,),
+    )
+    existing = {(r['ward_type'], r['ac_type'], r['room_config']): r['id'] for r in cursor.fetchall()}
+
+    seen = set()
+    updates, inserts = [], []
+    for row_number, w in rows:
+        key = (w['ward_type'], w['ac_type'], w['room_config'])
+        if key in seen:
+            report.error(row_number, 'Duplicate ward in upload')
+            continue
+        seen.add(key)
+        counts = (w['total_beds'], w['available_beds'], w['occupied_beds'])
+        if key in existing:
+            updates.append((row_number, counts + (existing[key],)))
+        else:
+            inserts.append((row_number, (hospital_id,) + key + counts))
+
+    def _count_updates(n):
+        report.updated += n
+
+    def _count_inserts(n):
+        report.inserted += n
+
+    write_chunk(conn, """
+        UPDATE bed_wards
+        SET total_beds = %s, available_beds = %s, occupied_beds = %s, updated_at = NOW()
+        WHERE id = %s
+    """, updates, report, on_success=_count_updates)
+    write_chunk(conn, """
+        INSERT INTO bed_wards
+        (hospital_id, ward_type, ac_type, room_config, total_beds, available_beds, occupied_beds)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, inserts, report, on_success=_count_inserts)
+
+
+@hospital_bulk_bp.route('/hospital-bulk/bed-wards', methods=['POST'])
+@jwt_required()
+def bulk_import_bed_wards():
+    """Create or update bed ward counts from a CSV / NDJSON upload"""
+    hospital_id = current_id('hospital')
+    if hospital_id is None:
+        return jsonify({'error': 'Hospital access required'}), 403
+    # A hospital only has a handful of ward keys; one chunk lets duplicates be
+    # caught across the whole upload.
+    return _run_import(hospital_id, _validate_ward, _write_wards, chunk_size=_MAX_CHUNK_SIZE, after=beds_changed)
+
+
+# ---------------------------------------------------------------------------
+# Private rooms
+# ---------------------------------------------------------------------------
+
+def _validate_room(record):
+    room_number = text_or_none(record.get('room_number'))
+    if not room_number:
+        raise ValueError('room_number is required')
+    bed_count = str(parse_int(record.get('bed_count'), 'bed_count', required=True))
+    if bed_count not in ('1', '2'):
+        raise ValueError('bed_count must be 1 or 2')
+    return {
+        'room_number': room_number,
+        'bed_count': bed_count,
+        # 2-bed rooms always have an attached bathroom.
+        'has_attached_bathroom': bed_count == '2' or parse_bool(record.get('has_attached_bathroom')),
+        'ac_type': _enum(record.get('ac_type'), 'ac_type', _ROOM_AC_TYPES),
+        'status': _enum(record.get('status'), 'status', _ROOM_STATUSES, default='available'),
+        'daily_rate': parse_float(record.get('daily_rate'), 'daily_rate', default=0.0),
+        'notes': text_or_none(record.get('notes')),
+    }
+
+
+_ROOM_UPSERT = """
+    INSERT INTO private_rooms
+    (hospital_id, room_number, bed_count, has_attached_bathroom,
+     ac_type, status, daily_rate, notes)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        bed_count = VALUES(bed_count), has_attached_bathroom = VALUES(has_attached_bathroom),
+        ac_type = VALUES(ac_type), status = VALUES(status),
+        daily_rate = VALUES(daily_rate), notes = VALUES(notes)
+"""
+
+
+def _write_rooms(conn, cursor, hospital_id, rows, report):
+    numbers = sorted({r['room_number'] for _, r in rows})
+    placeholders = ', '.join(['%s'] * len(numbers))
+    cursor.execute(
+        f"SELECT room_number FROM private_rooms WHERE hospital_id = %s AND room_number IN ({placeholders})",
+        (hospital_id, *numbers),
+    )
+    existing = {r['room_number'] for r in cursor.fetchall()}
+
+    inserts = 0
+    params = []
+    for row_number, r in rows:
+        if r['room_number'] not in existing:
+            inserts += 1
+            existing.add(r['room_number'])
+        params.append((row_number, (
+            hospital_id, r['room_number'], r['bed_count'], r['has_attached_bathroom'],
+            r['ac_type'], r['status'], r['daily_rate'], r['notes'],
+        )))
+
+    written = []
+    write_chunk(conn, _ROOM_UPSERT, params, report, on_success=written.append)
+    _split_counts(report, sum(written), inserts)
+
+
+@hospital_bulk_bp.route('/hospital-bulk/private-rooms', methods=['POST'])
+@jwt_required()
+def bulk_import_private_rooms():
+    """Create or update private rooms from a CSV / NDJSON upload (keyed by room_number)"""
+    hospital_id = current_id('hospital')
+    if hospital_id is None:
+        return jsonify({'error': 'Hospital access required'}), 403
+    return _run_import(hospital_id, _validate_room, _write_rooms, after=beds_changed)
+
+
+# ---------------------------------------------------------------------------
+# Hospital appointments
+# ---------------------------------------------------------------------------
+
+def _validate_appointment(record):
+    appointment_id = parse_int(record.get('id'), 'id', minimum=1)
+    doctor_id = parse_int(record.get('hospital_doctor_id'), 'hospital_doctor_id', minimum=1)
+
+    if appointment_id is not None:
+        # Update row: only the columns that are present change.
+        status = text_or_none(record.get('status'))
+        priority = text_or_none(record.get('priority'))
+        return {
+            'id': appointment_id,
+            'hospital_doctor_id': doctor_id,
+            'appointment_date': _parse_date(record.get('appointment_date'), 'appointment_date'),
+            'appointment_time': _parse_time(record.get('appointment_time'), 'appointment_time'),
+            'priority': _enum(priority, 'priority', _APPOINTMENT_PRIORITIES) if priority else None,
+            'status': _enum(status, 'status', _APPOINTMENT_STATUSES) if status else None,
+            'notes': text_or_none(record.get('notes')),
+        }
+
+    patient_name = text_or_none(record.get('patient_name'))
+    department = text_or_none(record.get('department'))
+    if not patient_name:
+        raise ValueError('patient_name is required')
+    if not department:
+        raise ValueError('department is required')
+    return {
+        'id': None,
+        'hospital_doctor_id': doctor_id,
+        'patient_name': patient_name,
+        'patient_phone': text_or_none(record.get('patient_phone')),
+        'patient_email': text_or_none(record.get('patient_email')),
+        'appointment_date': _parse_date(record.get('appointment_date'), 'appointment_date', required=True),
+        'appointment_time': _parse_time(record.get('appointment_time'), 'appointment_time', required=True),
+        'department': department,
+        'appointment_type': text_or_none(record.get('appointment_type')) or 'Consultation',
+        'priority': _enum(record.get('priority'), 'priority', _APPOINTMENT_PRIORITIES, default='normal'),
+        'status': _enum(record.get('status'), 'status', _APPOINTMENT_STATUSES, default='pending'),
+        'symptoms': text_or_none(record.get('symptoms')),
+        'notes': text_or_none(record.get('notes')),
+    }
+
+
+def _ids_in_hospital(cursor, table, ids, hospital_id):
+    if not ids:
+        return set()
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(
+        f"SELECT id FROM {table} WHERE hospital_id = %s AND id IN ({placeholders})",
+        (hospital_id, *sorted(ids)),
+    )
+    return {r['id'] for r in cursor.fetchall()}
+
+
+def _write_appointments(conn, cursor, hospital_id, rows, report):
+    doctors = _ids_in_hospital(
+        cursor, 'hospital_doctors',
+        {a['hospital_doctor_id'] for _, a in rows if a['hospital_doctor_id']}, hospital_id,
+    )
+    appointments = _ids_in_hospital(
+        cursor, 'hospital_appointments', {a['id'] for _, a in rows if a['id']}, hospital_id,
+    )
+
+    updates, inserts = [], []
+    for row_number, a in rows:
+        if a['hospital_doctor_id'] and a['hospital_doctor_id'] not in doctors:
+            report.error(row_number, 'Hospital doctor not found')
+            continue
+        if a['id']:
+            if a['id'] not in appointments:
+                report.error(row_number, 'Appointment not found')
+                continue
+            updates.append((row_number, (
+                a['hospital_doctor_id'], a['appointment_date'], a['appointment_time'],
+                a['priority'], a['status'], a['notes'], a['id'], hospital_id,
+            )))
+        else:
+            inserts.append((row_number, (
+                hospital_id, a['hospital_doctor_id'], a['patient_name'], a['patient_phone'],
+                a['patient_email'], a['appointment_date'], a['appointment_time'], a['department'],
+                a['appointment_type'], a['priority'], a['status'], a['symptoms'], a['notes'],
+            )))
+
+    def _count_updates(n):
+        report.updated += n
+
+    def _count_inserts(n):
+        report.inserted += n
+
+    write_chunk(conn, """
+        UPDATE hospital_appointments
+        SET hospital_doctor_id = COALESCE(%s, hospital_doctor_id),
+            appointment_date = COALESCE(%s, appointment_date),
+            appointment_time = COALESCE(%s, appointment_time),
+            priority = COALESCE(%s, priority),
+            status = COALESCE(%s, status),
+            notes = COALESCE(%s, notes),
+            updated_at = NOW()
+        WHERE id = %s AND hospital_id = %s
+    """, updates, report, on_success=_count_updates)
+    write_chunk(conn, """
+        INSERT INTO hospital_appointments
+        (hospital_id, hospital_doctor_id, patient_name, patient_phone, patient_email,
+         appointment_date, appointment_time, department, appointment_type,
+         priority, status, symptoms, notes)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, inserts, report, on_success=_count_inserts)
+
+
+@hospital_bulk_bp.route('/hospital-bulk/appointments', methods=['POST'])
+@jwt_required()
+def bulk_import_hospital_appointments():
+    """Create appointments (rows without ``id``) or update them (rows with ``id``) in bulk"""
+    hospital_id = current_id('hospital')
+    if hospital_id is None:
+        return jsonify({'error': 'Hospital access required'}), 403
+    return _run_import(hospital_id, _validate_appointment, _write_appointments)
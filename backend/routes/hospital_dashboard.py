@@ -6,6 +6,7 @@ Provides comprehensive dashboard data for hospital management
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import get_db_connection
+from utils.occupancy_series import read_series, format_trend, RES_5M, RES_1H, RES_1D
 import pymysql
 from datetime import datetime, date, timedelta
 
@@ -277,33 +278,55 @@ def get_recent_appointments():
 @jwt_required(optional=True)
 def get_bed_occupancy_trend():
     """
-    Get bed occupancy trend for the last 7 days
-    Query params: hospital_id (required)
+    Get bed occupancy trend (% occupied per ward type)
+    Query params: hospital_id (required), days (default 7, max 365),
+                  resolution (optional: 5m, 1h, 1d)
+    Falls back to daily allocation counts when no occupancy series exists yet.
+    Hourly/daily buckets are maintained by scripts/occupancy_series.py (run it
+    from cron); until it catches up they are rolled up from 5-minute samples
+    on read.
     """
     try:
         hospital_id = request.args.get('hospital_id', type=int)
         
         if not hospital_id:
             return jsonify({'error': 'hospital_id is required'}), 400
+
+        days = max(1, min(request.args.get('days', 7, type=int) or 7, 365))
+        resolution = request.args.get('resolution')
+        if resolution and resolution not in (RES_5M, RES_1H, RES_1D):
+            return jsonify({'error': 'resolution must be one of: 5m, 1h, 1d'}), 400
         
         conn = get_db_connection()
         cursor = conn.cursor()
-        
-        # Get daily bed occupancy for different ward types over the last 7 days
+
+        resolution, series = read_series(cursor, hospital_id, days, resolution)
+        if series:
+            cursor.close()
+            conn.close()
+            return jsonify({
+                'success': True,
+                'source': 'series',
+                'resolution': resolution,
+                'days': days,
+                'trend': format_trend(series, resolution, days)
+            }), 200
+        
+        # Get daily bed occupancy for different ward types over the requested window
         cursor.execute("""
             SELECT 
                 DATE(bal.created_at) as date,
-                DATE_FORMAT(bal.created_at, '%a') as day_name,
+                DATE_FORMAT(bal.created_at, '%%a') as day_name,
                 bw.ward_type,
                 COUNT(*) as allocations
             FROM bed_allocation_logs bal
             JOIN bed_wards bw ON bal.ward_id = bw.id
             WHERE bal.hospital_id = %s 
-            AND bal.created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
+            AND bal.created_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
             AND bal.action = 'allocated'
             GROUP BY DATE(bal.created_at), day_name, bw.ward_type
             ORDER BY date ASC
-        """, (hospital_id,))
+        """, (hospital_id, days))
         
         trend_data = cursor.fetchall()
         
@@ -313,13 +336,15 @@ def get_bed_occupancy_trend():
         # Format data for frontend charts
         formatted_data = {}
         for row in trend_data:
-            day = row['day_name']
-            if day not in formatted_data:
-                formatted_data[day] = {'name': day}
-            formatted_data[day][row['ward_type']] = row['allocations']
+            key = row['date']
+            if key not in formatted_data:
+                formatted_data[key] = {'name': row['day_name'] if days <= 7 else row['date'].strftime('%b %d')}
+            formatted_data[key][row['ward_type']] = row['allocations']
         
         return jsonify({
             'success': True,
+            'source': 'allocation_logs',
+            'days': days,
             'trend': list(formatted_data.values())
         }), 200
         
@@ -408,64 +433,66 @@ def get_all_dashboard_data():
         
         department_data = cursor.fetchall()
         
-        # Get weekly occupancy trend for last 7 days
-        # Since bed_allocation_logs may be empty, use current bed occupancy data
+        # Get weekly occupancy trend for last 7 days from the daily occupancy series
+        _, series = read_series(cursor, hospital_id, 7, RES_1D)
+        occupancy_data = format_trend(series, RES_1D, 7)
+
+        # Until the series has history, use current bed occupancy data
         # and generate a realistic trend based on current occupancy
-        occupancy_data = []
-        
-        # Get current occupancy by ward type
-        cursor.execute("""
-            SELECT 
-                ward_type,
-                SUM(occupied_beds) as occupied,
-                SUM(total_beds) as total
-            FROM bed_wards
-            WHERE hospital_id = %s
-            AND ward_type IN ('general', 'icu', 'emergency', 'pediatrics', 'maternity')
-            GROUP BY ward_type
-        """, (hospital_id,))
-        
-        current_occupancy = {}
-        ward_data = cursor.fetchall()
-        for ward in ward_data:
-            ward_type = ward['ward_type']
-            if ward['total'] > 0:
-                occupancy_pct = round((ward['occupied'] / ward['total']) * 100)
-            else:
-                occupancy_pct = 0
-            current_occupancy[ward_type] = occupancy_pct
-        
-        # Generate trend data for last 7 days
-        # Today (day 0) should match exact current occupancy
-        # Previous days show realistic historical variations
-        import random
-        random.seed(hospital_id)  # Use hospital_id as seed for consistency
-        
-        for i in range(6, -1, -1):
-            day_date = today - timedelta(days=i)
-            day_name = day_date.strftime('%a')
-            is_today = (i == 0)
+        if not occupancy_data:
+            # Get current occupancy by ward type
+            cursor.execute("""
+                SELECT 
+                    ward_type,
+                    SUM(occupied_beds) as occupied,
+                    SUM(total_beds) as total
+                FROM bed_wards
+                WHERE hospital_id = %s
+                AND ward_type IN ('general', 'icu', 'emergency', 'pediatrics', 'maternity')
+                GROUP BY ward_type
+            """, (hospital_id,))
+        
+            current_occupancy = {}
+            ward_data = cursor.fetchall()
+            for ward in ward_data:
+                ward_type = ward['ward_type']
+                if ward['total'] > 0:
+                    occupancy_pct = round((ward['occupied'] / ward['total']) * 100)
+                else:
+                    occupancy_pct = 0
+                current_occupancy[ward_type] = occupancy_pct
+        
+            # Generate trend data for last 7 days
+            # Today (day 0) should match exact current occupancy
+            # Previous days show realistic historical variations
+            import random
+            random.seed(hospital_id)  # Use hospital_id as seed for consistency
+        
+            for i in range(6, -1, -1):
+                day_date = today - timedelta(days=i)
+                day_name = day_date.strftime('%a')
+                is_today = (i == 0)
             
-            day_data = {'name': day_name}
+                day_data = {'name': day_name}
             
-            for ward_type in ['general', 'icu', 'emergency', 'pediatrics', 'maternity']:
-                base_occupancy = current_occupancy.get(ward_type, 0)
+                for ward_type in ['general', 'icu', 'emergency', 'pediatrics', 'maternity']:
+                    base_occupancy = current_occupancy.get(ward_type, 0)
                 
-                if is_today:
-                    # Today: Use exact current occupancy
-                    day_occupancy = base_occupancy
-                else:
-                    # Historical days: Add realistic variations
-                    # Weekends typically have lower occupancy
-                    if day_name in ['Sat', 'Sun']:
-                        variation = random.randint(-8, -3)
+                    if is_today:
+                        # Today: Use exact current occupancy
+                        day_occupancy = base_occupancy
                     else:
-                        variation = random.randint(-4, 4)
-                    day_occupancy = max(0, min(100, base_occupancy + variation))
+                        # Historical days: Add realistic variations
+                        # Weekends typically have lower occupancy
+                        if day_name in ['Sat', 'Sun']:
+                            variation = random.randint(-8, -3)
+                        else:
+                            variation = random.randint(-4, 4)
+                        day_occupancy = max(0, min(100, base_occupancy + variation))
                 
-                day_data[ward_type] = day_occupancy
+                    day_data[ward_type] = day_occupancy
             
-            occupancy_data.append(day_data)
+                occupancy_data.append(day_data)
         
         # Get patients today count
         cursor.execute("""
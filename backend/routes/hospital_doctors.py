@@ -6,6 +6,7 @@ Handles CRUD operations for doctors within a hospital's management system
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import get_db_connection
+from utils.http_cache import conditional_get, specialties_version
 import pymysql
 from datetime import datetime
 
@@ -464,6 +465,7 @@ def get_hospital_doctor_statistics():
 
 @hospital_doctors_bp.route('/hospital-doctors/specialties', methods=['GET'])
 @jwt_required(optional=True)
+@conditional_get(specialties_version, max_age=300, public=True)
 def get_available_specialties():
     """
     Get list of all specialties available in the system
@@ -1,10 +1,16 @@
 from flask import Blueprint, request, jsonify
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_query
+from utils.bed_availability import get_availability_index
+from utils.http_cache import conditional_get
 from flask_jwt_extended import jwt_required
 import pymysql
 import json
 from math import radians, cos, sin, asin, sqrt
 
+_EARTH_RADIUS_KM = 6371
+_KM_PER_DEGREE_LAT = 111.045
+_BED_WARD_TYPES = {'general', 'maternity', 'pediatrics', 'icu', 'emergency', 'private_room'}
+
 hospitals_bp = Blueprint('hospitals', __name__)
 
 
@@ -155,8 +161,26 @@ def get_hospitals():
             conn.close()
 
 
+def _hospital_details_version(hospital_id):
+    row = execute_query(
+        """
+        SELECT h.updated_at,
+               (SELECT COUNT(*) FROM hospital_doctors WHERE hospital_id = h.id) AS doctor_count,
+               (SELECT MAX(updated_at) FROM hospital_doctors WHERE hospital_id = h.id) AS doctors_updated_at
+        FROM hospitals h
+        WHERE h.id = %s
+        """,
+        (hospital_id,),
+        fetch_one=True,
+    )
+    if not row:
+        return None
+    return (row['updated_at'], row['doctor_count'], row['doctors_updated_at'])
+
+
 @hospitals_bp.route('/hospitals/<int:hospital_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(_hospital_details_version)
 def get_hospital_details(hospital_id):
     """Get detailed information about a specific hospital"""
     conn = None
@@ -315,3 +339,114 @@ def get_nearby_hospitals():
             cursor.close()
         if conn:
             conn.close()
+
+
+@hospitals_bp.route('/beds/search', methods=['GET'])
+@jwt_required()
+def search_available_beds():
+    """
+    Find hospitals that currently have free beds of a given kind, nearest first.
+
+    Query Parameters:
+    - ward_type: general, maternity, pediatrics, icu, emergency, private_room (required)
+    - ac_type: ac / non_ac (ignored for ICU, emergency and private rooms)
+    - room_config: private room configuration, e.g. 1_bed_with_bath
+    - min_beds: minimum free beds (default: 1)
+    - latitude / longitude: rank by distance when given
+    - radius: search radius in kilometers (default: 25)
+    - limit: max results (default: 10, max: 100)
+    """
+    conn = None
+    cursor = None
+    try:
+        ward_type = (request.args.get('ward_type') or '').strip().lower()
+        if ward_type not in _BED_WARD_TYPES:
+            return jsonify({'error': f'ward_type must be one of: {", ".join(sorted(_BED_WARD_TYPES))}'}), 400
+
+        ac_type = (request.args.get('ac_type') or '').strip().lower() or None
+        room_config = (request.args.get('room_config') or '').strip() or None
+        min_beds = max(1, request.args.get('min_beds', default=1, type=int) or 1)
+        user_lat = request.args.get('latitude', type=float)
+        user_lon = request.args.get('longitude', type=float)
+        radius = request.args.get('radius', default=25, type=float)
+        limit = max(1, min(request.args.get('limit', default=10, type=int) or 10, 100))
+
+        conn = get_db_connection()
+        index = get_availability_index(conn)
+        capacity = index.hospitals_with_capacity(ward_type, ac_type, room_config, min_beds)
+        if not capacity:
+            return jsonify({'hospitals': [], 'count': 0, 'search_radius': radius}), 200
+
+        ids = sorted(capacity)
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor = conn.cursor()
+
+        if user_lat is not None and user_lon is not None:
+            # Bounding box first (uses idx_location), exact haversine only on what's inside.
+            dlat = radius / _KM_PER_DEGREE_LAT
+            dlon = radius / (_KM_PER_DEGREE_LAT * max(cos(radians(user_lat)), 0.01))
+            cursor.execute(f"""
+                SELECT id, name, address, city, state, latitude, longitude, phone,
+                       emergency_contact, rating,
+                       {_EARTH_RADIUS_KM} * 2 * ASIN(SQRT(
+                           POWER(SIN(RADIANS(latitude - %s) / 2), 2) +
+                           COS(RADIANS(%s)) * COS(RADIANS(latitude)) *
+                           POWER(SIN(RADIANS(longitude - %s) / 2), 2)
+                       )) AS distance
+                FROM hospitals
+                WHERE id IN ({placeholders})
+                AND latitude BETWEEN %s AND %s
+                AND longitude BETWEEN %s AND %s
+                HAVING distance <= %s
+                ORDER BY distance ASC
+                LIMIT %s
+            """, (
+                user_lat, user_lat, user_lon, *ids,
+                user_lat - dlat, user_lat + dlat, user_lon - dlon, user_lon + dlon,
+                radius, limit,
+            ))
+            rows = cursor.fetchall()
+        else:
+            cursor.execute(f"""
+                SELECT id, name, address, city, state, latitude, longitude, phone,
+                       emergency_contact, rating
+                FROM hospitals
+                WHERE id IN ({placeholders})
+            """, tuple(ids))
+            rows = sorted(cursor.fetchall(), key=lambda h: (-capacity.get(h['id'], 0), h['name']))[:limit]
+
+        results = []
+        for hospital in rows:
+            item = {
+                'id': hospital['id'],
+                'name': hospital['name'],
+                'address': hospital['address'],
+                'city': hospital['city'],
+                'state': hospital['state'],
+                'latitude': float(hospital['latitude']) if hospital['latitude'] is not None else None,
+                'longitude': float(hospital['longitude']) if hospital['longitude'] is not None else None,
+                'phone': hospital['phone'],
+                'emergency_contact': hospital['emergency_contact'],
+                'rating': float(hospital['rating']) if hospital['rating'] else 0.0,
+                'available_beds': capacity.get(hospital['id'], 0)
+            }
+            if 'distance' in hospital:
+                item['distance'] = round(float(hospital['distance']), 2)
+            results.append(item)
+
+        return jsonify({
+            'hospitals': results,
+            'count': len(results),
+            'search_radius': radius,
+            'ward_type': ward_type
+        }), 200
+
+    except pymysql.MySQLError as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': f'Failed to search available beds: {str(e)}'}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
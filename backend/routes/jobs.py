@@ -0,0 +1,69 @@
+import json
+import time
+
+from flask import Blueprint, Response, jsonify, stream_with_context
+from flask_jwt_extended import get_jwt_identity
+
+from utils.auth_utils import jwt_required_custom
+from utils.job_queue import get_job_queue, is_terminal, serialize_job
+
+jobs_bp = Blueprint("jobs", __name__)
+
+_SSE_POLL_SECONDS = 0.5
+_SSE_MAX_SECONDS = 120
+
+
+def _owned_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if not job or str(job.get("owner")) != str(get_jwt_identity()):
+        return None
+    return job
+
+
+@jobs_bp.route("/jobs/<job_id>", methods=["GET"])
+@jwt_required_custom
+def get_job_status(job_id: str):
+    """Poll a background job started by an endpoint called with ``async=1``."""
+
+    try:
+        job = _owned_job(job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(serialize_job(job)), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to fetch job", "message": str(e)}), 500
+
+
+@jobs_bp.route("/jobs/<job_id>/events", methods=["GET"])
+@jwt_required_custom
+def stream_job_events(job_id: str):
+    """Server-sent events for a job: one event per change, closed when finished."""
+
+    if not _owned_job(job_id):
+        return jsonify({"error": "Job not found"}), 404
+
+    queue = get_job_queue()
+
+    def _events():
+        last = None
+        deadline = time.time() + _SSE_MAX_SECONDS
+        while time.time() < deadline:
+            job = queue.get(job_id)
+            if not job:
+                yield "event: error\ndata: {\"error\": \"Job not found\"}\n\n"
+                return
+            payload = serialize_job(job)
+            marker = (payload["status"], payload["progress"], payload["message"])
+            if marker != last:
+                last = marker
+                yield f"data: {json.dumps(payload, default=str)}\n\n"
+            if is_terminal(job):
+                return
+            time.sleep(_SSE_POLL_SECONDS)
+        yield "event: timeout\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(_events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
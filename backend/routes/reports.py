@@ -1,7 +1,8 @@
 import os
+from datetime import datetime, timedelta
 from pathlib import Path
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import get_jwt_identity
 from werkzeug.utils import secure_filename
 
@@ -9,8 +10,13 @@ from config import Config
 from utils.auth_utils import jwt_required_custom
 from utils.database import execute_query
 from utils.gemini_utils import explain_bytes_with_gemini, simplify_ocr_text
-from utils.ocr_utils import extract_text_from_image_bytes
-from utils.pdf_utils import extract_text_from_pdf_bytes
+from utils.job_queue import submit_job, wants_async
+from utils.lab_results import extract_report_values, find_report_date, get_test, save_results
+from utils.medical_text import NON_MEDICAL_MESSAGE, REPORT_TYPES, guess_report_type, is_obviously_non_medical
+from utils.ocr_utils import extract_text_from_image
+from utils.pdf_utils import extract_text_from_pdf
+from utils.report_search import make_snippet, parse_query
+from utils.uploads import UploadTooLarge, spool_upload
 
 reports_bp = Blueprint("reports", __name__)
 
@@ -80,10 +86,19 @@ def _as_user_id() -> int:
         raise ValueError("Invalid user identity")
 
 
-def _ocr_bytes(*, ext: str, data: bytes):
+def _ocr_bytes(*, ext: str, data):
+    """OCR an upload; ``data`` is the spooled file's path (or raw bytes)."""
+    if ext != "pdf" and isinstance(data, (bytes, bytearray)):
+        from io import BytesIO
+
+        data = BytesIO(data)
     if ext == "pdf":
-        return extract_text_from_pdf_bytes(data)
-    return extract_text_from_image_bytes(data)
+        return extract_text_from_pdf(data)
+    return extract_text_from_image(data)
+
+
+def _too_large(exc: UploadTooLarge):
+    return jsonify({"error": "File too large", "message": str(exc)}), 413
 
 
 @reports_bp.route("/ocr", methods=["POST"])
@@ -115,22 +130,27 @@ def ocr_report():
             }
         ), 400
 
-    image_bytes = f.read()
-    if not image_bytes:
-        return jsonify({"error": "Empty file", "message": "Uploaded file is empty"}), 400
+    try:
+        upload = spool_upload(f.stream, suffix=f".{ext}", filename=filename)
+    except UploadTooLarge as exc:
+        return _too_large(exc)
 
-    # Optional: save original upload for debugging/auditing later.
-    # For MVP we keep it off by default.
-    if (os.getenv("SAVE_OCR_UPLOADS") or "").strip().lower() in {"1", "true", "yes"}:
-        base = Path(Config.UPLOAD_FOLDER) / "reports"
-        base.mkdir(parents=True, exist_ok=True)
-        (base / filename).write_bytes(image_bytes)
+    with upload:
+        if not upload.size:
+            return jsonify({"error": "Empty file", "message": "Uploaded file is empty"}), 400
 
-    try:
-        text, confidence = _ocr_bytes(ext=ext, data=image_bytes)
-        return jsonify({"text": text, "confidence": confidence}), 200
-    except Exception as exc:
-        return jsonify({"error": "OCR failed", "message": str(exc)}), 500
+        # Optional: save original upload for debugging/auditing later.
+        # For MVP we keep it off by default.
+        if (os.getenv("SAVE_OCR_UPLOADS") or "").strip().lower() in {"1", "true", "yes"}:
+            base = Path(Config.UPLOAD_FOLDER) / "reports"
+            base.mkdir(parents=True, exist_ok=True)
+            upload.copy_to(base / filename)
+
+        try:
+            text, confidence = _ocr_bytes(ext=ext, data=upload.path)
+            return jsonify({"text": text, "confidence": confidence}), 200
+        except Exception as exc:
+            return jsonify({"error": "OCR failed", "message": str(exc)}), 500
 
 
 @reports_bp.route("/explain", methods=["POST"])
@@ -197,92 +217,143 @@ def simplify_report_and_save():
 
     model = (request.form.get("model") or request.args.get("model") or "gemini-3-flash-preview").strip()
 
-    data = f.read()
-    if not data:
+    try:
+        upload = spool_upload(f.stream, suffix=f".{ext}", filename=filename)
+    except UploadTooLarge as exc:
+        return _too_large(exc)
+    if not upload.size:
+        upload.close()
         return jsonify({"error": "Empty file", "message": "Uploaded file is empty"}), 400
 
+    if wants_async(request):
+        # The job holds the only reference to the spooled file; it is removed
+        # once the job (including retries) is done with it.
+        job_id = submit_job(
+            "report_simplify",
+            _simplify_and_save,
+            owner=str(user_id),
+            kwargs={"user_id": user_id, "filename": filename, "ext": ext, "upload": upload, "model": model},
+            on_error=_simplify_error,
+            app=current_app._get_current_object(),
+        )
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+    with upload:
+        try:
+            return jsonify(_simplify_and_save(user_id=user_id, filename=filename, ext=ext, upload=upload, model=model)), 201
+        except Exception as exc:
+            payload, code = _simplify_error(exc)
+            return jsonify(payload), code
+
+
+def _simplify_and_save(*, user_id: int, filename: str, ext: str, upload, model: str, progress=None) -> dict:
+    """OCR + Gemini explanation + insert into medical_reports.
+
+    Shared by the synchronous endpoint and the background job. ``upload``
+    is a ``SpooledUpload``; OCR reads it from disk and the bytes are only
+    loaded for the Gemini request.
+    """
+
+    if progress:
+        progress(10, "Extracting text")
+    ocr_text, confidence = _ocr_bytes(ext=ext, data=upload.path)
+
+    # Keep OCR for database/search even if it's imperfect.
+    report_type = None
+    if not (ocr_text or "").strip():
+        ocr_text = "[OCR failed to extract text, but AI analysis may still succeed]"
+        confidence = None
+    elif is_obviously_non_medical(ocr_text):
+        # Receipts, tickets, transcripts...: don't upload the file to Gemini at all.
+        raise ValueError(NON_MEDICAL_MESSAGE)
+    else:
+        report_type = guess_report_type(ocr_text)
+
+    # Accuracy upgrade: for the explanation, prefer Gemini multimodal analysis
+    # using the original file bytes so tables/columns/layout are preserved.
+    if ext == "pdf":
+        mime_type = "application/pdf"
+    elif ext == "png":
+        mime_type = "image/png"
+    else:
+        mime_type = "image/jpeg"
+
+    if progress:
+        progress(40, "Generating explanation")
     try:
-        ocr_text, confidence = _ocr_bytes(ext=ext, data=data)
-
-        # Keep OCR for database/search even if it's imperfect.
-        if not (ocr_text or "").strip():
-            ocr_text = "[OCR failed to extract text, but AI analysis may still succeed]"
-            confidence = None
-
-        # Accuracy upgrade: for the explanation, prefer Gemini multimodal analysis
-        # using the original file bytes so tables/columns/layout are preserved.
-        if ext == "pdf":
-            mime_type = "application/pdf"
-        elif ext == "png":
-            mime_type = "image/png"
+        explanation = explain_bytes_with_gemini(upload.read_bytes(), mime_type=mime_type, model=model)
+    except ValueError:
+        # The model rejected the document as non-medical; asking again from
+        # the OCR text would only spend a second call on the same answer.
+        raise
+    except Exception:
+        # Fallback: keep the original behavior if vision/PDF analysis fails.
+        # This prevents regressions on environments/models that don't support multimodal.
+        if (ocr_text or "").strip() and not ocr_text.startswith("[OCR failed"):
+            explanation = simplify_ocr_text(ocr_text, model=model)
         else:
-            mime_type = "image/jpeg"
-
+            raise
+
+    if progress:
+        progress(80, "Reading lab values")
+    lab_values = extract_report_values(ocr_text, model=model) if report_type != "prescription" else []
+
+    if progress:
+        progress(90, "Saving report")
+    report_id = execute_query(
+        """
+        INSERT INTO medical_reports (user_id, file_name, ocr_text, ai_interpretation, report_type)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        (user_id, filename, ocr_text, explanation, report_type),
+        commit=True,
+    )
+
+    row = execute_query(
+        """
+        SELECT id, file_name, uploaded_at
+        FROM medical_reports
+        WHERE id = %s AND user_id = %s
+        LIMIT 1
+        """,
+        (report_id, user_id),
+        fetch_one=True,
+    )
+
+    uploaded_at = None
+    if row and row.get("uploaded_at"):
         try:
-            explanation = explain_bytes_with_gemini(data, mime_type=mime_type, model=model)
+            uploaded_at = row["uploaded_at"].isoformat()
         except Exception:
-            # Fallback: keep the original behavior if vision/PDF analysis fails.
-            # This prevents regressions on environments/models that don't support multimodal.
-            if (ocr_text or "").strip() and not ocr_text.startswith("[OCR failed"):
-                explanation = simplify_ocr_text(ocr_text, model=model)
-            else:
-                raise
-
-        report_id = execute_query(
-            """
-            INSERT INTO medical_reports (user_id, file_name, ocr_text, ai_interpretation, report_type)
-            VALUES (%s, %s, %s, %s, %s)
-            """,
-            (user_id, filename, ocr_text, explanation, None),
-            commit=True,
-        )
+            uploaded_at = str(row.get("uploaded_at"))
 
-        row = execute_query(
-            """
-            SELECT id, file_name, uploaded_at
-            FROM medical_reports
-            WHERE id = %s AND user_id = %s
-            LIMIT 1
-            """,
-            (report_id, user_id),
-            fetch_one=True,
-        )
+    # Trend charts read these rows instead of re-parsing report text.
+    save_results(user_id, int(report_id), lab_values, find_report_date(ocr_text) or (row or {}).get("uploaded_at"))
 
-        uploaded_at = None
-        if row and row.get("uploaded_at"):
-            try:
-                uploaded_at = row["uploaded_at"].isoformat()
-            except Exception:
-                uploaded_at = str(row.get("uploaded_at"))
+    return {
+        "report_id": int(report_id),
+        "file_name": filename,
+        "text": ocr_text,
+        "confidence": confidence,
+        "explanation": explanation,
+        "model": model,
+        "uploaded_at": uploaded_at,
+        "lab_results": [v.as_dict() for v in lab_values],
+    }
 
-        return (
-            jsonify(
-                {
-                    "report_id": int(report_id),
-                    "file_name": filename,
-                    "text": ocr_text,
-                    "confidence": confidence,
-                    "explanation": explanation,
-                    "model": model,
-                    "uploaded_at": uploaded_at,
-                }
-            ),
-            201,
-        )
 
-    except ValueError as exc:
-        return jsonify({"error": "Invalid input", "message": str(exc)}), 400
-    except RuntimeError as exc:
-        # e.g. GEMINI_API_KEY not set
-        return _gemini_error_response(exc)
-    except Exception as exc:
-        res, code = _gemini_error_response(exc)
-        # Keep the endpoint-specific top-level error label for non-503 errors.
-        if code >= 500 and code != 503:
-            payload = res.get_json(silent=True) or {}
-            payload["error"] = "Simplify failed"
-            return jsonify(payload), code
-        return res, code
+def _simplify_error(exc: Exception):
+    """Map a simplify failure to (payload, status_code)."""
+
+    if isinstance(exc, ValueError):
+        return {"error": "Invalid input", "message": str(exc)}, 400
+
+    res, code = _gemini_error_response(exc)
+    payload = res.get_json(silent=True) or {}
+    # Keep the endpoint-specific top-level error label for non-503 errors.
+    if not isinstance(exc, RuntimeError) and code >= 500 and code != 503:
+        payload["error"] = "Simplify failed"
+    return payload, code
 
 
 @reports_bp.route("/history", methods=["GET"])
@@ -322,6 +393,237 @@ def list_report_history():
         return jsonify({"error": "Failed to fetch history", "message": str(exc)}), 500
 
 
+def _parse_day(value: str, name: str):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def _search_rows(user_id: int, query, *, match_all: bool, filters: list, params: list, order: str, limit: int, offset: int):
+    if query.indexable:
+        against = query.boolean_expression(match_all=match_all)
+        score_sql = "MATCH(ocr_text, ai_interpretation) AGAINST (%s IN BOOLEAN MODE)"
+        where = [score_sql]
+        where_params = [against]
+        select_params = [against]
+    else:
+        # Only words too short for the index: scan this user's reports.
+        score_sql = "0"
+        where, where_params, select_params = [], [], []
+        for word in query.short:
+            where.append("(ocr_text LIKE %s OR ai_interpretation LIKE %s)")
+            where_params += [f"%{word}%", f"%{word}%"]
+
+    order_sql = "uploaded_at DESC, id DESC" if order == "date" else "score DESC, uploaded_at DESC, id DESC"
+    return execute_query(
+        f"""
+        SELECT id, file_name, report_type, uploaded_at, ocr_text, ai_interpretation,
+               {score_sql} AS score
+        FROM medical_reports
+        WHERE user_id = %s AND {" AND ".join(where + filters)}
+        ORDER BY {order_sql}
+        LIMIT %s OFFSET %s
+        """,
+        tuple(select_params + [user_id] + where_params + params + [limit + 1, offset]),
+        fetch_all=True,
+    ) or []
+
+
+@reports_bp.route("/search", methods=["GET"])
+@jwt_required_custom
+def search_report_history():
+    """Full-text search over the current user's saved reports.
+
+    Query params: ``q`` (required; words match as prefixes, "quoted text" as
+    a phrase), ``from`` / ``to`` (YYYY-MM-DD, inclusive), ``type``,
+    ``sort`` (``relevance`` or ``date``), ``limit`` (max 50), ``offset``.
+    Every word must match; if that finds nothing, reports matching any of
+    the words are returned instead (``match`` says which one applied). A
+    ``q`` made only of stopwords returns no results and a ``message``.
+    """
+
+    try:
+        user_id = _as_user_id()
+        raw_query = (request.args.get("q") or "").strip()
+        if not raw_query:
+            raise ValueError("'q' is required")
+        query = parse_query(raw_query)
+
+        filters, params = [], []
+        if request.args.get("from"):
+            filters.append("uploaded_at >= %s")
+            params.append(_parse_day(request.args["from"], "from"))
+        if request.args.get("to"):
+            filters.append("uploaded_at < %s")
+            params.append(_parse_day(request.args["to"], "to") + timedelta(days=1))
+        report_type = (request.args.get("type") or "").strip().lower()
+        if report_type:
+            if report_type not in REPORT_TYPES:
+                raise ValueError(f"'type' must be one of: {', '.join(REPORT_TYPES)}")
+            filters.append("report_type = %s")
+            params.append(report_type)
+
+        order = "date" if request.args.get("sort") == "date" else "relevance"
+        try:
+            limit = max(1, min(int(request.args.get("limit", "20")), 50))
+            offset = max(0, int(request.args.get("offset", "0")))
+        except ValueError:
+            raise ValueError("'limit' and 'offset' must be integers")
+    except ValueError as exc:
+        return jsonify({"error": "Invalid input", "message": str(exc)}), 400
+
+    if not query:
+        # Only stopwords ("the", "of ..."): nothing the index could match.
+        return jsonify({
+            "results": [], "match": "all", "has_more": False,
+            "message": "The query has no searchable words",
+        }), 200
+
+    try:
+        kwargs = dict(filters=filters, params=params, order=order, limit=limit, offset=offset)
+        match = "all"
+        rows = _search_rows(user_id, query, match_all=True, **kwargs)
+        if not rows and offset == 0 and len(query.words) > 1:
+            match = "any"
+            rows = _search_rows(user_id, query, match_all=False, **kwargs)
+
+        terms = query.highlight_terms
+        results = []
+        for r in rows[:limit]:
+            snippet, highlights, matched_in = "", [], None
+            for name in ("ocr_text", "ai_interpretation"):
+                snippet, highlights = make_snippet(r.get(name) or "", terms)
+                if snippet:
+                    matched_in = name
+                    break
+            results.append(
+                {
+                    "id": r["id"],
+                    "file_name": r.get("file_name"),
+                    "report_type": r.get("report_type"),
+                    "uploaded_at": r.get("uploaded_at"),
+                    "score": float(r.get("score") or 0),
+                    "snippet": snippet,
+                    "highlights": highlights,
+                    "matched_in": matched_in,
+                }
+            )
+
+        return jsonify({"results": results, "match": match, "has_more": len(rows) > limit}), 200
+    except Exception as exc:
+        return jsonify({"error": "Search failed", "message": str(exc)}), 500
+
+
+@reports_bp.route("/labs", methods=["GET"])
+@jwt_required_custom
+def list_lab_tests():
+    """Tests found in the current user's reports, with the latest value of each."""
+
+    try:
+        user_id = _as_user_id()
+        rows = execute_query(
+            """
+            SELECT l.test_code, l.test_name, l.value, l.unit, l.flag, l.measured_at, c.n
+            FROM (
+                SELECT test_code, MAX(measured_at) AS last_at, COUNT(*) AS n
+                FROM lab_results
+                WHERE user_id = %s
+                GROUP BY test_code
+            ) c
+            JOIN lab_results l
+              ON l.user_id = %s AND l.test_code = c.test_code AND l.measured_at = c.last_at
+            ORDER BY l.measured_at DESC, l.id DESC
+            """,
+            (user_id, user_id),
+            fetch_all=True,
+        )
+
+        tests = {}
+        for r in rows or []:
+            if r["test_code"] in tests:
+                continue
+            tests[r["test_code"]] = {
+                "test_code": r["test_code"],
+                "test_name": r["test_name"],
+                "unit": r.get("unit"),
+                "count": int(r.get("n") or 0),
+                "latest": {
+                    "value": float(r["value"]),
+                    "flag": r.get("flag"),
+                    "measured_at": r.get("measured_at"),
+                },
+            }
+        return jsonify({"tests": list(tests.values())}), 200
+    except Exception as exc:
+        return jsonify({"error": "Failed to fetch lab results", "message": str(exc)}), 500
+
+
+@reports_bp.route("/labs/<test_code>", methods=["GET"])
+@jwt_required_custom
+def lab_trend(test_code):
+    """Time series of one test for the current user (oldest first).
+
+    Query params: ``from`` / ``to`` (YYYY-MM-DD, inclusive), ``limit`` (max 1000).
+    """
+
+    try:
+        user_id = _as_user_id()
+        test_code = (test_code or "").strip().upper()[:32]
+        filters, params = [], []
+        if request.args.get("from"):
+            filters.append("AND measured_at >= %s")
+            params.append(_parse_day(request.args["from"], "from"))
+        if request.args.get("to"):
+            filters.append("AND measured_at < %s")
+            params.append(_parse_day(request.args["to"], "to") + timedelta(days=1))
+        try:
+            limit = max(1, min(int(request.args.get("limit", "500")), 1000))
+        except ValueError:
+            raise ValueError("'limit' must be an integer")
+    except ValueError as exc:
+        return jsonify({"error": "Invalid input", "message": str(exc)}), 400
+
+    try:
+        # Newest ``limit`` points via the (user_id, test_code, measured_at) index.
+        rows = execute_query(
+            f"""
+            SELECT report_id, test_name, value, unit, ref_low, ref_high, flag, source, measured_at
+            FROM lab_results
+            WHERE user_id = %s AND test_code = %s {" ".join(filters)}
+            ORDER BY measured_at DESC, id DESC
+            LIMIT %s
+            """,
+            tuple([user_id, test_code] + params + [limit]),
+            fetch_all=True,
+        ) or []
+        rows.reverse()
+
+        known = get_test(test_code)
+        points = [
+            {
+                "measured_at": r.get("measured_at"),
+                "value": float(r["value"]),
+                "ref_low": float(r["ref_low"]) if r.get("ref_low") is not None else None,
+                "ref_high": float(r["ref_high"]) if r.get("ref_high") is not None else None,
+                "flag": r.get("flag"),
+                "source": r.get("source"),
+                "report_id": r.get("report_id"),
+            }
+            for r in rows
+        ]
+        return jsonify(
+            {
+                "test_code": test_code,
+                "test_name": known.name if known else (rows[-1]["test_name"] if rows else None),
+                "unit": known.unit if known else (rows[-1].get("unit") if rows else None),
+                "points": points,
+            }
+        ), 200
+    except Exception as exc:
+        return jsonify({"error": "Failed to fetch lab trend", "message": str(exc)}), 500
+
+
 @reports_bp.route("/history", methods=["DELETE"])
 @jwt_required_custom
 def clear_report_history():
@@ -1,11 +1,13 @@
 from flask import Blueprint, jsonify
 
 from utils.database import execute_query
+from utils.http_cache import conditional_get, specialties_version
 
 specialties_bp = Blueprint("specialties", __name__)
 
 
 @specialties_bp.route("/specialties", methods=["GET"])
+@conditional_get(specialties_version, max_age=300, public=True)
 def list_specialties():
     try:
         rows = execute_query(
@@ -5,13 +5,16 @@ import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity
 
 from config import Config
 from utils.auth_utils import jwt_required_custom
 from utils.database import execute_query
+from utils.job_queue import submit_job, wants_async
+from utils.response_cache import age_bucket, get_response_cache, normalize_text
+from utils import symptom_terms
+from utils.symptom_triage import SymptomTriage, build_local_analysis
 from utils.validators import validate_required_fields
 
 symptoms_bp = Blueprint("symptoms", __name__)
@@ -118,17 +121,27 @@ _SYMPTOM_HINT_WORDS = [
 ]
 
 
+# Compiled once: one pass over the text instead of one re.search per pattern.
+_NON_MEDICAL_RE = re.compile("|".join(f"(?:{p})" for p in _NON_MEDICAL_PATTERNS), flags=re.IGNORECASE)
+_SYMPTOM_HINT_RE = re.compile("|".join(re.escape(w) for w in _SYMPTOM_HINT_WORDS))
+
+_TRIAGE = SymptomTriage(
+    hint_words=_SYMPTOM_HINT_WORDS,
+    specialty_synonyms=_SPECIALTY_SYNONYMS,
+    specialties=_SPECIALTY_CANON,
+)
+
+
 def _is_non_medical_request(text: str) -> bool:
     t = (text or "").strip().lower()
     if not t:
         return False
 
-    non_medical_hit = any(re.search(p, t, flags=re.IGNORECASE) for p in _NON_MEDICAL_PATTERNS)
-    if not non_medical_hit:
+    if not _NON_MEDICAL_RE.search(t):
         return False
 
     # If there are clear symptom indicators, assume it's medical even if it mentions a non-medical topic.
-    if any(w in t for w in _SYMPTOM_HINT_WORDS):
+    if _SYMPTOM_HINT_RE.search(t):
         # Still treat it as non-medical when the user explicitly asks to solve a math problem.
         if "math problem" in t or ("solve" in t and "equation" in t):
             return True
@@ -239,6 +252,22 @@ def _normalize_specialty(value: Optional[str], allowed: List[str]) -> str:
     return "General Practice"
 
 
+def _local_triage(
+    symptoms_text: str, payload: Dict[str, Any], allowed_specialties: List[str]
+) -> Optional[Dict[str, Any]]:
+    """Answer common symptom phrasings locally; None means "ask Gemini"."""
+
+    result = _TRIAGE.triage(symptoms_text, age=payload.get("age"))
+    specialty = result.get("recommended_specialty")
+    if not result.get("is_medical") or not specialty:
+        return None
+    if float(result.get("confidence") or 0.0) < Config.SYMPTOM_TRIAGE_MIN_CONFIDENCE:
+        return None
+    if specialty.lower() not in {a.lower() for a in allowed_specialties}:
+        return None
+    return build_local_analysis(result, _normalize_specialty(specialty, allowed_specialties))
+
+
 def _gemini_symptom_analysis(
     payload: Dict[str, Any], allowed_specialties: List[str]
 ) -> Tuple[str, Optional[Dict[str, Any]]]:
@@ -296,7 +325,9 @@ def _gemini_symptom_analysis(
         ]
     }
 
-    resp = requests.post(GEMINI_API_URL, json=req, timeout=30)
+    import requests  # deferred: keeps worker start-up light
+
+    resp = requests.post(GEMINI_API_URL, json=req, timeout=Config.AI_REQUEST_TIMEOUT_SECONDS)
     resp.raise_for_status()
     data = resp.json()
     ai_text = data["candidates"][0]["content"]["parts"][0]["text"]
@@ -305,6 +336,37 @@ def _gemini_symptom_analysis(
     return ai_text, parsed
 
 
+def _cached_gemini_symptom_analysis(
+    payload: Dict[str, Any], allowed_specialties: List[str]
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """``_gemini_symptom_analysis`` behind the shared response cache.
+
+    Only requests without medical history or medications are cached; those
+    are plain routing questions whose answer doesn't depend on the user.
+    """
+
+    if (payload.get("medical_history") or "").strip() or (payload.get("medications") or "").strip():
+        return _gemini_symptom_analysis(payload, allowed_specialties)
+
+    cache = get_response_cache("symptoms")
+    symptoms = payload.get("symptoms") or ""
+    scope = (
+        age_bucket(payload.get("age")),
+        payload.get("gender"),
+        normalize_text(payload.get("duration") or ""),
+        ",".join(sorted(allowed_specialties)),
+    )
+    hit = cache.get(symptoms, *scope)
+    if hit is not None:
+        return hit[0], hit[1]
+
+    started = time.perf_counter()
+    ai_raw, ai_json = _gemini_symptom_analysis(payload, allowed_specialties)
+    if ai_json is not None:
+        cache.set(symptoms, *scope, value=(ai_raw, ai_json), cost_ms=(time.perf_counter() - started) * 1000)
+    return ai_raw, ai_json
+
+
 @symptoms_bp.route("/analyze", methods=["POST"])
 @jwt_required_custom
 def analyze_symptoms():
@@ -324,90 +386,64 @@ def analyze_symptoms():
         if len(symptoms_text) < 5:
             return jsonify({"error": "Please provide a bit more detail about your symptoms."}), 400
 
-        # Guard: avoid returning medical specialties for clearly non-medical requests.
-        if _is_non_medical_request(symptoms_text):
-            analysis_obj: Dict[str, Any] = {
-                "is_medical": False,
-                "recommended_specialty": None,
-                "urgency_level": "low",
-                "summary": "This message does not describe a medical symptom or health concern.",
-                "reasoning": "The symptom checker is intended for health-related symptoms; this looks like a non-medical request.",
-                "red_flags": [],
-                "next_steps": [
-                    "If you have a health concern, describe your symptoms (e.g., pain, fever, cough) and how long they have been present.",
-                    "For math or other non-medical questions, use an educational resource or ask a tutor.",
-                ],
-                "disclaimer": "This tool provides informational guidance only and is not a medical diagnosis.",
-            }
+        if wants_async(request, data):
+            job_id = submit_job(
+                "symptom_analysis",
+                _run_symptom_analysis,
+                owner=str(user_id),
+                kwargs={"user_id": user_id, "data": data, "symptoms_text": symptoms_text},
+                on_error=_symptom_error,
+            )
+            return jsonify({"job_id": job_id, "status": "queued"}), 202
 
-            ai_raw = json.dumps(analysis_obj, ensure_ascii=False)
-            recommended_specialty = None
-            urgency_level = "low"
+        return jsonify(_run_symptom_analysis(user_id=user_id, data=data, symptoms_text=symptoms_text))
 
-            insert_query = """
-                INSERT INTO symptom_logs (user_id, symptoms, ai_analysis, recommended_specialty, urgency_level, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            log_id = execute_query(
-                insert_query,
-                (
-                    user_id,
-                    symptoms_text,
-                    ai_raw,
-                    recommended_specialty,
-                    urgency_level,
-                    datetime.now(),
-                ),
-                commit=True,
-            )
+    except Exception as e:
+        payload, code = _symptom_error(e)
+        return jsonify(payload), code
 
-            return jsonify(
-                {
-                    "id": log_id,
-                    "recommended_specialty": recommended_specialty,
-                    "urgency_level": urgency_level,
-                    "analysis": analysis_obj,
-                    "raw": ai_raw,
-                }
-            )
 
-        allowed_specialties = _get_allowed_specialties()
-        allowed_for_ai = [s for s in allowed_specialties if (s or "").strip().lower() != "other"]
-        if not allowed_for_ai:
-            allowed_for_ai = list(_SPECIALTY_CANON)
-
-        ai_raw, ai_json = _gemini_symptom_analysis(data, allowed_for_ai)
-
-        # If the model indicates the input isn't medical, do not force a specialty.
-        is_medical = True
-        if isinstance(ai_json, dict) and "is_medical" in ai_json:
-            is_medical = bool(ai_json.get("is_medical"))
-
-        if not is_medical:
-            recommended_specialty = None
-            urgency_level = "low"
-            if isinstance(ai_json, dict):
-                ai_json["recommended_specialty"] = None
-                ai_json["urgency_level"] = urgency_level
-                ai_json["is_medical"] = False
-        else:
-            if isinstance(ai_json, dict):
-                ai_json["is_medical"] = True
-
-        if is_medical:
-            recommended_specialty = _normalize_specialty(
-                (ai_json or {}).get("recommended_specialty") if ai_json else None,
-                allowed_for_ai,
-            )
-            urgency_level = _normalize_urgency(
-                (ai_json or {}).get("urgency_level") if ai_json else None
-            )
+def _symptom_error(exc: Exception) -> Tuple[Dict[str, Any], int]:
+    import requests
+
+    if isinstance(exc, requests.HTTPError):
+        return {"error": "AI service error", "message": str(exc)}, 502
+    return {"error": "Failed to analyze symptoms", "message": str(exc)}, 500
+
+
+def _run_symptom_analysis(
+    *, user_id: int, data: Dict[str, Any], symptoms_text: str, progress=None
+) -> Dict[str, Any]:
+    """Classify, route and log one symptom check.
+
+    Shared by the synchronous endpoint and the background job.
+    """
+
+    # Guard: avoid returning medical specialties for clearly non-medical requests.
+    if _is_non_medical_request(symptoms_text):
+        analysis_obj: Dict[str, Any] = {
+            "is_medical": False,
+            "recommended_specialty": None,
+            "urgency_level": "low",
+            "summary": "This message does not describe a medical symptom or health concern.",
+            "reasoning": "The symptom checker is intended for health-related symptoms; this looks like a non-medical request.",
+            "red_flags": [],
+            "next_steps": [
+                "If you have a health concern, describe your symptoms (e.g., pain, fever, cough) and how long they have been present.",
+                "For math or other non-medical questions, use an educational resource or ask a tutor.",
+            ],
+            "disclaimer": "This tool provides informational guidance only and is not a medical diagnosis.",
+        }
+
+        ai_raw = json.dumps(analysis_obj, ensure_ascii=False)
+        recommended_specialty = None
+        urgency_level = "low"
 
-        # Store raw model output for traceability.
         insert_query = """
             INSERT INTO symptom_logs (user_id, symptoms, ai_analysis, recommended_specialty, urgency_level, created_at)
             VALUES (%s, %s, %s, %s, %s, %s)
         """
+        created_at = datetime.now()
         log_id = execute_query(
             insert_query,
             (
@@ -416,32 +452,92 @@ def analyze_symptoms():
                 ai_raw,
                 recommended_specialty,
                 urgency_level,
-                datetime.now(),
+                created_at,
             ),
             commit=True,
         )
-
-        return jsonify(
-            {
-                "id": log_id,
-                "recommended_specialty": recommended_specialty,
-                "urgency_level": urgency_level,
-                "analysis": ai_json
-                or {
-                    "is_medical": True,
-                    "recommended_specialty": recommended_specialty,
-                    "urgency_level": urgency_level,
-                    "summary": ai_raw,
-                    "disclaimer": "This is informational only and not a medical diagnosis.",
-                },
-                "raw": ai_raw,
-            }
+        symptom_terms.record_check(symptoms_text, created_at)
+
+        return {
+            "id": log_id,
+            "recommended_specialty": recommended_specialty,
+            "urgency_level": urgency_level,
+            "analysis": analysis_obj,
+            "raw": ai_raw,
+        }
+
+    allowed_specialties = _get_allowed_specialties()
+    allowed_for_ai = [s for s in allowed_specialties if (s or "").strip().lower() != "other"]
+    if not allowed_for_ai:
+        allowed_for_ai = list(_SPECIALTY_CANON)
+
+    ai_json = _local_triage(symptoms_text, data, allowed_for_ai)
+    if ai_json is not None:
+        ai_raw = json.dumps(ai_json, ensure_ascii=False)
+    else:
+        if progress:
+            progress(20, "Analyzing symptoms")
+        ai_raw, ai_json = _cached_gemini_symptom_analysis(data, allowed_for_ai)
+
+    # If the model indicates the input isn't medical, do not force a specialty.
+    is_medical = True
+    if isinstance(ai_json, dict) and "is_medical" in ai_json:
+        is_medical = bool(ai_json.get("is_medical"))
+
+    if not is_medical:
+        recommended_specialty = None
+        urgency_level = "low"
+        if isinstance(ai_json, dict):
+            ai_json["recommended_specialty"] = None
+            ai_json["urgency_level"] = urgency_level
+            ai_json["is_medical"] = False
+    else:
+        if isinstance(ai_json, dict):
+            ai_json["is_medical"] = True
+
+    if is_medical:
+        recommended_specialty = _normalize_specialty(
+            (ai_json or {}).get("recommended_specialty") if ai_json else None,
+            allowed_for_ai,
+        )
+        urgency_level = _normalize_urgency(
+            (ai_json or {}).get("urgency_level") if ai_json else None
         )
 
-    except requests.HTTPError as e:
-        return jsonify({"error": "AI service error", "message": str(e)}), 502
-    except Exception as e:
-        return jsonify({"error": "Failed to analyze symptoms", "message": str(e)}), 500
+    # Store raw model output for traceability.
+    insert_query = """
+        INSERT INTO symptom_logs (user_id, symptoms, ai_analysis, recommended_specialty, urgency_level, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    created_at = datetime.now()
+    log_id = execute_query(
+        insert_query,
+        (
+            user_id,
+            symptoms_text,
+            ai_raw,
+            recommended_specialty,
+            urgency_level,
+            created_at,
+        ),
+        commit=True,
+    )
+    symptom_terms.record_check(symptoms_text, created_at)
+
+    return {
+        "id": log_id,
+        "recommended_specialty": recommended_specialty,
+        "urgency_level": urgency_level,
+        "analysis": ai_json
+        or {
+            "is_medical": True,
+            "recommended_specialty": recommended_specialty,
+            "urgency_level": urgency_level,
+            "summary": ai_raw,
+            "disclaimer": "This is informational only and not a medical diagnosis.",
+        },
+        "raw": ai_raw,
+    }
 
 
 @symptoms_bp.route("/history", methods=["GET"])
@@ -502,7 +598,7 @@ def delete_symptom_history_item(log_id: int):
             return jsonify({"error": "Invalid authentication identity"}), 401
 
         existing = execute_query(
-            "SELECT id FROM symptom_logs WHERE id = %s AND user_id = %s",
+            "SELECT id, symptoms, created_at FROM symptom_logs WHERE id = %s AND user_id = %s",
             (log_id, user_id),
             fetch_one=True,
         )
@@ -514,6 +610,7 @@ def delete_symptom_history_item(log_id: int):
             (log_id, user_id),
             commit=True,
         )
+        symptom_terms.record_check(existing.get("symptoms"), existing.get("created_at"), delta=-1)
 
         return jsonify({"ok": True, "deleted_id": log_id})
 
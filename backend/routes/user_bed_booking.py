@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, g, request, jsonify
+from utils.auth_context import requires_role
 from utils.database import get_db_connection
+from utils.bed_availability import beds_changed
 import pymysql
 
 user_bed_booking_bp = Blueprint('user_bed_booking', __name__)
@@ -13,22 +14,6 @@ def clean_value(val):
     return val
 
 
-def get_hospital_id_from_jwt():
-    """Extract hospital ID from JWT identity (handles 'hospital_X' format)"""
-    jwt_identity = get_jwt_identity()
-    if isinstance(jwt_identity, str) and jwt_identity.startswith('hospital_'):
-        return int(jwt_identity.replace('hospital_', ''))
-    return int(jwt_identity)
-
-
-def get_user_id_from_jwt():
-    """Extract user ID from JWT identity (handles 'user_X' format if applicable)"""
-    jwt_identity = get_jwt_identity()
-    if isinstance(jwt_identity, str) and jwt_identity.startswith('user_'):
-        return int(jwt_identity.replace('user_', ''))
-    return int(jwt_identity)
-
-
 # DEBUG endpoint - remove in production
 @user_bed_booking_bp.route('/debug/all-bookings', methods=['GET'])
 def debug_all_bookings():
@@ -72,13 +57,13 @@ def debug_all_bookings():
 
 
 @user_bed_booking_bp.route('/user/bed-bookings', methods=['POST'])
-@jwt_required()
+@requires_role('user')
 def create_bed_booking():
     """Create a new bed booking request from a user"""
     conn = None
     cursor = None
     try:
-        user_id = get_user_id_from_jwt()
+        user_id = g.auth.id
         data = request.get_json()
         
         # Required fields
@@ -188,6 +173,7 @@ def create_bed_booking():
         
         conn.commit()
         booking_id = cursor.lastrowid
+        beds_changed(conn, hospital_id)
         
         return jsonify({
             'message': 'Bed booked successfully! Your reservation is confirmed.',
@@ -208,13 +194,13 @@ def create_bed_booking():
 
 
 @user_bed_booking_bp.route('/user/bed-bookings', methods=['GET'])
-@jwt_required()
+@requires_role('user')
 def get_user_bookings():
     """Get all bed bookings for the current user"""
     conn = None
     cursor = None
     try:
-        user_id = get_user_id_from_jwt()
+        user_id = g.auth.id
         
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -233,23 +219,15 @@ def get_user_bookings():
         
         bookings = cursor.fetchall()
         
-        # Convert dates to strings for JSON serialization
         result = []
         for booking in bookings:
             booking_dict = dict(booking)
             # Map DB column names to frontend expected names
             if booking_dict.get('preferred_date'):
-                booking_dict['admission_date'] = str(booking_dict['preferred_date'])
-                booking_dict['preferred_date'] = str(booking_dict['preferred_date'])
-            if booking_dict.get('expected_discharge_date'):
-                booking_dict['expected_discharge_date'] = str(booking_dict['expected_discharge_date'])
+                booking_dict['admission_date'] = booking_dict['preferred_date']
             if booking_dict.get('admission_reason'):
                 booking_dict['medical_notes'] = booking_dict['admission_reason']
                 booking_dict['medical_condition'] = booking_dict['admission_reason']
-            if booking_dict.get('created_at'):
-                booking_dict['created_at'] = str(booking_dict['created_at'])
-            if booking_dict.get('updated_at'):
-                booking_dict['updated_at'] = str(booking_dict['updated_at'])
             result.append(booking_dict)
         
         return jsonify({'bookings': result}), 200
@@ -266,13 +244,13 @@ def get_user_bookings():
 
 
 @user_bed_booking_bp.route('/user/bed-bookings/<int:booking_id>', methods=['DELETE'])
-@jwt_required()
+@requires_role('user')
 def cancel_booking(booking_id):
     """Cancel a bed booking"""
     conn = None
     cursor = None
     try:
-        user_id = get_user_id_from_jwt()
+        user_id = g.auth.id
         
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -324,6 +302,7 @@ def cancel_booking(booking_id):
             """, (hospital_id, ward_type, ac_type))
         
         conn.commit()
+        beds_changed(conn, hospital_id)
         
         return jsonify({'message': 'Booking cancelled successfully'}), 200
         
@@ -343,13 +322,13 @@ def cancel_booking(booking_id):
 # ============================================================================
 
 @user_bed_booking_bp.route('/hospital/bed-bookings', methods=['GET'])
-@jwt_required()
+@requires_role('hospital')
 def get_hospital_bookings():
     """Get all bed bookings for the hospital (hospital admin view)"""
     conn = None
     cursor = None
     try:
-        hospital_id = get_hospital_id_from_jwt()
+        hospital_id = g.auth.id
         status_filter = request.args.get('status')
         ward_filter = request.args.get('ward_type')
         
@@ -381,23 +360,15 @@ def get_hospital_bookings():
         cursor.execute(query, params)
         bookings = cursor.fetchall()
         
-        # Convert dates to strings
         result = []
         for booking in bookings:
             booking_dict = dict(booking)
             # Map DB column names to frontend expected names
             if booking_dict.get('preferred_date'):
-                booking_dict['admission_date'] = str(booking_dict['preferred_date'])
-                booking_dict['preferred_date'] = str(booking_dict['preferred_date'])
-            if booking_dict.get('expected_discharge_date'):
-                booking_dict['expected_discharge_date'] = str(booking_dict['expected_discharge_date'])
+                booking_dict['admission_date'] = booking_dict['preferred_date']
             if booking_dict.get('admission_reason'):
                 booking_dict['medical_notes'] = booking_dict['admission_reason']
                 booking_dict['medical_condition'] = booking_dict['admission_reason']
-            if booking_dict.get('created_at'):
-                booking_dict['created_at'] = str(booking_dict['created_at'])
-            if booking_dict.get('updated_at'):
-                booking_dict['updated_at'] = str(booking_dict['updated_at'])
             result.append(booking_dict)
         
         return jsonify({'bookings': result}), 200
@@ -414,13 +385,13 @@ def get_hospital_bookings():
 
 
 @user_bed_booking_bp.route('/hospital/bed-bookings/by-ward', methods=['GET'])
-@jwt_required()
+@requires_role('hospital')
 def get_bookings_by_ward():
     """Get bookings grouped by ward type for the hospital bed management view"""
     conn = None
     cursor = None
     try:
-        hospital_id = get_hospital_id_from_jwt()
+        hospital_id = g.auth.id
         print(f"[DEBUG] Fetching bookings for hospital_id: {hospital_id}")
         
         conn = get_db_connection()
@@ -472,7 +443,7 @@ def get_bookings_by_ward():
                 'patient_phone': booking['patient_phone'],
                 'patient_email': booking['patient_email'],
                 'emergency_contact': booking['emergency_contact'],
-                'admission_date': str(booking['preferred_date']) if booking['preferred_date'] else None,
+                'admission_date': booking['preferred_date'],
                 'admission_reason': booking['admission_reason'] or 'Not specified',
                 'ward_type': booking['ward_type'],
                 'ac_type': booking['ac_type'],
@@ -484,8 +455,8 @@ def get_bookings_by_ward():
                     'email': booking['user_email'],
                     'phone': booking['user_phone']
                 },
-                'created_at': str(booking['created_at']) if booking['created_at'] else None,
-                'updated_at': str(booking['updated_at']) if booking['updated_at'] else None
+                'created_at': booking['created_at'],
+                'updated_at': booking['updated_at']
             }
             
             grouped[ward_key].append(booking_dict)
@@ -504,13 +475,13 @@ def get_bookings_by_ward():
 
 
 @user_bed_booking_bp.route('/hospital/bed-bookings/<int:booking_id>/status', methods=['PUT'])
-@jwt_required()
+@requires_role('hospital')
 def update_booking_status(booking_id):
     """Update booking status (confirm, reject, complete)"""
     conn = None
     cursor = None
     try:
-        hospital_id = get_hospital_id_from_jwt()
+        hospital_id = g.auth.id
         data = request.get_json()
         new_status = data.get('status')
         notes = data.get('notes')
@@ -578,6 +549,7 @@ def update_booking_status(booking_id):
                 """, (hospital_id, ward_type, ac_type))
         
         conn.commit()
+        beds_changed(conn, hospital_id)
         
         return jsonify({
             'message': f'Booking status updated to {new_status}',
@@ -1,3 +1,4 @@
+import sys
 from datetime import date, datetime
 
 from flask import Blueprint, jsonify, request
@@ -5,6 +6,9 @@ from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from utils.database import execute_query
 from utils.gemini_utils import generate_weight_recommendations
+from utils.job_queue import submit_job, wants_async
+from utils.weight_analytics import DEFAULT_POINTS, DEFAULT_WINDOW_DAYS, compute_analytics
+from utils import weight_recommendations
 
 weight_management_bp = Blueprint("weight_management", __name__)
 
@@ -78,6 +82,66 @@ def list_weight_entries():
         return jsonify({"error": f"Failed to fetch weight entries: {str(e)}"}), 500
 
 
+def _int_arg(name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        return max(lo, min(int(request.args.get(name, default)), hi))
+    except (TypeError, ValueError):
+        return default
+
+
+@weight_management_bp.route("/weight/analytics", methods=["GET"])
+@jwt_required()
+def get_weight_analytics():
+    """Trend analytics over the user's weight history, downsampled for charts.
+
+    Query: points (chart points, default 300), window (moving-average days,
+    default 7), days (only the last N days; omit for full history).
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        points = _int_arg("points", DEFAULT_POINTS, 3, 2000)
+        window = _int_arg("window", DEFAULT_WINDOW_DAYS, 1, 90)
+        days = request.args.get("days")
+
+        params = [user_id]
+        date_filter = ""
+        if days:
+            try:
+                days_i = max(1, min(int(days), 3650))
+            except (TypeError, ValueError):
+                return jsonify({"error": "days must be an integer"}), 400
+            date_filter = "AND entry_date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)"
+            params.append(days_i)
+
+        rows = execute_query(
+            f"""
+            SELECT entry_date, weight_kg
+            FROM weight_entries
+            WHERE user_id = %s {date_filter}
+            ORDER BY entry_date ASC, id ASC
+            """,
+            tuple(params),
+            fetch_all=True,
+        )
+        goal = execute_query(
+            """
+            SELECT target_weight_kg, target_date
+            FROM weight_goals
+            WHERE user_id = %s AND is_active = TRUE
+            ORDER BY id DESC
+            LIMIT 1
+            """,
+            (user_id,),
+            fetch_one=True,
+        )
+
+        entries = [(r["entry_date"], float(r["weight_kg"])) for r in rows or []]
+        analytics = compute_analytics(entries, goal=goal, window_days=window, points=points)
+        return jsonify(analytics), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to compute weight analytics: {str(e)}"}), 500
+
+
 @weight_management_bp.route("/weight/entries/<int:entry_id>", methods=["PUT"])
 @jwt_required()
 def update_weight_entry(entry_id: int):
@@ -333,65 +397,118 @@ def set_weight_goal():
 @weight_management_bp.route("/weight/suggestions", methods=["POST"])
 @jwt_required()
 def get_weight_suggestions():
-    """Return AI-generated diet/exercise suggestions based on latest entry + goal."""
+    """Return AI-generated diet/exercise suggestions based on latest entry + goal.
+
+    Served from the stored recommendation while its inputs are unchanged; when
+    they changed, the previous one is returned with ``stale: true`` and a
+    background refresh is started. ``{"refresh": true}`` forces regeneration.
+    """
     try:
         user_id = int(get_jwt_identity())
+        body = request.get_json(silent=True) or {}
 
-        latest = execute_query(
-            """
-            SELECT entry_date, weight_kg, height_cm, age_years, bmi
-            FROM weight_entries
-            WHERE user_id = %s
-            ORDER BY entry_date DESC, id DESC
-            LIMIT 1
-            """,
-            (user_id,),
-            fetch_one=True,
-        )
-        if not latest:
+        params = weight_recommendations.suggestion_params(user_id)
+        if not params:
             return jsonify({"error": "No weight entries yet. Add an entry first."}), 400
 
-        goal = execute_query(
-            """
-            SELECT target_weight_kg, target_date
-            FROM weight_goals
-            WHERE user_id = %s AND is_active = TRUE
-            ORDER BY id DESC
-            LIMIT 1
-            """,
-            (user_id,),
-            fetch_one=True,
-        )
+        fp = weight_recommendations.fingerprint(params)
+        stored = None if body.get("refresh") else _load_stored(user_id)
+
+        if stored and stored["fingerprint"] == fp:
+            return jsonify(_stored_response(stored, stale=False)), 200
+
+        if stored:
+            response = _stored_response(stored, stale=True)
+            if _claim_refresh(user_id, fp):
+                response["job_id"] = submit_job(
+                    "weight_suggestions",
+                    _build_weight_suggestions,
+                    owner=str(user_id),
+                    kwargs={"params": params, "user_id": user_id, "fingerprint": fp},
+                    on_error=_suggestions_error,
+                )
+            return jsonify(response), 200
 
-        result = generate_weight_recommendations(
-            weight_kg=float(latest["weight_kg"]),
-            height_cm=float(latest["height_cm"]),
-            age_years=int(latest["age_years"]) if latest.get("age_years") is not None else None,
-            bmi=float(latest["bmi"]),
-            goal_target_weight_kg=float(goal["target_weight_kg"]) if goal and goal.get("target_weight_kg") is not None else None,
-            goal_target_date=goal.get("target_date").isoformat() if goal and goal.get("target_date") else None,
-        )
+        if wants_async(request, body):
+            job_id = submit_job(
+                "weight_suggestions",
+                _build_weight_suggestions,
+                owner=str(user_id),
+                kwargs={"params": params, "user_id": user_id, "fingerprint": fp},
+                on_error=_suggestions_error,
+            )
+            return jsonify({"job_id": job_id, "status": "queued"}), 202
 
-        return jsonify({"recommendations": result.get("payload")}), 200
+        return jsonify(_build_weight_suggestions(params=params, user_id=user_id, fingerprint=fp)), 200
 
-    except RuntimeError as e:
-        # e.g. GEMINI_API_KEY not set
-        return jsonify({"error": f"AI suggestions unavailable: {str(e)}"}), 503
     except Exception as e:
-        # Try to detect common Gemini permission errors (revoked/leaked key)
+        payload, code = _suggestions_error(e)
+        return jsonify(payload), code
+
+
+def _load_stored(user_id: int):
+    try:
+        return weight_recommendations.load(user_id)
+    except Exception:
+        # Table missing or DB hiccup: behave as if nothing was stored.
+        return None
+
+
+def _claim_refresh(user_id: int, fp: str) -> bool:
+    try:
+        return weight_recommendations.claim_refresh(user_id, fp)
+    except Exception:
+        return False
+
+
+def _stored_response(stored, *, stale: bool):
+    generated_at = stored.get("generated_at")
+    return {
+        "recommendations": stored["payload"],
+        "cached": True,
+        "stale": stale,
+        "generated_at": generated_at.isoformat() if generated_at else None,
+    }
+
+
+def _build_weight_suggestions(*, params, user_id=None, fingerprint=None, progress=None):
+    if progress:
+        progress(20, "Generating suggestions")
+    try:
+        result = generate_weight_recommendations(**params)
+    except Exception:
+        if user_id is not None and fingerprint:
+            try:
+                weight_recommendations.release_refresh(user_id, fingerprint)
+            except Exception:
+                pass
+        raise
+    payload = result.get("payload")
+    if user_id is not None and fingerprint:
         try:
-            from google.api_core.exceptions import PermissionDenied
-
-            if isinstance(e, PermissionDenied):
-                return (
-                    jsonify(
-                        {
-                            "error": "AI suggestions unavailable: Gemini permission denied. Your API key may be invalid or revoked (often due to being reported as leaked). Create a new key in Google AI Studio, set GEMINI_API_KEY in backend/.env, and restart the backend."
-                        }
-                    ),
-                    503,
-                )
-        except Exception:
-            pass
+            weight_recommendations.save(user_id, fingerprint, payload)
+        except Exception as e:
+            print(f"Failed to store weight recommendations: {str(e)}", file=sys.stderr)
+    return {"recommendations": payload, "cached": False, "stale": False}
+
 
-        return jsonify({"error": f"Failed to generate suggestions: {str(e)}"}), 500
+def _suggestions_error(e: Exception):
+    if isinstance(e, RuntimeError):
+        # e.g. GEMINI_API_KEY not set
+        return {"error": f"AI suggestions unavailable: {str(e)}"}, 503
+
+    # Try to detect common Gemini permission errors (revoked/leaked key)
+    try:
+        from google.api_core.exceptions import PermissionDenied
+
+        if isinstance(e, PermissionDenied):
+            return (
+                {
+                    "error": "AI suggestions unavailable: Gemini permission denied. Your API key may be invalid or revoked (often due to being reported as leaked). Create a new key in Google AI Studio, set GEMINI_API_KEY in backend/.env, and restart the backend."
+                },
+                503,
+            )
+    except Exception:
+        pass
+
+    return {"error": f"Failed to generate suggestions: {str(e)}"}, 500
@@ -0,0 +1,78 @@
+"""Fill ``lab_results`` for reports saved before lab values were extracted.
+
+New reports are indexed when they are saved; run this once after
+deploying the table:
+
+    cd /path/to/backend && python scripts/backfill_lab_results.py
+    cd /path/to/backend && python scripts/backfill_lab_results.py --llm   # also ask Gemini about leftovers
+
+Reports that already have lab rows are skipped, so it is safe to re-run.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from utils.database import get_db_connection  # noqa: E402
+from utils.lab_results import (  # noqa: E402
+    extract_lab_values,
+    extract_report_values,
+    find_report_date,
+    save_results,
+)
+
+
+def _iter_reports(conn, chunk_size: int):
+    last_id = 0
+    while True:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT r.id, r.user_id, r.ocr_text, r.report_type, r.uploaded_at
+                FROM medical_reports r
+                WHERE r.id > %s
+                  AND NOT EXISTS (SELECT 1 FROM lab_results l WHERE l.report_id = r.id)
+                ORDER BY r.id
+                LIMIT %s
+                """,
+                (last_id, chunk_size),
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1]["id"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Extract lab values from saved reports")
+    parser.add_argument("--chunk-size", type=int, default=500, help="medical_reports rows read per query")
+    parser.add_argument("--llm", action="store_true", help="Send unrecognised lab lines to Gemini (costs API calls)")
+    parser.add_argument("--model", default="gemini-3-flash-preview")
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    reports = values = 0
+    try:
+        for row in _iter_reports(conn, args.chunk_size):
+            reports += 1
+            text = row.get("ocr_text") or ""
+            if row.get("report_type") == "prescription":
+                continue
+            if args.llm:
+                found = extract_report_values(text, model=args.model)
+            else:
+                found, _ = extract_lab_values(text)
+            values += save_results(row["user_id"], row["id"], found, find_report_date(text) or row.get("uploaded_at"))
+    finally:
+        conn.close()
+    print(f"extracted {values} lab values from {reports} reports")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+"""Rebuild ``symptom_term_daily`` from ``symptom_logs``.
+
+New symptom checks keep the table current on their own; run this once
+after deploying the term index, or after deleting logs in bulk (e.g. users
+removed with ON DELETE CASCADE):
+
+    cd /path/to/backend && python scripts/backfill_symptom_terms.py --days 365
+
+Checks logged while it runs may be counted twice; run it at a quiet time.
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from utils.database import get_db_connection  # noqa: E402
+from utils.symptom_terms import rebuild  # noqa: E402
+
+
+def _iter_logs(conn, start, chunk_size: int):
+    last_id = 0
+    while True:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, symptoms, created_at
+                FROM symptom_logs
+                WHERE id > %s AND created_at >= %s
+                ORDER BY id
+                LIMIT %s
+                """,
+                (last_id, start, chunk_size),
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1]["id"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild per-day symptom term counts")
+    parser.add_argument("--days", type=int, default=365, help="Rebuild this many days back (including today)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="symptom_logs rows read per query")
+    args = parser.parse_args()
+
+    start = (datetime.now() - timedelta(days=max(1, args.days) - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    read_conn = get_db_connection()
+    write_conn = get_db_connection()
+    try:
+        with write_conn.cursor() as cursor:
+            cursor.execute("DELETE FROM symptom_term_daily WHERE day >= %s", (start.date(),))
+        write_conn.commit()
+        seen = rebuild(_iter_logs(read_conn, start, args.chunk_size), write_conn)
+        print(f"rebuilt symptom terms from {seen} checks since {start.date()}")
+    finally:
+        read_conn.close()
+        write_conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
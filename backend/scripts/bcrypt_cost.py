@@ -0,0 +1,54 @@
+"""Pick BCRYPT_ROUNDS for a target hash latency on this machine.
+
+Times bcrypt at each cost factor (median of ``--samples`` runs) and
+recommends the highest cost whose median stays within ``--target-ms``.
+Run it on the deployment hardware, not a laptop:
+
+    cd /path/to/backend && python scripts/bcrypt_cost.py --target-ms 250
+
+Existing hashes are upgraded to the new cost as users log in.
+"""
+
+import argparse
+import statistics
+import time
+
+import bcrypt
+
+
+def _median_ms(rounds: int, samples: int) -> float:
+    password = b"benchmark-password-123"
+    timings = []
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+        timings.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt cost factors")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Acceptable hash time per login")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    best = None
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        ms = _median_ms(rounds, max(1, args.samples))
+        fits = ms <= args.target_ms
+        print(f"rounds={rounds:2d}  median={ms:8.1f} ms  {'ok' if fits else 'too slow'}")
+        if not fits:
+            break  # each step doubles the work
+        best = rounds
+
+    if best is None:
+        print(f"No cost >= {args.min_rounds} fits {args.target_ms:.0f} ms; keep BCRYPT_ROUNDS={args.min_rounds} at least.")
+        return 1
+    print(f"\nRecommended: BCRYPT_ROUNDS={best}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
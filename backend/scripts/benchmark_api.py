@@ -0,0 +1,605 @@
+"""Load-test / benchmark harness for the PocketCare API.
+
+Boots ``create_app`` in-process against the MySQL/MariaDB database configured
+in ``backend/.env``, optionally seeds synthetic rows, and drives the hot read
+endpoints at a configurable concurrency. Gemini and Tesseract are replaced by
+stubs (with an optional artificial latency) so the numbers reflect Flask and
+MySQL only.
+
+A SQLite stand-in is not supported: the routes rely on MySQL-only SQL
+(DATE_SUB, TIMESTAMPDIFF, JSON columns, INFORMATION_SCHEMA lookups).
+
+Synthetic rows are tagged with the ``@bench.pocketcare.local`` email domain
+and removed with ``--cleanup`` (dependent rows go via ON DELETE CASCADE).
+
+Examples:
+    python scripts/benchmark_api.py --seed --rows 100000
+    python scripts/benchmark_api.py --concurrency 16 --requests 500 --output bench.json
+    python scripts/benchmark_api.py --baseline bench.json --max-regression 0.15
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+BENCH_DOMAIN = "bench.pocketcare.local"
+# Placeholder only: synthetic accounts never log in, tokens are minted directly.
+BENCH_PASSWORD_HASH = "!benchmark-no-login"
+
+CENTER_LAT = 23.8103
+CENTER_LNG = 90.4125
+
+SPECIALTIES = [
+    "Cardiology",
+    "Dermatology",
+    "ENT",
+    "Gastroenterology",
+    "General Medicine",
+    "Neurology",
+    "Orthopedics",
+    "Pediatrics",
+    "Psychiatry",
+    "Pulmonology",
+]
+
+EMERGENCY_TYPES = ["chest-pain", "breathing", "bleeding", "unconscious", "seizure", "other"]
+
+# name -> (method, role, path template, json body)
+ENDPOINTS = {
+    "doctor_search": ("GET", "user", "/api/doctors?specialty=Cardiology", None),
+    "hospitals_nearby": (
+        "GET",
+        "user",
+        "/api/hospitals/nearby?latitude={lat}&longitude={lng}&radius=25",
+        None,
+    ),
+    "sos_polling": ("GET", "hospital", "/api/hospital/emergency/requests", None),
+    "sos_latest": ("GET", "user", "/api/emergency/sos/latest", None),
+    "chat_history": ("GET", "user", "/api/chat/history", None),
+    "hospital_dashboard": ("GET", "hospital", "/api/hospital-dashboard/all?hospital_id={hospital_id}", None),
+    "hospital_appointments": ("GET", "hospital", "/api/hospital-appointments?hospital_id={hospital_id}", None),
+    # Write paths that hit the (stubbed) AI providers; opt-in via --endpoints.
+    "symptoms_analyze": (
+        "POST",
+        "user",
+        "/api/symptoms/analyze",
+        {"symptoms": "chest pain and shortness of breath since morning", "age": 45, "gender": "male"},
+    ),
+    "chat_send": ("POST", "user", "/api/chat/send", {"message": "How much water should I drink daily?"}),
+}
+
+DEFAULT_ENDPOINTS = [
+    "doctor_search",
+    "hospitals_nearby",
+    "sos_polling",
+    "sos_latest",
+    "chat_history",
+    "hospital_dashboard",
+    "hospital_appointments",
+]
+
+
+# ---------------------------------------------------------------------------
+# Stubs
+# ---------------------------------------------------------------------------
+
+
+def _install_stubs(ai_latency_ms: float) -> None:
+    """Replace Gemini / Tesseract calls with deterministic stubs."""
+
+    delay = max(0.0, ai_latency_ms) / 1000.0
+
+    def _sleep():
+        if delay:
+            time.sleep(delay)
+
+    import routes.reports as report_routes
+    import routes.symptoms as symptom_routes
+    import utils.gemini_utils as gemini_utils
+
+    def fake_simplify(text, *, model="gemini-2.5-flash"):
+        _sleep()
+        return "Summary:\n- Benchmark stub summary."
+
+    def fake_explain(file_bytes, *, mime_type, model="gemini-2.5-flash"):
+        _sleep()
+        return "Summary:\n- Benchmark stub explanation."
+
+    def fake_ocr(*, ext, data):
+        _sleep()
+        return "HEMOGLOBIN 13.5 g/dL", 92.0
+
+    def fake_symptoms(payload, allowed):
+        _sleep()
+        parsed = {
+            "is_medical": True,
+            "urgency": "medium",
+            "recommended_specialty": "Cardiology",
+            "summary": "Benchmark stub analysis.",
+        }
+        return json.dumps(parsed), parsed
+
+    class _FakeResponse:
+        status_code = 200
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return {"candidates": [{"content": {"parts": [{"text": "- Benchmark stub reply."}]}}]}
+
+    def fake_post(*args, **kwargs):
+        _sleep()
+        return _FakeResponse()
+
+    gemini_utils.simplify_ocr_text = fake_simplify
+    gemini_utils.explain_bytes_with_gemini = fake_explain
+    report_routes.simplify_ocr_text = fake_simplify
+    report_routes.explain_bytes_with_gemini = fake_explain
+    report_routes._ocr_bytes = fake_ocr
+    symptom_routes.GEMINI_API_KEY = symptom_routes.GEMINI_API_KEY or "benchmark-stub"
+    symptom_routes._gemini_symptom_analysis = fake_symptoms
+    # routes.chat imports requests inside the view; patch the module itself.
+    import requests
+
+    requests.post = fake_post
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _insert_many(conn, sql, rows, batch_size):
+    with conn.cursor() as cursor:
+        for chunk in _chunks(rows, batch_size):
+            cursor.executemany(sql, chunk)
+            conn.commit()
+
+
+def _fetch_ids(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id FROM {table} WHERE email LIKE %s ORDER BY id ASC",
+            (f"%@{BENCH_DOMAIN}",),
+        )
+        return [int(r["id"]) for r in cursor.fetchall() or []]
+
+
+def _random_point(rng, spread_deg=0.5):
+    return (
+        round(CENTER_LAT + rng.uniform(-spread_deg, spread_deg), 8),
+        round(CENTER_LNG + rng.uniform(-spread_deg, spread_deg), 8),
+    )
+
+
+def _pick(rng, ids, hot_id, hot_share):
+    if rng.random() < hot_share:
+        return hot_id
+    return rng.choice(ids)
+
+
+def seed(conn, *, rows, batch_size, hot_share, rng):
+    """Insert ``rows`` synthetic hospitals, doctors, appointments, SOS and chat rows.
+
+    Users are created at a tenth of that (minimum 100). The first user and
+    hospital receive ``hot_share`` of the per-owner rows so the per-user /
+    per-hospital endpoints scan a realistic slice.
+    """
+
+    started = time.perf_counter()
+    n_users = max(100, rows // 10)
+    print(f"Seeding {n_users} users and {rows} rows per table...")
+
+    _insert_many(
+        conn,
+        "INSERT INTO users (email, password_hash, name, phone, gender, blood_group) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        [
+            (
+                f"user{i}@{BENCH_DOMAIN}",
+                BENCH_PASSWORD_HASH,
+                f"Bench User {i}",
+                f"017{i:08d}"[-11:],
+                rng.choice(["male", "female", "other"]),
+                rng.choice(["A+", "B+", "O+", "AB+", "O-"]),
+            )
+            for i in range(n_users)
+        ],
+        batch_size,
+    )
+    user_ids = _fetch_ids(conn, "users")
+
+    hospital_rows = []
+    for i in range(rows):
+        lat, lng = _random_point(rng)
+        total = rng.randint(50, 500)
+        hospital_rows.append(
+            (
+                f"Bench Hospital {i}",
+                f"{i} Bench Road",
+                "Dhaka",
+                "Dhaka",
+                lat,
+                lng,
+                f"hospital{i}@{BENCH_DOMAIN}",
+                BENCH_PASSWORD_HASH,
+                total,
+                rng.randint(0, total),
+                rng.randint(0, 20),
+                round(rng.uniform(2.5, 5.0), 1),
+            )
+        )
+    _insert_many(
+        conn,
+        "INSERT INTO hospitals (name, address, city, state, latitude, longitude, email, password_hash, "
+        "total_beds, available_beds, icu_beds, rating) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+        hospital_rows,
+        batch_size,
+    )
+    hospital_ids = _fetch_ids(conn, "hospitals")
+
+    _insert_many(
+        conn,
+        "INSERT INTO doctors (name, email, password_hash, specialty, specialties, qualification, experience, "
+        "rating, hospital_id, consultation_fee, is_available) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+        [
+            (
+                f"Dr. Bench {i}",
+                f"doctor{i}@{BENCH_DOMAIN}",
+                BENCH_PASSWORD_HASH,
+                spec,
+                json.dumps([spec]),
+                "MBBS",
+                rng.randint(1, 30),
+                round(rng.uniform(3.0, 5.0), 1),
+                rng.choice(hospital_ids),
+                rng.choice([500, 800, 1000, 1500]),
+                rng.random() < 0.9,
+            )
+            for i, spec in ((i, rng.choice(SPECIALTIES)) for i in range(rows))
+        ],
+        batch_size,
+    )
+    doctor_ids = _fetch_ids(conn, "doctors")
+
+    hot_user = user_ids[0]
+    hot_hospital = hospital_ids[0]
+    today = date.today()
+    statuses = ["pending", "confirmed", "completed", "cancelled"]
+
+    def _day():
+        return today + timedelta(days=rng.randint(-60, 30))
+
+    def _slot():
+        return f"{rng.randint(8, 19):02d}:{rng.choice(['00', '30'])}:00"
+
+    _insert_many(
+        conn,
+        "INSERT INTO appointments (user_id, doctor_id, appointment_date, appointment_time, symptoms, status) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        [
+            (_pick(rng, user_ids, hot_user, hot_share), rng.choice(doctor_ids), _day(), _slot(), "fever", rng.choice(statuses))
+            for _ in range(rows)
+        ],
+        batch_size,
+    )
+
+    _insert_many(
+        conn,
+        "INSERT INTO hospital_appointments (hospital_id, patient_name, patient_phone, appointment_date, "
+        "appointment_time, department, priority, status) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+        [
+            (
+                _pick(rng, hospital_ids, hot_hospital, hot_share),
+                f"Bench Patient {i}",
+                "01700000000",
+                _day(),
+                _slot(),
+                rng.choice(SPECIALTIES),
+                rng.choice(["low", "normal", "high", "urgent"]),
+                rng.choice(statuses),
+            )
+            for i in range(rows)
+        ],
+        batch_size,
+    )
+
+    now = datetime.now()
+    sos_rows = []
+    for _ in range(rows):
+        lat, lng = _random_point(rng, spread_deg=0.2)
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        # Mostly historical, resolved requests with a thin tail of live ones.
+        status = "pending" if rng.random() < 0.02 else rng.choice(["acknowledged", "resolved", "resolved"])
+        sos_rows.append(
+            (
+                _pick(rng, user_ids, hot_user, hot_share),
+                lat,
+                lng,
+                rng.choice(EMERGENCY_TYPES),
+                status,
+                None if status == "pending" else _pick(rng, hospital_ids, hot_hospital, hot_share),
+                created,
+            )
+        )
+    _insert_many(
+        conn,
+        "INSERT INTO emergency_requests (user_id, latitude, longitude, emergency_type, status, hospital_id, created_at) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        sos_rows,
+        batch_size,
+    )
+
+    _insert_many(
+        conn,
+        "INSERT INTO chat_messages (user_id, sender, message, created_at) VALUES (%s, %s, %s, %s)",
+        [
+            (
+                _pick(rng, user_ids, hot_user, hot_share),
+                "user" if i % 2 == 0 else "ai",
+                "How can I lower my blood pressure?" if i % 2 == 0 else "- Reduce salt\n- Exercise regularly",
+                now - timedelta(seconds=rows - i),
+            )
+            for i in range(rows)
+        ],
+        batch_size,
+    )
+
+    print(f"Seeding finished in {time.perf_counter() - started:.1f}s")
+
+
+def cleanup(conn):
+    with conn.cursor() as cursor:
+        for table in ("doctors", "hospitals", "users"):
+            cursor.execute(f"DELETE FROM {table} WHERE email LIKE %s", (f"%@{BENCH_DOMAIN}",))
+            print(f"Deleted {cursor.rowcount} synthetic rows from {table}")
+    conn.commit()
+
+
+def _targets(conn):
+    """Return (user_id, hospital_id, lat, lng) of the hot benchmark owners."""
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT id FROM users WHERE email LIKE %s ORDER BY id ASC LIMIT 1",
+            (f"%@{BENCH_DOMAIN}",),
+        )
+        user = cursor.fetchone()
+        cursor.execute(
+            "SELECT id, latitude, longitude FROM hospitals WHERE email LIKE %s ORDER BY id ASC LIMIT 1",
+            (f"%@{BENCH_DOMAIN}",),
+        )
+        hospital = cursor.fetchone()
+    if not user or not hospital:
+        return None
+    return int(user["id"]), int(hospital["id"]), float(hospital["latitude"]), float(hospital["longitude"])
+
+
+# ---------------------------------------------------------------------------
+# Load driver
+# ---------------------------------------------------------------------------
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 < pct <= 100)."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_endpoint(app, *, method, path, body, headers, total, concurrency, warmup):
+    local = threading.local()
+
+    def _client():
+        c = getattr(local, "client", None)
+        if c is None:
+            c = app.test_client()
+            local.client = c
+        return c
+
+    def _one(_):
+        client = _client()
+        t0 = time.perf_counter()
+        resp = client.open(path, method=method, headers=headers, json=body)
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        status = resp.status_code
+        resp.close()
+        return elapsed, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_one, range(warmup)))
+
+        started = time.perf_counter()
+        results = list(pool.map(_one, range(total)))
+        wall = time.perf_counter() - started
+
+    latencies = [r[0] for r in results]
+    errors = sum(1 for r in results if r[1] >= 400)
+    return {
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "rps": round(total / wall, 2) if wall > 0 else 0.0,
+    }
+
+
+def compare(current, baseline, max_regression):
+    """Return a list of human readable regressions versus ``baseline``.
+
+    A metric regresses when p95/p99 grows, or req/s drops, by more than
+    ``max_regression`` (a fraction, e.g. 0.15 for 15%).
+    """
+
+    problems = []
+    base_eps = (baseline or {}).get("endpoints") or {}
+    for name, cur in (current.get("endpoints") or {}).items():
+        base = base_eps.get(name)
+        if not base:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            old, new = float(base.get(key) or 0), float(cur.get(key) or 0)
+            if old > 0 and new > old * (1 + max_regression):
+                problems.append(f"{name}: {key} {old:.2f} -> {new:.2f} (+{(new / old - 1) * 100:.1f}%)")
+        old, new = float(base.get("rps") or 0), float(cur.get("rps") or 0)
+        if old > 0 and new < old * (1 - max_regression):
+            problems.append(f"{name}: rps {old:.2f} -> {new:.2f} ({(new / old - 1) * 100:.1f}%)")
+        if int(cur.get("errors") or 0) > int(base.get("errors") or 0):
+            problems.append(f"{name}: errors {base.get('errors')} -> {cur.get('errors')}")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PocketCare API hot endpoints")
+    parser.add_argument("--seed", action="store_true", help="Insert synthetic rows before benchmarking")
+    parser.add_argument("--cleanup", action="store_true", help="Delete synthetic rows and exit")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per table when seeding (10^3 .. 10^6)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="executemany batch size when seeding")
+    parser.add_argument("--hot-share", type=float, default=0.01, help="Share of per-owner rows given to the benchmark user/hospital")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--endpoints", default=",".join(DEFAULT_ENDPOINTS), help=f"Comma separated subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint")
+    parser.add_argument("--ai-latency-ms", type=float, default=0.0, help="Artificial latency for stubbed Gemini/Tesseract calls")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Allowed relative slowdown before failing")
+    parser.add_argument("--verbose", action="store_true", help="Keep route debug output on stderr")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    backend_env = BACKEND_DIR / ".env"
+    if backend_env.exists():
+        load_dotenv(backend_env)
+    else:
+        load_dotenv()
+
+    from utils.database import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        if args.cleanup:
+            cleanup(conn)
+            return 0
+        if args.seed:
+            seed(
+                conn,
+                rows=args.rows,
+                batch_size=args.batch_size,
+                hot_share=args.hot_share,
+                rng=random.Random(args.random_seed),
+            )
+        targets = _targets(conn)
+    finally:
+        conn.close()
+
+    if not targets:
+        print("No synthetic data found; run with --seed first.")
+        return 2
+    user_id, hospital_id, lat, lng = targets
+
+    names = [n.strip() for n in args.endpoints.split(",") if n.strip()]
+    unknown = [n for n in names if n not in ENDPOINTS]
+    if unknown:
+        print(f"Unknown endpoints: {', '.join(unknown)}")
+        return 2
+
+    _install_stubs(args.ai_latency_ms)
+
+    from flask_jwt_extended import create_access_token
+
+    from app import create_app
+
+    app = create_app(os.getenv("FLASK_ENV", "development"))
+    with app.app_context():
+        tokens = {
+            "user": create_access_token(identity=str(user_id)),
+            "hospital": create_access_token(identity=f"hospital_{hospital_id}"),
+        }
+
+    results = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "ai_latency_ms": args.ai_latency_ms,
+        },
+        "endpoints": {},
+    }
+
+    real_stderr = sys.stderr
+    if not args.verbose:
+        sys.stderr = open(os.devnull, "w")
+    try:
+        for name in names:
+            method, role, template, body = ENDPOINTS[name]
+            path = template.format(hospital_id=hospital_id, lat=lat, lng=lng)
+            stats = run_endpoint(
+                app,
+                method=method,
+                path=path,
+                body=body,
+                headers={"Authorization": f"Bearer {tokens[role]}"},
+                total=args.requests,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+            )
+            results["endpoints"][name] = stats
+            print(
+                f"{name:<24} p50={stats['p50_ms']:>8.2f}ms p95={stats['p95_ms']:>8.2f}ms "
+                f"p99={stats['p99_ms']:>8.2f}ms rps={stats['rps']:>8.1f} errors={stats['errors']}",
+                file=real_stderr,
+            )
+    finally:
+        if sys.stderr is not real_stderr:
+            sys.stderr.close()
+            sys.stderr = real_stderr
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        problems = compare(results, baseline, args.max_regression)
+        if problems:
+            print("Regressions versus baseline:")
+            for p in problems:
+                print(f"  - {p}")
+            return 1
+        print("No regressions versus baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
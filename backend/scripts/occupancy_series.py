@@ -0,0 +1,49 @@
+"""Periodic job for the bed occupancy time-series.
+
+Samples current occupancy for every hospital into 5-minute buckets, rolls
+5-minute buckets up into hourly and daily ones, and applies retention
+(OCCUPANCY_RETENTION_*_DAYS). Run it every 5 minutes, e.g. from cron:
+
+    */5 * * * * cd /path/to/backend && python scripts/occupancy_series.py
+
+Use ``--lookback-hours`` / ``--lookback-days`` once to rebuild older
+roll-ups after downtime.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from utils.database import get_db_connection  # noqa: E402
+from utils.occupancy_series import apply_retention, rollup, snapshot_all  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Snapshot, roll up and prune bed occupancy series")
+    parser.add_argument("--no-snapshot", action="store_true", help="Skip sampling current occupancy")
+    parser.add_argument("--no-rollup", action="store_true", help="Skip 5m -> 1h -> 1d roll-ups")
+    parser.add_argument("--no-retention", action="store_true", help="Skip deleting expired buckets")
+    parser.add_argument("--lookback-hours", type=int, default=2, help="Hourly buckets to rebuild")
+    parser.add_argument("--lookback-days", type=int, default=2, help="Daily buckets to rebuild")
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        if not args.no_snapshot:
+            print(f"snapshot: {snapshot_all(conn)} ward series sampled")
+        if not args.no_rollup:
+            counts = rollup(conn, lookback_hours=args.lookback_hours, lookback_days=args.lookback_days)
+            print(f"rollup: {counts}")
+        if not args.no_retention:
+            print(f"retention: {apply_retention(conn)} rows deleted")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
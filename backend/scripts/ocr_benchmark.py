@@ -0,0 +1,153 @@
+"""Compare the old and new image OCR pipelines on a folder of report photos.
+
+For every image in ``corpus`` (``.jpg``, ``.jpeg``, ``.png``, ``.tif``,
+``.tiff``, ``.bmp``, ``.webp``) both pipelines are run ``--runs`` times:
+
+- ``legacy``: what ``extract_text_from_image`` did before preprocessing was
+  added (full resolution, grayscale + contrast boost, ``image_to_string``
+  plus a separate ``image_to_data`` pass for the confidence).
+- ``current``: ``utils.ocr_utils.ocr_image`` (downscale, deskew, binarize,
+  crop, one Tesseract pass, retry at ``OCR_RETRY_DPI`` on low confidence).
+
+Reported per image and in total: median latency, the speed-up, Tesseract
+confidence, per-stage timings of the new pipeline and, when a
+``<image name>.txt`` ground-truth transcript sits next to the image, the
+character-level accuracy of each pipeline (``difflib`` ratio on
+whitespace-normalised, lower-cased text).
+
+Requires Pillow, pytesseract and the tesseract binary:
+
+    cd backend
+    python scripts/ocr_benchmark.py path/to/corpus --runs 3 --output ocr.json
+    OCR_TARGET_DPI=250 OCR_BINARIZE=otsu python scripts/ocr_benchmark.py path/to/corpus
+"""
+
+import argparse
+import difflib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".webp"}
+
+
+def legacy_ocr(path: Path, lang: str):
+    """The pre-preprocessing pipeline, kept here as the baseline."""
+    import pytesseract
+    from PIL import Image, ImageEnhance, ImageOps
+
+    image = Image.open(path).convert("RGB")
+    gray = ImageOps.grayscale(image)
+    gray = ImageEnhance.Contrast(gray).enhance(1.6)
+    text = pytesseract.image_to_string(gray, lang=lang)
+    data = pytesseract.image_to_data(gray, lang=lang, output_type=pytesseract.Output.DICT)
+    confs = []
+    for c in data.get("conf", []) or []:
+        try:
+            v = float(c)
+        except Exception:
+            continue
+        if v >= 0:
+            confs.append(v)
+    return text, (sum(confs) / len(confs)) if confs else None
+
+
+def _normalise(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def accuracy(text: str, truth: str) -> float:
+    return difflib.SequenceMatcher(None, _normalise(text), _normalise(truth), autojunk=False).ratio()
+
+
+def _timed(fn, runs: int):
+    latencies, out = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = fn()
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(latencies), out
+
+
+def bench_image(path: Path, *, lang: str, runs: int):
+    from utils.ocr_utils import ocr_image
+
+    legacy_ms, (legacy_text, legacy_conf) = _timed(lambda: legacy_ocr(path, lang), runs)
+    current_ms, result = _timed(lambda: ocr_image(str(path), lang=lang), runs)
+
+    row = {
+        "image": path.name,
+        "legacy_ms": round(legacy_ms, 1),
+        "current_ms": round(current_ms, 1),
+        "speedup": round(legacy_ms / current_ms, 2) if current_ms else None,
+        "legacy_confidence": round(legacy_conf, 1) if legacy_conf is not None else None,
+        "current_confidence": round(result.confidence, 1) if result.confidence is not None else None,
+        "attempts": result.attempts,
+        # Timings of the last run only.
+        "stages_ms": {name: round(ms, 1) for name, ms in result.timings.items()},
+    }
+    truth_path = path.with_suffix(".txt")
+    if truth_path.exists():
+        truth = truth_path.read_text(encoding="utf-8")
+        row["legacy_accuracy"] = round(accuracy(legacy_text, truth), 4)
+        row["current_accuracy"] = round(accuracy(result.text, truth), 4)
+    return row
+
+
+def _mean(rows, key):
+    values = [r[key] for r in rows if r.get(key) is not None]
+    return round(statistics.mean(values), 4) if values else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the image OCR pipeline against the legacy one")
+    parser.add_argument("corpus", help="Directory of report images (optional <name>.txt ground truth)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per image and pipeline (median is reported)")
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    images = sorted(p for p in Path(args.corpus).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not images:
+        print(f"No images found in {args.corpus}")
+        return 2
+
+    rows = []
+    for path in images:
+        row = bench_image(path, lang=args.lang, runs=max(1, args.runs))
+        rows.append(row)
+        acc = ""
+        if "current_accuracy" in row:
+            acc = f" acc {row['legacy_accuracy']:.3f} -> {row['current_accuracy']:.3f}"
+        stages = " ".join(f"{k}={v:.0f}" for k, v in row["stages_ms"].items())
+        print(
+            f"{row['image']:<32} {row['legacy_ms']:>8.0f}ms -> {row['current_ms']:>7.0f}ms "
+            f"(x{row['speedup'] or 0:.1f}, attempts={row['attempts']}){acc}  [{stages}]"
+        )
+
+    legacy_total = sum(r["legacy_ms"] for r in rows)
+    current_total = sum(r["current_ms"] for r in rows)
+    summary = {
+        "images": len(rows),
+        "legacy_ms_total": round(legacy_total, 1),
+        "current_ms_total": round(current_total, 1),
+        "speedup": round(legacy_total / current_total, 2) if current_total else None,
+        "legacy_accuracy": _mean(rows, "legacy_accuracy"),
+        "current_accuracy": _mean(rows, "current_accuracy"),
+        "retried": sum(1 for r in rows if r["attempts"] > 1),
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"summary": summary, "images": rows}, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
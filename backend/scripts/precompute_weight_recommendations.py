@@ -0,0 +1,76 @@
+"""Nightly precomputation of AI weight recommendations.
+
+For every user who logged a weight entry in the last ``--days`` days,
+regenerates the stored recommendation when its input fingerprint changed
+(new entry, new goal, or a WEIGHT_PROMPT_VERSION bump). Users whose stored
+recommendation is current are skipped, so re-runs are cheap.
+
+    0 3 * * * cd /path/to/backend && python scripts/precompute_weight_recommendations.py
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from utils import weight_recommendations  # noqa: E402
+from utils.database import execute_query  # noqa: E402
+from utils.gemini_utils import generate_weight_recommendations  # noqa: E402
+
+
+def _active_users(days: int, limit: int):
+    rows = execute_query(
+        """
+        SELECT DISTINCT user_id
+        FROM weight_entries
+        WHERE entry_date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+        ORDER BY user_id
+        LIMIT %s
+        """,
+        (days, limit),
+        fetch_all=True,
+    )
+    return [int(r["user_id"]) for r in rows or []]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Precompute stored weight recommendations for active users")
+    parser.add_argument("--days", type=int, default=30, help="Users with an entry in the last N days")
+    parser.add_argument("--limit", type=int, default=5000, help="Max users per run")
+    parser.add_argument("--sleep", type=float, default=0.5, help="Pause between Gemini calls (seconds)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which users would be refreshed")
+    args = parser.parse_args()
+
+    refreshed = skipped = failed = 0
+    for user_id in _active_users(args.days, args.limit):
+        params = weight_recommendations.suggestion_params(user_id)
+        if not params:
+            continue
+        fp = weight_recommendations.fingerprint(params)
+        stored = weight_recommendations.load(user_id)
+        if stored and stored["fingerprint"] == fp:
+            skipped += 1
+            continue
+        if args.dry_run:
+            print(f"user {user_id}: would refresh")
+            refreshed += 1
+            continue
+        try:
+            result = generate_weight_recommendations(**params)
+            weight_recommendations.save(user_id, fp, result.get("payload"))
+            refreshed += 1
+        except Exception as e:
+            failed += 1
+            print(f"user {user_id}: failed: {e}", file=sys.stderr)
+        time.sleep(max(0.0, args.sleep))
+
+    print(f"refreshed={refreshed} up_to_date={skipped} failed={failed}")
+    return 1 if failed and not refreshed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+"""Compare gunicorn serving profiles on an AI-bound endpoint.
+
+Starts gunicorn once per profile (``web``, ``io``, ``cpu`` from
+``gunicorn.conf.py``) with the same number of workers and drives
+``POST /api/reports/explain`` at increasing concurrency. Gemini is replaced
+by a stub that sleeps ``--ai-latency-ms`` (like a real model call, it holds
+the request without using CPU), so the numbers show how many slow upstream
+calls each worker model can keep in flight, and at what memory cost. The
+endpoint needs no database.
+
+Reported per profile and concurrency: req/s, p50/p95 latency, errors, and
+the resident memory of the master plus its workers (Linux).
+
+Requires gunicorn (and gevent for the ``io`` profile):
+
+    cd backend && pip install gunicorn gevent
+    python scripts/serving_benchmark.py --workers 2 --ai-latency-ms 1500 --concurrency 1,16,64
+
+``stub_app()`` is the app factory the spawned servers load.
+"""
+
+import argparse
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+EXPLAIN_BODY = json.dumps({"text": "HEMOGLOBIN 13.5 g/dL (13.0 - 17.0)"}).encode("utf-8")
+
+
+def stub_app():
+    """``create_app('production')`` with Gemini/Tesseract stubbed out."""
+    from app import create_app
+    from scripts.benchmark_api import _install_stubs
+
+    _install_stubs(float(os.getenv("BENCH_AI_LATENCY_MS", "1000")))
+    return create_app("production")
+
+
+def _token() -> str:
+    from flask_jwt_extended import create_access_token
+
+    from app import create_app
+    from utils.auth_context import claims_for
+
+    app = create_app("production")
+    with app.app_context():
+        return create_access_token(identity="1", additional_claims=claims_for("user", 1))
+
+
+def _tree_rss_mb(pid: int):
+    """RSS of ``pid`` and its direct children from /proc, or None off Linux."""
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+    total_kb = 0
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue
+        fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+        if int(entry.name) == pid or int(fields.get("PPid", "0").strip() or 0) == pid:
+            total_kb += int((fields.get("VmRSS") or "0 kB").split()[0])
+    return total_kb / 1024.0
+
+
+def _wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=2) as resp:
+                if resp.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not become ready")
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered), max(1, math.ceil(pct / 100.0 * len(ordered)))) - 1]
+
+
+def _drive(base_url: str, token: str, *, concurrency: int, total: int, timeout: float):
+    def _one(_):
+        req = urllib.request.Request(
+            f"{base_url}/api/reports/explain",
+            data=EXPLAIN_BODY,
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
+            method="POST",
+        )
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                resp.read()
+                ok = resp.status == 200
+        except Exception:
+            ok = False
+        return (time.perf_counter() - t0) * 1000.0, ok
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(_one, range(total)))
+        wall = time.perf_counter() - started
+
+    latencies = [ms for ms, ok in results if ok]
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": sum(1 for _, ok in results if not ok),
+        "rps": round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+    }
+
+
+def run_profile(profile: str, args, token: str):
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = dict(
+        os.environ,
+        GUNICORN_PROFILE=profile,
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_BIND=f"127.0.0.1:{args.port}",
+        GUNICORN_APP="scripts.serving_benchmark:stub_app()",
+        GUNICORN_ACCESSLOG="",
+        BENCH_AI_LATENCY_MS=str(args.ai_latency_ms),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=str(BACKEND_DIR),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL if not args.verbose else None,
+    )
+    try:
+        _wait_ready(base_url)
+        rows = []
+        for concurrency in args.concurrency:
+            total = max(args.requests, concurrency * 2)
+            stats = _drive(base_url, token, concurrency=concurrency, total=total, timeout=args.request_timeout)
+            stats["rss_mb"] = _tree_rss_mb(server.pid)
+            rows.append(stats)
+            rss = f"{stats['rss_mb']:7.1f} MB" if stats["rss_mb"] is not None else "      n/a"
+            print(
+                f"{profile:<4} c={concurrency:<4} rps={stats['rps']:>8.1f} p50={stats['p50_ms']:>8.1f}ms "
+                f"p95={stats['p95_ms']:>8.1f}ms errors={stats['errors']:<4} rss={rss}"
+            )
+        return rows
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare gunicorn serving profiles")
+    parser.add_argument("--profiles", default="web,io,cpu")
+    parser.add_argument("--workers", type=int, default=2, help="Same worker count for every profile (fixed memory)")
+    parser.add_argument("--concurrency", default="1,8,32,64", help="Comma separated client concurrency levels")
+    parser.add_argument("--requests", type=int, default=128, help="Requests per level (at least 2x concurrency)")
+    parser.add_argument("--ai-latency-ms", type=float, default=1000.0)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show gunicorn logs")
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("gunicorn is not installed: pip install gunicorn gevent")
+        return 2
+
+    token = _token()
+    results = {"workers": args.workers, "ai_latency_ms": args.ai_latency_ms, "profiles": {}}
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        results["profiles"][profile] = run_profile(profile, args, token)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+"""Measure (and budget) backend cold start and per-worker memory.
+
+Starts a fresh interpreter ``--runs`` times, each doing what a gunicorn
+worker does on boot (import ``app`` and call ``create_app``), and reports
+the median wall time, the time spent inside ``create_app`` and the peak RSS
+of the process. One extra run uses ``python -X importtime`` to list the
+modules that cost the most, so a regression can be traced to the import
+that introduced it. No database connection is made.
+
+Examples:
+    python scripts/startup_benchmark.py
+    python scripts/startup_benchmark.py --runs 10 --top 25 --output startup.json
+    python scripts/startup_benchmark.py --budget-ms 400 --budget-rss-mb 80   # CI gate
+    python scripts/startup_benchmark.py --warm   # include the pre-fork WARMUP_MODULES imports
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+create_app('production')
+t2 = time.perf_counter()
+warm_ms = 0.0
+if {warm!r}:
+    from config import Config
+    from utils.warmup import warm_imports
+    warm_ms = sum(warm_imports(Config.WARMUP_MODULES).values())
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+except ImportError:  # Windows
+    rss_mb = None
+print(json.dumps({{
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'warm_ms': warm_ms,
+    'rss_mb': rss_mb,
+    'modules': len(sys.modules),
+}}))
+"""
+
+
+def _run_once(warm: bool, importtime: bool = False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", _CHILD.format(warm=warm)]
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=str(BACKEND_DIR), capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall_ms"] = wall_ms
+    return result, proc.stderr
+
+
+def _parse_importtime(stderr: str):
+    """``[(module, self_us, cumulative_us, depth)]`` from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        # Nesting is shown as two extra spaces per level after the single separator space.
+        raw_name = parts[2].rstrip()[1:]
+        depth = (len(raw_name) - len(raw_name.lstrip())) // 2
+        try:
+            rows.append((raw_name.strip(), int(parts[0]), int(parts[1]), depth))
+        except ValueError:
+            continue
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark backend cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--warm", action="store_true", help="Also import WARMUP_MODULES (gunicorn preload)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if median wall time exceeds this")
+    parser.add_argument("--budget-rss-mb", type=float, default=None, help="Fail if median peak RSS exceeds this")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    runs = [_run_once(args.warm)[0] for _ in range(max(1, args.runs))]
+
+    def median(key):
+        values = [r[key] for r in runs if r.get(key) is not None]
+        return statistics.median(values) if values else None
+
+    summary = {k: median(k) for k in ("wall_ms", "import_ms", "create_app_ms", "warm_ms", "rss_mb", "modules")}
+
+    _, stderr = _run_once(args.warm, importtime=True)
+    imports = _parse_importtime(stderr)
+    top_level = sorted((r for r in imports if r[3] == 0), key=lambda r: -r[2])[: args.top]
+    top_self = sorted(imports, key=lambda r: -r[1])[: args.top]
+
+    print(f"runs={len(runs)}  python={sys.version.split()[0]}  warm={args.warm}")
+    print(f"  wall (interpreter + app)  {summary['wall_ms']:8.1f} ms")
+    print(f"  import app                {summary['import_ms']:8.1f} ms")
+    print(f"  create_app()              {summary['create_app_ms']:8.1f} ms")
+    if args.warm:
+        print(f"  warm-up imports           {summary['warm_ms']:8.1f} ms")
+    if summary["rss_mb"] is not None:
+        print(f"  peak RSS                  {summary['rss_mb']:8.1f} MB")
+    print(f"  modules loaded            {summary['modules']:8.0f}")
+
+    print("\nSlowest top-level imports (cumulative):")
+    for name, _, cumul, _ in top_level:
+        print(f"  {cumul / 1000:8.1f} ms  {name}")
+    print("\nSlowest modules (self):")
+    for name, self_us, _, _ in top_self:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "summary": summary,
+            "runs": runs,
+            "top_cumulative": [{"module": n, "ms": c / 1000} for n, _, c, _ in top_level],
+            "top_self": [{"module": n, "ms": s / 1000} for n, s, _, _ in top_self],
+        }, indent=2))
+
+    failed = False
+    if args.budget_ms is not None and summary["wall_ms"] > args.budget_ms:
+        print(f"\nFAIL: wall time {summary['wall_ms']:.1f} ms > budget {args.budget_ms:.1f} ms")
+        failed = True
+    if args.budget_rss_mb is not None and summary["rss_mb"] is not None and summary["rss_mb"] > args.budget_rss_mb:
+        print(f"\nFAIL: peak RSS {summary['rss_mb']:.1f} MB > budget {args.budget_rss_mb:.1f} MB")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from flask import Flask, g, jsonify
+from flask_jwt_extended import JWTManager, create_access_token
+
+from utils import auth_context
+
+
+def _app() -> Flask:
+    app = Flask(__name__)
+    app.config.update({"TESTING": True, "JWT_SECRET_KEY": "test-jwt-secret"})
+    JWTManager(app)
+
+    @app.get("/doctor-only")
+    @auth_context.requires_role("doctor")
+    def doctor_only():
+        return jsonify({"role": g.auth.role, "id": g.auth.id})
+
+    return app
+
+
+def _header(app: Flask, identity: str, claims=None) -> dict[str, str]:
+    with app.app_context():
+        token = create_access_token(identity=identity, additional_claims=claims)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_role_claims_and_cached_existence(monkeypatch):
+    calls = []
+
+    def fake_execute_query(query, params=None, fetch_one=False, fetch_all=False, commit=False):
+        calls.append((query, params))
+        return {"id": params[0]} if "FROM doctors" in query else None
+
+    monkeypatch.setattr(auth_context, "execute_query", fake_execute_query)
+    auth_context.invalidate()
+    app = _app()
+    client = app.test_client()
+
+    doctor = _header(app, "7", auth_context.claims_for("doctor", 7))
+    for _ in range(3):
+        resp = client.get("/doctor-only", headers=doctor)
+        assert resp.status_code == 200
+        assert resp.get_json() == {"role": "doctor", "id": 7}
+    assert len(calls) == 1  # existence checked once, then served from the cache
+
+    user = _header(app, "7", auth_context.claims_for("user", 7))
+    assert client.get("/doctor-only", headers=user).status_code == 403
+
+    hospital = _header(app, "hospital_7")
+    assert client.get("/doctor-only", headers=hospital).status_code == 403
+
+    # Pre-claims token: a bare id resolves to a role that has that account.
+    legacy = _header(app, "7")
+    assert client.get("/doctor-only", headers=legacy).status_code == 200
+
+    assert client.get("/doctor-only").status_code == 401
+    auth_context.invalidate()
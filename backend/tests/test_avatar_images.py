@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+
+from utils import avatar_images
+
+
+def test_pick_size_rounds_up_to_stored_variant():
+    assert avatar_images.pick_size("20") == 32
+    assert avatar_images.pick_size(64) == 64
+    assert avatar_images.pick_size("100") == 256
+    assert avatar_images.pick_size("4000") == 256
+    assert avatar_images.pick_size(None) == avatar_images.DEFAULT_AVATAR_SIZE
+
+
+def test_save_variants_is_content_addressed(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+
+    buf = BytesIO()
+    Image.new("RGB", (640, 480), (200, 30, 30)).save(buf, "JPEG")
+    data = buf.getvalue()
+
+    photo_hash = avatar_images.save_variants(data, tmp_path)
+    assert avatar_images.is_photo_hash(photo_hash)
+    assert avatar_images.save_variants(data, tmp_path) == photo_hash
+
+    for size in avatar_images.AVATAR_SIZES:
+        for webp in (True, False):
+            with Image.open(tmp_path / avatar_images.variant_filename(photo_hash, size, webp)) as im:
+                assert im.size == (size, size)
+                assert "exif" not in im.info
+
+    with pytest.raises(ValueError):
+        avatar_images.save_variants(b"not an image", tmp_path)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = rows
+        self._result = []
+
+    def execute(self, sql, params=None):
+        if params:
+            self._result = [r for r in self._rows if r["hospital_id"] == params[0]]
+        else:
+            self._result = [r for r in self._rows if r["available_beds"] > 0]
+
+    def fetchall(self):
+        return list(self._result)
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return _Cursor(self.rows)
+
+
+def _ward(hospital_id, ward_type, available, ac_type="not_applicable", room_config=None):
+    return {
+        "hospital_id": hospital_id,
+        "ward_type": ward_type,
+        "ac_type": ac_type,
+        "room_config": room_config,
+        "available_beds": available,
+    }
+
+
+def test_index_matches_booking_rules_and_refreshes_per_hospital():
+    from utils.bed_availability import AvailabilityIndex
+
+    rows = [
+        _ward(1, "icu", 2, "ac"),
+        _ward(1, "icu", 1, "non_ac"),
+        _ward(2, "icu", 0),
+        _ward(2, "general", 4, "ac"),
+        _ward(3, "general", 1, "non_ac"),
+        _ward(3, "private_room", 1, room_config="1_bed_with_bath"),
+    ]
+    conn = _Conn(rows)
+    index = AvailabilityIndex()
+    index.load(conn)
+
+    # ICU ignores AC type and sums across wards.
+    assert index.hospitals_with_capacity("icu", "non_ac") == {1: 3}
+    assert index.hospitals_with_capacity("general", "ac") == {2: 4}
+    assert index.hospitals_with_capacity("general") == {2: 4, 3: 1}
+    assert index.hospitals_with_capacity("general", min_beds=2) == {2: 4}
+    assert index.hospitals_with_capacity("private_room", room_config="2_bed_with_bath") == {}
+    assert index.hospitals_with_capacity("private_room") == {3: 1}
+
+    # A booking takes hospital 1's last ICU beds; another hospital frees one.
+    rows[0]["available_beds"] = 0
+    rows[1]["available_beds"] = 0
+    rows[2]["available_beds"] = 1
+    index.refresh_hospital(conn, 1)
+    index.refresh_hospital(conn, 2)
+    assert index.hospitals_with_capacity("icu") == {2: 1}
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import io
+
+
+def test_iter_records_reads_csv_and_ndjson():
+    from utils.bulk_io import detect_format, iter_records
+
+    csv_body = io.BytesIO(b"\xef\xbb\xbfName, Specialty\nDr A , Cardiology\nDr B,Neurology\n")
+    assert detect_format(None, "text/csv", None) == "csv"
+    rows = list(iter_records(csv_body, "csv"))
+    assert rows == [
+        (1, {"name": "Dr A", "specialty": "Cardiology"}, None),
+        (2, {"name": "Dr B", "specialty": "Neurology"}, None),
+    ]
+
+    ndjson_body = io.BytesIO(b'{"Name": "Dr C"}\n\nnot json\n[1, 2]\n')
+    assert detect_format(None, None, "doctors.ndjson") == "ndjson"
+    rows = list(iter_records(ndjson_body, "ndjson"))
+    assert rows[0] == (1, {"name": "Dr C"}, None)
+    assert rows[1][0] == 2 and rows[1][1] is None and rows[1][2].startswith("Invalid JSON")
+    assert rows[2] == (3, None, "Each line must be a JSON object")
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, sql, params):
+        self.conn.calls.append(("many", len(params)))
+        if any(p[0] == "bad" for p in params):
+            raise RuntimeError("chunk failed")
+
+    def execute(self, sql, params):
+        self.conn.calls.append(("one", params[0]))
+        if params[0] == "bad":
+            raise RuntimeError(1062, "Duplicate entry")
+
+    def close(self):
+        pass
+
+
+class _FakeConn:
+    def __init__(self):
+        self.calls = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_write_chunk_isolates_bad_rows():
+    from utils.bulk_io import BulkReport, write_chunk
+
+    conn = _FakeConn()
+    report = BulkReport()
+    written = []
+
+    write_chunk(conn, "INSERT", [(1, ("ok",)), (2, ("ok",))], report, on_success=written.append)
+    assert conn.calls == [("many", 2)]
+    assert written == [2]
+
+    conn.calls.clear()
+    write_chunk(conn, "INSERT", [(3, ("ok",)), (4, ("bad",)), (5, ("ok",))], report, on_success=written.append)
+    assert conn.calls[0] == ("many", 3)
+    assert sum(written) == 4
+    assert report.errors == [{"row": 4, "error": "Duplicate entry"}]
+    assert report.failed == 1
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from flask import Flask, jsonify
+
+from utils.compression import init_compression
+from utils.http_cache import conditional_get
+
+
+def _make_app(state):
+    app = Flask(__name__)
+    app.config.update({"TESTING": True, "COMPRESS_MIN_SIZE": 64})
+    init_compression(app)
+
+    def version(item_id):
+        if item_id not in state["rows"]:
+            return None
+        return (state["rows"][item_id],)
+
+    @app.get("/items/<int:item_id>")
+    @conditional_get(version, max_age=60, public=True)
+    def get_item(item_id):
+        state["rendered"] += 1
+        if item_id not in state["rows"]:
+            return jsonify({"error": "not found"}), 404
+        return jsonify({"id": item_id, "padding": "x" * 200}), 200
+
+    return app
+
+
+def test_revalidation_skips_the_view():
+    state = {"rows": {1: datetime(2026, 1, 1, 10, 0, 0)}, "rendered": 0}
+    client = _make_app(state).test_client()
+
+    first = client.get("/items/1", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] in ("public, max-age=60", "max-age=60, public")
+    etag = first.headers["ETag"]
+
+    again = client.get("/items/1", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert state["rendered"] == 1
+
+    state["rows"][1] = datetime(2026, 1, 2, 10, 0, 0)
+    changed = client.get("/items/1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert state["rendered"] == 2
+
+
+def test_missing_row_falls_through_without_validators():
+    state = {"rows": {}, "rendered": 0}
+    resp = _make_app(state).test_client().get("/items/9")
+    assert resp.status_code == 404
+    assert "ETag" not in resp.headers
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import io
+import time
+
+
+def _wait(queue, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job and job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_retries_then_succeeds_and_expires():
+    from utils.job_queue import JobQueue
+
+    queue = JobQueue(max_workers=1, max_retries=2, retry_backoff_seconds=0, result_ttl_seconds=0)
+    attempts = []
+
+    def flaky(*, value, progress):
+        attempts.append(value)
+        progress(50, "halfway")
+        if len(attempts) < 2:
+            raise RuntimeError("temporary")
+        return {"value": value}
+
+    job_id = queue.submit("test", flaky, owner="1", kwargs={"value": 3})
+    job = _wait(queue.store, job_id)
+
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+    assert job["result"] == {"value": 3}
+    # TTL of 0 -> result is gone as soon as it is read through the queue
+    assert queue.get(job_id) is None
+
+
+def test_job_does_not_retry_bad_input():
+    from utils.job_queue import JobQueue
+
+    queue = JobQueue(max_workers=1, max_retries=3, retry_backoff_seconds=0)
+    calls = []
+
+    def bad(*, progress):
+        calls.append(1)
+        raise ValueError("nope")
+
+    job_id = queue.submit("test", bad, owner="1", on_error=lambda exc: ({"error": str(exc)}, 400))
+    job = _wait(queue, job_id)
+
+    assert len(calls) == 1
+    assert job["status"] == "failed"
+    assert job["status_code"] == 400
+    assert job["error"] == {"error": "nope"}
+
+
+def test_simplify_async_returns_job_and_poll_delivers_result(monkeypatch, app, client, auth_header):
+    import routes.reports as reports_mod
+    import utils.job_queue as job_queue_mod
+    from routes.jobs import jobs_bp
+
+    app.register_blueprint(jobs_bp, url_prefix="/api")
+    monkeypatch.setattr(job_queue_mod, "_queue", job_queue_mod.JobQueue(max_workers=1, retry_backoff_seconds=0))
+
+    monkeypatch.setattr(reports_mod, "_ocr_bytes", lambda *, ext, data: ("Glucose 110 mg/dL", 88.0))
+    monkeypatch.setattr(reports_mod, "explain_bytes_with_gemini", lambda file_bytes, *, mime_type, model: "VISION OK")
+
+    def fake_execute_query(sql, params, commit=False, fetch_one=False, fetch_all=False):
+        if "INSERT INTO medical_reports" in sql:
+            return 9
+        if "SELECT id, file_name, uploaded_at" in sql:
+            return {"id": 9, "file_name": "lab.png", "uploaded_at": None}
+        raise AssertionError(f"Unexpected SQL: {sql}")
+
+    monkeypatch.setattr(reports_mod, "execute_query", fake_execute_query)
+
+    data = {"file": (io.BytesIO(b"fake-image-bytes"), "lab.png")}
+    resp = client.post("/api/reports/simplify?async=1", data=data, headers=auth_header, content_type="multipart/form-data")
+
+    assert resp.status_code == 202, resp.get_data(as_text=True)
+    job_id = resp.get_json()["job_id"]
+
+    _wait(job_queue_mod.get_job_queue(), job_id)
+    poll = client.get(f"/api/jobs/{job_id}", headers=auth_header)
+
+    assert poll.status_code == 200
+    body = poll.get_json()
+    assert body["status"] == "succeeded"
+    assert body["result"]["report_id"] == 9
+    assert body["result"]["explanation"] == "VISION OK"
+
+
+def test_job_store_errors_and_config_errors_fail_without_hanging():
+    from utils.job_queue import MESSAGE_MAX_LENGTH, JobQueue, MemoryJobStore
+
+    class FlakyStore(MemoryJobStore):
+        def update(self, job_id, **fields):
+            if fields.get("status") == "running":
+                raise ConnectionError("db went away")
+            super().update(job_id, **fields)
+
+    queue = JobQueue(FlakyStore(), max_workers=1, retry_backoff_seconds=0)
+    job = _wait(queue.store, queue.submit("test", lambda *, progress: 1, owner="1"))
+    assert job["status"] == "failed"
+    assert job["error"]["message"] == "db went away"
+
+    queue = JobQueue(max_workers=1, max_retries=3, retry_backoff_seconds=0)
+    calls = []
+
+    def misconfigured(*, progress):
+        calls.append(1)
+        progress(10, "x" * 1000)
+        raise RuntimeError("GEMINI_API_KEY is not set")
+
+    job = _wait(queue.store, queue.submit("test", misconfigured, owner="1"))
+    assert len(calls) == 1
+    assert job["status"] == "failed"
+
+    seen = []
+    queue = JobQueue(max_workers=1, retry_backoff_seconds=0)
+    queue.store.update = lambda job_id, **fields: seen.append(fields.get("message"))
+    queue._run_attempts("j", misconfigured, {}, None, 0)
+    assert all(m is None or len(m) <= MESSAGE_MAX_LENGTH for m in seen)
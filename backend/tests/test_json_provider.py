@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import gzip
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+from utils.compression import init_compression
+from utils.json_provider import FastJSONProvider
+
+
+def _make_app() -> Flask:
+    app = Flask(__name__)
+    app.config.update({"TESTING": True, "COMPRESS_MIN_SIZE": 256})
+    app.json = FastJSONProvider(app)
+    init_compression(app)
+
+    @app.get("/row")
+    def row():
+        return jsonify({
+            "appointment_date": date(2026, 3, 1),
+            "appointment_time": timedelta(hours=9, minutes=30),
+            "created_at": datetime(2026, 2, 27, 14, 5, 0),
+            "fee": Decimal("500.00"),
+        })
+
+    @app.get("/rows")
+    def rows():
+        return jsonify({"items": [{"id": i, "name": f"Doctor {i}"} for i in range(200)]})
+
+    return app
+
+
+def test_serializes_db_types():
+    body = _make_app().test_client().get("/row").get_json()
+    assert body == {
+        "appointment_date": "2026-03-01",
+        "appointment_time": "9:30:00",
+        "created_at": "2026-02-27T14:05:00",
+        "fee": 500.0,
+    }
+
+
+def test_compresses_large_responses_only():
+    client = _make_app().test_client()
+
+    large = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in large.headers["Vary"]
+    assert b'"Doctor 199"' in gzip.decompress(large.data)
+
+    small = client.get("/row", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+    plain = client.get("/rows")
+    assert "Content-Encoding" not in plain.headers
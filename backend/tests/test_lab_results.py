@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import io
+from datetime import date, datetime
+
+import pytest
+
+from utils.lab_results import extract_lab_values, find_report_date, from_llm, parse_line
+
+REPORT = """CITY DIAGNOSTIC LAB
+Sample collected: 12/03/2025 08:10      Reported: 13-03-2025
+Test                         Result   Unit     Reference
+HbA1c (Glycated Haemoglobin) 6.4      %        4.0 - 5.6   H
+Haemoglobin                  11.2     g/dL     13.0 - 17.0
+Fasting Blood Sugar          6.9      mmol/L   3.9-5.5
+Platelet Count               2,50,000 /cumm    1,50,000 - 4,00,000
+LDL Cholesterol              162      mg/dL    < 100
+Lipoprotein (a)              45       mg/dL    < 30
+"""
+
+
+def test_extract_lab_values_parses_units_ranges_and_flags():
+    values, leftovers = extract_lab_values(REPORT)
+    by_code = {v.test_code: v for v in values}
+
+    assert set(by_code) == {"HBA1C", "HGB", "GLU_FASTING", "PLT", "LDL"}
+    assert (by_code["HBA1C"].value, by_code["HBA1C"].ref_high, by_code["HBA1C"].flag) == (6.4, 5.6, "H")
+    assert by_code["HGB"].flag == "L"  # derived from the range
+    assert by_code["GLU_FASTING"].unit == "mg/dL"
+    assert by_code["GLU_FASTING"].value == pytest.approx(124.3, abs=0.1)
+    assert (by_code["PLT"].value, by_code["PLT"].ref_low) == (250.0, 150.0)
+    assert (by_code["LDL"].ref_high, by_code["LDL"].flag) == (100.0, "H")
+    assert leftovers == ["Lipoprotein (a) 45 mg/dL < 30"]
+    assert find_report_date(REPORT) == date(2025, 3, 12)
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        # qualifiers in the test name are not the value
+        ("Vitamin D (25-OH) 18 ng/mL 30 - 100", ("VITD", 18.0, 30.0, 100.0, "L")),
+        ("Vitamin D, 25-Hydroxy 18 ng/mL", ("VITD", 18.0, None, None, None)),
+        # category labels are neither flags nor a single reference range
+        ("LDL Cholesterol 120 mg/dL Low risk < 100", ("LDL", 120.0, None, None, None)),
+        ("Triglycerides 180 mg/dL Normal: <150 High: 200-499", ("TG", 180.0, None, None, None)),
+        # the range wins over a printed flag; without one, an adjacent flag is kept
+        ("Haemoglobin 15.0 g/dL L 13.0 - 17.0", ("HGB", 15.0, 13.0, 17.0, None)),
+        ("Ferritin 500ng/mL (H)", ("FERRITIN", 500.0, None, None, "H")),
+    ],
+)
+def test_parse_line_ignores_qualifiers_and_reference_labels(line, expected):
+    v = parse_line(line)
+    assert (v.test_code, v.value, v.ref_low, v.ref_high, v.flag) == expected
+
+
+def test_report_date_skips_date_of_birth():
+    assert find_report_date("Date of Birth: 14/07/1996 / Sample Collected: 02/03/2025") == date(2025, 3, 2)
+    header = "Patient: A   DOB: 14/07/1996\nRegistration Date: 01/03/2025\nSpecimen received 02-03-2025"
+    assert find_report_date(header) == date(2025, 3, 2)
+    assert find_report_date("Name: A   Age: 28 Y   Date of Birth 14/07/1996") is None
+
+
+def test_llm_items_must_quote_the_leftover_lines():
+    lines = ["Lipoprotein (a) 45 mg/dL < 30", "Sperm count 120000000 /mL"]
+    items = [
+        {"line": lines[0], "name": "Lipoprotein (a)", "value": 45, "unit": "mg/dL", "ref_high": 30},
+        {"line": lines[0], "name": "Lipoprotein (a)", "value": 54},  # not on the line
+        {"line": "Ferritin 80 ng/mL", "name": "Ferritin", "value": 80},  # not a leftover
+        {"line": lines[1], "name": "Sperm count", "value": 120000000},  # overflows DECIMAL(12,4)
+    ]
+    [value] = from_llm(items, lines)
+
+    assert (value.test_code, value.value, value.flag, value.source) == ("X_LIPOPROTEIN_A", 45.0, "H", "llm")
+
+
+def test_simplify_saves_lab_values_and_trend_reads_them(monkeypatch, client, auth_header):
+    import routes.reports as reports_mod
+
+    monkeypatch.setattr(reports_mod, "_ocr_bytes", lambda *, ext, data: (REPORT, 90.0))
+    monkeypatch.setattr(reports_mod, "explain_bytes_with_gemini", lambda file_bytes, *, mime_type, model: "OK")
+    monkeypatch.setattr("utils.lab_results.Config.LAB_LLM_MAX_LINES", 0)
+    saved = {}
+    monkeypatch.setattr(
+        reports_mod, "save_results", lambda user_id, report_id, values, measured_at: saved.update(
+            user_id=user_id, report_id=report_id, codes=[v.test_code for v in values], measured_at=measured_at
+        )
+    )
+
+    def fake_execute_query(sql, params, commit=False, fetch_one=False, fetch_all=False):
+        if "INSERT INTO medical_reports" in sql:
+            return 5
+        if "SELECT id, file_name, uploaded_at" in sql:
+            return {"id": 5, "file_name": "lab.png", "uploaded_at": datetime(2025, 4, 1)}
+        if "FROM lab_results" in sql:
+            assert params == (123, "HBA1C", date(2025, 1, 1), 500)
+            return [
+                {"report_id": 5, "test_name": "HbA1c", "value": 6.4, "unit": "%", "ref_low": 4.0,
+                 "ref_high": 5.6, "flag": "H", "source": "regex", "measured_at": datetime(2025, 3, 12)},
+                {"report_id": 2, "test_name": "HbA1c", "value": 7.1, "unit": "%", "ref_low": None,
+                 "ref_high": None, "flag": None, "source": "regex", "measured_at": datetime(2024, 9, 1)},
+            ]
+        raise AssertionError(f"Unexpected SQL: {sql}")
+
+    monkeypatch.setattr(reports_mod, "execute_query", fake_execute_query)
+
+    resp = client.post(
+        "/api/reports/simplify",
+        data={"file": (io.BytesIO(b"fake-image-bytes"), "lab.png")},
+        headers=auth_header,
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 201, resp.get_data(as_text=True)
+    assert {r["test_code"] for r in resp.get_json()["lab_results"]} == set(saved["codes"])
+    assert (saved["user_id"], saved["report_id"], saved["measured_at"]) == (123, 5, date(2025, 3, 12))
+
+    trend = client.get("/api/reports/labs/hba1c?from=2025-01-01", headers=auth_header)
+    assert trend.status_code == 200, trend.get_data(as_text=True)
+    body = trend.get_json()
+    assert (body["test_code"], body["unit"]) == ("HBA1C", "%")
+    assert [p["value"] for p in body["points"]] == [7.1, 6.4]  # oldest first
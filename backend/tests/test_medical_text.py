@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import io
+
+
+def test_classify_ocr_text_heuristics():
+    from utils.medical_text import MEDICAL, NON_MEDICAL, UNKNOWN, classify_ocr_text
+
+    lab = "Hemoglobin 13.5 g/dL (13.0-17.0)\nFasting glucose 110 mg/dL\nCreatinine 1.1 mg/dL"
+    receipt = "SUPER SHOP\nInvoice No 8812\nQty 2  Rice 5kg\nSubtotal 900\nVAT 45\nCashier: Rahim\nChange due 55"
+
+    assert classify_ocr_text(lab) == MEDICAL
+    assert classify_ocr_text(receipt) == NON_MEDICAL
+    assert classify_ocr_text("short") == UNKNOWN
+    # A pharmacy receipt mentions medicine, so the model has to decide.
+    assert classify_ocr_text("Receipt\nSubtotal 120\nVAT 6\nParacetamol tablet 500 mg x 10") != NON_MEDICAL
+
+
+def test_simplify_rejects_obvious_non_medical_without_gemini(monkeypatch, client, auth_header):
+    import routes.reports as reports_mod
+
+    receipt = "SUPER SHOP\nInvoice No 8812\nQty 2  Rice 5kg\nSubtotal 900\nVAT 45\nCashier: Rahim\nChange due 55"
+    monkeypatch.setattr(reports_mod, "_ocr_bytes", lambda *, ext, data: (receipt, 90.0))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Gemini should not be called for obvious non-medical uploads")
+
+    monkeypatch.setattr(reports_mod, "explain_bytes_with_gemini", fail)
+    monkeypatch.setattr(reports_mod, "simplify_ocr_text", fail)
+    monkeypatch.setattr(reports_mod, "execute_query", fail)
+
+    data = {"file": (io.BytesIO(b"fake-image-bytes"), "receipt.png")}
+    resp = client.post("/api/reports/simplify", data=data, headers=auth_header, content_type="multipart/form-data")
+
+    assert resp.status_code == 400, resp.get_data(as_text=True)
+    assert "health-related" in resp.get_json()["message"]
+
+
+def test_render_envelope_formats_sections_and_rejects():
+    import pytest
+
+    from utils.gemini_utils import _FILE_SECTIONS, _render_envelope
+
+    raw = '```json\n{"is_medical": true, "rejection_message": null, "sections": {"summary": ["Normal CBC"], "next_steps": ["Routine follow-up"]}}\n```'
+    assert _render_envelope(raw, _FILE_SECTIONS) == "1) Summary\n- Normal CBC\n\n2) Next steps\n- Routine follow-up"
+
+    with pytest.raises(ValueError, match="bank statement"):
+        _render_envelope('{"is_medical": false, "rejection_message": "This appears to be a bank statement."}', _FILE_SECTIONS)
+
+    # Malformed shapes degrade instead of raising AttributeError.
+    assert _render_envelope('{"is_medical": true, "sections": ["Normal CBC"]}', _FILE_SECTIONS) == "1) Summary\n- Normal CBC"
+    assert _render_envelope(
+        '{"is_medical": true, "sections": {"summary": ["Normal CBC"], "key_details": 5}}', _FILE_SECTIONS
+    ) == "1) Summary\n- Normal CBC"
+
+
+def test_simplify_does_not_retry_a_model_rejection(monkeypatch, client, auth_header):
+    import routes.reports as reports_mod
+
+    text = "Patient visit notes\nHemoglobin 13.5 g/dL (13.0-17.0)\nFollow up with doctor"
+    monkeypatch.setattr(reports_mod, "_ocr_bytes", lambda *, ext, data: (text, 90.0))
+
+    def reject(*args, **kwargs):
+        raise ValueError("This appears to be a bank statement.")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a rejected upload must not be sent to Gemini again")
+
+    monkeypatch.setattr(reports_mod, "explain_bytes_with_gemini", reject)
+    monkeypatch.setattr(reports_mod, "simplify_ocr_text", fail)
+    monkeypatch.setattr(reports_mod, "execute_query", fail)
+
+    data = {"file": (io.BytesIO(b"fake-image-bytes"), "scan.png")}
+    resp = client.post("/api/reports/simplify", data=data, headers=auth_header, content_type="multipart/form-data")
+
+    assert resp.status_code == 400, resp.get_data(as_text=True)
+    assert "bank statement" in resp.get_json()["message"]
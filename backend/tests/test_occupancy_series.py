@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+
+def test_buckets_and_resolution_choice():
+    from utils.occupancy_series import floor_bucket, resolution_for_days
+
+    ts = datetime(2026, 3, 4, 13, 47, 59, 123)
+    assert floor_bucket(ts, "5m") == datetime(2026, 3, 4, 13, 45)
+    assert floor_bucket(ts, "1h") == datetime(2026, 3, 4, 13, 0)
+    assert floor_bucket(ts, "1d") == datetime(2026, 3, 4)
+    assert [resolution_for_days(d) for d in (1, 7, 30, 365)] == ["5m", "1h", "1d", "1d"]
+
+
+def test_private_rooms_override_aggregate_private_ward():
+    from utils.occupancy_series import _merge_occupancy
+
+    wards = [
+        {"hospital_id": 1, "ward_type": "icu", "occupied": 3, "total": 10},
+        {"hospital_id": 1, "ward_type": "private_room", "occupied": 1, "total": 4},
+        {"hospital_id": 2, "ward_type": "private_room", "occupied": 2, "total": 5},
+    ]
+    rooms = [{"hospital_id": 1, "occupied": 2, "total": 6}]
+
+    assert _merge_occupancy(wards, rooms) == {
+        (1, "icu"): (3, 10),
+        (1, "private_room"): (2, 6),
+        (2, "private_room"): (2, 5),
+    }
+
+
+def test_format_trend_uses_bucket_sums():
+    from utils.occupancy_series import format_trend
+
+    rows = [
+        {"bucket_start": datetime(2026, 3, 2), "ward_type": "icu", "occupied_sum": 30, "total_sum": 40},
+        {"bucket_start": datetime(2026, 3, 1), "ward_type": "general", "occupied_sum": 5, "total_sum": 20},
+        {"bucket_start": datetime(2026, 3, 1), "ward_type": "private_room", "occupied_sum": 1, "total_sum": 1},
+    ]
+    trend = format_trend(rows, "1d", 7)
+
+    assert [p["name"] for p in trend] == ["Sun", "Mon"]
+    assert trend[0]["general"] == 25 and trend[0]["icu"] == 0
+    assert trend[1]["icu"] == 75
+    assert "private_room" not in trend[0]
+
+
+def test_read_series_rolls_up_buckets_the_job_has_not_reached():
+    from utils.occupancy_series import read_series
+
+    stored = {
+        "1d": [{"bucket_start": datetime(2026, 3, 2), "ward_type": "icu",
+                "occupied_sum": 60, "total_sum": 100, "occupied_max": 8}],
+        "1h": [],  # roll-up job hasn't run since yesterday
+        "5m": [
+            {"bucket_start": datetime(2026, 3, 3, 9, 0), "ward_type": "icu",
+             "occupied_sum": 4, "total_sum": 10, "occupied_max": 4},
+            {"bucket_start": datetime(2026, 3, 3, 9, 5), "ward_type": "icu",
+             "occupied_sum": 6, "total_sum": 10, "occupied_max": 6},
+        ],
+    }
+
+    class Cursor:
+        def __init__(self):
+            self.reads = []
+
+        def execute(self, sql, params):
+            self.reads.append(params[1:])
+            self.rows = [r for r in stored[params[1]] if r["bucket_start"] >= params[2]]
+
+        def fetchall(self):
+            return self.rows
+
+    cursor = Cursor()
+    resolution, rows = read_series(cursor, 1, 7, now=datetime(2026, 3, 3, 9, 7))
+
+    assert resolution == "1h"
+    assert cursor.reads == [("1h", datetime(2026, 2, 24, 9)), ("5m", datetime(2026, 2, 24, 9))]
+    assert [(r["bucket_start"], r["occupied_sum"], r["total_sum"], r["occupied_max"]) for r in rows] == [
+        (datetime(2026, 3, 3, 9), 10, 20, 6)
+    ]
+
+    _, rows = read_series(cursor, 1, 7, "1d", now=datetime(2026, 3, 3, 9, 7))
+    assert [(r["bucket_start"], r["occupied_sum"]) for r in rows] == [
+        (datetime(2026, 3, 2), 60), (datetime(2026, 3, 3), 10)
+    ]
+    assert cursor.reads[-2:] == [("1h", datetime(2026, 3, 3)), ("5m", datetime(2026, 3, 3))]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from utils.ocr_preprocess import otsu_threshold
+from utils.ocr_utils import words_to_text
+
+
+def test_otsu_threshold_splits_bimodal_histogram():
+    hist = [0] * 256
+    hist[30] = 500  # ink
+    hist[220] = 4000  # paper
+    t = otsu_threshold(hist)
+
+    assert 30 <= t < 220
+    assert otsu_threshold([0] * 256) == 127
+
+
+def test_words_to_text_rebuilds_lines_and_paragraphs():
+    data = {
+        "text": ["", "HEMOGLOBIN", "13.5", "g/dL", "", "Normal"],
+        "conf": ["-1", "91", "88", "70", "-1", "95"],
+        "block_num": [1, 1, 1, 1, 2, 2],
+        "par_num": [1, 1, 1, 1, 1, 1],
+        "line_num": [0, 1, 1, 2, 0, 1],
+    }
+    text, confidence = words_to_text(data)
+
+    assert text == "HEMOGLOBIN 13.5\ng/dL\n\nNormal"
+    assert confidence == pytest.approx(86.0)
+    assert words_to_text({"text": []}) == ("", None)
+
+
+def test_preprocess_deskews_downscales_and_crops():
+    Image = pytest.importorskip("PIL.Image")
+    ImageDraw = pytest.importorskip("PIL.ImageDraw")
+    from utils.ocr_preprocess import PreprocessOptions, estimate_skew, preprocess
+
+    page = Image.new("L", (1600, 2200), 255)
+    draw = ImageDraw.Draw(page)
+    for y in range(300, 1500, 60):
+        draw.rectangle((200, y, 1400, y + 14), fill=0)
+    tilted = page.rotate(3, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+    assert estimate_skew(tilted) == pytest.approx(-3, abs=0.5)
+
+    out = preprocess(tilted, PreprocessOptions(target_dpi=100))
+    assert out.scale < 1
+    assert abs(out.skew_degrees) >= 2.5
+    assert max(out.image.size) < 1170 * 0.8  # cropped to the text block
+    assert set(out.timings) == {"load", "deskew", "binarize", "crop"}
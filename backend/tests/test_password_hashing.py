@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from utils.password_hashing import PasswordHasher, PasswordHashingBusy, hash_cost
+
+
+def test_hash_verify_and_rehash_detection():
+    hasher = PasswordHasher(rounds=4, workers=1)
+    hashed = hasher.hash("s3cret-Pass")
+
+    assert hash_cost(hashed) == 4
+    assert hasher.verify("s3cret-Pass", hashed)
+    assert not hasher.verify("wrong", hashed)
+    assert not hasher.verify("s3cret-Pass", "")
+
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=5).needs_rehash(hashed)
+
+
+def test_rejects_work_beyond_max_pending():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return True
+
+    t = threading.Thread(target=hasher._run, args=(slow,))
+    t.start()
+    started.wait(5)
+    with pytest.raises(PasswordHashingBusy):
+        hasher.hash("another")
+    release.set()
+    t.join(5)
+    assert hasher.pending == 0
+    assert hasher.verify("x", hasher.hash("x"))
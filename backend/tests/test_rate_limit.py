@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from utils.captcha import CaptchaPool, CaptchaService
+from utils.rate_limit import MemoryRateLimitStore, RateLimiter
+
+
+def test_sliding_window_carries_previous_window():
+    limiter = RateLimiter(MemoryRateLimitStore())
+    t0 = 1_000_040.0  # 20s into a 60s window
+
+    assert not any(limiter.hit("ip", 5, 60, now=t0 + i) for i in range(5))
+    assert limiter.hit("ip", 5, 60, now=t0 + 6)
+
+    # Early in the next window most of the previous hits still count...
+    assert limiter.hit("ip", 5, 60, now=t0 + 45)
+    # ...and once it has slid past them the key is free again.
+    assert not limiter.hit("ip", 5, 60, now=t0 + 100)
+    assert not limiter.hit("other", 5, 60, now=t0 + 6)
+
+
+def test_memory_store_is_bounded():
+    store = MemoryRateLimitStore(max_keys=100)
+    limiter = RateLimiter(store)
+    for i in range(1000):
+        limiter.hit(f"ip-{i}", 10, 60)
+    assert len(store) <= 100
+
+
+def test_captcha_tokens_are_bound_and_single_use():
+    pool = CaptchaPool(size=0, render=lambda: ("ABCDE", "png"))
+    service = CaptchaService(pool, ttl_seconds=300)
+
+    issued = service.issue("10.0.0.1")
+    token = issued["captcha_id"]
+    assert issued["image_base64"] == "png"
+
+    assert service.verify(token, "wrong", "10.0.0.1") == (False, "Incorrect captcha")
+    assert service.verify(token, "abcde", "10.0.0.2")[0] is False
+    assert service.verify(token, "abcde", "10.0.0.1") == (True, "")
+    assert service.verify(token, "abcde", "10.0.0.1") == (False, "Captcha already used")
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from utils.report_search import make_snippet, parse_query
+
+
+def test_parse_query_builds_boolean_expression():
+    q = parse_query('HbA1c "fasting blood sugar" of k HBA1C')
+
+    assert q.words == ["hba1c"]
+    assert q.phrases == ["fasting blood sugar"]
+    assert q.short == ["k"]  # "of" is an InnoDB stopword
+    assert q.boolean_expression() == '+"fasting blood sugar" +hba1c*'
+    assert parse_query("last hba1c").boolean_expression(match_all=False) == "last* hba1c*"
+    assert not parse_query('  "" ')
+
+
+def test_make_snippet_windows_and_highlights():
+    text = "Patient: A\n" + "filler " * 40 + "HbA1c   7.2 %  (4.0 - 5.6)\n" + "tail " * 40
+    snippet, highlights = make_snippet(text, ["hba1"], radius=30)
+
+    assert snippet.startswith("… ") and snippet.endswith(" …")
+    assert "HbA1c 7.2 %" in snippet
+    assert [snippet[s:e] for s, e in highlights] == ["HbA1c"]
+    assert make_snippet(text, ["ferritin"]) == ("", [])
+
+
+def test_search_endpoint_scopes_filters_and_falls_back(monkeypatch, client, auth_header):
+    import routes.reports as reports_mod
+
+    calls = []
+
+    def fake_execute_query(sql, params, commit=False, fetch_one=False, fetch_all=False):
+        calls.append((sql, params))
+        if "+last*" in params[0]:
+            return []
+        return [
+            {
+                "id": 7,
+                "file_name": "lab.pdf",
+                "report_type": "lab",
+                "uploaded_at": datetime(2025, 3, 1, 9, 30),
+                "ocr_text": "HbA1c 6.1 %",
+                "ai_interpretation": "Your HbA1c is slightly high.",
+                "score": 1.5,
+            }
+        ]
+
+    monkeypatch.setattr(reports_mod, "execute_query", fake_execute_query)
+
+    resp = client.get(
+        "/api/reports/search?q=last+hba1c&from=2024-01-01&to=2025-12-31&type=lab&sort=date",
+        headers=auth_header,
+    )
+
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    payload = resp.get_json()
+    assert payload["match"] == "any"
+    assert payload["has_more"] is False
+    assert payload["results"][0]["snippet"] == "HbA1c 6.1 %"
+    assert payload["results"][0]["matched_in"] == "ocr_text"
+
+    sql, params = calls[-1]
+    assert "WHERE user_id = %s AND MATCH" in sql
+    assert "ORDER BY uploaded_at DESC" in sql
+    assert params == ("last* hba1c*", 123, "last* hba1c*", date(2024, 1, 1), date(2026, 1, 1), "lab", 21, 0)
+
+    assert client.get("/api/reports/search?q=", headers=auth_header).status_code == 400
+    stopwords = client.get("/api/reports/search?q=the+of", headers=auth_header)
+    assert stopwords.status_code == 200
+    assert stopwords.get_json()["results"] == []
+    assert client.get("/api/reports/search?q=x&type=bogus", headers=auth_header).status_code == 400
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import time
+
+
+def test_fingerprint_ignores_case_punctuation_and_stop_words():
+    from utils.response_cache import fingerprint
+
+    assert fingerprint("I have headache and fever for 2 days", "adult") == fingerprint("Headache, fever - 2 days!", "adult")
+    assert fingerprint("fever but no cough", "adult") != fingerprint("cough but no fever", "adult")
+    assert fingerprint("fever", "adult") != fingerprint("fever", "child")
+
+
+def test_cache_ttl_lru_and_metrics():
+    from utils.response_cache import ResponseCache
+
+    cache = ResponseCache("test", max_entries=2, ttl_seconds=60)
+    cache.set("fever", "adult", value={"specialty": "General Practice"}, cost_ms=1200)
+
+    hit = cache.get("Fever!", "adult")
+    assert hit == {"specialty": "General Practice"}
+    hit["specialty"] = "mutated"
+    assert cache.get("fever", "adult") == {"specialty": "General Practice"}
+
+    cache.set("rash", "adult", value=1)
+    assert cache.get("fever", "adult") is not None  # "rash" is now least recently used
+    cache.set("cough", "adult", value=2)
+    assert cache.get("rash", "adult") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["saved_ms"] == 3600.0
+
+    expiring = ResponseCache("ttl", ttl_seconds=0)
+    expiring.set("fever", value=1)
+    time.sleep(0.001)
+    assert expiring.get("fever") is None
+
+
+def test_nearest_neighbour_lookup_catches_paraphrase():
+    from utils.response_cache import ResponseCache
+
+    cache = ResponseCache("nn", similarity_threshold=0.8)
+    cache.set("headache and fever for two days", "adult", value="GP")
+
+    assert cache.get("headaches and fever for two days", "adult") == "GP"
+    assert cache.get("headaches and fever for two days", "child") is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_prompts_that_normalize_to_nothing_are_never_cached():
+    from utils.response_cache import ResponseCache
+
+    cache = ResponseCache("test", min_tokens=2)
+    for text in ("hi", "how are you", "what is it", "fever"):
+        cache.set(text, value="shared reply")
+        assert cache.get(text) is None
+    cache.set("fever and cough", value="ok")
+    assert cache.get("Fever, and cough!") == "ok"
+    assert cache.stats()["bypassed"] == 4
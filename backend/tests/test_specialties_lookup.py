@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from utils import specialties
+
+
+def test_lookups_hit_the_cache_and_batch_misses(monkeypatch):
+    table = [{"id": 1, "name": "Cardiology"}, {"id": 2, "name": "Other"}]
+    calls = []
+
+    def fake_execute_query(query, params=None, fetch_one=False, fetch_all=False, commit=False):
+        calls.append((query, params))
+        if "IN (" in query:
+            return [{"id": 3, "name": "Neurology"}] if "neurology" in (params or ()) else []
+        return list(table)
+
+    monkeypatch.setattr(specialties, "execute_query", fake_execute_query)
+    specialties.invalidate()
+
+    found = specialties.find_by_names(["cardiology", " CARDIOLOGY ", "Neurology", "Astrology"])
+    assert found == {"cardiology": {"id": 1, "name": "Cardiology"}, "neurology": {"id": 3, "name": "Neurology"}}
+    assert len(calls) == 2  # full load + one batched IN for the misses
+    assert calls[1][1] == ("astrology", "neurology")
+
+    assert specialties.find_by_name("other") == {"id": 2, "name": "Other"}
+    assert specialties.find_by_ids([3]) == {3: {"id": 3, "name": "Neurology"}}
+    assert len(calls) == 2
+    specialties.invalidate()
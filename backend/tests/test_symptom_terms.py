@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from datetime import date
+
+from utils import symptom_terms
+
+
+class _Cursor:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def executemany(self, sql, rows):
+        self.sink.extend(rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Conn:
+    def __init__(self):
+        self.rows = []
+        self.committed = False
+
+    def cursor(self):
+        return _Cursor(self.rows)
+
+    def commit(self):
+        self.committed = True
+
+
+def test_extract_terms_normalizes_and_dedupes():
+    assert symptom_terms.extract_terms("Headache;  FEVER\nheadache, , sore   throat") == [
+        "headache", "fever", "sore throat",
+    ]
+    assert symptom_terms.extract_terms("") == []
+    assert len(symptom_terms.extract_terms(",".join(f"t{i}" for i in range(30)))) == symptom_terms.MAX_TERMS_PER_CHECK
+
+
+def test_rebuild_counts_checks_per_day_and_term():
+    conn = _Conn()
+    logs = [
+        {"symptoms": "fever, cough", "created_at": date(2026, 5, 1)},
+        {"symptoms": "Fever; fever", "created_at": date(2026, 5, 1)},
+        {"symptoms": "cough", "created_at": date(2026, 5, 2)},
+    ]
+    assert symptom_terms.rebuild(logs, conn) == 3
+    assert conn.committed
+    assert sorted(conn.rows) == [
+        (date(2026, 5, 1), "cough", 1),
+        (date(2026, 5, 1), "fever", 2),
+        (date(2026, 5, 2), "cough", 1),
+    ]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from utils.symptom_triage import SymptomTriage, build_local_analysis
+
+
+def _engine():
+    from routes.symptoms import _TRIAGE
+
+    return _TRIAGE
+
+
+def test_common_phrasings_are_answered_with_high_confidence():
+    triage = _engine()
+
+    result = triage.triage("Sore throat and runny nose for 3 days")
+    assert result["recommended_specialty"] == "ENT"
+    assert result["urgency_level"] == "low"
+    assert result["confidence"] >= 0.75
+
+    result = triage.triage("I have a persistent cough")
+    assert result["recommended_specialty"] == "Pulmonology"
+    assert result["urgency_level"] == "medium"
+
+
+def test_red_flags_force_high_urgency_and_vague_text_is_low_confidence():
+    triage = _engine()
+
+    assert triage.triage("sudden chest pain spreading to my arm")["urgency_level"] == "high"
+    assert triage.triage("headache")["confidence"] < 0.75
+    assert triage.triage("what time is it")["is_medical"] is False
+
+
+def test_children_are_routed_to_pediatrics():
+    result = SymptomTriage().triage("fever and cough since yesterday", age=4)
+    assert result["recommended_specialty"] == "Pediatrics"
+
+
+def test_local_analysis_has_the_gemini_shape():
+    result = _engine().triage("itchy rash on my arm")
+    analysis = build_local_analysis(result, "Dermatology")
+
+    for key in ("is_medical", "recommended_specialty", "urgency_level", "summary", "reasoning", "red_flags", "next_steps", "disclaimer"):
+        assert key in analysis
+    assert analysis["source"] == "local"
+
+
+def test_non_medical_guard_uses_combined_patterns():
+    from routes.symptoms import _is_non_medical_request
+
+    assert _is_non_medical_request("can you help me with my python code") is True
+    assert _is_non_medical_request("my code review gave me a headache and fever") is False
+
+
+def test_negated_symptoms_and_red_flags_are_ignored():
+    triage = _engine()
+
+    result = triage.triage("I don't have chest pain, just a cough")
+    assert result["red_flags"] == []
+    assert result["urgency_level"] != "high"
+    assert result["recommended_specialty"] == "Pulmonology"
+    assert "chest pain" in result["negated_terms"]
+    assert result["confidence"] < 0.75  # goes to the model
+
+    result = triage.triage("No fever but I can't breathe")
+    assert result["red_flags"] == ["can't breathe"]
+    assert result["negated_terms"] == ["fever"]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import io
+import os
+
+import pytest
+
+from utils.uploads import UploadTooLarge, spool_upload
+
+
+def test_spool_upload_streams_to_disk_and_cleans_up(tmp_path, monkeypatch):
+    from config import Config
+
+    monkeypatch.setattr(Config, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    payload = os.urandom(3 * 1024 * 1024 + 17)
+
+    with spool_upload(io.BytesIO(payload), max_bytes=4 * 1024 * 1024, suffix=".pdf") as upload:
+        assert upload.size == len(payload)
+        assert upload.path.endswith(".pdf")
+        assert upload.read_bytes() == payload
+    assert upload.closed
+    assert list(tmp_path.iterdir()) == []
+
+    # Dropping the last reference (as a finished background job does) removes it too.
+    upload = spool_upload(io.BytesIO(b"abc"), max_bytes=10)
+    path = upload.path
+    del upload
+    assert not os.path.exists(path)
+
+    with pytest.raises(UploadTooLarge):
+        spool_upload(io.BytesIO(payload), max_bytes=1024 * 1024)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_report_upload_over_the_limit_is_rejected(monkeypatch, client, auth_header):
+    from config import Config
+
+    monkeypatch.setattr(Config, "MAX_FILE_SIZE", 1024)
+    data = {"file": (io.BytesIO(b"x" * 4096), "report.png")}
+    resp = client.post("/api/reports/ocr", data=data, headers=auth_header, content_type="multipart/form-data")
+
+    assert resp.status_code == 413
+    assert resp.get_json()["error"] == "File too large"
+
+
+def test_request_bodies_are_not_capped_app_wide():
+    # Streamed bulk imports can exceed MAX_FILE_SIZE; uploads enforce it per file.
+    from config import config
+
+    assert all(getattr(cfg, "MAX_CONTENT_LENGTH", None) is None for cfg in config.values())
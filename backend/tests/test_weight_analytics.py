@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+
+def _entries(n, start=date(2026, 1, 1), kg=90.0, per_day=-0.1):
+    return [(start + timedelta(days=i), kg + per_day * i) for i in range(n)]
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    from utils.weight_analytics import lttb
+
+    xs = list(range(100))
+    ys = [0.0] * 100
+    ys[37] = 10.0
+    keep = lttb(xs, ys, 10)
+
+    assert len(keep) == 10
+    assert keep[0] == 0 and keep[-1] == 99
+    assert 37 in keep
+    assert lttb(xs[:5], ys[:5], 10) == [0, 1, 2, 3, 4]
+
+
+def test_analytics_trend_buckets_and_projection():
+    from utils.weight_analytics import compute_analytics
+
+    entries = _entries(60)
+    out = compute_analytics(
+        entries,
+        goal={"target_weight_kg": 80.0, "target_date": "2026-12-31"},
+        window_days=7,
+        points=20,
+    )
+
+    assert out["summary"]["count"] == 60
+    assert len(out["series"]) == 20
+    assert out["rate"]["kg_per_week"] == -0.7
+    # 7-day trailing mean lags the latest value by 3 days of loss
+    assert out["summary"]["moving_avg_kg"] == round(84.1 + 0.3, 2)
+    assert sum(b["count"] for b in out["weekly"]) == 60
+    assert [b["start"] for b in out["monthly"]] == ["2026-01-01", "2026-02-01", "2026-03-01"]
+
+    projection = out["projection"]
+    assert projection["days_to_goal"] == 44
+    assert projection["on_track"] is True
+
+    gaining = compute_analytics(_entries(10, per_day=0.2), goal={"target_weight_kg": 80.0})
+    assert gaining["projection"]["eta"] is None
+
+
+def test_moving_average_python_path_matches(monkeypatch):
+    import utils.weight_analytics as wa
+
+    days = [1, 2, 4, 8, 9]
+    weights = [80.0, 81.0, 82.0, 83.0, 85.0]
+    expected = [80.0, 80.5, 81.0, 82.5, 84.0]
+
+    assert wa._moving_average(days, weights, 5) == expected
+    monkeypatch.setattr(wa, "np", None)
+    assert wa._moving_average(days, weights, 5) == expected
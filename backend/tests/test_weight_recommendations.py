@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+
+@pytest.fixture()
+def weight_client(monkeypatch):
+    import routes.weight_management as wm
+
+    calls = {"generate": 0, "submitted": []}
+    state = {
+        "params": {
+            "weight_kg": 80.0, "height_cm": 175.0, "age_years": 30, "bmi": 26.12,
+            "goal_target_weight_kg": 75.0, "goal_target_date": None,
+        },
+        "stored": None,
+    }
+
+    def fake_generate(**params):
+        calls["generate"] += 1
+        return {"ok": True, "payload": {"summary": [f"for {params['weight_kg']}"]}}
+
+    def fake_save(user_id, fp, payload):
+        state["stored"] = {"fingerprint": fp, "payload": payload, "generated_at": datetime(2026, 1, 1)}
+
+    def fake_submit(kind, fn, *, owner, kwargs, on_error):
+        calls["submitted"].append(kwargs)
+        return "job-1"
+
+    rec = wm.weight_recommendations
+    monkeypatch.setattr(wm, "generate_weight_recommendations", fake_generate)
+    monkeypatch.setattr(wm, "submit_job", fake_submit)
+    monkeypatch.setattr(rec, "suggestion_params", lambda user_id: dict(state["params"]))
+    monkeypatch.setattr(rec, "load", lambda user_id: state["stored"])
+    monkeypatch.setattr(rec, "save", fake_save)
+    monkeypatch.setattr(rec, "claim_refresh", lambda user_id, fp: True)
+
+    app = Flask(__name__)
+    app.config.update({"TESTING": True, "JWT_SECRET_KEY": "test-jwt-secret"})
+    JWTManager(app)
+    app.register_blueprint(wm.weight_management_bp, url_prefix="/api")
+    with app.app_context():
+        token = create_access_token(identity="7")
+    return app.test_client(), {"Authorization": f"Bearer {token}"}, calls, state
+
+
+def test_suggestions_reuse_then_revalidate(weight_client):
+    client, headers, calls, state = weight_client
+
+    first = client.post("/api/weight/suggestions", headers=headers)
+    assert first.status_code == 200
+    assert first.get_json()["cached"] is False
+    assert calls["generate"] == 1
+
+    again = client.post("/api/weight/suggestions", headers=headers).get_json()
+    assert again["cached"] is True and again["stale"] is False
+    assert calls["generate"] == 1
+
+    state["params"]["weight_kg"] = 79.0
+    stale = client.post("/api/weight/suggestions", headers=headers).get_json()
+    assert stale["stale"] is True
+    assert stale["recommendations"] == {"summary": ["for 80.0"]}
+    assert stale["job_id"] == "job-1"
+    assert calls["submitted"][0]["params"]["weight_kg"] == 79.0
+    assert calls["generate"] == 1
+
+
+def test_failed_refresh_releases_only_its_own_claim(monkeypatch):
+    import routes.weight_management as wm
+
+    released = []
+
+    def fail(**params):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(wm, "generate_weight_recommendations", fail)
+    monkeypatch.setattr(wm.weight_recommendations, "release_refresh", lambda user_id, fp: released.append((user_id, fp)))
+
+    with pytest.raises(RuntimeError):
+        wm._build_weight_suggestions(params={}, user_id=7, fingerprint="fp-old")
+    assert released == [(7, "fp-old")]
@@ -0,0 +1,155 @@
+"""Who is calling: role + id resolved once per request.
+
+Tokens issued at login/registration carry ``role`` and ``uid`` claims
+(``claims_for``), so handlers no longer guess the role from the identity
+string or look the caller up to find out what they are. Tokens issued
+before the claims existed still work: ``hospital_5`` / ``admin_3`` map to
+their role, and a bare numeric identity (users and doctors share that
+format) is accepted as whichever requested role actually has that id.
+
+"Does this account still exist" is still checked, but the answer is kept
+per worker for ``AUTH_CACHE_TTL_SECONDS`` so authorization doesn't cost a
+database round trip on every request. ``invalidate`` drops an entry early.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+from config import Config
+from utils.database import execute_query
+
+ROLES = ('user', 'doctor', 'admin', 'hospital')
+
+_EXISTS_QUERIES = {
+    'user': 'SELECT id FROM users WHERE id = %s',
+    'doctor': 'SELECT id FROM doctors WHERE id = %s',
+    'hospital': 'SELECT id FROM hospitals WHERE id = %s',
+    'admin': 'SELECT id FROM admins WHERE id = %s AND is_active = TRUE',
+}
+
+
+@dataclass(frozen=True)
+class AuthContext:
+    role: str
+    id: int
+
+
+def claims_for(role: str, entity_id) -> Dict:
+    """``additional_claims`` for ``create_access_token``."""
+    return {'role': role, 'uid': int(entity_id)}
+
+
+class _ExistenceCache:
+    def __init__(self, ttl_seconds: float = 60.0, max_keys: int = 10000):
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_keys = max(1, int(max_keys))
+        self._entries: Dict[Tuple[str, int], Tuple[bool, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, role: str, entity_id: int) -> Optional[bool]:
+        hit = self._entries.get((role, entity_id))
+        if hit is None or hit[1] < time.time():
+            return None
+        return hit[0]
+
+    def put(self, role: str, entity_id: int, exists: bool) -> None:
+        now = time.time()
+        with self._lock:
+            if len(self._entries) >= self.max_keys:
+                for k in [k for k, (_, exp) in self._entries.items() if exp < now]:
+                    del self._entries[k]
+                if len(self._entries) >= self.max_keys:
+                    self._entries.clear()
+            self._entries[(role, entity_id)] = (exists, now + self.ttl_seconds)
+
+    def invalidate(self, role: Optional[str] = None, entity_id: Optional[int] = None) -> None:
+        with self._lock:
+            if role is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((role, int(entity_id)), None)
+
+
+_cache = _ExistenceCache(Config.AUTH_CACHE_TTL_SECONDS, Config.AUTH_CACHE_MAX_KEYS)
+
+
+def principal_exists(role: str, entity_id: int) -> bool:
+    cached = _cache.get(role, entity_id)
+    if cached is not None:
+        return cached
+    row = execute_query(_EXISTS_QUERIES[role], (int(entity_id),), fetch_one=True)
+    _cache.put(role, entity_id, bool(row))
+    return bool(row)
+
+
+def invalidate(role: Optional[str] = None, entity_id: Optional[int] = None) -> None:
+    """Forget a cached existence answer (all of them when ``role`` is None)."""
+    _cache.invalidate(role, entity_id)
+
+
+def _from_identity(identity, roles: Iterable[str]) -> Optional[AuthContext]:
+    s = str(identity or '')
+    prefix, sep, rest = s.partition('_')
+    if sep and prefix in ROLES and rest.isdigit():
+        return AuthContext(prefix, int(rest))
+    if s.isdigit():
+        # Legacy user/doctor token: same id format for both tables.
+        for role in roles:
+            if role in ('user', 'doctor') and principal_exists(role, int(s)):
+                return AuthContext(role, int(s))
+    return None
+
+
+def current_auth(roles: Iterable[str] = ROLES) -> Optional[AuthContext]:
+    """The verified caller, or None. Call after the JWT has been verified."""
+    ctx = getattr(g, 'auth', None)
+    if ctx is not None:
+        return ctx
+    claims = get_jwt() or {}
+    role, uid = claims.get('role'), claims.get('uid')
+    if role in ROLES and isinstance(uid, int):
+        ctx = AuthContext(role, uid)
+    else:
+        ctx = _from_identity(get_jwt_identity(), roles)
+    if ctx is not None:
+        g.auth = ctx
+    return ctx
+
+
+def current_id(role: str) -> Optional[int]:
+    """Caller's id if their token resolves to ``role``, else None."""
+    ctx = current_auth((role,))
+    return ctx.id if ctx is not None and ctx.role == role else None
+
+
+def requires_role(*roles: str, check_exists: bool = True):
+    """Allow only callers whose token resolves to one of ``roles``.
+
+    The resolved ``AuthContext`` is available as ``g.auth`` in the view.
+    """
+    allowed = roles or ROLES
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                verify_jwt_in_request()
+            except Exception as e:
+                return jsonify({'error': 'Invalid or expired token', 'message': str(e)}), 401
+
+            ctx = current_auth(allowed)
+            if ctx is None:
+                return jsonify({'error': 'Invalid authentication identity'}), 401
+            if ctx.role not in allowed:
+                return jsonify({'error': 'Access denied for this account type'}), 403
+            if check_exists and not principal_exists(ctx.role, ctx.id):
+                return jsonify({'error': 'Account not found'}), 401
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
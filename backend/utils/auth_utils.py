@@ -1,17 +1,20 @@
-import bcrypt
 from functools import wraps
 from flask import jsonify, request
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 
+from utils.password_hashing import PasswordHashingBusy, get_password_hasher  # noqa: F401
+
 def hash_password(password):
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    """Hash a password using bcrypt (on the bounded hashing pool)"""
+    return get_password_hasher().hash(password)
 
 def verify_password(password, hashed_password):
-    """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    """Verify a password against its hash (on the bounded hashing pool)"""
+    return get_password_hasher().verify(password, hashed_password)
+
+def password_needs_rehash(hashed_password):
+    """True when the hash was made with a cost other than BCRYPT_ROUNDS"""
+    return get_password_hasher().needs_rehash(hashed_password)
 
 def jwt_required_custom(fn):
     """Custom JWT required decorator with error handling"""
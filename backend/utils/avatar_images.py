@@ -0,0 +1,109 @@
+"""Profile photo variants.
+
+An upload is decoded once, auto-rotated from its EXIF orientation,
+center-cropped to a square and re-encoded as WebP and JPEG at each of
+AVATAR_SIZES. Re-encoding drops EXIF/GPS and any other metadata. Files are
+named ``<hash>_<size>.<ext>`` where ``<hash>`` is the SHA-256 of the
+uploaded bytes, so a URL never changes content and can be cached forever,
+and re-uploading the same picture reuses the existing files.
+
+``users.photo_url`` stores ``/api/auth/user-photos/<hash>``; the size and
+format are picked per request (see ``variant_filename``).
+"""
+
+import hashlib
+import os
+import re
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+AVATAR_SIZES = (32, 64, 256)
+DEFAULT_AVATAR_SIZE = 256
+
+_HASH_LEN = 24
+_HASH_RE = re.compile(rf"^[0-9a-f]{{{_HASH_LEN}}}$")
+
+# Refuse decompression bombs well before Pillow's own (much larger) limit.
+_MAX_PIXELS = 40_000_000
+
+
+def is_photo_hash(name: str) -> bool:
+    return bool(_HASH_RE.match(name or ""))
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:_HASH_LEN]
+
+
+def pick_size(requested) -> int:
+    """Smallest stored size >= the requested one (largest if it exceeds them all)."""
+    try:
+        size = int(requested)
+    except (TypeError, ValueError):
+        return DEFAULT_AVATAR_SIZE
+    for candidate in AVATAR_SIZES:
+        if candidate >= size:
+            return candidate
+    return AVATAR_SIZES[-1]
+
+
+def variant_filename(photo_hash: str, size: int, webp: bool) -> str:
+    return f"{photo_hash}_{size}.{'webp' if webp else 'jpg'}"
+
+
+def save_variants(data: bytes, dest_dir: Path) -> str:
+    """Write every size/format variant of an uploaded image; return its hash.
+
+    Raises ValueError when the bytes are not a usable image and RuntimeError
+    when Pillow is not installed.
+    """
+    # Imported here rather than at module level: Pillow is only needed on
+    # upload, not for every worker start.
+    try:
+        from PIL import Image, ImageOps
+    except ImportError as exc:  # optional dependency
+        raise RuntimeError("Pillow is required for profile photos: pip install -r backend/requirements.txt") from exc
+
+    photo_hash = content_hash(data)
+    if all((dest_dir / variant_filename(photo_hash, s, w)).exists() for s in AVATAR_SIZES for w in (True, False)):
+        return photo_hash
+
+    try:
+        with Image.open(BytesIO(data)) as im:
+            if im.width * im.height > _MAX_PIXELS:
+                raise ValueError("Image dimensions are too large")
+            # JPEGs decode straight at reduced scale (1/2, 1/4, 1/8) when large.
+            im.draft(None, (AVATAR_SIZES[-1] * 2, AVATAR_SIZES[-1] * 2))
+            im = ImageOps.exif_transpose(im)
+            im.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError("Invalid image file") from e
+
+    has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+    im = im.convert("RGBA" if has_alpha else "RGB")
+    square = ImageOps.fit(im, (AVATAR_SIZES[-1], AVATAR_SIZES[-1]), method=Image.LANCZOS)
+
+    for size in AVATAR_SIZES:
+        resized = square if size == square.width else square.resize((size, size), Image.LANCZOS)
+        _write_atomic(dest_dir / variant_filename(photo_hash, size, True), resized, "WEBP", quality=82, method=4)
+        # JPEG has no alpha: flatten onto white.
+        if resized.mode == "RGBA":
+            flat = Image.new("RGB", resized.size, (255, 255, 255))
+            flat.paste(resized, mask=resized.getchannel("A"))
+            resized = flat
+        _write_atomic(
+            dest_dir / variant_filename(photo_hash, size, False),
+            resized, "JPEG", quality=85, optimize=True, progressive=True,
+        )
+    return photo_hash
+
+
+def _write_atomic(path: Path, image, fmt: str, **options) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    image.save(tmp, fmt, **options)
+    os.replace(tmp, path)
+
+
+def accepts_webp(accept_header: Optional[str]) -> bool:
+    return "image/webp" in (accept_header or "").lower()
@@ -0,0 +1,155 @@
+"""Live cross-hospital bed availability index.
+
+Maps a bed key ``(ward_type, ac_type, room_config)`` to the hospitals that
+currently have free beds for it, so "nearest hospital with a free ICU bed"
+doesn't have to scan every hospital's wards. Bed writes call
+``beds_changed()`` which refreshes that hospital's entries in place; a full
+reload (one covering-index scan of ``bed_wards``) happens every
+BED_AVAILABILITY_TTL_SECONDS to pick up writes made by other workers.
+
+The index is advisory: bookings still re-check ``bed_wards`` in the
+transaction that takes the bed.
+"""
+
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from config import Config
+from utils.database import get_db_connection
+from utils.occupancy_series import record_snapshot
+
+Key = Tuple[str, str, Optional[str]]
+
+# Same matching rules as user_bed_booking.create_bed_booking.
+_AC_AGNOSTIC_WARDS = {'icu', 'emergency'}
+_PRIVATE_ROOM = 'private_room'
+
+
+class AvailabilityIndex:
+    """(ward_type, ac_type, room_config) -> {hospital_id: available_beds}."""
+
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = float(ttl_seconds)
+        self._by_key: Dict[Key, Dict[int, int]] = {}
+        self._by_hospital: Dict[int, Set[Key]] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _put(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for r in rows:
+            available = int(r['available_beds'] or 0)
+            if available <= 0:
+                continue
+            hospital_id = int(r['hospital_id'])
+            key = (r['ward_type'], r['ac_type'] or 'not_applicable', r['room_config'] or None)
+            bucket = self._by_key.setdefault(key, {})
+            bucket[hospital_id] = bucket.get(hospital_id, 0) + available
+            self._by_hospital.setdefault(hospital_id, set()).add(key)
+
+    def _drop_hospital(self, hospital_id: int) -> None:
+        for key in self._by_hospital.pop(hospital_id, ()):
+            bucket = self._by_key.get(key)
+            if bucket is not None:
+                bucket.pop(hospital_id, None)
+                if not bucket:
+                    self._by_key.pop(key, None)
+
+    def load(self, conn) -> None:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT hospital_id, ward_type, ac_type, room_config, available_beds
+                FROM bed_wards
+                WHERE available_beds > 0
+            """)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        with self._lock:
+            self._by_key = {}
+            self._by_hospital = {}
+            self._put(rows)
+            self._loaded_at = time.time()
+
+    def refresh_hospital(self, conn, hospital_id: int) -> None:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT hospital_id, ward_type, ac_type, room_config, available_beds
+                FROM bed_wards
+                WHERE hospital_id = %s
+            """, (hospital_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        with self._lock:
+            self._drop_hospital(int(hospital_id))
+            self._put(rows)
+
+    def is_stale(self) -> bool:
+        return time.time() - self._loaded_at >= self.ttl_seconds
+
+    def hospitals_with_capacity(
+        self,
+        ward_type: str,
+        ac_type: Optional[str] = None,
+        room_config: Optional[str] = None,
+        min_beds: int = 1,
+    ) -> Dict[int, int]:
+        """Return ``{hospital_id: free_beds}`` for hospitals with at least ``min_beds``.
+
+        ICU/emergency ignore ``ac_type``; private rooms match on ``room_config``;
+        an omitted ``ac_type``/``room_config`` matches any.
+        """
+        if ward_type in _AC_AGNOSTIC_WARDS or ward_type == _PRIVATE_ROOM:
+            ac_type = None
+        if ward_type != _PRIVATE_ROOM:
+            room_config = None
+
+        out: Dict[int, int] = {}
+        with self._lock:
+            for (w, a, rc), bucket in self._by_key.items():
+                if w != ward_type:
+                    continue
+                if ac_type and a != ac_type:
+                    continue
+                if room_config and rc != room_config:
+                    continue
+                for hospital_id, available in bucket.items():
+                    out[hospital_id] = out.get(hospital_id, 0) + available
+        return {h: n for h, n in out.items() if n >= max(1, int(min_beds))}
+
+
+_index = AvailabilityIndex(ttl_seconds=Config.BED_AVAILABILITY_TTL_SECONDS)
+_reload_lock = threading.Lock()
+
+
+def get_availability_index(conn=None) -> AvailabilityIndex:
+    """Return the process-wide index, reloading it first when stale."""
+    if _index.is_stale():
+        with _reload_lock:
+            if _index.is_stale():
+                own = conn is None
+                conn = conn or get_db_connection()
+                try:
+                    _index.load(conn)
+                finally:
+                    if own:
+                        conn.close()
+    return _index
+
+
+def beds_changed(conn, hospital_id) -> None:
+    """Hook for bed writes: sample occupancy and refresh the availability index.
+
+    Best-effort, like ``record_snapshot``; never fails the calling request.
+    """
+    if not hospital_id:
+        return
+    record_snapshot(conn, hospital_id)
+    try:
+        _index.refresh_hospital(conn, int(hospital_id))
+    except Exception as e:
+        print(f"Bed availability refresh skipped for hospital {hospital_id}: {str(e)}", file=sys.stderr)
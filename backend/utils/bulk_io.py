@@ -0,0 +1,199 @@
+"""Helpers for bulk CSV / NDJSON imports.
+
+Records are streamed from the upload (never fully buffered), validated in
+batches and written with ``executemany`` inside one transaction per chunk.
+When a chunk fails as a whole it is retried row by row so that one bad row
+only rejects itself and the per-row error report stays accurate.
+"""
+
+import codecs
+import csv
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+_CSV_TYPES = {"text/csv", "application/csv", "text/plain"}
+_NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+
+
+def detect_format(explicit: Optional[str], content_type: Optional[str], filename: Optional[str]) -> Optional[str]:
+    fmt = (explicit or "").strip().lower()
+    if fmt in ("csv", "ndjson", "jsonl"):
+        return "csv" if fmt == "csv" else "ndjson"
+
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    if ctype in _CSV_TYPES:
+        return "csv"
+    if ctype in _NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+
+def iter_records(stream, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield ``(row_number, record, parse_error)`` from a binary stream.
+
+    Row numbers are 1-based data rows (the CSV header is not counted).
+    """
+
+    text = codecs.getreader("utf-8-sig")(stream, errors="replace")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for idx, row in enumerate(reader, start=1):
+            cleaned = {
+                (k or "").strip().lower(): (v.strip() if isinstance(v, str) else v)
+                for k, v in row.items()
+                if k is not None
+            }
+            yield idx, cleaned, None
+        return
+
+    idx = 0
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        idx += 1
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            yield idx, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(obj, dict):
+            yield idx, None, "Each line must be a JSON object"
+            continue
+        yield idx, {str(k).strip().lower(): v for k, v in obj.items()}, None
+
+
+def chunked(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BulkReport:
+    """Counters + capped per-row error list returned to the client."""
+
+    def __init__(self):
+        self.received = 0
+        self.valid = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._errors_truncated = False
+
+    def error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+        else:
+            self._errors_truncated = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "valid": self.valid,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self._errors_truncated,
+        }
+
+
+def write_chunk(
+    conn,
+    sql: str,
+    rows: List[Tuple[int, tuple]],
+    report: BulkReport,
+    *,
+    on_success: Callable[[int], None],
+) -> None:
+    """executemany ``rows`` (``(row_number, params)``) in one transaction.
+
+    ``on_success`` receives the number of rows written. On failure the chunk
+    is rolled back and replayed row by row to pinpoint the bad rows.
+    """
+
+    if not rows:
+        return
+
+    cursor = conn.cursor()
+    try:
+        try:
+            cursor.executemany(sql, [params for _, params in rows])
+            conn.commit()
+            on_success(len(rows))
+            return
+        except Exception:
+            conn.rollback()
+
+        for row_number, params in rows:
+            try:
+                cursor.execute(sql, params)
+                conn.commit()
+                on_success(1)
+            except Exception as e:
+                conn.rollback()
+                report.error(row_number, _db_error_message(e))
+    finally:
+        cursor.close()
+
+
+def _db_error_message(exc: Exception) -> str:
+    args = getattr(exc, "args", None)
+    if args and len(args) >= 2 and isinstance(args[1], str):
+        return args[1]
+    return str(exc)
+
+
+def parse_int(value: Any, field: str, *, minimum: Optional[int] = None, required: bool = False) -> Optional[int]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"{field} is required")
+        return None
+    try:
+        out = int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an integer")
+    if minimum is not None and out < minimum:
+        raise ValueError(f"{field} must be >= {minimum}")
+    return out
+
+
+def parse_float(value: Any, field: str, *, default: Optional[float] = None) -> Optional[float]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number")
+
+
+def parse_bool(value: Any, *, default: bool = False) -> bool:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def text_or_none(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    s = str(value).strip()
+    return s or None
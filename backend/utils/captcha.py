@@ -0,0 +1,198 @@
+"""Image captcha for the public registration forms.
+
+Rendering a challenge (noise, per-glyph drawing, blur, PNG encode) takes a
+few milliseconds of Pillow work, so challenges are pre-rendered into a pool
+that a background thread tops up; ``/api/auth/captcha`` just pops one.
+
+Issued captchas are not stored. The ``captcha_id`` handed to the client is
+a signed token ``<nonce>.<expires_at>.<mac>`` where the MAC covers the
+nonce, expiry, client IP and the expected answer, so any worker can verify
+it. Single use is enforced by claiming the nonce in the rate-limit store
+(shared across workers with ``RATE_LIMIT_BACKEND=database``).
+
+This is meant to deter naive scripts, not to be bot-proof.
+"""
+
+import base64
+import hashlib
+import hmac
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from io import BytesIO
+from typing import Optional, Tuple
+
+from config import Config
+from utils.rate_limit import get_rate_limiter
+
+_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # avoid ambiguous 0/O, 1/I
+
+
+def render_challenge() -> Tuple[str, str]:
+    """Random text rendered into a PNG with light noise: (answer, png_base64)."""
+    try:
+        from PIL import Image, ImageDraw, ImageFilter, ImageFont
+    except Exception as exc:
+        raise RuntimeError("Captcha image generation requires Pillow") from exc
+
+    text = "".join(_ALPHABET[secrets.randbelow(len(_ALPHABET))] for _ in range(5))
+
+    width, height = 180, 64
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+
+    # Font: try a common bundled font; fall back to PIL default.
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 34)
+    except Exception:
+        font = ImageFont.load_default()
+
+    # Background noise (lines)
+    for _ in range(6):
+        x1 = secrets.randbelow(width)
+        y1 = secrets.randbelow(height)
+        x2 = secrets.randbelow(width)
+        y2 = secrets.randbelow(height)
+        color = (secrets.randbelow(120), secrets.randbelow(120), secrets.randbelow(120))
+        draw.line((x1, y1, x2, y2), fill=color, width=2)
+
+    # Dots
+    for _ in range(120):
+        x = secrets.randbelow(width)
+        y = secrets.randbelow(height)
+        color = (secrets.randbelow(180), secrets.randbelow(180), secrets.randbelow(180))
+        draw.point((x, y), fill=color)
+
+    # Text (slightly jittered)
+    x = 18
+    for ch in text:
+        y = 10 + secrets.randbelow(12)
+        color = (secrets.randbelow(60), secrets.randbelow(60), secrets.randbelow(60))
+        draw.text((x, y), ch, font=font, fill=color)
+        x += 28 + secrets.randbelow(6)
+
+    # Gentle blur to make OCR a bit harder
+    img = img.filter(ImageFilter.GaussianBlur(radius=0.8))
+
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return text, base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+class CaptchaPool:
+    """Pre-rendered challenges, refilled in the background.
+
+    Each challenge is handed out once. When the pool runs dry (burst of
+    requests) a challenge is rendered inline, as before.
+    """
+
+    def __init__(self, size: int = 50, render=render_challenge):
+        self.size = max(0, int(size))
+        self._render = render
+        self._items: deque = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_thread(self) -> None:
+        # Started lazily so importing the module (and forking gunicorn workers)
+        # doesn't start threads.
+        if self._thread is None and self.size:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._refill_loop, name="pocketcare-captcha", daemon=True)
+                    self._thread.start()
+
+    def _refill_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while len(self._items) < self.size:
+                try:
+                    self._items.append(self._render())
+                except Exception as e:
+                    print(f"captcha pool refill failed: {e}", file=sys.stderr)
+                    time.sleep(5)
+                    break
+
+    def take(self) -> Tuple[str, str]:
+        self._ensure_thread()
+        try:
+            item = self._items.popleft()
+        except IndexError:
+            item = None
+        if len(self._items) < self.size // 2 or item is None:
+            self._wake.set()
+        return item if item is not None else self._render()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _mac(nonce: str, expires_at: int, ip: str, answer: str) -> str:
+    key = (Config.SECRET_KEY or "").encode("utf-8")
+    msg = f"captcha|{nonce}|{expires_at}|{ip}|{answer}".encode("utf-8")
+    return hmac.new(key, msg, hashlib.sha256).hexdigest()[:32]
+
+
+class CaptchaService:
+    def __init__(self, pool: CaptchaPool, ttl_seconds: int = 300):
+        self.pool = pool
+        self.ttl_seconds = int(ttl_seconds)
+
+    def issue(self, ip: str) -> dict:
+        answer, png_b64 = self.pool.take()
+        nonce = secrets.token_urlsafe(12)
+        expires_at = int(time.time()) + self.ttl_seconds
+        token = f"{nonce}.{expires_at}.{_mac(nonce, expires_at, ip or '', answer.upper())}"
+        return {
+            'captcha_id': token,
+            'image_base64': png_b64,
+            'mime_type': 'image/png',
+            'expires_in_seconds': self.ttl_seconds,
+        }
+
+    def verify(self, captcha_id: str, captcha_answer, ip: str) -> Tuple[bool, str]:
+        cid = (captcha_id or '').strip()
+        if not cid:
+            return False, 'Missing captcha_id'
+
+        provided = ("" if captcha_answer is None else str(captcha_answer)).strip().upper()
+        if not provided:
+            return False, 'Invalid captcha answer'
+
+        try:
+            nonce, expires_raw, mac = cid.split('.')
+            expires_at = int(expires_raw)
+        except ValueError:
+            return False, 'Captcha expired or invalid'
+        if expires_at < time.time():
+            return False, 'Captcha expired or invalid'
+
+        # The MAC binds the token to the client IP and the expected answer, so
+        # a wrong answer and a token replayed from another IP look the same.
+        if not hmac.compare_digest(mac, _mac(nonce, expires_at, ip or '', provided)):
+            return False, 'Incorrect captcha'
+
+        # One-time use.
+        if not get_rate_limiter().claim_once(f"captcha:{nonce}", self.ttl_seconds):
+            return False, 'Captcha already used'
+        return True, ''
+
+
+_service: Optional[CaptchaService] = None
+_service_lock = threading.Lock()
+
+
+def get_captcha_service() -> CaptchaService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = CaptchaService(
+                    CaptchaPool(Config.CAPTCHA_POOL_SIZE),
+                    ttl_seconds=Config.CAPTCHA_TTL_SECONDS,
+                )
+    return _service
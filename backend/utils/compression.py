@@ -0,0 +1,85 @@
+"""gzip / brotli compression for API responses.
+
+Registered once in ``create_app``. A response is compressed when the client
+accepts it, it is a buffered (not streamed) text-like body such as JSON, and
+it is at least COMPRESS_MIN_SIZE bytes. Brotli is preferred when the
+``brotli`` package is installed; gzip from the standard library otherwise.
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+_COMPRESSIBLE = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def _accepted(header: str) -> set:
+    accepted = set()
+    for part in (header or "").lower().split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    accepted = _accepted(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return ""
+
+
+def compress(data: bytes, encoding: str, *, gzip_level: int = 6, br_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=br_quality)
+    # mtime=0 keeps the output deterministic (stable ETags, cache-friendly).
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def init_compression(app) -> None:
+    min_size = int(app.config.get("COMPRESS_MIN_SIZE", 1024))
+    gzip_level = int(app.config.get("COMPRESS_LEVEL", 6))
+    br_quality = int(app.config.get("COMPRESS_BR_QUALITY", 4))
+
+    @app.after_request
+    def _compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or not (response.mimetype or "").startswith(_COMPRESSIBLE)
+        ):
+            return response
+
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        response.vary.add("Accept-Encoding")
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(compress(data, encoding, gzip_level=gzip_level, br_quality=br_quality))
+        response.headers["Content-Encoding"] = encoding
+        # The body changed, so a strong validator no longer matches byte-for-byte.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -1,4 +1,25 @@
 import os
+from functools import lru_cache
+
+from utils.medical_text import NON_MEDICAL_MESSAGE, is_obviously_non_medical
+
+# Bump when the weight recommendation prompt or output shape changes so
+# stored recommendations are regenerated.
+WEIGHT_PROMPT_VERSION = "weight-v1"
+
+
+@lru_cache(maxsize=4)
+def _client(api_key: str):
+    # genai.Client sets up an HTTP session; reuse it across calls.
+    from google import genai
+
+    # Bounded so a stalled call can't outlive the gunicorn worker timeout.
+    timeout_ms = int(os.getenv("AI_REQUEST_TIMEOUT_SECONDS", "60")) * 1000
+    try:
+        return genai.Client(api_key=api_key, http_options={"timeout": timeout_ms})
+    except (TypeError, ValueError):
+        # Older google-genai without a per-client timeout.
+        return genai.Client(api_key=api_key)
 
 
 def generate_weight_recommendations(
@@ -16,13 +37,11 @@ def generate_weight_recommendations(
     Returns a dict with either a parsed JSON payload or a fallback text payload.
     """
 
-    from google import genai
-
     api_key = (os.getenv("GEMINI_API_KEY") or "").strip()
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY is not set")
 
-    client = genai.Client(api_key=api_key)
+    client = _client(api_key)
 
     goal_bits = []
     if goal_target_weight_kg is not None:
@@ -78,19 +97,124 @@ def generate_weight_recommendations(
         return {"ok": True, "payload": {"text": raw, "disclaimer": "General information only; not medical advice."}}
 
 
+_CLASSIFIER_RULES = (
+    "MEDICAL documents: lab reports, blood tests, X-rays, MRI/CT scans, "
+    "prescriptions, medical bills from hospitals/clinics, discharge summaries, doctor's notes, "
+    "pathology reports, vaccination records, health insurance claims, medical certificates, "
+    "or any document directly related to patient healthcare or medical diagnosis.\n\n"
+    "NON-MEDICAL documents: regular invoices, shopping receipts, calendars, "
+    "event notices, personal letters, academic transcripts, ID cards, travel tickets, "
+    "utility bills, tax forms, bank statements, resumes, contracts, or any document "
+    "that is NOT directly related to medical/healthcare purposes.\n\n"
+    "IMPORTANT: Be strict. If you are unsure or the document is ambiguous, treat it as non-medical.\n\n"
+)
+
+# (json key, heading) in output order; rendered back to the numbered text
+# format the frontend already displays.
+_TEXT_SECTIONS = (
+    ("summary", "Summary"),
+    ("key_details", "Key details"),
+    ("next_steps", "Next steps"),
+)
+
+_FILE_SECTIONS = (
+    ("summary", "Summary"),
+    ("key_details", "Key details"),
+    ("notable_findings", "Notable findings"),
+    ("next_steps", "Next steps"),
+)
+
+
+def _envelope_instructions(sections) -> str:
+    keys = ", ".join(f'"{key}": ["..."]' for key, _ in sections)
+    return (
+        "Return STRICT JSON only, with this shape:\n"
+        "{\n"
+        '  "is_medical": true | false,\n'
+        '  "rejection_message": null | "This appears to be a [document type]. Only health-related documents like lab reports, prescriptions, or medical records can be simplified here.",\n'
+        f'  "sections": {{{keys}}}\n'
+        "}\n"
+        "If the document is NOT medical set is_medical to false, fill rejection_message and leave sections empty.\n"
+    )
+
+
+def _parse_envelope(raw: str) -> dict | None:
+    import json
+
+    cleaned = (raw or "").strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`")
+        cleaned = cleaned.replace("json\n", "", 1)
+        cleaned = cleaned.strip()
+    try:
+        payload = json.loads(cleaned)
+    except Exception:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _render_envelope(raw: str, sections) -> str:
+    """Turn the model's JSON envelope into the numbered-bullets explanation.
+
+    Raises ValueError (with the model's rejection message) for non-medical
+    documents. Falls back to the raw text when the model ignored the schema.
+    """
+
+    envelope = _parse_envelope(raw)
+    if envelope is None:
+        text = (raw or "").strip()
+        if text.upper().startswith("NOT_MEDICAL"):
+            raise ValueError(text.split(":", 1)[-1].strip() or NON_MEDICAL_MESSAGE)
+        return text
+
+    if not envelope.get("is_medical"):
+        raise ValueError((envelope.get("rejection_message") or "").strip() or NON_MEDICAL_MESSAGE)
+
+    body = envelope.get("sections") or {}
+    if isinstance(body, (list, str)):
+        # Model returned bare bullets instead of named sections.
+        body = {sections[0][0]: body}
+    elif not isinstance(body, dict):
+        body = {}
+    blocks = []
+    for key, heading in sections:
+        items = body.get(key) or []
+        if isinstance(items, str):
+            items = [items]
+        if not isinstance(items, list):
+            continue
+        lines = [f"- {str(item).strip()}" for item in items if str(item).strip()]
+        if lines:
+            blocks.append(f"{len(blocks) + 1}) {heading}\n" + "\n".join(lines))
+    if not blocks:
+        raise RuntimeError("Empty response from Gemini")
+    return "\n\n".join(blocks)
+
+
+def _json_config(types_mod):
+    try:
+        return types_mod.GenerateContentConfig(response_mime_type="application/json")
+    except Exception:
+        return None
+
+
 def simplify_ocr_text(ocr_text: str, *, model: str = "gemini-3-flash-preview") -> str:
     if not (ocr_text or "").strip():
         raise ValueError("OCR text is empty")
 
+    # Obvious receipts/tickets/etc. never reach Gemini.
+    if is_obviously_non_medical(ocr_text):
+        raise ValueError(NON_MEDICAL_MESSAGE)
+
     # Late import so the backend can still start without Gemini deps
     # unless this feature is called.
-    from google import genai
+    from google.genai import types
 
     api_key = (os.getenv("GEMINI_API_KEY") or "").strip()
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY is not set")
 
-    client = genai.Client(api_key=api_key)
+    client = _client(api_key)
 
     # Guardrail against very large OCR dumps
     max_chars = 20000
@@ -98,58 +222,28 @@ def simplify_ocr_text(ocr_text: str, *, model: str = "gemini-3-flash-preview") -
     if len(trimmed) > max_chars:
         trimmed = trimmed[:max_chars] + "\n\n[TRUNCATED]"
 
-    # First, validate if the document is medical-related
-    validation_prompt = (
-        "You are a strict document classifier. Analyze the following OCR text and determine if it is from a MEDICAL/HEALTHCARE document.\n\n"
-        "MEDICAL documents: lab reports, blood tests, X-rays, MRI/CT scans, "
-        "prescriptions, medical bills from hospitals/clinics, discharge summaries, doctor's notes, "
-        "pathology reports, vaccination records, health insurance claims, medical certificates, "
-        "or any document directly related to patient healthcare or medical diagnosis.\n\n"
-        "NON-MEDICAL documents: regular invoices, shopping receipts, calendars, "
-        "event notices, personal letters, academic transcripts, ID cards, travel tickets, "
-        "utility bills, tax forms, bank statements, resumes, contracts, or any document "
-        "that is NOT directly related to medical/healthcare purposes.\n\n"
-        "IMPORTANT: Be strict. If you are unsure or the document is ambiguous, treat it as non-medical.\n\n"
-        "If this IS a medical document, respond with exactly: MEDICAL\n"
-        "If this is NOT a medical document, respond with a helpful message in this format:\n"
-        "NOT_MEDICAL: This appears to be a [document type]. Only health-related documents like lab reports, prescriptions, or medical records can be simplified here.\n\n"
-        f"OCR TEXT:\n{trimmed}"
-    )
-
-    validation_response = client.models.generate_content(model=model, contents=validation_prompt)
-    validation_text = (getattr(validation_response, "text", None) or "").strip()
-    
-    # Only proceed if the response is clearly MEDICAL
-    if not validation_text.upper().startswith("MEDICAL"):
-        # Extract the AI-generated message or use a default
-        if validation_text.upper().startswith("NOT_MEDICAL:"):
-            error_msg = validation_text[len("NOT_MEDICAL:"):].strip()
-        else:
-            error_msg = "Only health-related documents can be simplified. Please upload a medical document such as a lab report, prescription, X-ray, or diagnosis report."
-        raise ValueError(error_msg)
-
-    # Proceed with medical report simplification
+    # Classification and simplification in a single call.
     prompt = (
-        "You are a helpful medical assistant.\n"
-        "Rewrite the following OCR text from a medical document into a simple, easy-to-understand explanation.\n"
+        "You are a helpful medical assistant and a strict document classifier.\n"
+        "First decide whether the following OCR text is from a MEDICAL/HEALTHCARE document.\n\n"
+        + _CLASSIFIER_RULES
+        + "If it IS medical, rewrite it into a simple, easy-to-understand explanation.\n"
         "Rules:\n"
         "- Use plain language and short bullet points.\n"
         "- Do NOT invent details that are not present.\n"
         "- Do NOT provide a diagnosis.\n"
         "- If there are abnormal lab values or urgent warnings explicitly stated, highlight them as 'Important'.\n"
-        "Output format:\n"
-        "1) Summary (2-4 bullets)\n"
-        "2) Key details (bullets)\n"
-        "3) Next steps (2-4 bullets, general and safe)\n\n"
-        "OCR TEXT:\n"
+        "Sections: summary (2-4 bullets), key_details (bullets), next_steps (2-4 bullets, general and safe).\n\n"
+        + _envelope_instructions(_TEXT_SECTIONS)
+        + "\nOCR TEXT:\n"
         f"{trimmed}"
     )
 
-    response = client.models.generate_content(model=model, contents=prompt)
+    response = client.models.generate_content(model=model, contents=prompt, config=_json_config(types))
     text = getattr(response, "text", None)
     if not text:
         raise RuntimeError("Empty response from Gemini")
-    return text.strip()
+    return _render_envelope(text, _TEXT_SECTIONS)
 
 
 def explain_bytes_with_gemini(
@@ -161,6 +255,7 @@ def explain_bytes_with_gemini(
     """Analyze an image/PDF directly with Gemini for better layout-aware extraction.
 
     This is intended for medical report understanding where tables/columns matter.
+    The file is uploaded once; classification and explanation share the call.
     """
 
     if not file_bytes:
@@ -168,62 +263,28 @@ def explain_bytes_with_gemini(
     if not (mime_type or "").strip():
         raise ValueError("mime_type is required")
 
-    from google import genai
     from google.genai import types
 
     api_key = (os.getenv("GEMINI_API_KEY") or "").strip()
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY is not set")
 
-    client = genai.Client(api_key=api_key)
-
-    # First, validate if the document is medical-related
-    validation_prompt = (
-        "You are a strict document classifier. Analyze the attached document and determine if it is a MEDICAL/HEALTHCARE document.\n\n"
-        "MEDICAL documents: lab reports, blood tests, X-rays, MRI/CT scans, "
-        "prescriptions, medical bills from hospitals/clinics, discharge summaries, doctor's notes, "
-        "pathology reports, vaccination records, health insurance claims, medical certificates, "
-        "or any document directly related to patient healthcare or medical diagnosis.\n\n"
-        "NON-MEDICAL documents: regular invoices, shopping receipts, calendars, "
-        "event notices, personal letters, academic transcripts, ID cards, travel tickets, "
-        "utility bills, tax forms, bank statements, resumes, contracts, or any document "
-        "that is NOT directly related to medical/healthcare purposes.\n\n"
-        "IMPORTANT: Be strict. If you are unsure or the document is ambiguous, treat it as non-medical.\n\n"
-        "If this IS a medical document, respond with exactly: MEDICAL\n"
-        "If this is NOT a medical document, respond with a helpful message in this format:\n"
-        "NOT_MEDICAL: This appears to be a [document type]. Only health-related documents like lab reports, prescriptions, or medical records can be simplified here."
-    )
-
-    validation_contents = [
-        types.Part.from_text(validation_prompt),
-        types.Part.from_bytes(data=file_bytes, mime_type=mime_type),
-    ]
+    client = _client(api_key)
 
-    validation_response = client.models.generate_content(model=model, contents=validation_contents)
-    validation_text = (getattr(validation_response, "text", None) or "").strip()
-    
-    # Only proceed if the response is clearly MEDICAL
-    if not validation_text.upper().startswith("MEDICAL"):
-        # Extract the AI-generated message or use a default
-        if validation_text.upper().startswith("NOT_MEDICAL:"):
-            error_msg = validation_text[len("NOT_MEDICAL:"):].strip()
-        else:
-            error_msg = "Only health-related documents can be simplified. Please upload a medical document such as a lab report, prescription, X-ray, or diagnosis report."
-        raise ValueError(error_msg)
-
-    # Proceed with medical report analysis
     prompt = (
-        "You are a helpful medical assistant. Analyze the attached medical report file.\n"
+        "You are a helpful medical assistant and a strict document classifier.\n"
+        "First decide whether the attached document is a MEDICAL/HEALTHCARE document.\n\n"
+        + _CLASSIFIER_RULES
+        + "If it IS medical, analyze the attached medical report file.\n"
         "Rules:\n"
         "- Be accurate with numbers and units; keep them tied to the correct labels/rows/columns.\n"
         "- If a value is unclear/blurred, say so instead of guessing.\n"
         "- Do NOT invent details not present.\n"
         "- Do NOT provide a diagnosis or medication guidance.\n"
-        "Output format:\n"
-        "1) Summary (1-3 bullets)\n"
-        "2) Key details (bullets; include dates, test names, and measured values)\n"
-        "3) Notable findings (bullets; highlight abnormal/flagged values only if shown)\n"
-        "4) Next steps (2-4 bullets; general and safe)\n"
+        "Sections: summary (1-3 bullets), key_details (bullets; include dates, test names, and measured values), "
+        "notable_findings (bullets; highlight abnormal/flagged values only if shown), "
+        "next_steps (2-4 bullets; general and safe).\n\n"
+        + _envelope_instructions(_FILE_SECTIONS)
     )
 
     contents = [
@@ -231,8 +292,57 @@ def explain_bytes_with_gemini(
         types.Part.from_bytes(data=file_bytes, mime_type=mime_type),
     ]
 
-    response = client.models.generate_content(model=model, contents=contents)
+    response = client.models.generate_content(model=model, contents=contents, config=_json_config(types))
+    text = getattr(response, "text", None)
+    if not text:
+        raise RuntimeError("Empty response from Gemini")
+    return _render_envelope(text, _FILE_SECTIONS)
+
+
+def extract_lab_values_with_gemini(lines: list[str], *, model: str = "gemini-3-flash-preview") -> list[dict]:
+    """Read test name / value / unit / reference range from lab-report lines.
+
+    Only used for lines the local regex tables couldn't parse (see
+    ``utils.lab_results``); the caller validates every item against the text.
+    """
+
+    if not lines:
+        return []
+
+    from google.genai import types
+
+    api_key = (os.getenv("GEMINI_API_KEY") or "").strip()
+    if not api_key:
+        raise RuntimeError("GEMINI_API_KEY is not set")
+
+    client = _client(api_key)
+
+    prompt = (
+        "Extract lab test results from these lines of an OCR'd medical lab report.\n"
+        "Rules:\n"
+        "- One item per measured test; skip headers, comments and lines without a result.\n"
+        "- Copy numbers exactly as printed. Do NOT guess or convert units.\n"
+        "- ref_low / ref_high are the printed reference range bounds (null if absent).\n"
+        "Return STRICT JSON only: a list of objects with keys "
+        '"line" (the input line, verbatim), "name", "value" (number), "unit" (string or null), '
+        '"ref_low" (number or null), "ref_high" (number or null).\n\n'
+        "LINES:\n" + "\n".join(lines)
+    )
+
+    response = client.models.generate_content(model=model, contents=prompt, config=_json_config(types))
     text = getattr(response, "text", None)
     if not text:
         raise RuntimeError("Empty response from Gemini")
-    return text.strip()
+
+    import json
+
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`").replace("json\n", "", 1).strip()
+    try:
+        payload = json.loads(cleaned)
+    except Exception:
+        return []
+    if isinstance(payload, dict):
+        payload = payload.get("results") or payload.get("items") or []
+    return payload if isinstance(payload, list) else []
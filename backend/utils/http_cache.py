@@ -0,0 +1,106 @@
+"""Conditional GET (ETag / Last-Modified) for read-mostly endpoints.
+
+``conditional_get`` wraps a view with a cheap *version* lookup - usually one
+indexed ``SELECT MAX(updated_at), COUNT(*) ...`` - that runs before the view.
+The version is hashed into a strong ETag, so a client that already holds the
+current representation gets a bodiless 304 without the view querying or
+serializing anything. On a miss the view runs as usual and the validators
+are attached to its response.
+
+    @bp.route('/specialties')
+    @conditional_get(specialties_version, max_age=300, public=True)
+    def list_specialties(): ...
+
+The version function receives the view's URL arguments and returns a tuple
+(datetimes in it also feed ``Last-Modified``), or None to skip caching for
+that request (e.g. the row does not exist - let the view return its 404).
+"""
+
+import hashlib
+import sys
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from flask import current_app, make_response, request
+
+from utils.database import execute_query
+
+
+def _etag_for(version: Any) -> str:
+    raw = f"{request.path}?{request.query_string.decode('latin-1')}|{version!r}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _last_modified(version: Any) -> Optional[datetime]:
+    stamps = [v for v in (version if isinstance(version, tuple) else (version,)) if isinstance(v, datetime)]
+    if not stamps:
+        return None
+    # MySQL TIMESTAMPs come back naive in the server's local time.
+    return max(stamps).astimezone(timezone.utc)
+
+
+def _cache_control(response, max_age: int, public: bool) -> None:
+    response.cache_control.public = public
+    response.cache_control.private = not public
+    if max_age > 0:
+        response.cache_control.max_age = max_age
+    else:
+        # Keep it, but revalidate (cheap: a version lookup) before every reuse.
+        response.cache_control.no_cache = True
+
+
+def conditional_get(version_fn: Callable[..., Any], *, max_age: int = 0, public: bool = False):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return fn(*args, **kwargs)
+
+            try:
+                version = version_fn(**kwargs)
+            except Exception as e:
+                # Missing column before fix_database has run, DB hiccup, ... -
+                # serve the response without validators rather than fail.
+                print(f"conditional_get version lookup failed for {request.path}: {e}", file=sys.stderr)
+                version = None
+            if version is None:
+                return fn(*args, **kwargs)
+
+            etag = _etag_for(version)
+            last_modified = _last_modified(version)
+
+            not_modified = False
+            if request.if_none_match:
+                # Weak comparison: compression turns our strong tag into W/"...".
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif request.if_modified_since and last_modified:
+                not_modified = last_modified.replace(microsecond=0) <= request.if_modified_since
+
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            _cache_control(response, max_age, public)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# --- Version lookups shared by several endpoints ---
+
+
+def specialties_version(**_):
+    row = execute_query(
+        "SELECT COUNT(*) AS n, MAX(id) AS max_id, MAX(updated_at) AS updated_at FROM specialties",
+        fetch_one=True,
+    )
+    return (row["n"], row["max_id"], row["updated_at"]) if row else None
@@ -0,0 +1,439 @@
+"""Background job queue for slow AI / OCR work.
+
+Endpoints that call Tesseract or Gemini can hand their work to
+``submit_job`` and answer ``202 + job_id`` straight away; clients poll
+``GET /api/jobs/<job_id>`` (see ``routes/jobs.py``) for the result.
+
+Jobs run on an in-process thread pool. Job state lives in a pluggable
+store selected by ``JOB_QUEUE_BACKEND``:
+
+- ``memory`` (default): a dict guarded by a lock. Fine for a single process.
+- ``database``: the ``background_jobs`` table, so any gunicorn worker can
+  answer the status poll, not just the one that accepted the upload.
+
+Finished jobs are kept for ``JOB_RESULT_TTL_SECONDS`` and then pruned.
+"""
+
+import json
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+_TERMINAL = {JOB_SUCCEEDED, JOB_FAILED}
+
+# Errors caused by bad input will fail the same way again; don't retry them.
+_NON_RETRYABLE = (ValueError, TypeError, KeyError, PermissionError, ImportError)
+
+# RuntimeErrors that mean the server is misconfigured (missing API key,
+# missing OCR dependency): retrying can't help either.
+_CONFIG_ERROR_MARKERS = ("is not set", "not configured", "dependencies missing", "requires ")
+
+# background_jobs.message is VARCHAR(255).
+MESSAGE_MAX_LENGTH = 255
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, _NON_RETRYABLE):
+        return False
+    if isinstance(exc, RuntimeError):
+        text = str(exc)
+        return not any(marker in text for marker in _CONFIG_ERROR_MARKERS)
+    return True
+
+
+def _message(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    text = str(text)
+    return text if len(text) <= MESSAGE_MAX_LENGTH else text[: MESSAGE_MAX_LENGTH - 3] + "..."
+
+
+def _now() -> datetime:
+    return datetime.now()
+
+
+def _iso(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        return value.isoformat()
+    except Exception:
+        return str(value)
+
+
+class MemoryJobStore:
+    """Process-local job store."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+                job["updated_at"] = _now()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def prune(self) -> int:
+        now = _now()
+        with self._lock:
+            expired = [
+                jid
+                for jid, job in self._jobs.items()
+                if job.get("expires_at") is not None and job["expires_at"] <= now
+            ]
+            for jid in expired:
+                self._jobs.pop(jid, None)
+        return len(expired)
+
+
+class DatabaseJobStore:
+    """Job store backed by the ``background_jobs`` table."""
+
+    _COLUMNS = (
+        "id",
+        "kind",
+        "owner",
+        "status",
+        "progress",
+        "message",
+        "attempts",
+        "result",
+        "error",
+        "status_code",
+        "created_at",
+        "updated_at",
+        "expires_at",
+    )
+
+    def create(self, job: Dict[str, Any]) -> None:
+        from utils.database import execute_query
+
+        execute_query(
+            """
+            INSERT INTO background_jobs (id, kind, owner, status, progress, message, attempts, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (
+                job["id"],
+                job["kind"],
+                job["owner"],
+                job["status"],
+                job["progress"],
+                job.get("message"),
+                job["attempts"],
+                job["created_at"],
+                job["updated_at"],
+            ),
+            commit=True,
+        )
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        from utils.database import execute_query
+
+        fields["updated_at"] = _now()
+        for key in ("result", "error"):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key], ensure_ascii=False, default=str)
+        cols = [c for c in fields if c in self._COLUMNS and c != "id"]
+        if not cols:
+            return
+        assignments = ", ".join(f"{c} = %s" for c in cols)
+        execute_query(
+            f"UPDATE background_jobs SET {assignments} WHERE id = %s",
+            tuple(fields[c] for c in cols) + (job_id,),
+            commit=True,
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        from utils.database import execute_query
+
+        row = execute_query(
+            f"SELECT {', '.join(self._COLUMNS)} FROM background_jobs WHERE id = %s LIMIT 1",
+            (job_id,),
+            fetch_one=True,
+        )
+        if not row:
+            return None
+        for key in ("result", "error"):
+            if row.get(key):
+                try:
+                    row[key] = json.loads(row[key])
+                except Exception:
+                    pass
+        return row
+
+    def prune(self) -> int:
+        from utils.database import get_db_connection
+
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                deleted = cursor.execute(
+                    "DELETE FROM background_jobs WHERE expires_at IS NOT NULL AND expires_at <= %s",
+                    (_now(),),
+                )
+            conn.commit()
+            return int(deleted or 0)
+        finally:
+            conn.close()
+
+
+class JobQueue:
+    """Thread pool + job store with retries, progress and result TTL."""
+
+    def __init__(
+        self,
+        store=None,
+        *,
+        max_workers: int = 4,
+        result_ttl_seconds: int = 3600,
+        max_retries: int = 2,
+        retry_backoff_seconds: float = 2.0,
+        prune_interval_seconds: float = 60.0,
+    ):
+        self.store = store or MemoryJobStore()
+        self.max_workers = max(1, int(max_workers))
+        self.result_ttl_seconds = int(result_ttl_seconds)
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff_seconds = float(retry_backoff_seconds)
+        self.prune_interval_seconds = float(prune_interval_seconds)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created lazily so importing the module (and forking gunicorn workers)
+        # doesn't start threads.
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="pocketcare-job"
+                    )
+        return self._executor
+
+    def _maybe_prune(self) -> None:
+        now = time.time()
+        if now - self._last_prune < self.prune_interval_seconds:
+            return
+        self._last_prune = now
+        try:
+            self.store.prune()
+        except Exception:
+            pass
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[..., Any],
+        *,
+        owner: str,
+        kwargs: Optional[Dict[str, Any]] = None,
+        on_error: Optional[Callable[[Exception], Tuple[Dict[str, Any], int]]] = None,
+        app=None,
+        max_retries: Optional[int] = None,
+    ) -> str:
+        """Queue ``fn(**kwargs, progress=callback)`` and return the job id.
+
+        ``fn`` must return a JSON-serializable value. ``on_error`` maps a
+        final exception to ``(error_payload, http_status)`` so the poll
+        endpoint can report the same error the synchronous endpoint would.
+        When ``app`` is given the job runs inside its app context.
+        """
+
+        self._maybe_prune()
+
+        job_id = uuid.uuid4().hex
+        now = _now()
+        self.store.create(
+            {
+                "id": job_id,
+                "kind": kind,
+                "owner": str(owner),
+                "status": JOB_QUEUED,
+                "progress": 0,
+                "message": None,
+                "attempts": 0,
+                "result": None,
+                "error": None,
+                "status_code": None,
+                "created_at": now,
+                "updated_at": now,
+                "expires_at": None,
+            }
+        )
+
+        retries = self.max_retries if max_retries is None else max(0, int(max_retries))
+        self._pool().submit(self._run, job_id, fn, dict(kwargs or {}), on_error, app, retries)
+        return job_id
+
+    def _run(self, job_id, fn, kwargs, on_error, app, retries) -> None:
+        if app is not None:
+            with app.app_context():
+                self._run_attempts(job_id, fn, kwargs, on_error, retries)
+        else:
+            self._run_attempts(job_id, fn, kwargs, on_error, retries)
+
+    def _run_attempts(self, job_id, fn, kwargs, on_error, retries) -> None:
+        def progress(percent: int, message: Optional[str] = None) -> None:
+            try:
+                self.store.update(
+                    job_id, progress=max(0, min(int(percent), 100)), message=_message(message)
+                )
+            except Exception:
+                pass
+
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                self.store.update(job_id, status=JOB_RUNNING, attempts=attempt)
+                try:
+                    result = fn(progress=progress, **kwargs)
+                except Exception as exc:
+                    if attempt <= retries and _is_retryable(exc):
+                        self.store.update(
+                            job_id,
+                            status=JOB_QUEUED,
+                            message=_message(f"Retrying after error: {exc}"),
+                        )
+                        time.sleep(self.retry_backoff_seconds * (2 ** (attempt - 1)))
+                        continue
+                    self._fail(job_id, exc, on_error)
+                    return
+
+                self.store.update(
+                    job_id,
+                    status=JOB_SUCCEEDED,
+                    progress=100,
+                    message=None,
+                    result=result,
+                    status_code=200,
+                    expires_at=_now() + timedelta(seconds=self.result_ttl_seconds),
+                )
+                return
+        except Exception as exc:
+            # The job store itself failed (e.g. the database went away). Try
+            # once to record the failure so the job doesn't stay "running".
+            traceback.print_exc()
+            try:
+                self._fail(job_id, exc, None, log=False)
+            except Exception:
+                traceback.print_exc()
+
+    def _fail(self, job_id, exc, on_error, *, log: bool = True) -> None:
+        payload: Dict[str, Any] = {"error": "Job failed", "message": str(exc)}
+        status_code = 500
+        if on_error is not None:
+            try:
+                payload, status_code = on_error(exc)
+            except Exception:
+                traceback.print_exc()
+        elif log:
+            traceback.print_exc()
+
+        self.store.update(
+            job_id,
+            status=JOB_FAILED,
+            message=None,
+            error=payload,
+            status_code=int(status_code),
+            expires_at=_now() + timedelta(seconds=self.result_ttl_seconds),
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._maybe_prune()
+        job = self.store.get(job_id)
+        if not job:
+            return None
+        expires_at = job.get("expires_at")
+        if expires_at is not None and expires_at <= _now():
+            return None
+        return job
+
+
+def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public JSON shape of a job (owner is never exposed)."""
+
+    status = job.get("status")
+    out: Dict[str, Any] = {
+        "job_id": job.get("id"),
+        "kind": job.get("kind"),
+        "status": status,
+        "progress": int(job.get("progress") or 0),
+        "message": job.get("message"),
+        "attempts": int(job.get("attempts") or 0),
+        "created_at": _iso(job.get("created_at")),
+        "updated_at": _iso(job.get("updated_at")),
+    }
+    if status == JOB_SUCCEEDED:
+        out["result"] = job.get("result")
+    elif status == JOB_FAILED:
+        out["error"] = job.get("error")
+        out["status_code"] = job.get("status_code")
+    return out
+
+
+def is_terminal(job: Dict[str, Any]) -> bool:
+    return job.get("status") in _TERMINAL
+
+
+def wants_async(req, body: Optional[Dict[str, Any]] = None) -> bool:
+    """True when the client asked for async mode (``?async=1``, form or JSON ``async``)."""
+
+    raw = req.args.get("async")
+    if raw is None and req.form:
+        raw = req.form.get("async")
+    if raw is None and isinstance(body, dict):
+        raw = body.get("async")
+    if isinstance(raw, bool):
+        return raw
+    return str(raw or "").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                backend = (Config.JOB_QUEUE_BACKEND or "memory").strip().lower()
+                store = DatabaseJobStore() if backend in ("db", "database", "mysql") else MemoryJobStore()
+                _queue = JobQueue(
+                    store,
+                    max_workers=Config.JOB_WORKERS,
+                    result_ttl_seconds=Config.JOB_RESULT_TTL_SECONDS,
+                    max_retries=Config.JOB_MAX_RETRIES,
+                )
+    return _queue
+
+
+def submit_job(kind: str, fn: Callable[..., Any], *, owner: str, **options: Any) -> str:
+    """Shortcut for ``get_job_queue().submit(...)``."""
+
+    return get_job_queue().submit(kind, fn, owner=owner, **options)
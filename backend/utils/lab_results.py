@@ -0,0 +1,513 @@
+"""Structured lab values extracted from saved reports.
+
+When a report is saved, its OCR text is parsed line by line against a
+table of common tests (``LAB_TESTS``): name aliases, the canonical unit
+and conversions from other units, and a plausible range that rejects
+misread numbers. A line like
+
+    HbA1c (Glycated Haemoglobin)   6.4   %   4.0 - 5.6   H
+
+becomes ``HBA1C = 6.4 %`` with reference range 4.0-5.6 and flag ``H``.
+Lines that look like lab results (a number and a lab unit) but match no
+known test are the only ones sent to Gemini (at most
+``LAB_LLM_MAX_LINES``), and anything the model returns must quote a
+number that is actually on the line.
+
+Values are stored in ``lab_results`` at write time, indexed by
+``(user_id, test_code, measured_at)``, so a trend is a short range scan
+over numeric rows instead of re-reading report text.
+``scripts/backfill_lab_results.py`` fills the table for reports saved
+before it existed.
+"""
+
+import re
+import sys
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from config import Config
+from utils.database import get_db_connection
+from utils.medical_text import LAB_UNIT_RE
+
+Conversion = Union[float, Callable[[float], float]]
+
+
+@dataclass(frozen=True)
+class LabTest:
+    code: str
+    name: str
+    unit: str
+    aliases: Tuple[str, ...]
+    # other unit -> factor (or function) converting into ``unit``
+    conversions: Tuple[Tuple[str, Conversion], ...] = ()
+    plausible: Tuple[float, float] = (0.0, float("inf"))
+
+
+_GLUCOSE = (("mmol/l", 18.016),)
+_LIPID = (("mmol/l", 38.67),)
+_COUNT_K = (("/cumm", 0.001), ("/ul", 0.001), ("cells/mcl", 0.001), ("x10^9/l", 1.0), ("10^9/l", 1.0), ("x10^3/ul", 1.0))
+
+LAB_TESTS: Tuple[LabTest, ...] = (
+    LabTest("HBA1C", "HbA1c", "%", ("hba1c", "hb a1c", "a1c", "glycated haemoglobin", "glycated hemoglobin",
+                                    "glycosylated haemoglobin", "glycosylated hemoglobin"),
+            (("mmol/mol", lambda v: v / 10.929 + 2.15),), (3.0, 20.0)),
+    LabTest("HGB", "Haemoglobin", "g/dL", ("haemoglobin", "hemoglobin", "hb", "hgb"),
+            (("g/l", 0.1), ("mmol/l", 1.611)), (2.0, 25.0)),
+    LabTest("GLU_FASTING", "Fasting glucose", "mg/dL", ("fasting blood sugar", "fbs", "fasting plasma glucose", "fpg",
+                                                         "fasting glucose", "glucose fasting", "blood sugar fasting",
+                                                         "glucose (fasting)", "blood sugar (fasting)"),
+            _GLUCOSE, (20.0, 800.0)),
+    LabTest("GLU_PP", "Post-prandial glucose", "mg/dL", ("ppbs", "post prandial blood sugar", "postprandial blood sugar",
+                                                         "post prandial glucose", "postprandial glucose", "2 hrs abf",
+                                                         "blood sugar 2 hrs after breakfast"),
+            _GLUCOSE, (20.0, 800.0)),
+    LabTest("GLU_RANDOM", "Random glucose", "mg/dL", ("random blood sugar", "rbs", "random glucose", "glucose random",
+                                                      "random plasma glucose"),
+            _GLUCOSE, (20.0, 800.0)),
+    LabTest("GLU", "Glucose", "mg/dL", ("glucose", "blood glucose", "blood sugar", "plasma glucose"),
+            _GLUCOSE, (20.0, 800.0)),
+    LabTest("CHOL", "Total cholesterol", "mg/dL", ("total cholesterol", "cholesterol total", "cholesterol",
+                                                   "serum cholesterol", "s. cholesterol"),
+            _LIPID, (50.0, 600.0)),
+    LabTest("LDL", "LDL cholesterol", "mg/dL", ("ldl cholesterol", "ldl-c", "ldl", "low density lipoprotein"),
+            _LIPID, (10.0, 400.0)),
+    LabTest("HDL", "HDL cholesterol", "mg/dL", ("hdl cholesterol", "hdl-c", "hdl", "high density lipoprotein"),
+            _LIPID, (5.0, 200.0)),
+    LabTest("TG", "Triglycerides", "mg/dL", ("triglycerides", "triglyceride", "tg", "serum triglycerides"),
+            (("mmol/l", 88.57),), (10.0, 5000.0)),
+    LabTest("CREAT", "Creatinine", "mg/dL", ("creatinine", "serum creatinine", "s. creatinine", "s.creatinine"),
+            (("umol/l", 1 / 88.4),), (0.1, 30.0)),
+    LabTest("BUN", "Blood urea nitrogen", "mg/dL", ("bun", "blood urea nitrogen"),
+            (("mmol/l", 2.801),), (1.0, 200.0)),
+    LabTest("UREA", "Urea", "mg/dL", ("urea", "blood urea", "serum urea"),
+            (("mmol/l", 6.006),), (2.0, 400.0)),
+    LabTest("UA", "Uric acid", "mg/dL", ("uric acid", "serum uric acid", "s. uric acid"),
+            (("umol/l", 1 / 59.48),), (0.5, 20.0)),
+    LabTest("ALT", "ALT (SGPT)", "U/L", ("alt", "sgpt", "alt (sgpt)", "sgpt (alt)", "alanine aminotransferase"),
+            (("iu/l", 1.0),), (1.0, 5000.0)),
+    LabTest("AST", "AST (SGOT)", "U/L", ("ast", "sgot", "ast (sgot)", "sgot (ast)", "aspartate aminotransferase"),
+            (("iu/l", 1.0),), (1.0, 5000.0)),
+    LabTest("ALP", "Alkaline phosphatase", "U/L", ("alkaline phosphatase", "alp", "alk phos"),
+            (("iu/l", 1.0),), (5.0, 3000.0)),
+    LabTest("BILI_T", "Total bilirubin", "mg/dL", ("total bilirubin", "bilirubin total", "bilirubin (total)",
+                                                   "serum bilirubin", "s. bilirubin", "bilirubin"),
+            (("umol/l", 1 / 17.1),), (0.05, 40.0)),
+    LabTest("TSH", "TSH", "uIU/mL", ("tsh", "thyroid stimulating hormone", "s. tsh"),
+            (("miu/l", 1.0), ("uiu/ml", 1.0), ("miu/ml", 1.0)), (0.001, 200.0)),
+    LabTest("FT4", "Free T4", "ng/dL", ("free t4", "ft4", "free thyroxine"),
+            (("pmol/l", 1 / 12.87),), (0.1, 10.0)),
+    LabTest("WBC", "White blood cells", "10^3/uL", ("total wbc count", "wbc count", "wbc", "total leucocyte count",
+                                                    "total leukocyte count", "tlc", "white blood cells", "total count"),
+            _COUNT_K, (0.3, 200.0)),
+    LabTest("PLT", "Platelets", "10^3/uL", ("platelet count", "platelets", "platelet", "plt"),
+            _COUNT_K + (("lakh/cumm", 100.0), ("lakhs/cumm", 100.0)), (5.0, 2000.0)),
+    LabTest("RBC", "Red blood cells", "10^6/uL", ("rbc count", "rbc", "red blood cells", "total rbc count"),
+            (("x10^12/l", 1.0), ("10^12/l", 1.0), ("million/cumm", 1.0), ("mill/cumm", 1.0), ("x10^6/ul", 1.0)),
+            (0.5, 10.0)),
+    LabTest("ESR", "ESR", "mm/hr", ("esr", "erythrocyte sedimentation rate"),
+            (("mm/h", 1.0), ("mm in 1st hour", 1.0), ("mm/1st hr", 1.0)), (0.0, 200.0)),
+    LabTest("CRP", "C-reactive protein", "mg/L", ("crp", "c-reactive protein", "c reactive protein", "hs-crp"),
+            (("mg/dl", 10.0),), (0.0, 600.0)),
+    LabTest("NA", "Sodium", "mmol/L", ("sodium", "serum sodium", "s. sodium", "na+", "na"),
+            (("meq/l", 1.0),), (90.0, 200.0)),
+    LabTest("K", "Potassium", "mmol/L", ("potassium", "serum potassium", "s. potassium", "k+", "k"),
+            (("meq/l", 1.0),), (1.0, 10.0)),
+    LabTest("VITD", "Vitamin D (25-OH)", "ng/mL", ("25-oh vitamin d", "25 oh vitamin d", "25-hydroxy vitamin d",
+                                                   "25 hydroxy vitamin d", "vitamin d", "vit d", "vitamin d3"),
+            (("nmol/l", 1 / 2.496),), (1.0, 200.0)),
+    LabTest("B12", "Vitamin B12", "pg/mL", ("vitamin b12", "vit b12", "b12", "cobalamin"),
+            (("pmol/l", 1.355),), (20.0, 5000.0)),
+    LabTest("FERRITIN", "Ferritin", "ng/mL", ("ferritin", "serum ferritin", "s. ferritin"),
+            (("ug/l", 1.0),), (1.0, 20000.0)),
+)
+
+_TESTS_BY_CODE: Dict[str, LabTest] = {t.code: t for t in LAB_TESTS}
+
+
+def _alias_key(text: str) -> str:
+    return " ".join(text.lower().replace("µ", "u").replace("μ", "u").split())
+
+
+# (alias, test), longest alias first so "fasting blood sugar" wins over "blood sugar".
+_ALIASES: List[Tuple[str, LabTest]] = sorted(
+    ((_alias_key(a), t) for t in LAB_TESTS for a in t.aliases), key=lambda item: len(item[0]), reverse=True
+)
+_ALIAS_RE = re.compile(
+    r"^[\W\d_]{0,4}?(" + "|".join(re.escape(a) for a, _ in _ALIASES) + r")(?![a-z0-9])"
+)
+_ALIAS_LOOKUP: Dict[str, LabTest] = {}
+for _alias, _test in _ALIASES:
+    _ALIAS_LOOKUP.setdefault(_alias, _test)
+
+_NUMBER = r"\d{1,3}(?:,\d{2,3})+(?![\d.])|\d+(?:[.,]\d+)?"
+_RANGE_RE = re.compile(rf"({_NUMBER})\s*(?:-|–|—|to)\s*({_NUMBER})")
+_BOUND_RE = re.compile(rf"(<|>|≤|≥|<=|>=|up to|upto)\s*({_NUMBER})")
+_VALUE_RE = re.compile(rf"(?<![\w.])({_NUMBER})(?![\d^])")
+# A printed flag right after the value (or its unit): "H", "(L)", "*H", or
+# "High"/"Low" when nothing but a number or the end of the line follows, so
+# "Low risk" and "High: 200-499" are not read as flags.
+_FLAG_RE = re.compile(r"[(\[*]?(h|l|high|low)[)\]*]?(?=\s*(?:$|[\d<>≤≥]))")
+# Reference text split into categories ("Desirable < 200", "Normal: <150
+# High: 200-499") rather than one normal range.
+_CATEGORY_RE = re.compile(
+    r"\b(?:desirable|optimal|borderline|risk|deficien|insufficien|sufficien|toxic|prediabet|diabet)"
+    r"|\b(?:normal|high|low|very high)\s*[:=]"
+)
+
+# Report dates: collection/report labels first, then a generic "date" that
+# isn't a date of birth. Text from a birth/age label onwards is ignored.
+_REPORT_DATE_HINT_RE = re.compile(r"collect\w*|sample|specimen|report(?:ed)?|received", re.IGNORECASE)
+_DATE_HINT_RE = re.compile(r"(?<!birth )\bdate\b(?!\s*of\s*birth)", re.IGNORECASE)
+_BIRTH_RE = re.compile(r"birth|\bd\.?o\.?b\b|\bage\b", re.IGNORECASE)
+_DATE_RES = (
+    (re.compile(r"(?<!\d)(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?!\d)"), ("y", "m", "d")),
+    (re.compile(r"(?<!\d)(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})(?!\d)"), ("d", "m", "y")),
+    (re.compile(r"(?<!\d)(\d{1,2})[-\s/.]?([a-z]{3})[a-z]*[-\s/.,]*(\d{4})(?!\d)", re.IGNORECASE), ("d", "b", "y")),
+)
+# lab_results.value / ref_low / ref_high are DECIMAL(12,4).
+_DECIMAL_LIMIT = 10.0 ** 8
+
+_MONTHS = {m: i for i, m in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+
+
+@dataclass
+class LabValue:
+    test_code: str
+    test_name: str
+    value: float
+    unit: Optional[str]
+    ref_low: Optional[float] = None
+    ref_high: Optional[float] = None
+    flag: Optional[str] = None  # 'H' / 'L'
+    source: str = "regex"  # regex | llm
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _number(raw: str) -> float:
+    raw = raw.strip()
+    if re.fullmatch(r"\d{1,3}(?:,\d{2,3})+", raw):
+        return float(raw.replace(",", ""))
+    return float(raw.replace(",", "."))
+
+
+def _convert(test: LabTest, value: float, unit: Optional[str]) -> Optional[float]:
+    if unit is None or unit == _alias_key(test.unit):
+        return value
+    for alt, conv in test.conversions:
+        if alt == unit:
+            return conv(value) if callable(conv) else value * conv
+    return None
+
+
+def _unit_in(test: LabTest, rest: str) -> Optional[str]:
+    compact = rest.replace(" ", "")
+    candidates = [_alias_key(test.unit)] + [alt for alt, _ in test.conversions]
+    for unit in sorted(candidates, key=len, reverse=True):
+        if unit.replace(" ", "") in compact:
+            return unit
+    return None
+
+
+def _unit_at(test: LabTest, text: str) -> int:
+    """Length of the test's unit (canonical or convertible) at the start of ``text``, else 0."""
+    candidates = [_alias_key(test.unit)] + [alt for alt, _ in test.conversions]
+    for unit in sorted(candidates, key=len, reverse=True):
+        if text.startswith(unit):
+            return len(unit)
+    return 0
+
+
+def _plausible(test: LabTest, value: Optional[float]) -> bool:
+    return value is not None and test.plausible[0] <= value <= test.plausible[1]
+
+
+def _fits_column(value: Optional[float]) -> bool:
+    return value is not None and abs(value) < _DECIMAL_LIMIT
+
+
+def _range_flag(value: float, low: Optional[float], high: Optional[float]) -> Optional[str]:
+    if low is not None and value < low:
+        return "L"
+    if high is not None and value > high:
+        return "H"
+    return None
+
+
+def _bounds_count(text: str) -> int:
+    return len(_RANGE_RE.findall(text)) + len(_BOUND_RE.findall(_RANGE_RE.sub(" ", text)))
+
+
+def parse_line(line: str) -> Optional[LabValue]:
+    """``LabValue`` for one OCR line of a known test, else None."""
+    text = _alias_key(line)
+    m = _ALIAS_RE.match(text)
+    if not m:
+        return None
+    test = _ALIAS_LOOKUP[m.group(1)]
+    rest = text[m.end():]
+
+    ref_low = ref_high = None
+    range_span = (0, 0)
+    rm = _RANGE_RE.search(rest)
+    if rm:
+        ref_low, ref_high = _number(rm.group(1)), _number(rm.group(2))
+        range_span = rm.span()
+    else:
+        bm = _BOUND_RE.search(rest)
+        if bm:
+            bound = _number(bm.group(2))
+            if bm.group(1) in (">", "≥", ">="):
+                ref_low = bound
+            else:
+                ref_high = bound
+            range_span = bm.span()
+
+    # Several ranges or risk categories: no single normal range to store.
+    if _CATEGORY_RE.search(rest) or _bounds_count(rest) > 1:
+        ref_low = ref_high = None
+
+    value = None
+    for vm in _VALUE_RE.finditer(rest):
+        if range_span[0] <= vm.start() < range_span[1]:
+            continue
+        after = rest[vm.end():]
+        # Skip the "10" of "x10^3/uL"-style units.
+        if after[:1] == "^":
+            continue
+        # Skip qualifiers that belong to the name: "25-OH", "25-hydroxy".
+        if re.match(r"-?[a-z]", after) and not _unit_at(test, after):
+            continue
+        value = _number(vm.group(1))
+        value_end = vm.end()
+        break
+    if value is None:
+        return None
+
+    unit = _unit_in(test, rest)
+    converted = _convert(test, value, unit)
+    if unit is None and not _plausible(test, converted):
+        # No unit printed: try the alternatives (e.g. platelets as 250000 /cumm).
+        for alt, _ in test.conversions:
+            candidate = _convert(test, value, alt)
+            if _plausible(test, candidate):
+                unit, converted = alt, candidate
+                break
+    if not _plausible(test, converted):
+        return None
+
+    def _ref(bound):
+        return round(_convert(test, bound, unit), 4) if bound is not None else None
+
+    low, high = _ref(ref_low), _ref(ref_high)
+    if low is not None or high is not None:
+        # The printed range decides; a stray or misread "H"/"L" can't contradict it.
+        flag = _range_flag(converted, low, high)
+    else:
+        tail = rest[value_end:].lstrip()
+        tail = tail[_unit_at(test, tail):].lstrip()
+        fm = _FLAG_RE.match(tail)
+        flag = ("L" if fm.group(1) in ("l", "low") else "H") if fm else None
+
+    return LabValue(
+        test_code=test.code,
+        test_name=test.name,
+        value=round(converted, 4),
+        unit=test.unit,
+        ref_low=low,
+        ref_high=high,
+        flag=flag,
+    )
+
+
+def extract_lab_values(text: str) -> Tuple[List[LabValue], List[str]]:
+    """(known tests found, leftover lines that still look like lab results).
+
+    The first value per test wins, so a repeated header or footer doesn't
+    add a second reading.
+    """
+    values: Dict[str, LabValue] = {}
+    leftovers: List[str] = []
+    for raw in (text or "").splitlines():
+        line = " ".join(raw.split())
+        if len(line) < 3:
+            continue
+        parsed = parse_line(line)
+        if parsed:
+            values.setdefault(parsed.test_code, parsed)
+        elif re.match(r"^\W*[a-z]{2}", line, re.IGNORECASE) and LAB_UNIT_RE.search(line):
+            leftovers.append(line)
+    return list(values.values()), leftovers
+
+
+def _slug(name: str) -> str:
+    return ("X_" + re.sub(r"[^A-Z0-9]+", "_", name.upper()).strip("_"))[:32]
+
+
+def from_llm(items: Iterable[Dict], lines: Sequence[str]) -> List[LabValue]:
+    """Validate Gemini's answer for the leftover ``lines``.
+
+    Items need a name and a numeric value that both appear on the quoted
+    line (or any leftover line); names that match a known test are
+    normalised like regex results, the rest get an ``X_`` code.
+    """
+    haystack = " ".join(_alias_key(l) for l in lines)
+    out: Dict[str, LabValue] = {}
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        name = " ".join(str(item.get("name") or "").split())[:100]
+        try:
+            value = float(item.get("value"))
+        except (TypeError, ValueError):
+            continue
+        line = _alias_key(str(item.get("line") or "")) or haystack
+        if not name or line not in haystack:
+            continue
+        if not any(_number(n) == value for n in re.findall(_NUMBER, line)):
+            continue
+        if _alias_key(name).split()[0] not in line:
+            continue
+
+        def _opt(key):
+            try:
+                return float(item.get(key)) if item.get(key) is not None else None
+            except (TypeError, ValueError):
+                return None
+
+        test = _ALIAS_LOOKUP.get(_alias_key(name))
+        unit = _alias_key(str(item.get("unit") or "")) or None
+        if test:
+            converted = _convert(test, value, unit)
+            if not _plausible(test, converted):
+                continue
+            low, high = _opt("ref_low"), _opt("ref_high")
+            parsed = LabValue(
+                test.code, test.name, round(converted, 4), test.unit,
+                round(_convert(test, low, unit), 4) if low is not None else None,
+                round(_convert(test, high, unit), 4) if high is not None else None,
+            )
+        else:
+            parsed = LabValue(_slug(name), name, value, (item.get("unit") or None), _opt("ref_low"), _opt("ref_high"))
+        # Unknown tests have no plausible range; at least keep every value
+        # storable so one misread number can't fail the whole report's insert.
+        if not _fits_column(parsed.value):
+            continue
+        if not _fits_column(parsed.ref_low):
+            parsed.ref_low = None
+        if not _fits_column(parsed.ref_high):
+            parsed.ref_high = None
+        parsed.flag = _range_flag(parsed.value, parsed.ref_low, parsed.ref_high)
+        parsed.source = "llm"
+        out.setdefault(parsed.test_code, parsed)
+    return list(out.values())
+
+
+def extract_report_values(ocr_text: str, *, model: str) -> List[LabValue]:
+    """Regex tables first; Gemini only for the leftover lab-looking lines."""
+    values, leftovers = extract_lab_values(ocr_text)
+    leftovers = leftovers[: max(0, Config.LAB_LLM_MAX_LINES)]
+    if not leftovers:
+        return values
+    try:
+        from utils.gemini_utils import extract_lab_values_with_gemini
+
+        known = {v.test_code for v in values}
+        items = extract_lab_values_with_gemini(leftovers, model=model)
+        values += [v for v in from_llm(items, leftovers) if v.test_code not in known]
+    except Exception as e:
+        # The regex results still get saved.
+        print(f"lab value LLM fallback failed: {e}", file=sys.stderr)
+    return values
+
+
+def find_report_date(text: str) -> Optional[date]:
+    """Collection/report date printed on the report, if one can be read.
+
+    Dates following a collection/sample/report label are tried first, then
+    ones following a generic "date" label, then any other date. Dates of
+    birth (and anything after a birth/DOB/age label on the same line) are
+    never used. Numeric dates are read day-first (dd/mm/yyyy).
+    """
+    lines = (text or "").splitlines()
+
+    def _before_birth(segment: str) -> str:
+        b = _BIRTH_RE.search(segment)
+        return segment[:b.start()] if b else segment
+
+    def _after(hint_re):
+        for line in lines:
+            for m in hint_re.finditer(line):
+                yield _before_birth(line[m.end():])
+
+    for segment in _after(_REPORT_DATE_HINT_RE):
+        found = _first_date(segment)
+        if found:
+            return found
+    for segment in _after(_DATE_HINT_RE):
+        found = _first_date(segment)
+        if found:
+            return found
+    for line in lines:
+        found = _first_date(_before_birth(line))
+        if found:
+            return found
+    return None
+
+
+def _first_date(text: str) -> Optional[date]:
+    today = date.today()
+    for pattern, order in _DATE_RES:
+        for m in pattern.finditer(text):
+            parts = dict(zip(order, m.groups()))
+            try:
+                month = _MONTHS.get(parts["b"][:3].lower()) if "b" in parts else int(parts["m"])
+                found = date(int(parts["y"]), month or 0, int(parts["d"]))
+            except (TypeError, ValueError):
+                continue
+            if date(1990, 1, 1) <= found <= today:
+                return found
+    return None
+
+
+def save_results(user_id: int, report_id: Optional[int], values: Sequence[LabValue], measured_at) -> int:
+    """Insert ``values`` for one report. Best effort; returns rows written."""
+    if not values:
+        return 0
+    if isinstance(measured_at, date) and not isinstance(measured_at, datetime):
+        measured_at = datetime.combine(measured_at, datetime.min.time())
+    rows = [
+        (user_id, report_id, v.test_code, v.test_name[:100], v.value, (v.unit or None) and v.unit[:20],
+         v.ref_low if _fits_column(v.ref_low) else None, v.ref_high if _fits_column(v.ref_high) else None,
+         v.flag, v.source, measured_at or datetime.now())
+        for v in values
+        if _fits_column(v.value)
+    ]
+    if not rows:
+        return 0
+    try:
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.executemany(
+                    """
+                    INSERT INTO lab_results
+                        (user_id, report_id, test_code, test_name, value, unit, ref_low, ref_high, flag, source, measured_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    rows,
+                )
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        # Saving the report must never fail because of the lab index.
+        print(f"lab_results insert failed: {e}", file=sys.stderr)
+        return 0
+    return len(rows)
+
+
+def get_test(code: str) -> Optional[LabTest]:
+    return _TESTS_BY_CODE.get((code or "").upper())
@@ -0,0 +1,125 @@
+"""Cheap local heuristics for "is this OCR text from a medical document?".
+
+Used before any Gemini call so obvious non-medical uploads (receipts,
+tickets, transcripts, bank statements...) are rejected without paying for
+an upstream round-trip. Anything ambiguous is left for the model to decide.
+"""
+
+import re
+from typing import Optional
+
+MEDICAL = "medical"
+NON_MEDICAL = "non_medical"
+UNKNOWN = "unknown"
+
+NON_MEDICAL_MESSAGE = (
+    "Only health-related documents can be simplified. Please upload a medical document "
+    "such as a lab report, prescription, X-ray, or diagnosis report."
+)
+
+_MEDICAL_TERMS = (
+    "patient", "hospital", "clinic", "diagnosis", "diagnosed", "prescription", "rx", "dr", "physician",
+    "specimen", "sample", "reference range", "ref range", "normal range", "result", "investigation",
+    "pathology", "laboratory", "lab", "haemoglobin", "hemoglobin", "glucose", "cholesterol",
+    "triglyceride", "creatinine", "urea", "bilirubin", "platelet", "wbc", "rbc", "hba1c", "tsh",
+    "sgpt", "sgot", "alt", "ast", "ldl", "hdl", "esr", "crp", "serum", "plasma", "urine",
+    "x-ray", "xray", "mri", "ct scan", "ultrasound", "ecg", "impression", "findings",
+    "tablet", "tab", "capsule", "cap", "syrup", "dose", "mg", "ml", "once daily", "twice daily",
+    "blood pressure", "pulse", "bmi", "vaccine", "vaccination", "discharge summary", "admission",
+)
+
+_NON_MEDICAL_TERMS = (
+    "invoice no", "receipt", "subtotal", "sub total", "vat", "cashier", "change due", "qty",
+    "boarding pass", "flight", "gate", "seat no", "pnr", "departure", "arrival",
+    "semester", "gpa", "cgpa", "transcript", "course code", "credit hours",
+    "account number", "account no", "balance", "statement period", "withdrawal", "deposit",
+    "salary", "payslip", "tax", "electricity", "meter reading", "due date",
+    "curriculum vitae", "resume", "work experience", "agreement", "tenant", "landlord",
+    "calendar", "monday tuesday", "event", "ticket",
+)
+
+# Lab units and vitals are the strongest single signal for lab reports.
+LAB_UNIT_RE = re.compile(
+    r"\b\d+(?:[.,]\d+)?\s*(?:"
+    r"mg/dl|g/dl|g/l|mmol/l|umol/l|µmol/l|mol/l|meq/l|iu/l|u/l|miu/l|uiu/ml|µiu/ml|ng/ml|pg/ml|ng/dl|"
+    r"mcg/dl|µg/dl|fl|pg|mm/hr|mm/h|mmhg|bpm|/cumm|/µl|/ul|x10\^?\d+/[uµ]?l|cells/mcl|lakh/cumm"
+    r")(?![a-z])",
+    re.IGNORECASE,
+)
+
+_SEPARATOR_RE = re.compile(r"[^a-z0-9/\- ]+")
+
+
+def _term_pattern(terms):
+    # One alternation per vocabulary, longest first so phrases win over prefixes.
+    ordered = sorted({t.lower() for t in terms}, key=len, reverse=True)
+    return re.compile(r"(?<![a-z0-9])(?:" + "|".join(re.escape(t) for t in ordered) + r")(?![a-z0-9])")
+
+
+_MEDICAL_RE = _term_pattern(_MEDICAL_TERMS)
+_NON_MEDICAL_RE = _term_pattern(_NON_MEDICAL_TERMS)
+
+
+def classify_ocr_text(text: str) -> str:
+    """Return ``MEDICAL``, ``NON_MEDICAL`` or ``UNKNOWN`` for OCR output.
+
+    Only returns ``NON_MEDICAL`` when the text is long enough to judge, hits
+    several non-medical markers, and has no medical terms or lab units.
+    """
+
+    raw = (text or "").strip()
+    if len(raw) < 40:
+        return UNKNOWN
+
+    lowered = _SEPARATOR_RE.sub(" ", raw.lower())
+    unit_hits = len(LAB_UNIT_RE.findall(raw))
+    medical_hits = len(set(_MEDICAL_RE.findall(lowered)))
+    non_medical_hits = len(set(_NON_MEDICAL_RE.findall(lowered)))
+
+    if unit_hits >= 2 or medical_hits >= 3:
+        return MEDICAL
+    if non_medical_hits >= 2 and medical_hits == 0 and unit_hits == 0:
+        return NON_MEDICAL
+    return UNKNOWN
+
+
+def is_obviously_non_medical(text: str) -> bool:
+    return classify_ocr_text(text) == NON_MEDICAL
+
+
+# Values stored in ``medical_reports.report_type`` (NULL when unsure).
+REPORT_TYPES = ("lab", "imaging", "prescription", "discharge")
+
+_REPORT_TYPE_RES = {
+    "imaging": _term_pattern((
+        "x-ray", "xray", "radiograph", "mri", "ct scan", "ultrasound", "ultrasonography", "usg",
+        "sonography", "mammogram", "echocardiography", "doppler", "impression", "findings",
+    )),
+    "prescription": _term_pattern((
+        "rx", "prescription", "tablet", "tab", "capsule", "cap", "syrup", "once daily",
+        "twice daily", "after meal", "before meal", "bd", "tds", "od",
+    )),
+    "discharge": _term_pattern((
+        "discharge summary", "date of admission", "date of discharge", "admission",
+        "course in hospital", "condition at discharge",
+    )),
+}
+
+
+def guess_report_type(text: str) -> Optional[str]:
+    """Best-effort ``report_type`` for OCR text (used as a search filter)."""
+
+    raw = (text or "").strip()
+    if len(raw) < 40:
+        return None
+    lowered = _SEPARATOR_RE.sub(" ", raw.lower())
+    hits = {name: len(set(rx.findall(lowered))) for name, rx in _REPORT_TYPE_RES.items()}
+    if hits["discharge"] >= 2:
+        return "discharge"
+    if len(LAB_UNIT_RE.findall(raw)) >= 2:
+        return "lab"
+    if hits["imaging"] >= 2:
+        return "imaging"
+    if hits["prescription"] >= 2:
+        return "prescription"
+    return None
@@ -0,0 +1,294 @@
+"""Bed occupancy time-series.
+
+Current occupancy per hospital and ward type (``bed_wards`` plus
+``private_rooms``) is sampled into ``bed_occupancy_series``. Samples land in
+5-minute buckets on every bed write and from the periodic
+``scripts/occupancy_series.py`` job. The same job rolls 5-minute buckets up
+into hourly and hourly into daily buckets and prunes old rows; schedule it
+(cron, every few minutes) in production. Until it has run, hourly and daily
+reads are rolled up from the finer buckets on the fly, which is slower for
+long ranges but never shows an empty or stale chart.
+
+Each bucket keeps sums (not averages) so roll-ups stay exact:
+``occupancy % = occupied_sum / total_sum``. Trend charts read one resolution
+for one hospital in a single range scan on the primary key.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pymysql
+
+from config import Config
+
+RES_5M = '5m'
+RES_1H = '1h'
+RES_1D = '1d'
+
+CHART_WARD_TYPES = ('general', 'icu', 'emergency', 'pediatrics', 'maternity')
+
+_PRIVATE_ROOM = 'private_room'
+
+_FINER = {RES_1H: RES_5M, RES_1D: RES_1H}
+_STEP = {RES_5M: timedelta(minutes=5), RES_1H: timedelta(hours=1), RES_1D: timedelta(days=1)}
+
+_UPSERT_SAMPLE = """
+    INSERT INTO bed_occupancy_series
+    (hospital_id, ward_type, resolution, bucket_start, samples, occupied_sum, total_sum, occupied_max)
+    VALUES (%s, %s, '5m', %s, 1, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        samples = samples + 1,
+        occupied_sum = occupied_sum + VALUES(occupied_sum),
+        total_sum = total_sum + VALUES(total_sum),
+        occupied_max = GREATEST(occupied_max, VALUES(occupied_max))
+"""
+
+# Roll-ups recompute whole target buckets from the finer resolution, so they
+# are idempotent and can be re-run over the same window.
+_ROLLUP = """
+    INSERT INTO bed_occupancy_series
+    (hospital_id, ward_type, resolution, bucket_start, samples, occupied_sum, total_sum, occupied_max)
+    SELECT hospital_id, ward_type, %s, {bucket}, SUM(samples), SUM(occupied_sum), SUM(total_sum), MAX(occupied_max)
+    FROM bed_occupancy_series
+    WHERE resolution = %s AND bucket_start >= %s AND bucket_start < %s
+    GROUP BY hospital_id, ward_type, {bucket}
+    ON DUPLICATE KEY UPDATE
+        samples = VALUES(samples),
+        occupied_sum = VALUES(occupied_sum),
+        total_sum = VALUES(total_sum),
+        occupied_max = VALUES(occupied_max)
+"""
+
+_HOUR_BUCKET = "DATE_FORMAT(bucket_start, '%%Y-%%m-%%d %%H:00:00')"
+_DAY_BUCKET = "CAST(DATE(bucket_start) AS DATETIME)"
+
+
+def floor_bucket(ts: datetime, resolution: str) -> datetime:
+    if resolution == RES_1D:
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == RES_1H:
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(minute=ts.minute - ts.minute % 5, second=0, microsecond=0)
+
+
+def resolution_for_days(days: int) -> str:
+    if days <= 2:
+        return RES_5M
+    if days <= 14:
+        return RES_1H
+    return RES_1D
+
+
+def _merge_occupancy(ward_rows: Iterable[Dict[str, Any]], room_rows: Iterable[Dict[str, Any]]) -> Dict[Tuple[int, str], Tuple[int, int]]:
+    """Combine grouped ward and private room counts into ``(hospital, ward_type) -> (occupied, total)``.
+
+    Hospitals that track individual private rooms report those; otherwise
+    the aggregate ``private_room`` ward rows are used.
+    """
+    out: Dict[Tuple[int, str], Tuple[int, int]] = {}
+    for r in ward_rows:
+        out[(int(r['hospital_id']), r['ward_type'])] = (int(r['occupied'] or 0), int(r['total'] or 0))
+    for r in room_rows:
+        if int(r['total'] or 0) > 0:
+            out[(int(r['hospital_id']), _PRIVATE_ROOM)] = (int(r['occupied'] or 0), int(r['total'] or 0))
+    return out
+
+
+def _current_occupancy(cursor, hospital_id: Optional[int] = None) -> Dict[Tuple[int, str], Tuple[int, int]]:
+    where = "WHERE hospital_id = %s" if hospital_id is not None else ""
+    params = (hospital_id,) if hospital_id is not None else ()
+
+    cursor.execute(f"""
+        SELECT hospital_id, ward_type, SUM(occupied_beds) AS occupied, SUM(total_beds) AS total
+        FROM bed_wards
+        {where}
+        GROUP BY hospital_id, ward_type
+    """, params)
+    ward_rows = cursor.fetchall()
+
+    cursor.execute(f"""
+        SELECT hospital_id,
+               SUM(CASE WHEN status IN ('occupied', 'reserved') THEN 1 ELSE 0 END) AS occupied,
+               COUNT(*) AS total
+        FROM private_rooms
+        {where}
+        GROUP BY hospital_id
+    """, params)
+    room_rows = cursor.fetchall()
+
+    return _merge_occupancy(ward_rows, room_rows)
+
+
+def _write_samples(cursor, occupancy: Dict[Tuple[int, str], Tuple[int, int]], now: datetime) -> int:
+    bucket = floor_bucket(now, RES_5M)
+    rows = [
+        (hospital_id, ward_type, bucket, occupied, total, occupied)
+        for (hospital_id, ward_type), (occupied, total) in occupancy.items()
+    ]
+    if rows:
+        cursor.executemany(_UPSERT_SAMPLE, rows)
+    return len(rows)
+
+
+def record_snapshot(conn, hospital_id: int, now: Optional[datetime] = None) -> None:
+    """Best-effort sample of one hospital's occupancy after a bed write.
+
+    Never raises: a missing series table or a transient error must not fail
+    the request that changed the beds.
+    """
+    if not hospital_id:
+        return
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        _write_samples(cursor, _current_occupancy(cursor, int(hospital_id)), now or datetime.now())
+        conn.commit()
+    except Exception as e:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        print(f"Occupancy snapshot skipped for hospital {hospital_id}: {str(e)}", file=sys.stderr)
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def snapshot_all(conn, now: Optional[datetime] = None) -> int:
+    """Sample every hospital in two grouped reads and one multi-row upsert."""
+    cursor = conn.cursor()
+    try:
+        written = _write_samples(cursor, _current_occupancy(cursor), now or datetime.now())
+        conn.commit()
+        return written
+    finally:
+        cursor.close()
+
+
+def rollup(conn, now: Optional[datetime] = None, lookback_hours: int = 2, lookback_days: int = 2) -> Dict[str, int]:
+    """Rebuild recent hourly buckets from 5-minute ones and daily from hourly.
+
+    The current (partial) hour/day is included so charts see it right away.
+    """
+    now = now or datetime.now()
+    hour_from = floor_bucket(now, RES_1H) - timedelta(hours=lookback_hours)
+    day_from = floor_bucket(now, RES_1D) - timedelta(days=lookback_days)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_ROLLUP.format(bucket=_HOUR_BUCKET), (RES_1H, RES_5M, hour_from, now))
+        hourly = cursor.rowcount
+        cursor.execute(_ROLLUP.format(bucket=_DAY_BUCKET), (RES_1D, RES_1H, day_from, now))
+        daily = cursor.rowcount
+        conn.commit()
+        return {RES_1H: hourly, RES_1D: daily}
+    finally:
+        cursor.close()
+
+
+def apply_retention(conn, now: Optional[datetime] = None) -> Dict[str, int]:
+    now = now or datetime.now()
+    keep = {
+        RES_5M: timedelta(days=Config.OCCUPANCY_RETENTION_5M_DAYS),
+        RES_1H: timedelta(days=Config.OCCUPANCY_RETENTION_1H_DAYS),
+        RES_1D: timedelta(days=Config.OCCUPANCY_RETENTION_1D_DAYS),
+    }
+    deleted = {}
+    cursor = conn.cursor()
+    try:
+        for resolution, age in keep.items():
+            cursor.execute(
+                "DELETE FROM bed_occupancy_series WHERE resolution = %s AND bucket_start < %s",
+                (resolution, now - age),
+            )
+            deleted[resolution] = cursor.rowcount
+        conn.commit()
+        return deleted
+    finally:
+        cursor.close()
+
+
+def _roll_up_rows(rows: Iterable[Dict[str, Any]], resolution: str) -> List[Dict[str, Any]]:
+    """Sum finer series rows into ``resolution`` buckets (same maths as ``_ROLLUP``)."""
+    out: Dict[Tuple[datetime, str], Dict[str, Any]] = {}
+    for r in rows:
+        key = (floor_bucket(r['bucket_start'], resolution), r['ward_type'])
+        acc = out.get(key)
+        if acc is None:
+            out[key] = {
+                'bucket_start': key[0],
+                'ward_type': key[1],
+                'occupied_sum': int(r['occupied_sum'] or 0),
+                'total_sum': int(r['total_sum'] or 0),
+                'occupied_max': int(r['occupied_max'] or 0),
+            }
+            continue
+        acc['occupied_sum'] += int(r['occupied_sum'] or 0)
+        acc['total_sum'] += int(r['total_sum'] or 0)
+        acc['occupied_max'] = max(acc['occupied_max'], int(r['occupied_max'] or 0))
+    return [out[k] for k in sorted(out)]
+
+
+def _read_rows(cursor, hospital_id: int, resolution: str, start: datetime) -> List[Dict[str, Any]]:
+    cursor.execute("""
+        SELECT bucket_start, ward_type, occupied_sum, total_sum, occupied_max
+        FROM bed_occupancy_series
+        WHERE hospital_id = %s AND resolution = %s AND bucket_start >= %s
+        ORDER BY bucket_start
+    """, (hospital_id, resolution, start))
+    rows = list(cursor.fetchall())
+
+    finer = _FINER.get(resolution)
+    if finer is None:
+        return rows
+    # Bed writes only record 5-minute buckets; anything newer than the last
+    # rolled-up bucket (all of it if the roll-up job never ran) is summed here.
+    tail_start = rows[-1]['bucket_start'] + _STEP[resolution] if rows else start
+    return rows + _roll_up_rows(_read_rows(cursor, hospital_id, finer, tail_start), resolution)
+
+
+def read_series(cursor, hospital_id: int, days: int, resolution: Optional[str] = None,
+                now: Optional[datetime] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """Return ``(resolution, rows)`` for the last ``days`` days.
+
+    One range read per resolution: stored buckets first, then the part the
+    roll-up job hasn't reached yet is built from the finer resolution.
+    """
+    resolution = resolution or resolution_for_days(days)
+    start = floor_bucket((now or datetime.now()) - timedelta(days=days), resolution)
+    if resolution == RES_1D:
+        # "last 7 days" means 7 calendar days including today
+        start += timedelta(days=1)
+    try:
+        return resolution, _read_rows(cursor, hospital_id, resolution, start)
+    except pymysql.err.ProgrammingError:
+        # Table not migrated yet; callers fall back to their legacy trend.
+        return resolution, []
+
+
+def format_trend(rows: Iterable[Dict[str, Any]], resolution: str, days: int,
+                 ward_types: Iterable[str] = CHART_WARD_TYPES) -> List[Dict[str, Any]]:
+    """Pivot series rows into chart points: ``{'name', 'date', <ward_type>: pct}``."""
+    if resolution == RES_1D:
+        label = '%a' if days <= 7 else '%b %d'
+    elif resolution == RES_1H:
+        label = '%a %H:00'
+    else:
+        label = '%H:%M'
+
+    wanted = set(ward_types)
+    points: Dict[datetime, Dict[str, Any]] = {}
+    for r in rows:
+        if r['ward_type'] not in wanted:
+            continue
+        ts = r['bucket_start']
+        point = points.get(ts)
+        if point is None:
+            point = {'name': ts.strftime(label), 'date': ts.isoformat()}
+            for ward_type in ward_types:
+                point[ward_type] = 0
+            points[ts] = point
+        total = float(r['total_sum'] or 0)
+        point[r['ward_type']] = round(float(r['occupied_sum'] or 0) / total * 100) if total > 0 else 0
+    return [points[k] for k in sorted(points)]
@@ -1,5 +1,9 @@
 import os
-from typing import Any, Dict, Optional, Tuple
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.ocr_preprocess import PreprocessOptions, preprocess
 
 
 def _configure_tesseract_cmd() -> None:
@@ -28,15 +32,45 @@ def extract_text_from_image_bytes(
     *,
     lang: str = "eng",
 ) -> Tuple[str, Optional[float]]:
-    """Run Tesseract OCR on an image (bytes) and return (text, confidence).
+    """Run Tesseract OCR on an image (bytes) and return (text, confidence)."""
+
+    from io import BytesIO
+
+    return extract_text_from_image(BytesIO(image_bytes), lang=lang)
+
+
+def extract_text_from_image(
+    source: Any,
+    *,
+    lang: str = "eng",
+) -> Tuple[str, Optional[float]]:
+    """Run Tesseract OCR on an image and return (text, confidence).
+
+    ``source`` is a file path, a binary file object or an already decoded
+    PIL image (e.g. a rendered PDF page), so callers don't need to hold the
+    encoded bytes in memory.
 
     Confidence is an average of word-level confidences when available, else None.
     """
 
-    _configure_tesseract_cmd()
+    result = ocr_image(source, lang=lang)
+    return result.text, result.confidence
 
+
+@dataclass
+class OcrResult:
+    text: str
+    confidence: Optional[float]
+    dpi: int
+    attempts: int = 1
+    # Milliseconds per stage (load/deskew/binarize/crop/tesseract), summed
+    # over attempts.
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def _pytesseract():
+    _configure_tesseract_cmd()
     try:
-        from PIL import Image, ImageEnhance, ImageOps
         import pytesseract
     except Exception as exc:
         import sys
@@ -46,34 +80,80 @@ def extract_text_from_image_bytes(
             f"Backend Python: {sys.executable} (v{sys.version.split()[0]}). "
             "Fix: run the backend using your project venv and run: `python -m pip install -r backend/requirements.txt`, then restart the backend."
         ) from exc
+    return pytesseract
 
-    from io import BytesIO
 
-    image = Image.open(BytesIO(image_bytes))
-    image = image.convert("RGB")
+def words_to_text(data: Dict[str, List[Any]]) -> Tuple[str, Optional[float]]:
+    """Rebuild (text, mean word confidence) from ``image_to_data`` output.
 
-    # Light, safe preprocessing: grayscale + contrast boost.
-    gray = ImageOps.grayscale(image)
-    gray = ImageEnhance.Contrast(gray).enhance(1.6)
+    Lines are joined with newlines and paragraphs/blocks with a blank line,
+    like ``image_to_string``, so one Tesseract pass gives both.
+    """
 
-    # Main OCR text
-    text = pytesseract.image_to_string(gray, lang=lang)
+    lines: List[str] = []
+    words: List[str] = []
+    confs: List[float] = []
+    current = None
+    for i, word in enumerate(data.get("text") or []):
+        try:
+            conf = float(data["conf"][i])
+        except Exception:
+            conf = -1.0
+        word = (word or "").strip()
+        if conf < 0 or not word:
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        if key != current:
+            if words:
+                lines.append(" ".join(words))
+                words = []
+            if current is not None and key[:2] != current[:2]:
+                lines.append("")
+            current = key
+        words.append(word)
+        confs.append(conf)
+    if words:
+        lines.append(" ".join(words))
+    confidence = (sum(confs) / len(confs)) if confs else None
+    return "\n".join(lines), confidence
+
+
+def ocr_image(
+    source: Any,
+    *,
+    lang: str = "eng",
+    options: Optional[PreprocessOptions] = None,
+) -> OcrResult:
+    """Preprocess ``source`` (see ``utils.ocr_preprocess``) and OCR it once.
 
-    # Confidence (best-effort)
-    confidence: Optional[float] = None
-    try:
-        data: Dict[str, Any] = pytesseract.image_to_data(gray, lang=lang, output_type=pytesseract.Output.DICT)
-        confs = []
-        for c in data.get("conf", []) or []:
-            try:
-                v = float(c)
-                if v >= 0:
-                    confs.append(v)
-            except Exception:
-                continue
-        if confs:
-            confidence = sum(confs) / len(confs)
-    except Exception:
-        confidence = None
+    Quality gate: if the mean confidence is below ``OCR_MIN_CONFIDENCE``
+    and the image was downscaled, it is processed again at
+    ``OCR_RETRY_DPI`` and the better of the two results is kept.
+    """
 
-    return text, confidence
+    pytesseract = _pytesseract()
+    options = options or PreprocessOptions.from_env()
+    min_confidence = float(os.getenv("OCR_MIN_CONFIDENCE") or 60)
+    retry_dpi = int(os.getenv("OCR_RETRY_DPI") or 300)
+    timings: Dict[str, float] = {}
+
+    def _attempt(opts: PreprocessOptions):
+        prepared = preprocess(source, opts)
+        for name, ms in prepared.timings.items():
+            timings[name] = timings.get(name, 0.0) + ms
+        started = time.perf_counter()
+        data = pytesseract.image_to_data(prepared.image, lang=lang, output_type=pytesseract.Output.DICT)
+        timings["tesseract"] = timings.get("tesseract", 0.0) + (time.perf_counter() - started) * 1000.0
+        text, confidence = words_to_text(data)
+        return OcrResult(text=text, confidence=confidence, dpi=opts.target_dpi), prepared.scale
+
+    result, scale = _attempt(options)
+    low = result.confidence is None or result.confidence < min_confidence
+    if low and scale < 1.0 and retry_dpi > options.target_dpi:
+        retry, _ = _attempt(replace(options, target_dpi=retry_dpi))
+        if (retry.confidence or 0.0) > (result.confidence or 0.0):
+            result = retry
+        result.attempts = 2
+
+    result.timings = timings
+    return result
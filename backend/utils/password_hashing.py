@@ -0,0 +1,120 @@
+"""bcrypt off the request threads.
+
+Hashing and checking run on a small bounded pool (``BCRYPT_WORKERS``) so a
+burst of logins can use at most that many cores; other requests in the same
+worker keep being served. At most ``BCRYPT_MAX_PENDING`` operations may be
+queued or running - beyond that ``PasswordHashingBusy`` is raised and the
+routes answer 429 instead of piling up threads.
+
+``BCRYPT_POOL`` picks the executor: ``thread`` (default; bcrypt releases the
+GIL while it works) or ``process``.
+
+New hashes use ``BCRYPT_ROUNDS``; ``needs_rehash`` tells the login routes
+when a stored hash was made with a different cost so they can upgrade it
+while they have the plaintext. ``scripts/bcrypt_cost.py`` measures which
+cost fits a latency target on the deployment hardware.
+"""
+
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from config import Config
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Too many password hashes queued; the client should retry shortly."""
+
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    try:
+        return bcrypt.checkpw(password, hashed)
+    except ValueError:
+        # Empty / malformed stored hash (e.g. account created without one).
+        return False
+
+
+def hash_cost(hashed: str) -> Optional[int]:
+    """Cost factor of a ``$2b$12$...`` hash, or None if it isn't bcrypt."""
+    parts = (hashed or '').split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    def __init__(self, *, rounds: int = 12, workers: int = 2, max_pending: int = 32, pool: str = 'thread'):
+        self.rounds = int(rounds)
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.pool = (pool or 'thread').strip().lower()
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _pool(self) -> Executor:
+        # Created lazily so importing the module (and forking gunicorn workers)
+        # doesn't start threads or processes.
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.pool == 'process':
+                        # multiprocessing is only imported when this pool is chosen.
+                        from concurrent.futures import ProcessPoolExecutor
+
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix='pocketcare-bcrypt'
+                        )
+        return self._executor
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHashingBusy('Too many sign-in requests right now. Please try again in a moment.')
+            self._pending += 1
+        try:
+            return self._pool().submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password.encode('utf-8'), self.rounds).decode('utf-8')
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._run(_check, password.encode('utf-8'), (hashed or '').encode('utf-8'))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        cost = hash_cost(hashed)
+        return cost is not None and cost != self.rounds
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    rounds=Config.BCRYPT_ROUNDS,
+                    workers=Config.BCRYPT_WORKERS or min(4, os.cpu_count() or 1),
+                    max_pending=Config.BCRYPT_MAX_PENDING,
+                    pool=Config.BCRYPT_POOL,
+                )
+    return _hasher
@@ -1,7 +1,7 @@
 import os
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
-from utils.ocr_utils import extract_text_from_image_bytes
+from utils.ocr_utils import extract_text_from_image
 
 
 def extract_text_from_pdf_bytes(
@@ -10,13 +10,27 @@ def extract_text_from_pdf_bytes(
     lang: str = "eng",
     max_pages: int = 10,
 ) -> Tuple[str, Optional[float]]:
-    """Extract text from a PDF by rendering pages to images and running OCR.
-
-    Returns a combined text and an averaged confidence (best-effort).
-    """
+    """Extract text from PDF bytes by rendering pages to images and running OCR."""
 
     if not pdf_bytes:
         raise ValueError("PDF is empty")
+    return extract_text_from_pdf(pdf_bytes, lang=lang, max_pages=max_pages)
+
+
+def extract_text_from_pdf(
+    source: Union[str, bytes],
+    *,
+    lang: str = "eng",
+    max_pages: int = 10,
+) -> Tuple[str, Optional[float]]:
+    """Extract text from a PDF (file path or bytes) by rendering pages and running OCR.
+
+    Given a path, PyMuPDF reads the file on demand rather than from an
+    in-memory copy. Each page is rendered and handed to OCR as a raw pixel
+    buffer (no PNG encode/decode) and released before the next page.
+
+    Returns a combined text and an averaged confidence (best-effort).
+    """
 
     try:
         import fitz  # PyMuPDF
@@ -34,7 +48,25 @@ def extract_text_from_pdf_bytes(
     if env_max_pages.isdigit():
         max_pages = max(1, int(env_max_pages))
 
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        from PIL import Image
+    except Exception as exc:
+        raise RuntimeError(
+            "OCR dependencies missing (Pillow). "
+            "Fix: run `python -m pip install -r backend/requirements.txt`, then restart the backend."
+        ) from exc
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        doc = fitz.open(stream=source, filetype="pdf")
+    else:
+        doc = fitz.open(source, filetype="pdf")
+    try:
+        return _ocr_pages(doc, fitz, Image, lang=lang, max_pages=max_pages)
+    finally:
+        doc.close()
+
+
+def _ocr_pages(doc, fitz, Image, *, lang: str, max_pages: int) -> Tuple[str, Optional[float]]:
     page_count = doc.page_count
     if page_count == 0:
         return "", None
@@ -52,10 +84,13 @@ def extract_text_from_pdf_bytes(
 
     for idx in range(page_count):
         page = doc.load_page(idx)
-        pix = page.get_pixmap(matrix=matrix, alpha=False)
-        image_bytes = pix.tobytes("png")
-
-        text, conf = extract_text_from_image_bytes(image_bytes, lang=lang)
+        pix = page.get_pixmap(matrix=matrix, alpha=False, colorspace=fitz.csRGB)
+        # Wrap the pixmap's samples directly instead of encoding a PNG and
+        # decoding it again.
+        samples = getattr(pix, "samples_mv", None) or pix.samples
+        image = Image.frombuffer("RGB", (pix.width, pix.height), samples, "raw", "RGB", pix.stride, 1)
+        text, conf = extract_text_from_image(image, lang=lang)
+        del image, samples, pix
         label = f"--- Page {idx + 1} ---"
         combined_parts.append(f"{label}\n{text.strip()}".strip())
 
@@ -63,8 +98,6 @@ def extract_text_from_pdf_bytes(
             conf_sum += float(conf)
             conf_n += 1
 
-    doc.close()
-
     combined_text = "\n\n".join([p for p in combined_parts if p])
     combined_conf = (conf_sum / conf_n) if conf_n else None
     return combined_text, combined_conf
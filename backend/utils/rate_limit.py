@@ -0,0 +1,221 @@
+"""Sliding-window rate limiting.
+
+Each key keeps two counters - hits in the current fixed window and in the
+previous one - and the request rate is estimated as
+
+    previous * (time left of the previous window that still overlaps) + current
+
+which tracks a true sliding window closely with O(1) memory per key instead
+of a list of timestamps. Hits are counted before the check, so a client
+that keeps hammering an endpoint stays limited.
+
+Counters live in a pluggable store selected by ``RATE_LIMIT_BACKEND``:
+
+- ``memory`` (default): a dict guarded by a lock, capped at
+  ``RATE_LIMIT_MAX_KEYS`` keys and swept of stale keys periodically.
+- ``database``: the ``rate_limit_counters`` table, so limits hold across
+  gunicorn workers and hosts.
+
+The store also offers ``claim_once`` (first caller wins within a TTL), used
+to make captcha tokens single-use across workers.
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+
+def _window(now: float, window_seconds: int) -> Tuple[int, float]:
+    """(window start as an int timestamp, fraction of the window elapsed)."""
+    start = int(now // window_seconds) * window_seconds
+    return start, (now - start) / window_seconds
+
+
+class MemoryRateLimitStore:
+    """Process-local counters."""
+
+    def __init__(self, *, max_keys: int = 100_000, sweep_interval_seconds: float = 60.0):
+        # key -> [window_start, window_seconds, previous_hits, current_hits]
+        self._counters: Dict[str, List[int]] = {}
+        self._claims: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.max_keys = max(1, int(max_keys))
+        self.sweep_interval_seconds = float(sweep_interval_seconds)
+        self._last_sweep = time.time()
+
+    def hit(self, key: str, window_start: int, window_seconds: int) -> Tuple[int, int]:
+        with self._lock:
+            self._maybe_sweep(window_start)
+            entry = self._counters.get(key)
+            if entry is None or entry[0] < window_start - window_seconds:
+                entry = [window_start, window_seconds, 0, 0]
+            elif entry[0] < window_start:
+                entry = [window_start, window_seconds, entry[3], 0]
+            entry[3] += 1
+            self._counters[key] = entry
+            return entry[2], entry[3]
+
+    def claim_once(self, key: str, ttl_seconds: int) -> bool:
+        now = time.time()
+        with self._lock:
+            expires_at = self._claims.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._claims[key] = now + ttl_seconds
+            return True
+
+    def _maybe_sweep(self, ref: float) -> None:
+        now = time.time()
+        if now - self._last_sweep < self.sweep_interval_seconds and len(self._counters) < self.max_keys:
+            return
+        self._last_sweep = now
+        # ``ref`` is the caller's window start (<= now). A key whose last window
+        # ended a full window before it estimates to 0 and can go.
+        stale = [k for k, (start, width, _, _) in self._counters.items() if start + 2 * width <= ref]
+        for k in stale:
+            del self._counters[k]
+        for k in [k for k, exp in self._claims.items() if exp <= now]:
+            del self._claims[k]
+        if len(self._counters) >= self.max_keys:
+            # Still full of live keys (e.g. a spray of spoofed IPs): drop the
+            # least recently active half rather than grow without bound.
+            by_age = sorted(self._counters, key=lambda k: self._counters[k][0])
+            for k in by_age[: len(by_age) // 2]:
+                del self._counters[k]
+
+    def sweep(self) -> None:
+        with self._lock:
+            self._last_sweep = 0.0
+            self._maybe_sweep(time.time())
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class DatabaseRateLimitStore:
+    """Counters in the ``rate_limit_counters`` table (shared by all workers)."""
+
+    def __init__(self, *, sweep_interval_seconds: float = 60.0):
+        self.sweep_interval_seconds = float(sweep_interval_seconds)
+        self._last_sweep = 0.0
+
+    @staticmethod
+    def _key(key: str) -> str:
+        # Keys embed client input (IPs, emails); hash to a fixed width.
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def hit(self, key: str, window_start: int, window_seconds: int) -> Tuple[int, int]:
+        from utils.database import execute_query
+
+        self._maybe_sweep()
+        k = self._key(key)
+        execute_query(
+            """
+            INSERT INTO rate_limit_counters (rl_key, window_start, hits, expires_at)
+            VALUES (%s, %s, 1, FROM_UNIXTIME(%s))
+            ON DUPLICATE KEY UPDATE hits = hits + 1
+            """,
+            (k, window_start, window_start + 2 * window_seconds),
+            commit=True,
+        )
+        rows = execute_query(
+            "SELECT window_start, hits FROM rate_limit_counters WHERE rl_key = %s AND window_start IN (%s, %s)",
+            (k, window_start - window_seconds, window_start),
+            fetch_all=True,
+        ) or []
+        counts = {int(r["window_start"]): int(r["hits"]) for r in rows}
+        return counts.get(window_start - window_seconds, 0), counts.get(window_start, 0)
+
+    def claim_once(self, key: str, ttl_seconds: int) -> bool:
+        from utils.database import get_db_connection
+
+        # window_start 0 marks a claim row; the primary key makes the upsert
+        # the lock. Affected rows: 1 = inserted, 2 = took over an expired
+        # claim, 0 = someone holds it.
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO rate_limit_counters (rl_key, window_start, hits, expires_at)
+                    VALUES (%s, 0, 1, NOW() + INTERVAL %s SECOND)
+                    ON DUPLICATE KEY UPDATE
+                        expires_at = IF(expires_at < NOW(), VALUES(expires_at), expires_at)
+                    """,
+                    (self._key(f"claim:{key}"), int(ttl_seconds)),
+                )
+                claimed = cursor.rowcount in (1, 2)
+            conn.commit()
+            return claimed
+        finally:
+            conn.close()
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        if now - self._last_sweep < self.sweep_interval_seconds:
+            return
+        self._last_sweep = now
+        self.sweep()
+
+    def sweep(self) -> None:
+        from utils.database import execute_query
+
+        try:
+            execute_query("DELETE FROM rate_limit_counters WHERE expires_at < NOW() LIMIT 5000", commit=True)
+        except Exception as e:
+            print(f"rate limit sweep failed: {e}", file=sys.stderr)
+
+
+class RateLimiter:
+    def __init__(self, store=None):
+        self.store = store or MemoryRateLimitStore()
+
+    def hit(self, key: str, limit: int, window_seconds: int, *, now: Optional[float] = None) -> bool:
+        """Record one request for ``key``; True when it exceeds ``limit`` per window."""
+        window_seconds = max(1, int(window_seconds))
+        window_start, elapsed = _window(time.time() if now is None else now, window_seconds)
+        try:
+            previous, current = self.store.hit(key, window_start, window_seconds)
+        except Exception as e:
+            # Fail open: an unreachable counter store must not lock everyone out.
+            print(f"rate limit store error: {e}", file=sys.stderr)
+            return False
+        return previous * (1.0 - elapsed) + current > int(limit)
+
+    def claim_once(self, key: str, ttl_seconds: int) -> bool:
+        try:
+            return self.store.claim_once(key, ttl_seconds)
+        except Exception as e:
+            print(f"rate limit store error: {e}", file=sys.stderr)
+            return True
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                backend = (Config.RATE_LIMIT_BACKEND or "memory").strip().lower()
+                if backend in ("db", "database", "mysql"):
+                    store = DatabaseRateLimitStore(sweep_interval_seconds=Config.RATE_LIMIT_SWEEP_SECONDS)
+                else:
+                    store = MemoryRateLimitStore(
+                        max_keys=Config.RATE_LIMIT_MAX_KEYS,
+                        sweep_interval_seconds=Config.RATE_LIMIT_SWEEP_SECONDS,
+                    )
+                _limiter = RateLimiter(store)
+    return _limiter
+
+
+def rate_limited(key: str, limit: int, window_seconds: int) -> bool:
+    """Shortcut for ``get_rate_limiter().hit(...)``."""
+
+    return get_rate_limiter().hit(key, limit, window_seconds)
@@ -0,0 +1,119 @@
+"""Query parsing and snippets for report full-text search.
+
+``medical_reports`` has a FULLTEXT index on ``(ocr_text, ai_interpretation)``.
+InnoDB updates it as part of every INSERT, so new reports are searchable
+immediately. This module only turns what the user typed into a BOOLEAN
+MODE expression and cuts a highlighted snippet out of a matching report.
+The SQL lives in ``routes/reports.py`` like the other report queries.
+
+Query syntax: plain words match as prefixes (``hba1`` finds ``HbA1c``), and
+``"double quoted"`` text must appear as a phrase. Words shorter than
+InnoDB's ``innodb_ft_min_token_size`` (3) and InnoDB's default stopwords
+are not in the index; they are dropped from the MATCH expression and used
+as ``LIKE`` filters only when nothing else is left.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+MIN_TOKEN_SIZE = 3
+
+# INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD
+INNODB_STOPWORDS = frozenset(
+    (
+        "a about an are as at be by com de en for from how i in is it la of on or "
+        "that the this to was what when where who will with und www"
+    ).split()
+)
+
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class SearchQuery:
+    words: List[str] = field(default_factory=list)  # indexable, prefix-matched
+    phrases: List[str] = field(default_factory=list)
+    short: List[str] = field(default_factory=list)  # not indexable
+
+    def __bool__(self) -> bool:
+        return bool(self.words or self.phrases or self.short)
+
+    @property
+    def indexable(self) -> bool:
+        return bool(self.words or self.phrases)
+
+    def boolean_expression(self, *, match_all: bool = True) -> str:
+        """``AGAINST (... IN BOOLEAN MODE)`` argument; phrases are always required."""
+        op = "+" if match_all else ""
+        parts = [f'+"{p}"' for p in self.phrases] + [f"{op}{w}*" for w in self.words]
+        return " ".join(parts)
+
+    @property
+    def highlight_terms(self) -> List[str]:
+        return self.phrases + self.words + self.short
+
+
+def parse_query(raw: str, *, max_terms: int = 8) -> SearchQuery:
+    """Split user input into prefix words, quoted phrases and short words."""
+    raw = (raw or "").strip().lower()
+    query = SearchQuery()
+    for phrase in _PHRASE_RE.findall(raw):
+        words = _WORD_RE.findall(phrase)
+        if len(words) > 1:
+            query.phrases.append(" ".join(words))
+        else:
+            raw += " " + " ".join(words)
+    for word in _WORD_RE.findall(_PHRASE_RE.sub(" ", raw)):
+        if word in query.words or word in query.short:
+            continue
+        if len(word) >= MIN_TOKEN_SIZE and word not in INNODB_STOPWORDS:
+            query.words.append(word)
+        elif word not in INNODB_STOPWORDS:
+            query.short.append(word)
+    query.phrases = query.phrases[:max_terms]
+    query.words = query.words[:max_terms]
+    query.short = query.short[:max_terms]
+    return query
+
+
+def _term_regex(terms: List[str]) -> Optional["re.Pattern"]:
+    if not terms:
+        return None
+    alts = []
+    for term in sorted(set(terms), key=len, reverse=True):
+        # Phrases may span any whitespace/punctuation; words match as prefixes.
+        body = r"\W+".join(re.escape(w) for w in term.split())
+        alts.append(body + r"\w*")
+    return re.compile(r"(?<!\w)(?:" + "|".join(alts) + ")", re.IGNORECASE)
+
+
+def make_snippet(text: str, terms: List[str], *, radius: int = 80) -> Tuple[str, List[Tuple[int, int]]]:
+    """A short window of ``text`` around the first hit, plus highlight offsets.
+
+    Whitespace is collapsed and the window is trimmed to word boundaries;
+    ``…`` marks cut ends. Offsets are ``(start, end)`` into the snippet.
+    Returns ``("", [])`` when ``text`` doesn't contain any of ``terms``.
+    """
+    if not text:
+        return "", []
+    pattern = _term_regex(terms)
+    hit = pattern.search(text) if pattern else None
+    if not hit:
+        return "", []
+
+    start = max(0, hit.start() - radius)
+    end = min(len(text), hit.end() + radius)
+    if start > 0:
+        space = text.find(" ", start, hit.start())
+        start = space + 1 if space != -1 else start
+    if end < len(text):
+        space = text.rfind(" ", hit.end(), end)
+        end = space if space != -1 else end
+
+    snippet = " ".join(text[start:end].split())
+    lead = "… " if start > 0 else ""
+    snippet = lead + snippet + (" …" if end < len(text) else "")
+    highlights = [(m.start(), m.end()) for m in pattern.finditer(snippet)]
+    return snippet, highlights
@@ -0,0 +1,219 @@
+"""In-process cache for non-personalized AI answers.
+
+Symptom routing advice and Sage chat replies depend only on the prompt, so
+near-identical prompts ("I have headache and fever for 2 days" /
+"Headache and fever, 2 days!") can share one Gemini answer. Keys are a
+normalized fingerprint: lowercased, punctuation and stop-words dropped
+(word order is kept so "fever, no cough" != "cough, no fever"), plus a
+small "scope" (age bucket, gender, ...) that must match exactly.
+
+On a miss, an optional nearest-neighbour lookup over character-trigram
+vectors within the same scope catches light paraphrases. It is off unless
+RESPONSE_CACHE_SIMILARITY is set, because trigram overlap can't see
+negation.
+
+Prompts that normalize to fewer than RESPONSE_CACHE_MIN_TOKENS tokens
+("hi", "how are you", "what is it" all normalize to "") are never cached:
+they carry too little to say two users asked the same thing.
+
+Entries expire after a TTL and the least recently used ones are evicted
+once the cache is full. Hit rate and the upstream latency saved are
+exposed through ``cache_metrics()``.
+"""
+
+import copy
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from config import Config
+
+_STOP_WORDS = {
+    "a", "about", "also", "am", "an", "and", "any", "are", "as", "at", "be", "been", "but", "by",
+    "can", "could", "did", "do", "does", "doctor", "feel", "feeling", "for", "from", "get", "got",
+    "had", "has", "have", "having", "hello", "hi", "how", "i", "i'm", "im", "in", "is", "it", "its",
+    "just", "like", "little", "me", "my", "of", "on", "or", "please", "really", "should", "since",
+    "so", "some", "that", "the", "there", "this", "to", "very", "was", "what", "with", "you",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_text(text: str) -> str:
+    tokens = [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOP_WORDS]
+    return " ".join(tokens)
+
+
+def age_bucket(age: Any) -> str:
+    try:
+        a = int(age)
+    except (TypeError, ValueError):
+        return "unknown"
+    if a <= 12:
+        return "child"
+    if a <= 17:
+        return "teen"
+    if a <= 39:
+        return "adult"
+    if a <= 64:
+        return "middle"
+    return "senior"
+
+
+def fingerprint(text: str, *scope: Any) -> str:
+    raw = normalize_text(text) + "|" + "|".join(str(s or "").strip().lower() for s in scope)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _trigrams(text: str) -> Counter:
+    padded = f"  {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(v * b.get(k, 0) for k, v in a.items())
+    na = math.sqrt(sum(v * v for v in a.values()))
+    nb = math.sqrt(sum(v * v for v in b.values()))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+class ResponseCache:
+    """TTL + LRU cache with optional trigram nearest-neighbour lookup."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int = 2000,
+        ttl_seconds: float = 6 * 3600,
+        similarity_threshold: float = 0.0,
+        min_tokens: int = 1,
+    ):
+        self.name = name
+        self.min_tokens = max(1, int(min_tokens))
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.similarity_threshold = float(similarity_threshold or 0.0)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "evictions": 0,
+            "saved_ms": 0.0,
+        }
+
+    def _key(self, text: str, scope: Iterable[Any]) -> str:
+        return fingerprint(text, *scope)
+
+    def cacheable(self, text: str) -> bool:
+        return len(normalize_text(text).split()) >= self.min_tokens
+
+    def get(self, text: str, *scope: Any) -> Optional[Any]:
+        if not self.cacheable(text):
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return None
+        key = self._key(text, scope)
+        scope_key = "|".join(str(s or "").strip().lower() for s in scope)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] <= now:
+                self._entries.pop(key, None)
+                entry = None
+
+            if entry is None and self.similarity_threshold > 0:
+                entry = self._nearest(normalize_text(text), scope_key, now)
+                if entry is not None:
+                    self._stats["semantic_hits"] += 1
+
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(entry["key"])
+            self._stats["hits"] += 1
+            self._stats["saved_ms"] += entry["cost_ms"]
+            return copy.deepcopy(entry["value"])
+
+    def _nearest(self, normalized: str, scope_key: str, now: float) -> Optional[Dict[str, Any]]:
+        vector = _trigrams(normalized)
+        best, best_score = None, self.similarity_threshold
+        for entry in self._entries.values():
+            if entry["scope"] != scope_key or entry["expires_at"] <= now:
+                continue
+            score = _cosine(vector, entry["vector"])
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def set(self, text: str, *scope: Any, value: Any, cost_ms: float = 0.0) -> None:
+        if not self.cacheable(text):
+            return
+        key = self._key(text, scope)
+        normalized = normalize_text(text)
+        entry = {
+            "key": key,
+            "scope": "|".join(str(s or "").strip().lower() for s in scope),
+            "value": copy.deepcopy(value),
+            "vector": _trigrams(normalized) if self.similarity_threshold > 0 else None,
+            "cost_ms": float(cost_ms or 0.0),
+            "expires_at": time.time() + self.ttl_seconds,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._entries)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+        out["saved_ms"] = round(out["saved_ms"], 1)
+        return out
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(name: str) -> ResponseCache:
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = ResponseCache(
+                name,
+                max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl_seconds=Config.RESPONSE_CACHE_TTL_SECONDS,
+                similarity_threshold=Config.RESPONSE_CACHE_SIMILARITY,
+                min_tokens=Config.RESPONSE_CACHE_MIN_TOKENS,
+            )
+            _caches[name] = cache
+        return cache
+
+
+def cache_metrics() -> Dict[str, Dict[str, Any]]:
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {c.name: c.stats() for c in caches}
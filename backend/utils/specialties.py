@@ -0,0 +1,93 @@
+"""Cached specialty lookups for doctor registration and profile updates.
+
+The ``specialties`` table is a small, rarely changing lookup list, so the
+whole name/id map is kept in-process and reloaded every
+``SPECIALTY_CACHE_TTL_SECONDS``. Names are matched case-insensitively
+(like the table's collation). Names or ids not in the cached map - e.g.
+added since the last reload - are fetched with one batched ``IN (...)``
+query instead of one query per specialty.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from utils.database import execute_query
+
+SPECIALTY_CACHE_TTL_SECONDS = 300
+
+_lock = threading.Lock()
+_by_name: Dict[str, Dict] = {}
+_by_id: Dict[int, Dict] = {}
+_loaded_at = 0.0
+
+
+def _key(name: str) -> str:
+    return (name or '').strip().lower()
+
+
+def _remember(rows) -> None:
+    for r in rows or []:
+        if not r or r.get('id') is None:
+            continue
+        row = {'id': int(r['id']), 'name': r.get('name')}
+        _by_id[row['id']] = row
+        _by_name[_key(row['name'])] = row
+
+
+def _ensure_loaded() -> None:
+    global _loaded_at
+    if time.time() - _loaded_at < SPECIALTY_CACHE_TTL_SECONDS:
+        return
+    rows = execute_query('SELECT id, name FROM specialties', fetch_all=True)
+    with _lock:
+        _by_name.clear()
+        _by_id.clear()
+        _remember(rows)
+        _loaded_at = time.time()
+
+
+def invalidate() -> None:
+    global _loaded_at
+    _loaded_at = 0.0
+
+
+def find_by_names(names: Iterable[str]) -> Dict[str, Dict]:
+    """``{lowercased name: {'id', 'name'}}`` for the names that exist."""
+    _ensure_loaded()
+    wanted = {_key(n) for n in names if _key(n)}
+    found = {k: _by_name[k] for k in wanted if k in _by_name}
+    missing = sorted(wanted - set(found))
+    if missing:
+        placeholders = ','.join(['%s'] * len(missing))
+        rows = execute_query(
+            f'SELECT id, name FROM specialties WHERE name IN ({placeholders})',
+            tuple(missing),
+            fetch_all=True,
+        )
+        with _lock:
+            _remember(rows)
+        found.update({k: _by_name[k] for k in missing if k in _by_name})
+    return found
+
+
+def find_by_name(name: str) -> Optional[Dict]:
+    return find_by_names([name]).get(_key(name))
+
+
+def find_by_ids(ids: Iterable[int]) -> Dict[int, Dict]:
+    _ensure_loaded()
+    wanted = {int(i) for i in ids}
+    found = {i: _by_id[i] for i in wanted if i in _by_id}
+    missing = sorted(wanted - set(found))
+    if missing:
+        placeholders = ','.join(['%s'] * len(missing))
+        rows = execute_query(
+            f'SELECT id, name FROM specialties WHERE id IN ({placeholders})',
+            tuple(missing),
+            fetch_all=True,
+        )
+        with _lock:
+            _remember(rows)
+        found.update({i: _by_id[i] for i in missing if i in _by_id})
+    return found
@@ -0,0 +1,119 @@
+"""Per-day symptom term counts for the admin analytics page.
+
+Every logged symptom check adds its terms to ``symptom_term_daily``
+(``(day, term) -> count``) at write time, so "top symptoms" over any range
+is a ``SUM ... GROUP BY term`` over at most (days x distinct terms per day)
+small rows instead of re-splitting every raw ``symptom_logs.symptoms``
+string. Counts are exact: a term counts once per check that mentions it.
+
+``scripts/backfill_symptom_terms.py`` rebuilds the table from
+``symptom_logs`` (first rollout, or after bulk deletes).
+"""
+
+import sys
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, List
+
+import pymysql
+
+from utils.database import execute_query, get_db_connection
+
+MAX_TERMS_PER_CHECK = 10
+MAX_TERM_LENGTH = 100
+
+
+def extract_terms(text: str) -> List[str]:
+    """Comma/semicolon/newline separated, lowercased, de-duplicated terms."""
+    raw = (text or '').strip().lower()
+    if not raw:
+        return []
+    parts = [p.strip() for p in raw.replace('\n', ',').replace(';', ',').split(',')]
+    terms: List[str] = []
+    for p in parts:
+        p = ' '.join(p.split())[:MAX_TERM_LENGTH]
+        if p and p not in terms:
+            terms.append(p)
+        if len(terms) >= MAX_TERMS_PER_CHECK:
+            break
+    return terms
+
+
+def _day(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.now().date()
+
+
+def _apply(counts: Dict[tuple, int], cursor) -> None:
+    rows = [(day, term, n) for (day, term), n in counts.items() if n]
+    if not rows:
+        return
+    cursor.executemany(
+        """
+        INSERT INTO symptom_term_daily (day, term, count)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE count = GREATEST(count + VALUES(count), 0)
+        """,
+        rows,
+    )
+
+
+def record_check(symptoms_text: str, created_at=None, *, delta: int = 1) -> None:
+    """Add (or with ``delta=-1`` remove) one check's terms. Best effort."""
+    terms = extract_terms(symptoms_text)
+    if not terms:
+        return
+    day = _day(created_at)
+    try:
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                _apply({(day, t): delta for t in terms}, cursor)
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        # Analytics must never fail the user's symptom check.
+        print(f"symptom term index update failed: {e}", file=sys.stderr)
+
+
+def top_terms(start_day: date, limit: int = 12) -> List[Dict]:
+    try:
+        rows = execute_query(
+            """
+            SELECT term, SUM(count) AS count
+            FROM symptom_term_daily
+            WHERE day >= %s
+            GROUP BY term
+            HAVING SUM(count) > 0
+            ORDER BY count DESC, term ASC
+            LIMIT %s
+            """,
+            (start_day, int(limit)),
+            fetch_all=True,
+        )
+    except pymysql.err.ProgrammingError:
+        # Table not migrated yet (run fix_database.py + the backfill script).
+        return []
+    return [{'symptom': r['term'], 'count': int(r['count'])} for r in rows or []]
+
+
+def rebuild(rows: Iterable[Dict], conn, *, batch_size: int = 2000) -> int:
+    """Recount from ``symptom_logs`` rows (``symptoms``, ``created_at``); returns rows seen."""
+    counts: Counter = Counter()
+    seen = 0
+    with conn.cursor() as cursor:
+        for row in rows:
+            seen += 1
+            day = _day(row.get('created_at'))
+            for term in extract_terms(row.get('symptoms')):
+                counts[(day, term)] += 1
+            if len(counts) >= batch_size:
+                _apply(counts, cursor)
+                counts.clear()
+        _apply(counts, cursor)
+    conn.commit()
+    return seen
@@ -0,0 +1,378 @@
+"""Local rule-based symptom triage.
+
+A single compiled regex (one alternation over every known phrase) scans the
+symptom text once; each hit votes for a specialty and may raise urgency.
+The result carries a confidence score so callers can fall back to Gemini
+only when the local answer is weak.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# phrase -> (specialty, weight). Weight 3 = specific to that specialty,
+# 1 = weak hint.
+SYMPTOM_LEXICON: Dict[str, Tuple[str, int]] = {
+    # Cardiology
+    "chest pain": ("Cardiology", 3),
+    "chest tightness": ("Cardiology", 3),
+    "chest pressure": ("Cardiology", 3),
+    "palpitations": ("Cardiology", 3),
+    "racing heart": ("Cardiology", 3),
+    "irregular heartbeat": ("Cardiology", 3),
+    "high blood pressure": ("Cardiology", 2),
+    "hypertension": ("Cardiology", 2),
+    "swollen ankles": ("Cardiology", 1),
+    # Pulmonology
+    "shortness of breath": ("Pulmonology", 2),
+    "short of breath": ("Pulmonology", 2),
+    "breathless": ("Pulmonology", 2),
+    "difficulty breathing": ("Pulmonology", 2),
+    "wheezing": ("Pulmonology", 3),
+    "asthma": ("Pulmonology", 3),
+    "persistent cough": ("Pulmonology", 2),
+    "coughing blood": ("Pulmonology", 3),
+    "cough": ("Pulmonology", 1),
+    "coughing": ("Pulmonology", 1),
+    # Neurology
+    "migraine": ("Neurology", 3),
+    "seizure": ("Neurology", 3),
+    "seizures": ("Neurology", 3),
+    "numbness": ("Neurology", 2),
+    "tingling": ("Neurology", 2),
+    "tremor": ("Neurology", 3),
+    "memory loss": ("Neurology", 3),
+    "fainting": ("Neurology", 2),
+    "fainted": ("Neurology", 2),
+    "slurred speech": ("Neurology", 3),
+    "headache": ("Neurology", 1),
+    "headaches": ("Neurology", 1),
+    "dizziness": ("Neurology", 1),
+    "dizzy": ("Neurology", 1),
+    # Dermatology
+    "rash": ("Dermatology", 3),
+    "itchy skin": ("Dermatology", 3),
+    "acne": ("Dermatology", 3),
+    "eczema": ("Dermatology", 3),
+    "psoriasis": ("Dermatology", 3),
+    "hives": ("Dermatology", 3),
+    "mole": ("Dermatology", 2),
+    "itching": ("Dermatology", 2),
+    "itchy": ("Dermatology", 2),
+    "itch": ("Dermatology", 2),
+    "skin": ("Dermatology", 1),
+    # Gastroenterology
+    "stomach pain": ("Gastroenterology", 3),
+    "stomach ache": ("Gastroenterology", 3),
+    "abdominal pain": ("Gastroenterology", 3),
+    "diarrhea": ("Gastroenterology", 3),
+    "diarrhoea": ("Gastroenterology", 3),
+    "constipation": ("Gastroenterology", 3),
+    "heartburn": ("Gastroenterology", 3),
+    "acid reflux": ("Gastroenterology", 3),
+    "blood in stool": ("Gastroenterology", 3),
+    "bloating": ("Gastroenterology", 2),
+    "vomiting": ("Gastroenterology", 2),
+    "vomit": ("Gastroenterology", 2),
+    "nausea": ("Gastroenterology", 2),
+    # ENT
+    "sore throat": ("ENT", 3),
+    "ear pain": ("ENT", 3),
+    "earache": ("ENT", 3),
+    "ringing in ears": ("ENT", 3),
+    "tinnitus": ("ENT", 3),
+    "hearing loss": ("ENT", 3),
+    "sinus": ("ENT", 3),
+    "sinusitis": ("ENT", 3),
+    "tonsils": ("ENT", 3),
+    "blocked nose": ("ENT", 2),
+    "runny nose": ("ENT", 2),
+    "nasal congestion": ("ENT", 2),
+    # Ophthalmology
+    "blurred vision": ("Ophthalmology", 3),
+    "blurry vision": ("Ophthalmology", 3),
+    "eye pain": ("Ophthalmology", 3),
+    "red eye": ("Ophthalmology", 3),
+    "red eyes": ("Ophthalmology", 3),
+    "itchy eyes": ("Ophthalmology", 3),
+    "watery eyes": ("Ophthalmology", 2),
+    "vision loss": ("Ophthalmology", 3),
+    # Dentistry
+    "toothache": ("Dentistry", 3),
+    "tooth pain": ("Dentistry", 3),
+    "bleeding gums": ("Dentistry", 3),
+    "swollen gums": ("Dentistry", 3),
+    # Orthopedics
+    "back pain": ("Orthopedics", 3),
+    "joint pain": ("Orthopedics", 3),
+    "knee pain": ("Orthopedics", 3),
+    "shoulder pain": ("Orthopedics", 3),
+    "hip pain": ("Orthopedics", 3),
+    "neck pain": ("Orthopedics", 2),
+    "fracture": ("Orthopedics", 3),
+    "broken bone": ("Orthopedics", 3),
+    "sprain": ("Orthopedics", 3),
+    "sprained": ("Orthopedics", 3),
+    # Psychiatry
+    "anxiety": ("Psychiatry", 3),
+    "depression": ("Psychiatry", 3),
+    "depressed": ("Psychiatry", 3),
+    "panic attack": ("Psychiatry", 3),
+    "panic attacks": ("Psychiatry", 3),
+    "suicidal": ("Psychiatry", 3),
+    "mood swings": ("Psychiatry", 2),
+    "insomnia": ("Psychiatry", 2),
+    "can't sleep": ("Psychiatry", 2),
+    "stress": ("Psychiatry", 1),
+    # Gynecology
+    "irregular periods": ("Gynecology", 3),
+    "missed period": ("Gynecology", 3),
+    "period pain": ("Gynecology", 3),
+    "menstrual": ("Gynecology", 3),
+    "pregnant": ("Gynecology", 3),
+    "pregnancy": ("Gynecology", 3),
+    "vaginal": ("Gynecology", 3),
+    "pelvic pain": ("Gynecology", 2),
+    # Urology
+    "painful urination": ("Urology", 3),
+    "burning urination": ("Urology", 3),
+    "burning when urinating": ("Urology", 3),
+    "frequent urination": ("Urology", 3),
+    "blood in urine": ("Urology", 3),
+    "kidney stone": ("Urology", 3),
+    "kidney stones": ("Urology", 3),
+    # Oncology
+    "lump": ("Oncology", 2),
+    "unexplained weight loss": ("Oncology", 2),
+    # General Practice
+    "fever": ("General Practice", 2),
+    "high fever": ("General Practice", 2),
+    "flu": ("General Practice", 2),
+    "body ache": ("General Practice", 2),
+    "body aches": ("General Practice", 2),
+    "cold": ("General Practice", 1),
+    "chills": ("General Practice", 1),
+    "fatigue": ("General Practice", 1),
+    "tired": ("General Practice", 1),
+    "weakness": ("General Practice", 1),
+    "weak": ("General Practice", 1),
+    # Users sometimes name the specialist directly ("need a cardiologist").
+    "cardiologist": ("Cardiology", 3),
+    "dermatologist": ("Dermatology", 3),
+    "neurologist": ("Neurology", 3),
+    "gastroenterologist": ("Gastroenterology", 3),
+    "pulmonologist": ("Pulmonology", 3),
+    "psychiatrist": ("Psychiatry", 3),
+    "gynecologist": ("Gynecology", 3),
+    "gynaecologist": ("Gynecology", 3),
+    "urologist": ("Urology", 3),
+    "oncologist": ("Oncology", 3),
+    "pediatrician": ("Pediatrics", 3),
+    "paediatrician": ("Pediatrics", 3),
+    "dentist": ("Dentistry", 3),
+}
+
+# Red flags force urgency "high" regardless of specialty.
+RED_FLAGS = (
+    "chest pain",
+    "chest pressure",
+    "difficulty breathing",
+    "can't breathe",
+    "cannot breathe",
+    "coughing blood",
+    "vomiting blood",
+    "blood in stool",
+    "seizure",
+    "seizures",
+    "fainted",
+    "fainting",
+    "unconscious",
+    "severe bleeding",
+    "stroke",
+    "slurred speech",
+    "face drooping",
+    "paralysis",
+    "suicidal",
+    "worst headache",
+    "vision loss",
+    "broken bone",
+)
+
+# Modifiers that bump an otherwise low urgency to "medium".
+SEVERITY_MODIFIERS = (
+    "severe",
+    "persistent",
+    "worsening",
+    "getting worse",
+    "high fever",
+    "for weeks",
+    "for a week",
+    "blood",
+    "swollen",
+)
+
+# Negation cues ("no fever", "I don't have chest pain"). A cue negates the
+# phrases after it up to the end of its clause. "can't"/"cannot" are left
+# out on purpose: "can't breathe" is a symptom, not a denial.
+_NEGATION_CUE_RE = re.compile(
+    r"\b(?:no|not|never|without|denies|deny|denied|negative for|free of|"
+    r"(?:do|does|did|have|has|had|is|are|was|were)n'?t|dont|doesnt|didnt|havent|hasnt|isnt)\b"
+)
+_CLAUSE_END_RE = re.compile(r"[,.;:!?\n]|\b(?:but|just|only|however|although|though|except|and now)\b")
+
+# Any negation in the text scales confidence by this, so a sentence that
+# denies symptoms goes to the model rather than being answered locally.
+_NEGATION_CONFIDENCE_FACTOR = 0.5
+
+_PEDIATRIC_AGE = 12
+
+_NEXT_STEPS = {
+    "high": [
+        "Seek emergency care now or call your local emergency number.",
+        "Do not drive yourself if you feel faint, confused or short of breath.",
+    ],
+    "medium": [
+        "Book an appointment with the recommended specialist in the next few days.",
+        "Seek urgent care sooner if symptoms get worse or new symptoms appear.",
+    ],
+    "low": [
+        "Rest, stay hydrated and monitor your symptoms.",
+        "Book an appointment if symptoms persist or worsen.",
+    ],
+}
+
+
+class SymptomTriage:
+    """Compiled triage engine; build once and reuse across requests."""
+
+    def __init__(
+        self,
+        *,
+        hint_words: Iterable[str] = (),
+        specialty_synonyms: Optional[Mapping[str, str]] = None,
+        specialties: Iterable[str] = (),
+    ):
+        self._votes: Dict[str, Tuple[str, int]] = dict(SYMPTOM_LEXICON)
+
+        for name in specialties:
+            low = (name or "").strip().lower()
+            if low:
+                self._votes.setdefault(low, (name, 3))
+        for synonym, canon in (specialty_synonyms or {}).items():
+            self._votes.setdefault(synonym.lower(), (canon, 3))
+
+        self._hints = {w.lower() for w in hint_words}
+        self._red_flags = {t.lower() for t in RED_FLAGS}
+        self._modifiers = {t.lower() for t in SEVERITY_MODIFIERS}
+
+        phrases = set(self._votes) | self._hints | self._red_flags | self._modifiers
+        ordered = sorted(phrases, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"(?<![a-z])(?:" + "|".join(re.escape(p) for p in ordered) + r")(?![a-z])"
+        )
+
+    def scan(self, text: str) -> List[str]:
+        """Return every matched phrase (longest match wins at each position)."""
+
+        return self._pattern.findall((text or "").lower())
+
+    def _negated_spans(self, lowered: str) -> List[Tuple[int, int]]:
+        spans = []
+        for cue in _NEGATION_CUE_RE.finditer(lowered):
+            end = _CLAUSE_END_RE.search(lowered, cue.end())
+            spans.append((cue.end(), end.start() if end else len(lowered)))
+        return spans
+
+    def triage(self, text: str, *, age: Any = None) -> Dict[str, Any]:
+        lowered = (text or "").lower().replace("\u2019", "'")
+        spans = self._negated_spans(lowered)
+        hits: List[str] = []
+        negated: List[str] = []
+        for m in self._pattern.finditer(lowered):
+            if any(start <= m.start() < end for start, end in spans):
+                if m.group(0) not in negated:
+                    negated.append(m.group(0))
+            else:
+                hits.append(m.group(0))
+
+        scores: Dict[str, int] = {}
+        matched: List[str] = []
+        red_flags: List[str] = []
+        severity = False
+        for phrase in hits:
+            if phrase in self._red_flags and phrase not in red_flags:
+                red_flags.append(phrase)
+            # Modifiers can be swallowed by a longer phrase ("persistent cough").
+            if any(m in phrase for m in self._modifiers):
+                severity = True
+            vote = self._votes.get(phrase)
+            if vote:
+                specialty, weight = vote
+                scores[specialty] = scores.get(specialty, 0) + weight
+                if phrase not in matched:
+                    matched.append(phrase)
+            elif phrase in self._hints and phrase not in matched:
+                matched.append(phrase)
+
+        try:
+            age_i = int(age) if age not in (None, "") else None
+        except (TypeError, ValueError):
+            age_i = None
+
+        specialty = None
+        confidence = 0.0
+        if scores:
+            ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+            specialty, top = ranked[0]
+            total = sum(scores.values())
+            # Share of the vote for the winner, damped when the evidence is thin.
+            confidence = (top / total) * min(1.0, top / 3.0)
+            # Children go to Pediatrics whatever the organ system; being sure
+            # it is *some* medical issue is what matters then.
+            if age_i is not None and age_i <= _PEDIATRIC_AGE:
+                specialty = "Pediatrics"
+                confidence = min(1.0, total / 3.0)
+        elif matched:
+            # Generic symptom words only.
+            specialty, confidence = "General Practice", 0.3
+        if spans:
+            confidence *= _NEGATION_CONFIDENCE_FACTOR
+
+        if red_flags:
+            urgency = "high"
+        elif severity or len(matched) >= 3:
+            urgency = "medium"
+        else:
+            urgency = "low"
+
+        return {
+            "is_medical": bool(matched or red_flags),
+            "recommended_specialty": specialty,
+            "urgency_level": urgency,
+            "confidence": round(confidence, 3),
+            "matched_terms": matched,
+            "red_flags": red_flags,
+            "negated_terms": negated,
+        }
+
+
+def build_local_analysis(result: Dict[str, Any], specialty: str) -> Dict[str, Any]:
+    """Shape a triage result like the Gemini JSON the frontend renders."""
+
+    urgency = result.get("urgency_level") or "medium"
+    terms = ", ".join(result.get("matched_terms") or []) or "your symptoms"
+    summary = f"Symptoms such as {terms} are usually assessed by {specialty}."
+    if urgency == "high":
+        summary += " Some of what you describe can be serious and needs prompt attention."
+
+    return {
+        "is_medical": True,
+        "recommended_specialty": specialty,
+        "urgency_level": urgency,
+        "summary": summary,
+        "reasoning": f"Matched common symptom patterns: {terms}.",
+        "red_flags": list(result.get("red_flags") or []),
+        "next_steps": list(_NEXT_STEPS.get(urgency, _NEXT_STEPS["medium"])),
+        "disclaimer": "This tool provides informational guidance only and is not a medical diagnosis.",
+        "source": "local",
+        "confidence": result.get("confidence"),
+    }
@@ -0,0 +1,94 @@
+"""Report uploads spooled to disk instead of held in memory.
+
+``spool_upload`` copies a multipart file to a temporary file in fixed-size
+chunks, enforcing ``MAX_FILE_SIZE`` while it streams. The OCR stages then
+open the file by path: PyMuPDF and Pillow read it from disk on demand
+instead of each getting another in-memory copy. Bytes are only
+materialised when a stage genuinely needs them, e.g. the inline Gemini
+request, and only for the duration of that call.
+
+The temporary file is removed when the ``SpooledUpload`` is closed (or
+used as a context manager) or, for uploads handed to a background job, as
+soon as nothing references it any more.
+"""
+
+import os
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from config import Config
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """The upload exceeds ``MAX_FILE_SIZE``."""
+
+
+class SpooledUpload:
+    def __init__(self, path: str, size: int, filename: str = ""):
+        self.path = path
+        self.size = int(size)
+        self.filename = filename
+        self._finalizer = weakref.finalize(self, _remove, path)
+
+    def read_bytes(self) -> bytes:
+        """The whole file as ``bytes`` (one copy; prefer passing ``path``)."""
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+    def copy_to(self, dest: Path) -> None:
+        shutil.copyfile(self.path, dest)
+
+    def close(self) -> None:
+        self._finalizer()
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def spool_upload(
+    stream: BinaryIO,
+    *,
+    max_bytes: Optional[int] = None,
+    suffix: str = "",
+    filename: str = "",
+) -> SpooledUpload:
+    """Copy ``stream`` to a temp file; raises ``UploadTooLarge`` past ``max_bytes``."""
+    limit = Config.MAX_FILE_SIZE if max_bytes is None else int(max_bytes)
+    spool_dir = Config.UPLOAD_SPOOL_DIR or None
+    if spool_dir:
+        os.makedirs(spool_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="pocketcare-upload-", suffix=suffix, dir=spool_dir)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise UploadTooLarge(f"File is larger than {limit // (1024 * 1024)} MB")
+                out.write(chunk)
+    except BaseException:
+        _remove(path)
+        raise
+    return SpooledUpload(path, size, filename)
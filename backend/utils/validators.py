@@ -1,8 +1,9 @@
 import re
-from email_validator import validate_email, EmailNotValidError
 
 def validate_email_format(email):
     """Validate email format"""
+    # email_validator pulls in DNS helpers; load it on first use, not at start-up
+    from email_validator import validate_email, EmailNotValidError
     try:
         validate_email(email)
         return True, None
@@ -0,0 +1,39 @@
+"""Pre-fork warm-up for gunicorn's ``preload_app`` mode.
+
+Gemini, OCR, PDF, image and HTTP client libraries are imported on first use
+so a worker starts quickly and only pays for what it serves. When gunicorn
+preloads the app, ``warm_imports`` runs once in the master before workers
+are forked: the modules are imported a single time and their pages are
+shared copy-on-write by every worker instead of being loaded (and held in
+private memory) by each one on its first AI/OCR request.
+
+Nothing here opens connections or starts threads; those stay lazy and
+per-worker.
+"""
+
+import importlib
+import sys
+import time
+from typing import Dict, Iterable
+
+
+def warm_imports(modules: Iterable[str]) -> Dict[str, float]:
+    """Import each module; returns ``{name: milliseconds}`` for those that loaded.
+
+    Missing optional dependencies are skipped.
+    """
+    timings: Dict[str, float] = {}
+    for name in modules:
+        name = (name or '').strip()
+        if not name or name in sys.modules:
+            continue
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        except Exception as e:
+            print(f"warm-up import of {name} failed: {e}", file=sys.stderr)
+            continue
+        timings[name] = (time.perf_counter() - started) * 1000.0
+    return timings
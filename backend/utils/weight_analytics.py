@@ -0,0 +1,235 @@
+"""Server-side weight trend analytics.
+
+Turns a user's raw weight entries into what the dashboard charts need:
+trailing moving average, weekly/monthly buckets, rate of change, a goal ETA
+projection and an LTTB-downsampled series capped at a requested number of
+points. NumPy is used when installed; the pure-Python path gives the same
+numbers.
+"""
+
+import math
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# NumPy is imported on first use, not at import time (it adds noticeably to
+# worker start-up and is only needed once analytics are actually computed).
+_NOT_LOADED = object()
+np = _NOT_LOADED
+
+
+def _numpy():
+    global np
+    if np is _NOT_LOADED:
+        try:
+            import numpy
+        except ImportError:  # optional dependency
+            numpy = None
+        np = numpy
+    return np
+
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_RATE_DAYS = 28
+DEFAULT_POINTS = 300
+
+
+def _moving_average(days: Sequence[int], weights: Sequence[float], window_days: int) -> List[float]:
+    """Trailing time-based mean: each point averages entries in (day - window, day]."""
+    n = len(days)
+    if n == 0:
+        return []
+
+    np = _numpy()
+    if np is not None:
+        d = np.asarray(days, dtype=np.int64)
+        w = np.asarray(weights, dtype=np.float64)
+        csum = np.concatenate(([0.0], np.cumsum(w)))
+        start = np.searchsorted(d, d - window_days, side="right")
+        end = np.arange(1, n + 1)
+        return ((csum[end] - csum[start]) / (end - start)).tolist()
+
+    out: List[float] = []
+    total = 0.0
+    lo = 0
+    for hi in range(n):
+        total += weights[hi]
+        while days[lo] <= days[hi] - window_days:
+            total -= weights[lo]
+            lo += 1
+        out.append(total / (hi - lo + 1))
+    return out
+
+
+def _slope_per_day(days: Sequence[int], weights: Sequence[float]) -> Optional[float]:
+    """Least-squares slope in kg/day, or None with fewer than two distinct days."""
+    if len(days) < 2 or days[0] == days[-1]:
+        return None
+
+    np = _numpy()
+    if np is not None:
+        d = np.asarray(days, dtype=np.float64)
+        w = np.asarray(weights, dtype=np.float64)
+        dx = d - d.mean()
+        denom = float((dx * dx).sum())
+        return float((dx * (w - w.mean())).sum() / denom) if denom else None
+
+    mx = sum(days) / len(days)
+    my = sum(weights) / len(weights)
+    num = sum((x - mx) * (y - my) for x, y in zip(days, weights))
+    den = sum((x - mx) ** 2 for x in days)
+    return num / den if den else None
+
+
+def _buckets(dates: Sequence[date], weights: Sequence[float], kind: str) -> List[Dict[str, Any]]:
+    groups: Dict[date, List[float]] = {}
+    for d, w in zip(dates, weights):
+        key = d - timedelta(days=d.weekday()) if kind == "week" else d.replace(day=1)
+        groups.setdefault(key, []).append(w)
+    return [
+        {
+            "start": key.isoformat(),
+            "avg_kg": round(sum(vals) / len(vals), 2),
+            "min_kg": round(min(vals), 2),
+            "max_kg": round(max(vals), 2),
+            "count": len(vals),
+        }
+        for key, vals in sorted(groups.items())
+    ]
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` visually representative points."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    selected = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex.
+        next_start = int(math.floor((i + 1) * every)) + 1
+        next_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        span = max(next_end - next_start, 1)
+        avg_x = sum(xs[next_start:next_end]) / span if next_end > next_start else xs[-1]
+        avg_y = sum(ys[next_start:next_end]) / span if next_end > next_start else ys[-1]
+
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def _projection(
+    *,
+    last_date: date,
+    current_kg: float,
+    slope: Optional[float],
+    goal: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    if not goal or goal.get("target_weight_kg") is None:
+        return None
+
+    target = float(goal["target_weight_kg"])
+    remaining = target - current_kg
+    out: Dict[str, Any] = {
+        "target_weight_kg": round(target, 2),
+        "remaining_kg": round(remaining, 2),
+        "eta": None,
+        "days_to_goal": None,
+        "on_track": None,
+    }
+    if abs(remaining) < 0.05:
+        out.update({"eta": last_date.isoformat(), "days_to_goal": 0, "on_track": True})
+        return out
+    # Only project when the trend is actually heading towards the target.
+    if not slope or (remaining > 0) != (slope > 0):
+        out["reason"] = "Current trend is not moving towards the goal"
+        return out
+
+    days_needed = int(math.ceil(round(remaining / slope, 6)))
+    eta = last_date + timedelta(days=days_needed)
+    out.update({"eta": eta.isoformat(), "days_to_goal": days_needed})
+
+    target_date = goal.get("target_date")
+    if isinstance(target_date, str):
+        try:
+            target_date = date.fromisoformat(target_date)
+        except ValueError:
+            target_date = None
+    if isinstance(target_date, date):
+        out["on_track"] = eta <= target_date
+    return out
+
+
+def compute_analytics(
+    entries: Sequence[Tuple[date, float]],
+    *,
+    goal: Optional[Dict[str, Any]] = None,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    rate_days: int = DEFAULT_RATE_DAYS,
+    points: int = DEFAULT_POINTS,
+) -> Dict[str, Any]:
+    """Analytics for ``entries`` = ``[(entry_date, weight_kg), ...]`` sorted by date."""
+    if not entries:
+        return {
+            "summary": {"count": 0},
+            "series": [],
+            "weekly": [],
+            "monthly": [],
+            "rate": None,
+            "projection": None,
+        }
+
+    dates = [d for d, _ in entries]
+    weights = [float(w) for _, w in entries]
+    days = [d.toordinal() for d in dates]
+
+    moving = _moving_average(days, weights, max(1, int(window_days)))
+
+    recent_from = days[-1] - max(1, int(rate_days))
+    recent_idx = next((i for i, d in enumerate(days) if d > recent_from), len(days) - 1)
+    recent_slope = _slope_per_day(days[recent_idx:], weights[recent_idx:])
+    overall_slope = _slope_per_day(days, weights)
+    slope = recent_slope if recent_slope is not None else overall_slope
+
+    keep = lttb(days, weights, max(3, int(points)))
+    series = [
+        {
+            "date": dates[i].isoformat(),
+            "weight_kg": round(weights[i], 2),
+            "moving_avg_kg": round(moving[i], 2),
+        }
+        for i in keep
+    ]
+
+    return {
+        "summary": {
+            "count": len(entries),
+            "first_date": dates[0].isoformat(),
+            "last_date": dates[-1].isoformat(),
+            "start_kg": round(weights[0], 2),
+            "latest_kg": round(weights[-1], 2),
+            "min_kg": round(min(weights), 2),
+            "max_kg": round(max(weights), 2),
+            "change_kg": round(weights[-1] - weights[0], 2),
+            "moving_avg_kg": round(moving[-1], 2),
+        },
+        "series": series,
+        "weekly": _buckets(dates, weights, "week"),
+        "monthly": _buckets(dates, weights, "month"),
+        "rate": {
+            "window_days": int(rate_days),
+            "kg_per_week": round(recent_slope * 7, 3) if recent_slope is not None else None,
+            "overall_kg_per_week": round(overall_slope * 7, 3) if overall_slope is not None else None,
+        },
+        # Project from the smoothed value so one noisy weigh-in doesn't swing the ETA.
+        "projection": _projection(last_date=dates[-1], current_kg=moving[-1], slope=slope, goal=goal),
+    }
@@ -0,0 +1,139 @@
+"""Stored AI weight recommendations (stale-while-revalidate).
+
+Each user has at most one stored recommendation in ``weight_recommendations``
+together with the fingerprint of the inputs it was generated from: latest
+weight/height/age/BMI, the active goal and ``WEIGHT_PROMPT_VERSION``.
+
+- same fingerprint   -> the stored payload is served as is
+- changed fingerprint -> the old payload is served marked ``stale`` while one
+  background refresh regenerates it (claimed in the row, so concurrent
+  requests don't start duplicate Gemini calls)
+- nothing stored     -> generate now
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from utils.database import execute_query, get_db_connection
+from utils.gemini_utils import WEIGHT_PROMPT_VERSION
+
+# A refresh claim older than this is assumed dead (worker restarted, etc.).
+REFRESH_CLAIM_MINUTES = 10
+
+
+def suggestion_params(user_id: int) -> Optional[Dict[str, Any]]:
+    """Inputs for ``generate_weight_recommendations`` from the latest entry + active goal."""
+    latest = execute_query(
+        """
+        SELECT entry_date, weight_kg, height_cm, age_years, bmi
+        FROM weight_entries
+        WHERE user_id = %s
+        ORDER BY entry_date DESC, id DESC
+        LIMIT 1
+        """,
+        (user_id,),
+        fetch_one=True,
+    )
+    if not latest:
+        return None
+
+    goal = execute_query(
+        """
+        SELECT target_weight_kg, target_date
+        FROM weight_goals
+        WHERE user_id = %s AND is_active = TRUE
+        ORDER BY id DESC
+        LIMIT 1
+        """,
+        (user_id,),
+        fetch_one=True,
+    )
+
+    return {
+        "weight_kg": float(latest["weight_kg"]),
+        "height_cm": float(latest["height_cm"]),
+        "age_years": int(latest["age_years"]) if latest.get("age_years") is not None else None,
+        "bmi": float(latest["bmi"]),
+        "goal_target_weight_kg": float(goal["target_weight_kg"]) if goal and goal.get("target_weight_kg") is not None else None,
+        "goal_target_date": goal.get("target_date").isoformat() if goal and goal.get("target_date") else None,
+    }
+
+
+def fingerprint(params: Dict[str, Any]) -> str:
+    raw = json.dumps({"v": WEIGHT_PROMPT_VERSION, **params}, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def load(user_id: int) -> Optional[Dict[str, Any]]:
+    row = execute_query(
+        """
+        SELECT fingerprint, payload, generated_at
+        FROM weight_recommendations
+        WHERE user_id = %s
+        """,
+        (user_id,),
+        fetch_one=True,
+    )
+    if not row or not row.get("payload"):
+        return None
+    try:
+        row["payload"] = json.loads(row["payload"])
+    except (TypeError, ValueError):
+        return None
+    return row
+
+
+def save(user_id: int, fp: str, payload: Any) -> None:
+    execute_query(
+        """
+        INSERT INTO weight_recommendations
+            (user_id, fingerprint, prompt_version, payload, generated_at)
+        VALUES (%s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            fingerprint = VALUES(fingerprint),
+            prompt_version = VALUES(prompt_version),
+            payload = VALUES(payload),
+            generated_at = VALUES(generated_at),
+            -- only end our own claim; a newer refresh may be in flight
+            refresh_started_at = IF(refresh_fingerprint = VALUES(fingerprint), NULL, refresh_started_at),
+            refresh_fingerprint = IF(refresh_fingerprint = VALUES(fingerprint), NULL, refresh_fingerprint)
+        """,
+        (user_id, fp, WEIGHT_PROMPT_VERSION, json.dumps(payload)),
+        commit=True,
+    )
+
+
+def claim_refresh(user_id: int, fp: str) -> bool:
+    """Atomically mark a refresh for ``fp`` as in flight; False if one already is."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE weight_recommendations
+                SET refresh_fingerprint = %s, refresh_started_at = NOW()
+                WHERE user_id = %s
+                AND (refresh_fingerprint IS NULL OR refresh_fingerprint <> %s
+                     OR refresh_started_at < NOW() - INTERVAL %s MINUTE)
+                """,
+                (fp, user_id, fp, REFRESH_CLAIM_MINUTES),
+            )
+            claimed = cursor.rowcount == 1
+        conn.commit()
+        return claimed
+    finally:
+        conn.close()
+
+
+def release_refresh(user_id: int, fp: str) -> None:
+    """Drop the in-flight claim for ``fp``; a claim for another fingerprint is left alone."""
+    execute_query(
+        """
+        UPDATE weight_recommendations
+        SET refresh_fingerprint = NULL, refresh_started_at = NULL
+        WHERE user_id = %s AND refresh_fingerprint = %s
+        """,
+        (user_id, fp),
+        commit=True,
+    )
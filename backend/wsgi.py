@@ -0,0 +1,10 @@
+"""WSGI entry point for production servers (``gunicorn -c gunicorn.conf.py``).
+
+``python app.py`` stays the development server.
+"""
+
+import os
+
+from app import create_app
+
+app = create_app(os.getenv('FLASK_CONFIG', 'production'))
@@ -33,6 +33,7 @@ CREATE TABLE IF NOT EXISTS specialties (
     id INT PRIMARY KEY AUTO_INCREMENT,
     name VARCHAR(100) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     UNIQUE KEY uq_specialties_name (name)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
@@ -59,6 +60,7 @@ CREATE TABLE IF NOT EXISTS doctors (
     is_available BOOLEAN DEFAULT TRUE COMMENT 'Doctor availability toggle - TRUE for available, FALSE for unavailable',
     bio TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_specialty (specialty),
     INDEX idx_specialty_id (specialty_id),
     INDEX idx_hospital (hospital_id),
@@ -86,8 +88,10 @@ CREATE TABLE IF NOT EXISTS hospitals (
     services JSON COMMENT 'List of services offered',
     rating DECIMAL(2,1) DEFAULT 0.0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_location (latitude, longitude),
-    INDEX idx_city (city)
+    INDEX idx_city (city),
+    INDEX idx_hospitals_email (email)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ============================================================================
@@ -162,7 +166,8 @@ CREATE TABLE IF NOT EXISTS hospital_appointments (
     INDEX idx_hospital (hospital_id),
     INDEX idx_hospital_doctor (hospital_doctor_id),
     INDEX idx_date (appointment_date),
-    INDEX idx_status (status)
+    INDEX idx_status (status),
+    INDEX idx_hospital_schedule (hospital_id, appointment_date, appointment_time, status)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ============================================================================
@@ -177,7 +182,8 @@ CREATE TABLE IF NOT EXISTS symptom_logs (
     urgency_level ENUM('low', 'medium', 'high'),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_user (user_id)
+    INDEX idx_user (user_id),
+    INDEX idx_symptom_logs_created (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ============================================================================
@@ -190,10 +196,33 @@ CREATE TABLE IF NOT EXISTS medical_reports (
     file_name VARCHAR(255),
     ocr_text TEXT COMMENT 'Extracted text from OCR',
     ai_interpretation TEXT COMMENT 'Gemini explanation',
-    report_type VARCHAR(100) COMMENT 'e.g., blood test, x-ray',
+    report_type VARCHAR(100) COMMENT 'lab, imaging, prescription, discharge (NULL if unknown)',
     uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_user (user_id)
+    INDEX idx_user_uploaded (user_id, uploaded_at),
+    FULLTEXT INDEX ft_report_text (ocr_text, ai_interpretation)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================================================
+-- TABLE: lab_results
+-- ============================================================================
+-- One row per test value read from a saved report (see backend/utils/lab_results.py)
+CREATE TABLE IF NOT EXISTS lab_results (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    user_id INT NOT NULL,
+    report_id INT NULL,
+    test_code VARCHAR(32) NOT NULL COMMENT 'e.g. HBA1C, HGB; X_... for tests outside the built-in table',
+    test_name VARCHAR(100) NOT NULL,
+    value DECIMAL(12,4) NOT NULL COMMENT 'In the canonical unit for known tests',
+    unit VARCHAR(20) NULL,
+    ref_low DECIMAL(12,4) NULL,
+    ref_high DECIMAL(12,4) NULL,
+    flag CHAR(1) NULL COMMENT 'H or L',
+    source ENUM('regex', 'llm') NOT NULL DEFAULT 'regex',
+    measured_at DATETIME NOT NULL COMMENT 'Collection/report date on the report, else upload time',
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (report_id) REFERENCES medical_reports(id) ON DELETE CASCADE,
+    INDEX idx_lab_user_test_time (user_id, test_code, measured_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ============================================================================
@@ -364,6 +393,7 @@ CREATE TABLE IF NOT EXISTS bed_wards (
     INDEX idx_hospital_ward (hospital_id, ward_type),
     INDEX idx_ward_type (ward_type),
     UNIQUE KEY uq_hospital_ward_ac (hospital_id, ward_type, ac_type, room_config),
+    INDEX idx_bed_availability (ward_type, ac_type, room_config, available_beds, hospital_id),
     CONSTRAINT chk_bed_counts CHECK (
         total_beds >= 0 AND
         available_beds >= 0 AND
@@ -454,6 +484,85 @@ CREATE TABLE IF NOT EXISTS user_bed_bookings (
     INDEX idx_preferred_date (preferred_date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- ============================================================================
+-- TABLE: background_jobs
+-- Status/result store for offloaded AI and OCR work (JOB_QUEUE_BACKEND=database)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS background_jobs (
+    id CHAR(32) PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL COMMENT 'e.g. report_simplify, symptom_analysis, weight_suggestions',
+    owner VARCHAR(64) NOT NULL COMMENT 'JWT identity that submitted the job',
+    status ENUM('queued', 'running', 'succeeded', 'failed') NOT NULL DEFAULT 'queued',
+    progress TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    message VARCHAR(255) NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    result LONGTEXT NULL COMMENT 'JSON result payload',
+    error TEXT NULL COMMENT 'JSON error payload',
+    status_code INT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    expires_at DATETIME NULL COMMENT 'Finished jobs are pruned after this time',
+    INDEX idx_background_jobs_owner (owner),
+    INDEX idx_background_jobs_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================================================
+-- TABLE: bed_occupancy_series
+-- Bucketed bed occupancy per hospital and ward type (5m -> 1h -> 1d roll-ups)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS bed_occupancy_series (
+    hospital_id INT NOT NULL,
+    ward_type VARCHAR(20) NOT NULL,
+    resolution ENUM('5m', '1h', '1d') NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL DEFAULT 0,
+    occupied_sum BIGINT NOT NULL DEFAULT 0 COMMENT 'Sum of occupied beds over samples',
+    total_sum BIGINT NOT NULL DEFAULT 0 COMMENT 'Sum of total beds over samples',
+    occupied_max INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (hospital_id, resolution, bucket_start, ward_type),
+    INDEX idx_occupancy_series_retention (resolution, bucket_start),
+    FOREIGN KEY (hospital_id) REFERENCES hospitals(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================================================
+-- TABLE: weight_recommendations
+-- Latest AI weight recommendation per user, keyed by an input fingerprint
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS weight_recommendations (
+    user_id INT PRIMARY KEY,
+    fingerprint CHAR(40) NOT NULL COMMENT 'sha1 of metrics + goal + prompt version',
+    prompt_version VARCHAR(32) NOT NULL,
+    payload LONGTEXT NOT NULL COMMENT 'JSON recommendations',
+    generated_at DATETIME NOT NULL,
+    refresh_fingerprint CHAR(40) NULL COMMENT 'Set while a background refresh is running',
+    refresh_started_at DATETIME NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================================================
+-- TABLE: rate_limit_counters
+-- Shared sliding-window counters and one-time claims (RATE_LIMIT_BACKEND=database)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS rate_limit_counters (
+    rl_key CHAR(40) NOT NULL COMMENT 'sha1 of the limiter key',
+    window_start BIGINT NOT NULL COMMENT 'Unix time of the window start; 0 for claims',
+    hits INT NOT NULL DEFAULT 0,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (rl_key, window_start),
+    INDEX idx_rate_limit_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ============================================================================
+-- TABLE: symptom_term_daily
+-- Symptom checks per (day, normalized term), maintained when a check is logged
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS symptom_term_daily (
+    day DATE NOT NULL,
+    term VARCHAR(100) NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, term)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- ============================================================================
 -- MIGRATION: user_bed_bookings schema update
 -- Run these commands if you have the old schema with admission_date/medical_condition
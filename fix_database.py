@@ -107,6 +107,24 @@ def fix_database():
         _ensure_column('doctors', 'bio', "ALTER TABLE doctors ADD COLUMN bio TEXT NULL")
         _ensure_column('doctors', 'created_at', "ALTER TABLE doctors ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
 
+        # Row versions for conditional GETs (ETag / Last-Modified).
+        _ensure_column(
+            'doctors',
+            'updated_at',
+            "ALTER TABLE doctors ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+        )
+        _ensure_column(
+            'specialties',
+            'updated_at',
+            "ALTER TABLE specialties ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+        )
+        if _table_exists('hospitals'):
+            _ensure_column(
+                'hospitals',
+                'updated_at',
+                "ALTER TABLE hospitals ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+            )
+
         # Backfill doctors.specialty_id from doctors.specialty (best effort)
         try:
             cursor.execute(
@@ -386,6 +404,35 @@ def fix_database():
             except Exception:
                 pass
 
+            # Login looks hospitals up with a plain `email = %s` so it can use an
+            # index; that relies on a case-insensitive collation (the utf8mb4
+            # defaults are). Normalize stored emails too (best-effort).
+            try:
+                cursor.execute(
+                    """
+                    SELECT COLLATION_NAME
+                    FROM INFORMATION_SCHEMA.COLUMNS
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'hospitals' AND COLUMN_NAME = 'email'
+                    """
+                )
+                row = cursor.fetchone() or {}
+                collation = (row.get('COLLATION_NAME') or '').lower()
+                if collation and not collation.endswith('_ci'):
+                    print("Switching hospitals.email to a case-insensitive collation...")
+                    cursor.execute("ALTER TABLE hospitals MODIFY email VARCHAR(255) COLLATE utf8mb4_unicode_ci")
+                cursor.execute(
+                    "UPDATE hospitals SET email = LOWER(TRIM(email)) "
+                    "WHERE email IS NOT NULL AND BINARY email <> BINARY LOWER(TRIM(email))"
+                )
+                conn.commit()
+            except Exception:
+                pass
+            try:
+                cursor.execute("CREATE INDEX idx_hospitals_email ON hospitals(email)")
+                conn.commit()
+            except Exception:
+                pass
+
         # --- Emergency SOS: tables + columns used by routes/emergency_sos.py ---
         _ensure_table(
             'emergency_types',
@@ -676,7 +723,151 @@ def fix_database():
                 conn.commit()
             except Exception:
                 pass
-        
+
+        # Hospital front-desk schedule: date windows + keyset pagination + stats (best-effort)
+        if _table_exists('hospital_appointments'):
+            try:
+                cursor.execute(
+                    "CREATE INDEX idx_hospital_schedule ON hospital_appointments"
+                    "(hospital_id, appointment_date, appointment_time, status)"
+                )
+                conn.commit()
+            except Exception:
+                pass
+
+        _ensure_table(
+            'background_jobs',
+            """
+            CREATE TABLE IF NOT EXISTS background_jobs (
+                id CHAR(32) PRIMARY KEY,
+                kind VARCHAR(50) NOT NULL,
+                owner VARCHAR(64) NOT NULL,
+                status ENUM('queued', 'running', 'succeeded', 'failed') NOT NULL DEFAULT 'queued',
+                progress TINYINT UNSIGNED NOT NULL DEFAULT 0,
+                message VARCHAR(255) NULL,
+                attempts INT NOT NULL DEFAULT 0,
+                result LONGTEXT NULL,
+                error TEXT NULL,
+                status_code INT NULL,
+                created_at DATETIME NOT NULL,
+                updated_at DATETIME NOT NULL,
+                expires_at DATETIME NULL,
+                INDEX idx_background_jobs_owner (owner),
+                INDEX idx_background_jobs_expires (expires_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """,
+        )
+
+        if _table_exists('bed_wards'):
+            try:
+                cursor.execute(
+                    "CREATE INDEX idx_bed_availability ON bed_wards"
+                    "(ward_type, ac_type, room_config, available_beds, hospital_id)"
+                )
+                conn.commit()
+            except Exception:
+                pass
+
+        _ensure_table(
+            'bed_occupancy_series',
+            """
+            CREATE TABLE IF NOT EXISTS bed_occupancy_series (
+                hospital_id INT NOT NULL,
+                ward_type VARCHAR(20) NOT NULL,
+                resolution ENUM('5m', '1h', '1d') NOT NULL,
+                bucket_start DATETIME NOT NULL,
+                samples INT NOT NULL DEFAULT 0,
+                occupied_sum BIGINT NOT NULL DEFAULT 0,
+                total_sum BIGINT NOT NULL DEFAULT 0,
+                occupied_max INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (hospital_id, resolution, bucket_start, ward_type),
+                INDEX idx_occupancy_series_retention (resolution, bucket_start),
+                FOREIGN KEY (hospital_id) REFERENCES hospitals(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """,
+        )
+
+        _ensure_table(
+            'weight_recommendations',
+            """
+            CREATE TABLE IF NOT EXISTS weight_recommendations (
+                user_id INT PRIMARY KEY,
+                fingerprint CHAR(40) NOT NULL,
+                prompt_version VARCHAR(32) NOT NULL,
+                payload LONGTEXT NOT NULL,
+                generated_at DATETIME NOT NULL,
+                refresh_fingerprint CHAR(40) NULL,
+                refresh_started_at DATETIME NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """,
+        )
+
+        _ensure_table(
+            'rate_limit_counters',
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_counters (
+                rl_key CHAR(40) NOT NULL,
+                window_start BIGINT NOT NULL,
+                hits INT NOT NULL DEFAULT 0,
+                expires_at DATETIME NOT NULL,
+                PRIMARY KEY (rl_key, window_start),
+                INDEX idx_rate_limit_expires (expires_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """,
+        )
+
+        _ensure_table(
+            'symptom_term_daily',
+            """
+            CREATE TABLE IF NOT EXISTS symptom_term_daily (
+                day DATE NOT NULL,
+                term VARCHAR(100) NOT NULL,
+                count INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, term)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """,
+        )
+        if _table_exists('symptom_logs'):
+            try:
+                cursor.execute("CREATE INDEX idx_symptom_logs_created ON symptom_logs(created_at)")
+                conn.commit()
+            except Exception:
+                pass
+        if _table_exists('medical_reports'):
+            # Report search: FULLTEXT for MATCH ... AGAINST, plus per-user date order.
+            for index_sql in (
+                "CREATE FULLTEXT INDEX ft_report_text ON medical_reports(ocr_text, ai_interpretation)",
+                "CREATE INDEX idx_user_uploaded ON medical_reports(user_id, uploaded_at)",
+            ):
+                try:
+                    cursor.execute(index_sql)
+                    conn.commit()
+                except Exception:
+                    pass
+
+        _ensure_table(
+            'lab_results',
+            """
+            CREATE TABLE IF NOT EXISTS lab_results (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                user_id INT NOT NULL,
+                report_id INT NULL,
+                test_code VARCHAR(32) NOT NULL,
+                test_name VARCHAR(100) NOT NULL,
+                value DECIMAL(12,4) NOT NULL,
+                unit VARCHAR(20) NULL,
+                ref_low DECIMAL(12,4) NULL,
+                ref_high DECIMAL(12,4) NULL,
+                flag CHAR(1) NULL,
+                source ENUM('regex', 'llm') NOT NULL DEFAULT 'regex',
+                measured_at DATETIME NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                FOREIGN KEY (report_id) REFERENCES medical_reports(id) ON DELETE CASCADE,
+                INDEX idx_lab_user_test_time (user_id, test_code, measured_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            """,
+        )
         cursor.close()
         conn.close()
         return True